@@ -141,3 +141,49 @@ class UsageAnalyticsSummary(models.Model):
     
     def __str__(self):
         return f"{self.court_complex.name} - {self.period_type} ({self.period_start} to {self.period_end})"
+
+
+class HourlyPresence(models.Model):
+    """
+    Distinct-player rollup: one row per court complex, court-local hour and
+    codename, built from AT_COURTS BillboardEntry rows by
+    billboard.analytics_rollup.
+
+    Distinct visitor counts over any window of hours (peak hour, weekday,
+    weekly trend, 7/30-day totals) are COUNT(DISTINCT codename) over these
+    rows, so the analytics API never reads raw entries.
+    """
+    court_complex = models.ForeignKey(
+        CourtComplex,
+        on_delete=models.CASCADE,
+        related_name='hourly_presence'
+    )
+    date = models.DateField()  # court-local date
+    hour = models.IntegerField()  # court-local hour, 0-23
+    bucket_start = models.DateTimeField()  # start of the local hour, stored as UTC
+    codename = models.CharField(max_length=6)
+    check_ins = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-bucket_start']
+        unique_together = ['court_complex', 'date', 'hour', 'codename']
+        indexes = [
+            models.Index(fields=['court_complex', 'bucket_start']),
+            models.Index(fields=['bucket_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.court_complex.name} - {self.date} {self.hour}:00 - {self.codename}"
+
+
+class AnalyticsRollupState(models.Model):
+    """
+    Watermark for an incremental analytics rollup job.
+    ``last_entry_id`` is the highest BillboardEntry id already rolled up.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_entry_id = models.BigIntegerField(default=0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} @ entry {self.last_entry_id}"
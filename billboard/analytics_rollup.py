@@ -0,0 +1,205 @@
+"""
+billboard/analytics_rollup.py
+=============================
+Incremental rollup of AT_COURTS presence into per-hour distinct-player rows.
+
+The court analytics API used to stream every BillboardEntry of the last 30
+(or 56) days into Python for each court on each request.  Now a rollup job
+maintains:
+
+  HourlyPresence    — one row per (court, local date, local hour, codename)
+  HourlyUsageStats  — unique_visitors / total_check_ins per local hour
+  DailyUsageStats   — unique_visitors / total_check_ins per local day
+
+and the API answers with a fixed number of grouped queries over
+HourlyPresence (see court_analytics_api.py).
+
+Watermark
+---------
+AnalyticsRollupState('court_presence').last_entry_id is the highest entry
+id already rolled up; each run only looks at entries above it.  The
+watermark only advances past entries older than ``SETTLE``, so a row whose
+transaction committed after a higher id was processed is still picked up
+(young entries are simply re-processed on the next run).
+
+Runs only from the ``rollup_court_analytics`` / ``backfill_analytics``
+commands: render.yaml schedules the former every five minutes (the Procfile
+runs it with ``--interval``), and migration 0013 does the first full
+rollup on deploy.  Requests read the rollup as it stands.  A run that
+rebuilt anything invalidates the billboard_analytics cache region.
+
+Design principles:
+  - Idempotent: every court-local *day* touched by a new entry is rebuilt
+    from that day's entries, so re-processing never double counts.
+  - Buckets use the court's own timezone (CourtComplex.get_timezone()).
+  - The rollup owns unique_visitors / total_check_ins; snapshot-derived
+    metrics (peak_player_count, durations) are left to analytics_utils.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.utils import timezone
+
+from courts.models import CourtComplex
+from pfc_core import cache_regions
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = 'court_presence'
+# Presence only — GOING_TO_COURTS is intent, not physical presence.
+PRESENCE_TYPES = ('AT_COURTS',)
+SETTLE = timedelta(minutes=2)
+
+
+def _local_day_bounds(day, tz):
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+    return start, end
+
+
+def _court_timezone(court):
+    # Called unbound so historical CourtComplex models (migrations) work too
+    return CourtComplex.get_timezone(court)
+
+
+def _touched_days(entries, courts):
+    """{court_id: {local dates}} for (court_id, created_at) pairs."""
+    touched = defaultdict(set)
+    for court_id, created_at in entries:
+        court = courts.get(court_id)
+        if court is not None:
+            touched[court_id].add(created_at.astimezone(_court_timezone(court)).date())
+    return touched
+
+
+def _rebuild_court_days(court, days, apps=global_apps):
+    """Recompute HourlyPresence and the visitor stats for ``days`` of ``court``."""
+    BillboardEntry = apps.get_model('billboard', 'BillboardEntry')
+    HourlyPresence = apps.get_model('billboard', 'HourlyPresence')
+    HourlyUsageStats = apps.get_model('billboard', 'HourlyUsageStats')
+    DailyUsageStats = apps.get_model('billboard', 'DailyUsageStats')
+
+    tz = _court_timezone(court)
+    range_start = _local_day_bounds(min(days), tz)[0]
+    range_end = _local_day_bounds(max(days), tz)[1]
+
+    # (date, hour) -> {codename: check_ins}; (date, hour) -> bucket_start
+    buckets = defaultdict(lambda: defaultdict(int))
+    bucket_starts = {}
+    rows = BillboardEntry.objects.filter(
+        court_complex=court,
+        action_type__in=PRESENCE_TYPES,
+        created_at__gte=range_start,
+        created_at__lt=range_end,
+    ).values_list('created_at', 'codename')
+    for created_at, codename in rows.iterator():
+        local_dt = created_at.astimezone(tz)
+        if local_dt.date() not in days:
+            continue
+        key = (local_dt.date(), local_dt.hour)
+        buckets[key][codename] += 1
+        start = local_dt.replace(minute=0, second=0, microsecond=0)
+        # A repeated DST hour keeps its first occurrence
+        if key not in bucket_starts or start < bucket_starts[key]:
+            bucket_starts[key] = start
+
+    HourlyPresence.objects.filter(court_complex=court, date__in=days).delete()
+    HourlyPresence.objects.bulk_create([
+        HourlyPresence(
+            court_complex=court,
+            date=day,
+            hour=hour,
+            bucket_start=bucket_starts[(day, hour)],
+            codename=codename,
+            check_ins=check_ins,
+        )
+        for (day, hour), codenames in buckets.items()
+        for codename, check_ins in codenames.items()
+    ], batch_size=1000)
+
+    # Hours / days whose entries disappeared drop back to zero
+    HourlyUsageStats.objects.filter(court_complex=court, date__in=days).update(
+        unique_visitors=0, total_check_ins=0,
+    )
+    HourlyUsageStats.objects.bulk_create([
+        HourlyUsageStats(
+            court_complex=court,
+            date=day,
+            hour=hour,
+            unique_visitors=len(codenames),
+            total_check_ins=sum(codenames.values()),
+        )
+        for (day, hour), codenames in buckets.items()
+    ], update_conflicts=True, unique_fields=['court_complex', 'date', 'hour'],
+        update_fields=['unique_visitors', 'total_check_ins', 'updated_at'])
+
+    daily_codenames = defaultdict(set)
+    daily_check_ins = defaultdict(int)
+    for (day, _hour), codenames in buckets.items():
+        daily_codenames[day].update(codenames)
+        daily_check_ins[day] += sum(codenames.values())
+    DailyUsageStats.objects.filter(court_complex=court, date__in=days).update(
+        unique_visitors=0, total_check_ins=0,
+    )
+    DailyUsageStats.objects.bulk_create([
+        DailyUsageStats(
+            court_complex=court,
+            date=day,
+            unique_visitors=len(daily_codenames[day]),
+            total_check_ins=daily_check_ins[day],
+        )
+        for day in daily_codenames
+    ], update_conflicts=True, unique_fields=['court_complex', 'date'],
+        update_fields=['unique_visitors', 'total_check_ins', 'updated_at'])
+
+
+def rollup_presence(court_ids=None, full=False, apps=global_apps):
+    """
+    Roll up AT_COURTS entries added since the watermark.
+
+    ``full=True`` ignores the watermark and rebuilds every day that has
+    entries (optionally only for ``court_ids``).  ``apps`` lets a data
+    migration pass its historical models.  Returns the number of court-days
+    rebuilt.
+    """
+    BillboardEntry = apps.get_model('billboard', 'BillboardEntry')
+    AnalyticsRollupState = apps.get_model('billboard', 'AnalyticsRollupState')
+    CourtComplex = apps.get_model('courts', 'CourtComplex')
+
+    with transaction.atomic():
+        state, _created = AnalyticsRollupState.objects.get_or_create(name=ROLLUP_NAME)
+        # Serialise concurrent runs
+        state = AnalyticsRollupState.objects.select_for_update().get(pk=state.pk)
+
+        entries = BillboardEntry.objects.filter(action_type__in=PRESENCE_TYPES)
+        if court_ids is not None:
+            entries = entries.filter(court_complex_id__in=court_ids)
+        if not full:
+            entries = entries.filter(id__gt=state.last_entry_id)
+
+        new_entries = list(entries.values_list('id', 'court_complex_id', 'created_at'))
+        if not new_entries:
+            return 0
+        courts = CourtComplex.objects.in_bulk({court_id for _, court_id, _ in new_entries})
+        touched = _touched_days(
+            [(court_id, created_at) for _, court_id, created_at in new_entries], courts
+        )
+        for court_id, days in touched.items():
+            _rebuild_court_days(courts[court_id], days, apps=apps)
+
+        # A court-filtered run must not move the watermark past other courts' entries
+        if court_ids is None:
+            settled = timezone.now() - SETTLE
+            settled_ids = [entry_id for entry_id, _, created_at in new_entries if created_at < settled]
+            if settled_ids:
+                state.last_entry_id = max(state.last_entry_id, max(settled_ids))
+            state.last_run_at = timezone.now()
+            state.save(update_fields=['last_entry_id', 'last_run_at'])
+
+    rebuilt = sum(len(days) for days in touched.values())
+    cache_regions.invalidate(cache_regions.BILLBOARD_ANALYTICS)
+    logger.info(f"Court presence rollup: {len(new_entries)} entries, {rebuilt} court-days rebuilt")
+    return rebuilt
@@ -3,7 +3,7 @@ Utility functions for tracking and calculating court complex usage analytics.
 """
 import logging
 from django.utils import timezone
-from django.db.models import Count, Avg, Max, Sum, Q
+from django.db.models import Count, Avg, Max, Q
 from datetime import datetime, timedelta, date
 from courts.timezone_utils import get_court_local_now, get_court_local_date
 from billboard.analytics_models import (
@@ -139,9 +139,7 @@ def update_hourly_stats(court_complex, target_date=None, target_hour=None):
             created_at__lt=hour_end
         )
         
-        # Calculate metrics
-        unique_visitors = entries.values('codename').distinct().count()
-        total_check_ins = entries.count()
+        # unique_visitors / total_check_ins are maintained by analytics_rollup
         
         # Get peak player count from snapshots
         peak_count = CourtComplexUsageSnapshot.objects.filter(
@@ -173,14 +171,12 @@ def update_hourly_stats(court_complex, target_date=None, target_hour=None):
             date=target_date,
             hour=target_hour,
             defaults={
-                'unique_visitors': unique_visitors,
                 'peak_player_count': peak_count,
-                'total_check_ins': total_check_ins,
                 'average_duration_minutes': avg_duration,
             }
         )
         
-        logger.info(f"Updated hourly stats for {court_complex.name} on {target_date} {target_hour}:00 - {unique_visitors} visitors")
+        logger.info(f"Updated hourly stats for {court_complex.name} on {target_date} {target_hour}:00 - peak {peak_count} players")
         return stats
         
     except Exception as e:
@@ -211,9 +207,8 @@ def update_daily_stats(court_complex, target_date=None):
             logger.warning(f"No hourly stats found for {court_complex.name} on {target_date}")
             return None
         
-        # Aggregate metrics
-        total_unique_visitors = hourly_stats.aggregate(Sum('unique_visitors'))['unique_visitors__sum'] or 0
-        total_check_ins = hourly_stats.aggregate(Sum('total_check_ins'))['total_check_ins__sum'] or 0
+        # Aggregate metrics (unique_visitors / total_check_ins are maintained
+        # by analytics_rollup, which counts distinct players across the day)
         peak_count = hourly_stats.aggregate(Max('peak_player_count'))['peak_player_count__max'] or 0
         
         # Find peak hour
@@ -234,8 +229,6 @@ def update_daily_stats(court_complex, target_date=None):
             court_complex=court_complex,
             date=target_date,
             defaults={
-                'unique_visitors': total_unique_visitors,
-                'total_check_ins': total_check_ins,
                 'peak_hour': peak_hour,
                 'peak_player_count': peak_count,
                 'total_player_hours': total_player_hours,
@@ -243,7 +236,7 @@ def update_daily_stats(court_complex, target_date=None):
             }
         )
         
-        logger.info(f"Updated daily stats for {court_complex.name} on {target_date} - {total_unique_visitors} visitors")
+        logger.info(f"Updated daily stats for {court_complex.name} on {target_date} - peak {peak_count} players")
         return stats
         
     except Exception as e:
@@ -331,6 +324,9 @@ def trigger_analytics_update(court_complex):
         # Record snapshot
         record_usage_snapshot(court_complex)
         
+        # Distinct-visitor stats come from the scheduled rollup_court_analytics
+        # command, not from the check-in request
+        
         # Update current hour stats
         update_hourly_stats(court_complex)
         
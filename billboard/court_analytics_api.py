@@ -1,8 +1,17 @@
 """
 billboard/court_analytics_api.py
 ==================================
-Lightweight analytics API that reads directly from BillboardEntry data.
-No pre-aggregation needed — queries are fast enough for the volumes involved.
+Lightweight analytics API over the HourlyPresence rollup.
+Payloads are kept in the "billboard_analytics" cache region (see
+pfc_core/cache_regions.py), invalidated whenever a BillboardEntry is saved.
+
+Historical metrics are read from HourlyPresence (one row per court, local
+hour and codename — see billboard/analytics_rollup.py) as the last rollup
+left it; requests never roll up themselves.  The ``rollup_court_analytics``
+command brings it up to date (schedule it every few minutes) and
+invalidates the region.  Each endpoint runs a fixed number of grouped
+queries, independent of history length and of the number of courts.
+Windows ("last 30 days") are aligned to whole local hours.
 
 Endpoints:
   GET /billboard/api/analytics/summary/          — all-courts overview
@@ -40,24 +49,25 @@ Manual check-ins (presence_source = 'manual', or legacy entries with no source):
 In all cases, distinct codenames are counted so one player with multiple
 active entries (e.g. a manual check-in AND a game entry) counts as 1 person.
 """
-from collections import defaultdict
 from datetime import timedelta
 
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractIsoWeekDay, TruncWeek
 from django.http import JsonResponse
 from django.utils import timezone
 from django.views.decorators.http import require_GET
 
 from courts.models import CourtComplex
-from courts.timezone_utils import get_court_local_now
+from billboard.analytics_models import HourlyPresence
+from billboard.analytics_rollup import PRESENCE_TYPES
 from billboard.models import BillboardEntry
+from pfc_core import cache_regions
 
 
 DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-# The base queryset for analytics uses only AT_COURTS entries.
+# The base queryset for analytics uses only AT_COURTS entries (PRESENCE_TYPES).
 # GOING_TO_COURTS entries are intent/scheduling data, not physical presence,
 # and must not be counted in the current-occupancy or historical visitor totals.
-PRESENCE_TYPES = ("AT_COURTS",)
 
 
 def _entry_qs(days=30, court=None):
@@ -72,14 +82,39 @@ def _entry_qs(days=30, court=None):
     return qs
 
 
+def _presence_qs(days, court=None):
+    """
+    HourlyPresence rows for the last N days: every hour bucket that overlaps
+    the window (so the bucket holding the cutoff instant is included).
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    qs = HourlyPresence.objects.filter(bucket_start__gt=cutoff - timedelta(hours=1))
+    if court:
+        qs = qs.filter(court_complex=court)
+    return qs
+
+
+def _distinct_players(qs, *group_by, **expressions):
+    """{group key: distinct codenames} for a grouped HourlyPresence queryset."""
+    rows = qs.values(*group_by, **expressions).annotate(
+        players=Count("codename", distinct=True)
+    ).order_by()
+    keys = list(group_by) + list(expressions)
+    result = {}
+    for row in rows:
+        key = tuple(row[k] for k in keys)
+        result[key if len(key) > 1 else key[0]] = row["players"]
+    return result
+
+
 # Maximum age for a game-generated presence entry to be considered "live".
 # Mirrors the constant in analytics_utils.py.
 _GAME_PRESENCE_MAX_AGE_HOURS = 6
 
 
-def _current_occupancy(qs, two_hours_ago):
+def _currently_present(qs, two_hours_ago):
     """
-    Count distinct players currently at court from *qs* (already filtered to AT_COURTS).
+    Entries from *qs* (already filtered to AT_COURTS) that count as present now.
 
     Presence rules (consistent with BillboardListView and analytics_utils):
     - Game entries (friendly_game / tournament_match): is_active=True AND created
@@ -87,7 +122,6 @@ def _current_occupancy(qs, two_hours_ago):
       net against lifecycle failures (match left in 'active' without a result).
     - Post-game grace (post_game): is_active=True AND expires_at >= now.
     - Manual / legacy entries: is_active=True AND within the 2-hour window.
-    - Returns a distinct codename count so one player with multiple entries = 1 person.
     """
     now = timezone.now()
     game_cutoff = now - timedelta(hours=_GAME_PRESENCE_MAX_AGE_HOURS)
@@ -119,35 +153,22 @@ def _current_occupancy(qs, two_hours_ago):
                 created_at__gte=two_hours_ago,
             )
         )
-        .values("codename")
-        .distinct()
-        .count()
     )
 
 
-def _distinct_players_by_bucket(qs, court_tz, bucket_fn):
+def _current_occupancy(qs, two_hours_ago):
     """
-    Count distinct players (codenames) per time bucket.
-
-    For each entry, compute a bucket key using *bucket_fn(local_datetime)*.
-    Each codename is counted at most once per bucket — if a player has multiple
-    presence entries in the same bucket (e.g. a game entry + a post_game entry),
-    they still count as 1 visitor for that bucket.
+    Count distinct players currently at court from *qs*.
+    Returns a distinct codename count so one player with multiple entries = 1 person.
+    """
+    return _currently_present(qs, two_hours_ago).values("codename").distinct().count()
 
-    Args:
-        qs:         BillboardEntry queryset (already filtered to AT_COURTS + date range)
-        court_tz:   pytz timezone for the court complex
-        bucket_fn:  callable(aware_datetime) -> hashable bucket key
 
-    Returns:
-        defaultdict(set): bucket_key → set of codenames
-    """
-    bucket_codenames = defaultdict(set)
-    for created_at, codename in qs.values_list("created_at", "codename"):
-        local_dt = created_at.astimezone(court_tz)
-        key = bucket_fn(local_dt)
-        bucket_codenames[key].add(codename)
-    return bucket_codenames
+def _current_occupancy_by_court():
+    """{court_id: distinct players present now} for all courts, in one query."""
+    # The 2-hour window is the same instant in every court timezone.
+    two_hours_ago = timezone.now() - timedelta(hours=2)
+    return _distinct_players(_currently_present(_entry_qs(days=30), two_hours_ago), "court_complex")
 
 
 @require_GET
@@ -156,39 +177,39 @@ def api_analytics_summary(request):
     GET /billboard/api/analytics/summary/
     Returns per-court overview stats for the last 30 days.
     """
+    result = cache_regions.region(cache_regions.BILLBOARD_ANALYTICS).get_or_set(
+        ("summary",), _summary_rows
+    )
+    return JsonResponse({"ok": True, "courts": result})
+
+
+def _summary_rows():
     courts = CourtComplex.objects.order_by("name")
-    result = []
+    presence_30d = _presence_qs(days=30)
 
-    for court in courts:
-        # Use court-local now so the 2-hour cutoff is correct for each court's timezone
-        court_now = get_court_local_now(court)
-        two_hours_ago = court_now - timedelta(hours=2)
-
-        qs = _entry_qs(days=30, court=court)
-        # total_30d: distinct players, not raw rows
-        total = qs.values("codename").distinct().count()
-        current = _current_occupancy(qs, two_hours_ago)
-
-        # Peak hour — bucket by court-local hour, count distinct players per hour
-        import pytz
-        try:
-            court_tz = pytz.timezone(court.timezone_name)
-        except Exception:
-            court_tz = pytz.utc
-
-        hour_buckets = _distinct_players_by_bucket(qs, court_tz, lambda dt: dt.hour)
-        # Peak hour = the hour with the most distinct players
-        peak_hour = max(hour_buckets, key=lambda h: len(hour_buckets[h])) if hour_buckets else None
+    # total_30d: distinct players, not raw rows
+    totals = _distinct_players(presence_30d, "court_complex")
+    current = _current_occupancy_by_court()
+
+    # Peak hour — court-local hour with the most distinct players
+    peak_hours = {}
+    hour_counts = _distinct_players(presence_30d, "court_complex", "hour")
+    for (court_id, hour), players in sorted(hour_counts.items()):
+        if players > hour_counts.get((court_id, peak_hours.get(court_id)), 0):
+            peak_hours[court_id] = hour
 
+    result = []
+    for court in courts:
+        peak_hour = peak_hours.get(court.pk)
         result.append({
             "id":         court.pk,
             "name":       court.name,
-            "current":    current,
-            "total_30d":  total,
+            "current":    current.get(court.pk, 0),
+            "total_30d":  totals.get(court.pk, 0),
             "peak_hour":  f"{peak_hour:02d}:00" if peak_hour is not None else "—",
         })
 
-    return JsonResponse({"ok": True, "courts": result})
+    return result
 
 
 @require_GET
@@ -222,62 +243,60 @@ def api_analytics_court(request, court_id):
     except CourtComplex.DoesNotExist:
         return JsonResponse({"ok": False, "error": "Court not found"}, status=404)
 
-    # Use court-local now so the 2-hour cutoff is correct for this court's timezone
-    court_now = get_court_local_now(court)
-    two_hours_ago = court_now - timedelta(hours=2)
-    qs_30 = _entry_qs(days=30, court=court)
-    qs_7  = _entry_qs(days=7,  court=court)
+    payload = cache_regions.region(cache_regions.BILLBOARD_ANALYTICS).get_or_set(
+        ("court", court.pk), lambda: _court_payload(court)
+    )
+    return JsonResponse(payload)
+
 
-    import pytz
-    try:
-        court_tz = pytz.timezone(court.timezone_name)
-    except Exception:
-        court_tz = pytz.utc
+def _court_payload(court):
+    # The 2-hour cutoff is an absolute instant, identical in the court's timezone
+    two_hours_ago = timezone.now() - timedelta(hours=2)
+    presence_30 = _presence_qs(days=30, court=court)
 
     # ── Hourly distribution (0-23) — distinct players per hour-of-day ────────
     # Each player counted once per hour-of-day bucket across the 30-day window.
     # e.g. if a player appears at 10:00 on Monday and 10:00 on Wednesday,
     # they count as 1 distinct player for the 10:00 bucket (not 2).
-    hour_buckets = _distinct_players_by_bucket(qs_30, court_tz, lambda dt: dt.hour)
+    hour_counts = _distinct_players(presence_30, "hour")
     hourly = [
-        {"hour": h, "label": f"{h:02d}:00", "count": len(hour_buckets.get(h, set()))}
+        {"hour": h, "label": f"{h:02d}:00", "count": hour_counts.get(h, 0)}
         for h in range(9, 23)  # 09:00 – 22:00 (typical playing hours)
     ]
 
     # ── Day-of-week distribution — distinct players per weekday ───────────────
     # Each player counted once per weekday bucket across the 30-day window.
-    day_buckets = _distinct_players_by_bucket(qs_30, court_tz, lambda dt: dt.weekday())
+    day_counts = _distinct_players(presence_30, weekday=ExtractIsoWeekDay("date"))
     daily = [
-        {"day": d, "label": DAY_NAMES[d], "count": len(day_buckets.get(d, set()))}
+        {"day": d, "label": DAY_NAMES[d], "count": day_counts.get(d + 1, 0)}
         for d in range(7)
     ]
 
     # ── Weekly trend (last 8 weeks) — distinct players per calendar week ──────
     # Each player counted once per week even if they appeared multiple times.
-    qs_56 = _entry_qs(days=56, court=court)
-    week_buckets = _distinct_players_by_bucket(
-        qs_56, court_tz,
-        lambda dt: (dt.date() - timedelta(days=dt.weekday())).isoformat()
-    )
+    week_counts = _distinct_players(_presence_qs(days=56, court=court), week=TruncWeek("date"))
     weekly = sorted(
-        [{"date": k, "count": len(v)} for k, v in week_buckets.items()],
+        [{"date": week.isoformat(), "count": players} for week, players in week_counts.items()],
         key=lambda x: x["date"],
     )
 
-    # ── Current occupancy (distinct players) — unchanged ─────────────────────
-    current = _current_occupancy(qs_30, two_hours_ago)
+    # ── Current occupancy (distinct players) — live entries ──────────────────
+    current = _current_occupancy(_entry_qs(days=30, court=court), two_hours_ago)
 
     # ── Totals: distinct players (not raw row counts) ─────────────────────────
-    total_7d  = qs_7.values("codename").distinct().count()
-    total_30d = qs_30.values("codename").distinct().count()
+    week_cutoff = timezone.now() - timedelta(days=7, hours=1)
+    totals = presence_30.aggregate(
+        total_7d=Count("codename", distinct=True, filter=Q(bucket_start__gt=week_cutoff)),
+        total_30d=Count("codename", distinct=True),
+    )
 
-    return JsonResponse({
+    return {
         "ok":       True,
         "court":    {"id": court.pk, "name": court.name},
         "hourly":   hourly,
         "daily":    daily,
         "weekly":   weekly,
         "current":  current,
-        "total_7d": total_7d,
-        "total_30d": total_30d,
-    })
+        "total_7d": totals["total_7d"],
+        "total_30d": totals["total_30d"],
+    }
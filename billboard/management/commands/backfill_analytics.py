@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta, datetime
 from billboard.models import BillboardEntry
+from billboard.analytics_rollup import rollup_presence
 from billboard.analytics_utils import (
     record_usage_snapshot,
     update_hourly_stats,
@@ -57,6 +58,10 @@ class Command(BaseCommand):
         
         self.stdout.write(f'Processing {complexes.count()} court complex(es) from {start_date} to {end_date}')
         
+        # Distinct-visitor counts come from the presence rollup
+        rebuilt = rollup_presence(court_ids=list(complexes.values_list('id', flat=True)), full=True)
+        self.stdout.write(f'Rolled up presence for {rebuilt} court-day(s)')
+        
         total_hourly = 0
         total_daily = 0
         
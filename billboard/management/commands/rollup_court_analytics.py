@@ -0,0 +1,68 @@
+"""
+Management command that rolls up new AT_COURTS billboard entries into
+HourlyPresence / HourlyUsageStats / DailyUsageStats.
+Usage: python manage.py rollup_court_analytics [--full] [--complex-id ID] [--interval SECONDS]
+
+Only entries past the stored watermark are processed.  render.yaml runs it
+as a cron job every five minutes; ``--interval`` keeps it running as a
+worker instead (Procfile).  The analytics API only reads the rollup, so it
+is as fresh as the last run.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from billboard.analytics_models import AnalyticsRollupState
+from billboard.analytics_rollup import ROLLUP_NAME, rollup_presence
+
+
+class Command(BaseCommand):
+    help = 'Incrementally roll up court presence into distinct-visitor analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Ignore the watermark and rebuild every day that has entries'
+        )
+        parser.add_argument(
+            '--complex-id',
+            type=int,
+            help='Specific court complex ID to roll up (optional; leaves the watermark unchanged)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Keep running, rolling up every this many seconds (e.g. 300)'
+        )
+
+    def handle(self, *args, **options):
+        if not options['interval']:
+            self._run(options)
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Court analytics rollup running every {options['interval']:g}s"
+        ))
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    self._run(options)
+                except Exception as exc:
+                    self.stderr.write(f"Rollup failed: {exc}")
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("\nStopped rollup.")
+
+    def _run(self, options):
+        complex_id = options['complex_id']
+        rebuilt = rollup_presence(
+            court_ids=[complex_id] if complex_id else None,
+            full=options['full'],
+        )
+        state = AnalyticsRollupState.objects.filter(name=ROLLUP_NAME).first()
+        watermark = state.last_entry_id if state else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rebuilt} court-day(s); watermark at entry {watermark}'
+        ))
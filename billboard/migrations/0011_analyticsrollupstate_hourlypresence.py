@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 06:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billboard', '0010_presence_prefs_anon_community_report'),
+        ('courts', '0010_courtcomplex_timezone_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_entry_id', models.BigIntegerField(default=0)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HourlyPresence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.IntegerField()),
+                ('bucket_start', models.DateTimeField()),
+                ('codename', models.CharField(max_length=6)),
+                ('check_ins', models.IntegerField(default=0)),
+                ('court_complex', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_presence', to='courts.courtcomplex')),
+            ],
+            options={
+                'ordering': ['-bucket_start'],
+                'indexes': [models.Index(fields=['court_complex', 'bucket_start'], name='billboard_h_court_c_d8b845_idx'), models.Index(fields=['bucket_start'], name='billboard_h_bucket__b61279_idx')],
+                'unique_together': {('court_complex', 'date', 'hour', 'codename')},
+            },
+        ),
+    ]
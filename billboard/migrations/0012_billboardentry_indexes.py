@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billboard', '0011_analyticsrollupstate_hourlypresence'),
+        ('courts', '0010_courtcomplex_timezone_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billboardentry',
+            index=models.Index(fields=['court_complex', 'action_type', 'is_active', 'created_at'], name='billboard_b_court_c_ef16c4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='billboardentry',
+            index=models.Index(fields=['codename', 'action_type', 'is_active'], name='billboard_b_codenam_8112b8_idx'),
+        ),
+    ]
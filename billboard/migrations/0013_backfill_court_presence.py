@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def backfill_court_presence(apps, schema_editor):
+    """Roll up all existing presence, so court analytics are populated on deploy."""
+    from billboard.analytics_rollup import rollup_presence
+
+    rollup_presence(full=True, apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billboard', '0012_billboardentry_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_court_presence, migrations.RunPython.noop),
+    ]
@@ -103,6 +103,12 @@ class BillboardEntry(models.Model):
         ordering = ['-created_at']
         verbose_name = "Billboard Entry"
         verbose_name_plural = "Billboard Entries"
+        indexes = [
+            # Presence per court (live counts, analytics rollup)
+            models.Index(fields=['court_complex', 'action_type', 'is_active', 'created_at']),
+            # A player's own entries (check-out, duplicate check-in)
+            models.Index(fields=['codename', 'action_type', 'is_active']),
+        ]
     
     def __str__(self):
         return f"{self.get_player_name()} - {self.get_action_type_display()} at {self.court_complex.name}"
@@ -229,7 +235,9 @@ from billboard.analytics_models import (
     CourtComplexUsageSnapshot,
     HourlyUsageStats,
     DailyUsageStats,
-    UsageAnalyticsSummary
+    UsageAnalyticsSummary,
+    HourlyPresence,
+    AnalyticsRollupState,
 )
 
 # Import presence prefs model (must be after BillboardEntry is defined)
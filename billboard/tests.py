@@ -1,3 +1,106 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from courts.models import CourtComplex
+
+from .analytics_models import DailyUsageStats, HourlyPresence
+from .analytics_rollup import rollup_presence
+from .court_analytics_api import _court_payload, _summary_rows
+from .models import BillboardEntry
+
+
+class CourtAnalyticsRollupTests(TestCase):
+    def setUp(self):
+        self.court = CourtComplex.objects.create(name="Court", description="x")
+
+    def _entry(self, codename, hours_ago, action_type='AT_COURTS', court=None):
+        entry = BillboardEntry.objects.create(
+            codename=codename,
+            action_type=action_type,
+            court_complex=court or self.court,
+            is_active=False,
+        )
+        BillboardEntry.objects.filter(pk=entry.pk).update(
+            created_at=timezone.now() - timedelta(hours=hours_ago)
+        )
+        return entry
+
+    def test_distinct_players_per_bucket(self):
+        # Same player twice in one hour, plus another player; intent entries ignored
+        self._entry("AAAAAA", 30)
+        self._entry("AAAAAA", 30)
+        self._entry("BBBBBB", 30)
+        self._entry("CCCCCC", 30, action_type='GOING_TO_COURTS')
+
+        rollup_presence()
+
+        self.assertEqual(HourlyPresence.objects.count(), 2)
+        payload = _court_payload(self.court)
+        self.assertEqual(payload["total_30d"], 2)
+        self.assertEqual(sum(day["count"] for day in payload["daily"]), 2)
+        daily = DailyUsageStats.objects.get(court_complex=self.court)
+        self.assertEqual((daily.unique_visitors, daily.total_check_ins), (2, 3))
+
+    def test_rollup_is_incremental_and_idempotent(self):
+        self._entry("AAAAAA", 50)
+        self.assertEqual(rollup_presence(), 1)
+        # Nothing new past the watermark
+        self.assertEqual(rollup_presence(), 0)
+
+        self._entry("BBBBBB", 50)
+        rollup_presence()
+        rollup_presence(full=True)
+        self.assertEqual(_court_payload(self.court)["total_30d"], 2)
+
+    def test_migration_rolls_up_existing_presence(self):
+        self._entry("AAAAAA", 30)
+        self._entry("BBBBBB", 30)
+
+        migration = import_module('billboard.migrations.0013_backfill_court_presence')
+        state = MigrationLoader(connection).project_state(('billboard', '0013_backfill_court_presence'))
+        migration.backfill_court_presence(state.apps, None)
+
+        self.assertEqual(_court_payload(self.court)["total_30d"], 2)
+        # The watermark is set, so the scheduled run has nothing left to do
+        self.assertEqual(rollup_presence(), 0)
+
+    def test_endpoints_read_the_rollup_without_running_it(self):
+        self._entry("AAAAAA", 30)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(_court_payload(self.court)["total_30d"], 0)
+            _summary_rows()
+        self.assertFalse(any(
+            q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) or 'FOR UPDATE' in q['sql']
+            for q in queries.captured_queries
+        ))
+
+        rollup_presence()
+        self.assertEqual(_court_payload(self.court)["total_30d"], 1)
+
+    def test_summary_queries_bounded_by_history_and_courts(self):
+        other = CourtComplex.objects.create(name="Other", description="y")
+        for hours_ago in range(0, 24 * 20, 7):
+            self._entry("AAAAAA", hours_ago)
+            self._entry("BBBBBB", hours_ago, court=other)
+        rollup_presence()
+
+        with CaptureQueriesContext(connection) as small:
+            _summary_rows()
+
+        CourtComplex.objects.create(name="Third", description="z")
+        for hours_ago in range(1, 24 * 25, 3):
+            self._entry("CCCCCC", hours_ago)
+        rollup_presence()
+
+        with CaptureQueriesContext(connection) as large:
+            rows = _summary_rows()
 
-# Create your tests here.
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual({row["name"]: row["total_30d"] for row in rows},
+                         {"Court": 2, "Other": 1, "Third": 0})
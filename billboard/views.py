@@ -1,5 +1,6 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
@@ -15,6 +16,7 @@ from .forms import BillboardEntryForm, BillboardResponseForm, QuickResponseForm
 from teams.models import Team
 from courts.models import CourtComplex
 from courts.timezone_utils import get_court_local_now
+from pfc_core import name_search
 
 
 def team_search_api(request):
@@ -26,25 +28,14 @@ def team_search_api(request):
     if len(query) < 2:
         return JsonResponse({'teams': []})
     
-    # Search teams by name (case-insensitive, contains).
-    # Strict visibility rule: not archived, not temp, not subteam, full profile only.
-    teams = Team.objects.filter(
-        name__icontains=query,
-        is_archived=False,
-        is_tournament_temp=False,
-        parent_team__isnull=True,
-        profile__profile_type='full',
-    ).order_by('name')[:10]  # Limit to 10 results
+    # Ranked, accent-insensitive search over visible teams (not archived, not
+    # temp, not subteam, full profile only); results include the PIN for
+    # verification later
+    teams = name_search.search('teams', query)
     
-    team_data = []
-    for team in teams:
-        team_data.append({
-            'id': team.id,
-            'name': team.name,
-            'pin': team.pin  # Include PIN for verification later
-        })
-    
-    return JsonResponse({'teams': team_data})
+    response = JsonResponse({'teams': teams})
+    patch_cache_control(response, private=True, max_age=name_search.RESPONSE_MAX_AGE)
+    return response
 
 
 @csrf_exempt
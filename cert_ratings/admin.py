@@ -15,7 +15,8 @@ class CertifyingEntityAdmin(admin.ModelAdmin):
             "fields": ("elo_starting_rating", "elo_k_factor", "elo_scale"),
             "description": (
                 "These parameters apply when rating_system = classic_elo. "
-                "Changing them after ratings have been calculated will not recalculate historical entries."
+                "Changing them after ratings have been calculated will not recalculate historical entries; "
+                "run `python manage.py rerate_cert_ratings --entity <name>` to rebuild them."
             ),
         }),
     )
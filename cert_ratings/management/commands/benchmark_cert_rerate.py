@@ -0,0 +1,180 @@
+"""
+Django management command that benchmarks bulk Certifying Entity re-rating
+Usage: python manage.py benchmark_cert_rerate [--matches 100000] [--players 5000] [--team-size 3] [--sample 200]
+
+Generates random matches between teams drawn from a player pool, writes them
+as Match / MatchPlayer rows of a throw-away certified tournament and:
+
+  - rates the first ``--sample`` matches with process_match_cert_ratings,
+    to estimate what re-rating everything match by match would cost
+  - rebuilds the entity with batch.rerate_entity
+
+The rebuilt ratings must equal an in-memory replay of the same matches with
+elo.calculate_team_elo_change.  Everything runs inside a transaction that is
+rolled back.
+"""
+
+import logging
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from cert_ratings.batch import rerate_entity
+from cert_ratings.elo import calculate_team_elo_change
+from cert_ratings.models import CertifyingEntity, CertRatingHistory, PlayerCertRating
+from cert_ratings.processor import process_match_cert_ratings
+from matches.models import Match, MatchPlayer
+from teams.models import Player, Team
+from tournaments.models import Tournament
+
+
+TEAM_POOL = 1000
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bulk Certifying Entity re-rating against the match-by-match processor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--matches',
+            type=int,
+            default=100000,
+            help='Matches to re-rate (default: 100000)'
+        )
+        parser.add_argument(
+            '--players',
+            type=int,
+            default=5000,
+            help='Size of the player pool (default: 5000)'
+        )
+        parser.add_argument(
+            '--team-size',
+            type=int,
+            default=3,
+            help='Players per team (default: 3)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed (default: 42)'
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=200,
+            help='Matches rated one by one with the processor for comparison (default: 200)'
+        )
+
+    def handle(self, *args, **options):
+        if options['players'] < 2 * options['team_size']:
+            raise CommandError("--players must be at least twice --team-size")
+        logging.getLogger('cert_ratings').setLevel(logging.WARNING)
+        logging.getLogger('matches').setLevel(logging.WARNING)
+        rng = random.Random(options['seed'])
+        lineups = []
+        for match_id in range(1, options['matches'] + 1):
+            players = rng.sample(range(1, options['players'] + 1), 2 * options['team_size'])
+            lineups.append((match_id, players[:options['team_size']], players[options['team_size']:]))
+        reference, reference_rows = self.rate_one_by_one(lineups)
+
+        try:
+            with transaction.atomic():
+                self.run_database(lineups, reference, reference_rows, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS("Bulk re-rating matches match-by-match Elo"))
+
+    def rate_one_by_one(self, lineups):
+        """Processor maths, one match after the other; returns (ratings, history rows)."""
+        ratings = {}
+        history = []
+        for match_id, winners, losers in lineups:
+            winner_ratings = [ratings.setdefault(p, 1000.0) for p in winners]
+            loser_ratings = [ratings.setdefault(p, 1000.0) for p in losers]
+            winner_change = calculate_team_elo_change(winner_ratings, loser_ratings, True)
+            loser_change = calculate_team_elo_change(loser_ratings, winner_ratings, False)
+            for side, change in ((winners, winner_change), (losers, loser_change)):
+                for p in side:
+                    old = ratings[p]
+                    ratings[p] = old + change
+                    history.append((match_id, p, old, old + change, change))
+        return ratings, len(history)
+
+    def run_database(self, lineups, reference, reference_rows, options):
+        started = time.perf_counter()
+        entity = CertifyingEntity.objects.create(name=f"Benchmark entity {timezone.now().timestamp()}")
+        now = timezone.now()
+        tournament = Tournament.objects.create(
+            name="Cert re-rate benchmark", format="round_robin", play_format="triplet",
+            start_date=now, end_date=now, certifying_entity=entity,
+        )
+        # A pool of teams, so team filters are as selective as in a real event
+        teams = Team.objects.bulk_create([
+            Team(name=f"Benchmark team {i}", pin=f"Z{i:05d}") for i in range(TEAM_POOL)
+        ])
+        players = Player.objects.bulk_create([
+            Player(name=f"Benchmark player {i}", team=teams[i % TEAM_POOL]) for i in range(options['players'])
+        ])
+        player_ids = {i + 1: player.id for i, player in enumerate(players)}
+
+        match_objects = []
+        batch = 5000
+        for start in range(0, len(lineups), batch):
+            chunk = lineups[start:start + batch]
+            matches = Match.objects.bulk_create([
+                Match(
+                    tournament=tournament, team1=winner, team2=loser, winner=winner, loser=loser,
+                    team1_score=13, team2_score=7, status="completed",
+                    end_time=now + timedelta(seconds=match_id),
+                )
+                for match_id, _winners, _losers in chunk
+                for winner, loser in [(teams[2 * match_id % TEAM_POOL], teams[(2 * match_id + 1) % TEAM_POOL])]
+            ])
+            MatchPlayer.objects.bulk_create([
+                MatchPlayer(match=match, player_id=player_ids[p], team_id=team_id)
+                for match, (_match_id, winners, losers) in zip(matches, chunk)
+                for team_id, side in ((match.winner_id, winners), (match.loser_id, losers))
+                for p in side
+            ])
+            match_objects.extend(matches[:max(0, options['sample'] - len(match_objects))])
+        self.stdout.write(f"matches           {len(lineups)} ({len(lineups) * 2 * options['team_size']} participants)")
+        self.stdout.write(f"seed              {time.perf_counter() - started:.1f} s")
+
+        if match_objects:
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for match in match_objects:
+                    match.tournament = tournament
+                    process_match_cert_ratings(match)
+                elapsed = time.perf_counter() - started
+            per_match = elapsed / len(match_objects)
+            self.stdout.write(
+                f"match by match    {1000 * per_match:.2f} ms/match, "
+                f"{len(queries.captured_queries) / len(match_objects):.1f} queries/match "
+                f"(~{per_match * len(lineups):.0f} s for all, estimated from {len(match_objects)})"
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            result = rerate_entity(entity)
+        self.stdout.write(
+            f"rerate_entity     {result.elapsed:.1f} s ({result.matches / result.elapsed:.0f} matches/s, "
+            f"{len(queries.captured_queries)} queries)"
+        )
+
+        stored = dict(PlayerCertRating.objects.filter(entity=entity).values_list('player_id', 'current_rating'))
+        drift = max(abs(stored[player_ids[p]] - rating) for p, rating in reference.items())
+        self.stdout.write(f"max rating diff   {drift:.2e}")
+        if drift > 1e-6:
+            raise CommandError("Re-rated ratings differ from match-by-match ratings")
+        if result.history_rows != reference_rows or \
+                CertRatingHistory.objects.filter(entity=entity).count() != reference_rows:
+            raise CommandError(f"Expected {reference_rows} history rows")
@@ -0,0 +1,58 @@
+"""
+Django management command that rebuilds Certifying Entity Elo ratings from
+completed matches
+Usage: python manage.py rerate_cert_ratings [--entity PETA --entity Atlas] [--dry-run] [--chunk-size 2000]
+
+Run it after changing an entity's elo_starting_rating, elo_k_factor or
+elo_scale: every completed match of the entity's tournaments is re-rated in
+completion order and its CertRatingHistory / PlayerCertRating rows are
+replaced.  Without --entity all active entities are rebuilt.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from cert_ratings.batch import rerate_entity
+from cert_ratings.models import CertifyingEntity
+
+
+class Command(BaseCommand):
+    help = 'Re-rate every completed certified match of one or more Certifying Entities'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entity',
+            action='append',
+            dest='entities',
+            help='Entity name to rebuild (repeatable; default: all active entities)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Compute the ratings without writing anything'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Matches read and history rows written per batch (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        if options['entities']:
+            entities = list(CertifyingEntity.objects.filter(name__in=options['entities']))
+            unknown = set(options['entities']) - {entity.name for entity in entities}
+            if unknown:
+                raise CommandError(f"Unknown certifying entities: {', '.join(sorted(unknown))}")
+        else:
+            entities = list(CertifyingEntity.objects.filter(is_active=True))
+
+        for entity in entities:
+            try:
+                result = rerate_entity(entity, chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+            except ValueError as e:
+                self.stdout.write(self.style.ERROR(str(e)))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"{entity.name}: {result.matches} matches, {result.history_rows} history rows, "
+                f"{result.players} players rated, {result.reset_players} reset "
+                f"in {result.elapsed:.2f}s" + (" (dry run)" if options['dry_run'] else "")
+            ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-17 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cert_ratings', '0001_initial'),
+        ('matches', '0015_match_vs_encounter_match_vs_lineup_team1_locked_and_more'),
+        ('teams', '0012_playerstatssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certratinghistory',
+            index=models.Index(fields=['match', 'entity'], name='cert_rating_match_i_3d1a41_idx'),
+        ),
+    ]
@@ -150,6 +150,10 @@ class CertRatingHistory(models.Model):
 
     class Meta:
         unique_together = [("player", "entity", "match")]
+        indexes = [
+            # Per-match idempotency check in processor.process_match
+            models.Index(fields=["match", "entity"]),
+        ]
         verbose_name = "Cert Rating History Entry"
         verbose_name_plural = "Cert Rating History Entries"
         ordering = ["-timestamp"]
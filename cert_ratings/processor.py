@@ -13,6 +13,7 @@ Design principles:
 
 import logging
 from django.db import transaction
+from django.utils import timezone
 
 from .models import CertifyingEntity, PlayerCertRating, CertRatingHistory
 from .elo import calculate_team_elo_change
@@ -85,16 +86,29 @@ def process_match_cert_ratings(match):
         return {"success": True, "reason": "No participants found"}
 
     # ── Retrieve / initialise ratings ────────────────────────────────────────
-    def _get_or_create_rating(player):
-        obj, _ = PlayerCertRating.objects.get_or_create(
-            player=player,
-            entity=entity,
-            defaults={"current_rating": float(entity.elo_starting_rating)},
+    # Insert the rows of first-time players in one statement, then load all
+    participant_ids = [p.id for p in winner_players + loser_players]
+    ratings = PlayerCertRating.objects.filter(entity=entity, player_id__in=participant_ids)
+    missing = set(participant_ids) - set(ratings.values_list("player_id", flat=True))
+    if missing:
+        PlayerCertRating.objects.bulk_create(
+            [
+                PlayerCertRating(
+                    player_id=player_id,
+                    entity=entity,
+                    current_rating=float(entity.elo_starting_rating),
+                )
+                for player_id in missing
+            ],
+            ignore_conflicts=True,
         )
-        return obj
+    rating_by_player = {r.player_id: r for r in ratings}
+    players_by_id = {p.id: p for p in winner_players + loser_players}
+    for rating_obj in rating_by_player.values():
+        rating_obj.player = players_by_id[rating_obj.player_id]
 
-    winner_rating_objs = [_get_or_create_rating(p) for p in winner_players]
-    loser_rating_objs  = [_get_or_create_rating(p) for p in loser_players]
+    winner_rating_objs = [rating_by_player[p.id] for p in winner_players]
+    loser_rating_objs  = [rating_by_player[p.id] for p in loser_players]
 
     winner_ratings = [r.current_rating for r in winner_rating_objs]
     loser_ratings  = [r.current_rating for r in loser_rating_objs]
@@ -117,61 +131,46 @@ def process_match_cert_ratings(match):
 
     # ── Persist atomically ───────────────────────────────────────────────────
     updates = []
+    history = []
+    now = timezone.now()
     try:
         with transaction.atomic():
-            for rating_obj in winner_rating_objs:
-                old = rating_obj.current_rating
-                new = old + winner_change
-                CertRatingHistory.objects.create(
-                    player=rating_obj.player,
-                    entity=entity,
-                    match=match,
-                    rating_before=old,
-                    rating_after=new,
-                    rating_change=winner_change,
-                )
-                rating_obj.current_rating = new
-                rating_obj.matches_played += 1
-                rating_obj.save(update_fields=["current_rating", "matches_played", "updated_at"])
-                updates.append({
-                    "player": rating_obj.player.name,
-                    "entity": entity.name,
-                    "old": old,
-                    "new": new,
-                    "change": winner_change,
-                    "result": "win",
-                })
-                logger.info(
-                    f"[{entity.name}] {rating_obj.player.name}: "
-                    f"{old:.1f} → {new:.1f} (+{winner_change:.1f}) WIN"
-                )
-
-            for rating_obj in loser_rating_objs:
-                old = rating_obj.current_rating
-                new = old + loser_change
-                CertRatingHistory.objects.create(
-                    player=rating_obj.player,
-                    entity=entity,
-                    match=match,
-                    rating_before=old,
-                    rating_after=new,
-                    rating_change=loser_change,
-                )
-                rating_obj.current_rating = new
-                rating_obj.matches_played += 1
-                rating_obj.save(update_fields=["current_rating", "matches_played", "updated_at"])
-                updates.append({
-                    "player": rating_obj.player.name,
-                    "entity": entity.name,
-                    "old": old,
-                    "new": new,
-                    "change": loser_change,
-                    "result": "loss",
-                })
-                logger.info(
-                    f"[{entity.name}] {rating_obj.player.name}: "
-                    f"{old:.1f} → {new:.1f} ({loser_change:.1f}) LOSS"
-                )
+            for rating_objs, change, outcome in (
+                (winner_rating_objs, winner_change, "win"),
+                (loser_rating_objs, loser_change, "loss"),
+            ):
+                for rating_obj in rating_objs:
+                    old = rating_obj.current_rating
+                    new = old + change
+                    history.append(CertRatingHistory(
+                        player=rating_obj.player,
+                        entity=entity,
+                        match=match,
+                        rating_before=old,
+                        rating_after=new,
+                        rating_change=change,
+                    ))
+                    rating_obj.current_rating = new
+                    rating_obj.matches_played += 1
+                    rating_obj.updated_at = now
+                    updates.append({
+                        "player": rating_obj.player.name,
+                        "entity": entity.name,
+                        "old": old,
+                        "new": new,
+                        "change": change,
+                        "result": outcome,
+                    })
+                    logger.info(
+                        f"[{entity.name}] {rating_obj.player.name}: "
+                        f"{old:.1f} → {new:.1f} ({change:+.1f}) {outcome.upper()}"
+                    )
+
+            CertRatingHistory.objects.bulk_create(history)
+            PlayerCertRating.objects.bulk_update(
+                winner_rating_objs + loser_rating_objs,
+                ["current_rating", "matches_played", "updated_at"],
+            )
 
     except Exception as e:
         logger.error(
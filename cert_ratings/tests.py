@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from matches.models import Match, MatchPlayer
+from teams.models import Player, Team
+from tournaments.models import Tournament
+
+from .batch import rerate_entity
+from .elo import calculate_team_elo_change
+from .models import CertifyingEntity, CertRatingHistory, PlayerCertRating
+from .processor import process_match_cert_ratings
+
+
+class RerateEntityTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.entity = CertifyingEntity.objects.create(name="PETA")
+        self.tournament = Tournament.objects.create(
+            name="Certified", format="round_robin", play_format="doublet",
+            start_date=now, end_date=now + timedelta(days=1), certifying_entity=self.entity,
+        )
+        self.home = Team.objects.create(name="Home", pin="CERT01")
+        self.away = Team.objects.create(name="Away", pin="CERT02")
+        self.players = [Player.objects.create(name=f"C{i}", team=self.home) for i in range(4)]
+        # (winner lineup, loser lineup) by player index, in completion order
+        self.lineups = [((0, 1), (2, 3)), ((0, 2), (1, 3)), ((3,), (0, 1))]
+        self.matches = []
+        for number, (winners, losers) in enumerate(self.lineups):
+            match = Match.objects.create(
+                tournament=self.tournament, team1=self.home, team2=self.away,
+                team1_score=13, team2_score=5, status="completed",
+                winner=self.home, loser=self.away,
+            )
+            Match.objects.filter(pk=match.pk).update(end_time=now + timedelta(minutes=number))
+            for team, side in ((self.home, winners), (self.away, losers)):
+                for index in side:
+                    MatchPlayer.objects.create(match=match, player=self.players[index], team=team)
+            match.refresh_from_db()
+            self.matches.append(match)
+
+    def _expected(self, k_factor):
+        ratings = [1000.0] * len(self.players)
+        for winners, losers in self.lineups:
+            winner_ratings = [ratings[i] for i in winners]
+            loser_ratings = [ratings[i] for i in losers]
+            winner_change = calculate_team_elo_change(winner_ratings, loser_ratings, True, k_factor)
+            loser_change = calculate_team_elo_change(loser_ratings, winner_ratings, False, k_factor)
+            for i in winners:
+                ratings[i] += winner_change
+            for i in losers:
+                ratings[i] += loser_change
+        return ratings
+
+    def _stored(self):
+        stored = dict(
+            PlayerCertRating.objects.filter(entity=self.entity).values_list("player_id", "current_rating")
+        )
+        return [stored[player.id] for player in self.players]
+
+    def test_rerate_matches_processor_and_applies_new_k_factor(self):
+        for match in self.matches:
+            self.assertTrue(process_match_cert_ratings(match)["success"])
+        live = self._stored()
+        for actual, expected in zip(live, self._expected(20)):
+            self.assertAlmostEqual(actual, expected)
+
+        result = rerate_entity(self.entity)
+        self.assertEqual((result.matches, result.history_rows, result.players), (3, 11, 4))
+        for actual, expected in zip(self._stored(), live):
+            self.assertAlmostEqual(actual, expected)
+        self.assertEqual(CertRatingHistory.objects.filter(entity=self.entity).count(), 11)
+
+        self.entity.elo_k_factor = 32
+        self.entity.save()
+        rerate_entity(self.entity)
+        for actual, expected in zip(self._stored(), self._expected(32)):
+            self.assertAlmostEqual(actual, expected)
+        self.assertEqual(
+            PlayerCertRating.objects.get(entity=self.entity, player=self.players[0]).matches_played, 3
+        )
@@ -17,6 +17,10 @@ Marks stale friendly games as CANCELLED. Three tiers:
 No records are ever deleted — stale games become CANCELLED so Smart PFC
 ignores them automatically (it already excludes CANCELLED from routing).
 
+Afterwards the match numbers of all finished games (cancelled here or
+earlier, completed, expired) go back to the pool for new games (see
+friendly_games.number_pool).
+
 Usage:
     python manage.py expire_friendly_games          # cancel stale games
     python manage.py expire_friendly_games --dry-run # preview only
@@ -30,6 +34,7 @@ from django.utils import timezone
 from datetime import timedelta
 
 from friendly_games.models import FriendlyGame
+from friendly_games.number_pool import release_match_numbers
 from friendly_games.presence_utils import deactivate_friendly_game_presence
 
 
@@ -87,6 +92,7 @@ class Command(BaseCommand):
 
         if total == 0:
             self.stdout.write(self.style.SUCCESS('No stale friendly games found.'))
+            self._release_numbers(dry_run)
             return
 
         if dry_run:
@@ -99,6 +105,7 @@ class Command(BaseCommand):
                     f'  id={g.id} name="{g.name}" status={g.status} '
                     f'age={age_m:.1f}min match_number={g.match_number}'
                 )
+            self._release_numbers(dry_run)
             return
 
         # Mark as CANCELLED — no deletion.
@@ -114,3 +121,11 @@ class Command(BaseCommand):
             f'Marked {c1 + c2 + c3} stale friendly game(s) as CANCELLED '
             f'({c1} unstarted >10min, {c2} started >6h, {c3} other >24h).'
         ))
+        self._release_numbers(dry_run)
+
+    def _release_numbers(self, dry_run):
+        released = release_match_numbers(dry_run=dry_run)
+        if dry_run:
+            self.stdout.write(f'[DRY RUN] Would release {released} match number(s) of finished games.')
+        elif released:
+            self.stdout.write(self.style.SUCCESS(f'Released {released} match number(s) to the pool.'))
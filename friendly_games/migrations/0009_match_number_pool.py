@@ -0,0 +1,89 @@
+# Generated by Django 5.2 on 2026-10-17 07:51
+
+import random
+
+from django.db import migrations, models
+from django.utils import timezone
+
+TERMINAL_STATUSES = ['COMPLETED', 'CANCELLED', 'EXPIRED']
+
+
+def seed_match_number_pool(apps, schema_editor):
+    """
+    All 4-digit numbers in shuffled order: never-used numbers first, then
+    those of finished games; numbers of open games start out in use.
+    """
+    FriendlyGame = apps.get_model('friendly_games', 'FriendlyGame')
+    MatchNumberSlot = apps.get_model('friendly_games', 'MatchNumberSlot')
+    games = FriendlyGame.objects.filter(match_number__isnull=False)
+    held = set(games.exclude(status__in=TERMINAL_STATUSES).values_list('match_number', flat=True))
+    used = set(games.values_list('match_number', flat=True)) - held
+    numbers = [f"{n:04d}" for n in range(10000)]
+    fresh = [number for number in numbers if number not in held and number not in used]
+    recycled = [number for number in numbers if number in used]
+    random.shuffle(fresh)
+    random.shuffle(recycled)
+    now = timezone.now()
+    MatchNumberSlot.objects.bulk_create(
+        [
+            MatchNumberSlot(number=number, position=position)
+            for position, number in enumerate(fresh + recycled)
+        ]
+        + [
+            MatchNumberSlot(number=number, position=-1, in_use=True, claimed_at=now)
+            for number in sorted(held)
+        ],
+        batch_size=1000,
+    )
+
+
+def clear_match_number_pool(apps, schema_editor):
+    apps.get_model('friendly_games', 'MatchNumberSlot').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0010_courtcomplex_timezone_name'),
+        ('friendly_games', '0008_friendlygame_creator_player'),
+        ('teams', '0014_search_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendlyGameSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MatchNumberSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.CharField(max_length=4, unique=True)),
+                ('position', models.BigIntegerField(help_text='Place in the free queue; the lowest free slot is claimed next')),
+                ('in_use', models.BooleanField(default=False)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Match Number Slot',
+                'verbose_name_plural': 'Match Number Slots',
+            },
+        ),
+        migrations.AlterField(
+            model_name='friendlygame',
+            name='match_number',
+            field=models.CharField(blank=True, db_index=True, help_text='4-digit match number for joining', max_length=4, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='friendlygame',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['COMPLETED', 'CANCELLED', 'EXPIRED']), _negated=True), fields=('match_number',), name='unique_open_match_number'),
+        ),
+        migrations.AddIndex(
+            model_name='matchnumberslot',
+            index=models.Index(fields=['in_use', 'position'], name='friendly_ga_in_use_a624ba_idx'),
+        ),
+        migrations.RunPython(seed_match_number_pool, clear_match_number_pool),
+    ]
@@ -16,11 +16,6 @@ def generate_codename():
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
 
 
-def generate_match_number():
-    """Generate a unique 4-digit match number"""
-    return ''.join(random.choices(string.digits, k=4))
-
-
 class PlayerCodename(models.Model):
     """
     Separate table for player codenames - completely parallel to existing Player model.
@@ -94,12 +89,12 @@ class FriendlyGame(models.Model):
         help_text="Legacy 6-digit PIN for this game"
     )
     
-    # New match number system
+    # New match number system (numbers are recycled, see number_pool)
     match_number = models.CharField(
         max_length=4, 
-        unique=True,
         null=True,
         blank=True,
+        db_index=True,
         help_text="4-digit match number for joining"
     )
     expires_at = models.DateTimeField(
@@ -182,9 +177,20 @@ class FriendlyGame(models.Model):
         help_text='Whether the time limit has been reached',
     )
 
+    # Finished games; their match numbers go back to the pool
+    TERMINAL_STATUSES = ['COMPLETED', 'CANCELLED', 'EXPIRED']
+
     class Meta:
         verbose_name = "Friendly Game"
         verbose_name_plural = "Friendly Games"
+        constraints = [
+            # Finished games keep their number for history; only open games must not share one
+            models.UniqueConstraint(
+                fields=['match_number'],
+                condition=~models.Q(status__in=['COMPLETED', 'CANCELLED', 'EXPIRED']),
+                name='unique_open_match_number',
+            ),
+        ]
         
     def __str__(self):
         if self.match_number:
@@ -198,6 +204,7 @@ class FriendlyGame(models.Model):
         """Generate unique identifiers and set expiration"""
         # Generate match number for new games
         if not self.match_number and not self.game_pin:
+            # None when the pool is exhausted: the game falls back to a legacy PIN below
             self.match_number = self.generate_match_number()
             # Set expiration to 24 hours from now
             self.expires_at = timezone.now() + timedelta(hours=24)
@@ -210,18 +217,19 @@ class FriendlyGame(models.Model):
         super().save(*args, **kwargs)
     
     def generate_match_number(self):
-        """Generate unique 4-digit match number"""
-        while True:
-            number = generate_match_number()
-            if not FriendlyGame.objects.filter(match_number=number).exists():
-                return number
+        """Claim a free 4-digit match number from the pool (None when every number is in use)"""
+        from .number_pool import claim_match_number
+        return claim_match_number()
     
     def generate_game_pin(self):
         """Generate unique 6-digit game PIN (legacy)"""
-        while True:
-            pin = ''.join(random.choices(string.digits, k=6))
-            if not FriendlyGame.objects.filter(game_pin=pin).exists():
-                return pin
+        from .number_pool import next_game_pin
+        return next_game_pin()
+    
+    @classmethod
+    def by_match_number(cls, match_number):
+        """The game currently holding ``match_number`` (its newest game); raises DoesNotExist"""
+        return cls.objects.filter(match_number=match_number).latest('created_at', 'id')
     
     def is_expired(self):
         """Check if match number has expired"""
@@ -381,6 +389,36 @@ class FriendlyGame(models.Model):
         return remaining == 0
 
 
+class MatchNumberSlot(models.Model):
+    """
+    One 4-digit match number of the recyclable pool (see number_pool).
+    Free slots form a queue ordered by position; released numbers rejoin at the back.
+    """
+    number = models.CharField(max_length=4, unique=True)
+    position = models.BigIntegerField(help_text="Place in the free queue; the lowest free slot is claimed next")
+    in_use = models.BooleanField(default=False)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Match Number Slot"
+        verbose_name_plural = "Match Number Slots"
+        indexes = [
+            models.Index(fields=['in_use', 'position']),
+        ]
+
+    def __str__(self):
+        return f"#{self.number} ({'in use' if self.in_use else 'free'})"
+
+
+class FriendlyGameSequence(models.Model):
+    """A named counter, incremented atomically (legacy game PINs are a permutation of it)"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
 class FriendlyGamePlayer(models.Model):
     """
     Player participation in friendly games with codename verification.
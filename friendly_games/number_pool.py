@@ -0,0 +1,130 @@
+"""
+friendly_games/number_pool.py
+─────────────────────────────
+Collision-free allocation of FriendlyGame match numbers and legacy PINs.
+
+Match numbers used to be drawn at random until an ``exists()`` query found a
+free one.  Games are never deleted, so the 4-digit space only ever filled
+up: retries grew without bound and two concurrent creates could still pick
+the same number.
+
+Match numbers now come from a free list:
+  - MatchNumberSlot holds all 10,000 numbers in a shuffled queue (seeded by
+    migration 0009), so consecutive games get unrelated numbers.
+  - claim_match_number() takes the lowest free position: one index probe
+    on (in_use, position) and one conditional UPDATE, whatever the
+    occupancy.  On PostgreSQL concurrent claims skip each other's locked
+    rows; backends without row locks fall back to the conditional UPDATE,
+    so two creates can never leave with the same number.
+  - release_match_numbers() (run by ``expire_friendly_games``) frees the
+    numbers of finished games and queues them behind every free number, so
+    a number is reused as late as possible.  Finished games keep their
+    match_number for history; only open games must hold distinct numbers
+    (FriendlyGame's unique_open_match_number constraint), and lookups take
+    the newest game with a number (FriendlyGame.by_match_number).
+
+Legacy game PINs are a Feistel permutation of an atomic counter
+(FriendlyGameSequence): distinct for the first million PINs without any
+lookup, and still unpredictable to players.
+"""
+
+import hashlib
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import FriendlyGame, FriendlyGameSequence, MatchNumberSlot
+
+logger = logging.getLogger(__name__)
+
+MATCH_NUMBER_DIGITS = 4
+PIN_DIGITS = 6
+
+# Claims younger than this are never released: their game may not be committed yet
+RELEASE_GRACE = timedelta(minutes=5)
+
+
+def claim_match_number(attempts=5):
+    """Claim the free number at the head of the queue; None when every number is in use."""
+    for _ in range(attempts):
+        with transaction.atomic():
+            slot = (
+                MatchNumberSlot.objects.select_for_update(skip_locked=True)
+                .filter(in_use=False)
+                .order_by('position')
+                .values_list('pk', 'number')
+                .first()
+            )
+            if slot is None:
+                logger.error("Match number pool exhausted: every number is held by an open game")
+                return None
+            # Conditional claim: without row locks (SQLite) a concurrent claim may have won this slot
+            if MatchNumberSlot.objects.filter(pk=slot[0], in_use=False).update(
+                in_use=True, claimed_at=timezone.now()
+            ):
+                return slot[1]
+    logger.warning(f"Could not claim a match number after {attempts} attempts")
+    return None
+
+
+def release_match_numbers(dry_run=False):
+    """
+    Return the numbers no open game holds to the back of the free queue.
+
+    Returns how many numbers were (or, with ``dry_run``, would be) released.
+    """
+    held = (
+        FriendlyGame.objects.filter(match_number__isnull=False)
+        .exclude(status__in=FriendlyGame.TERMINAL_STATUSES)
+        .values('match_number')
+    )
+    with transaction.atomic():
+        releasable = (
+            MatchNumberSlot.objects.select_for_update()
+            .filter(in_use=True, claimed_at__lt=timezone.now() - RELEASE_GRACE)
+            .exclude(number__in=held)
+        )
+        slots = list(releasable.only('pk'))
+        if dry_run or not slots:
+            return len(slots)
+        # Shuffled, so freed numbers do not come back in the order their games ended
+        random.shuffle(slots)
+        tail = MatchNumberSlot.objects.aggregate(last=Max('position'))['last'] or 0
+        for offset, slot in enumerate(slots, start=1):
+            slot.position = tail + offset
+            slot.in_use = False
+            slot.claimed_at = None
+        MatchNumberSlot.objects.bulk_update(slots, ['position', 'in_use', 'claimed_at'], batch_size=500)
+    logger.info(f"Released {len(slots)} match number(s) to the pool")
+    return len(slots)
+
+
+def _feistel(value, digits, rounds=4):
+    """Keyed permutation of [0, 10**digits) (balanced Feistel network over two halves)."""
+    half = 10 ** (digits // 2)
+    left, right = divmod(value, half)
+    for round_number in range(rounds):
+        digest = hashlib.sha256(f"{settings.SECRET_KEY}:pin:{round_number}:{right}".encode()).digest()
+        left, right = right, (left + int.from_bytes(digest[:8], 'big')) % half
+    return left * half + right
+
+
+def next_game_pin():
+    """The next legacy game PIN: the permuted value of an atomic counter."""
+    space = 10 ** PIN_DIGITS
+    with transaction.atomic():
+        counter, _ = FriendlyGameSequence.objects.select_for_update().get_or_create(name='game_pin')
+        value = counter.value
+        # Random PINs issued before the sequence may sit on a permuted value: skip them
+        while True:
+            pin = f"{_feistel(value % space, PIN_DIGITS):0{PIN_DIGITS}d}"
+            value += 1
+            if not FriendlyGame.objects.filter(game_pin=pin).exists():
+                break
+        FriendlyGameSequence.objects.filter(pk=counter.pk).update(value=F('value') + (value - counter.value))
+    return pin
@@ -1,3 +1,51 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import FriendlyGame, MatchNumberSlot
+from .number_pool import _feistel
+
+
+class MatchNumberPoolTests(TestCase):
+    def _leave_free(self, count):
+        """Occupy every pool slot except the first ``count`` free ones in queue order."""
+        keep = MatchNumberSlot.objects.filter(in_use=False).order_by('position').values_list('pk', flat=True)[:count]
+        MatchNumberSlot.objects.filter(in_use=False).exclude(pk__in=list(keep)).update(
+            in_use=True, claimed_at=timezone.now()
+        )
+
+    def test_numbers_are_distinct_and_pool_exhaustion_falls_back_to_a_pin(self):
+        self.assertEqual(MatchNumberSlot.objects.count(), 10000)
+        self._leave_free(2)
+        first = FriendlyGame.objects.create(name="First")
+        second = FriendlyGame.objects.create(name="Second")
+        self.assertNotEqual(first.match_number, second.match_number)
+        self.assertEqual(FriendlyGame.by_match_number(second.match_number), second)
+
+        overflow = FriendlyGame.objects.create(name="Overflow")
+        self.assertIsNone(overflow.match_number)
+        self.assertRegex(overflow.game_pin, r'^\d{6}$')
+
+    def test_expire_releases_numbers_for_reuse(self):
+        self._leave_free(1)
+        old = FriendlyGame.objects.create(name="Old")
+        FriendlyGame.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        MatchNumberSlot.objects.filter(number=old.match_number).update(
+            claimed_at=timezone.now() - timedelta(hours=1)
+        )
+
+        out = StringIO()
+        call_command('expire_friendly_games', stdout=out)
+        self.assertIn('Released 1 match number(s)', out.getvalue())
+        old.refresh_from_db()
+        self.assertEqual(old.status, 'CANCELLED')
+
+        new = FriendlyGame.objects.create(name="New")
+        self.assertEqual(new.match_number, old.match_number)
+        self.assertEqual(FriendlyGame.by_match_number(new.match_number), new)
 
-# Create your tests here.
+    def test_pin_permutation_is_a_bijection(self):
+        self.assertEqual(len({_feistel(value, 4) for value in range(10000)}), 10000)
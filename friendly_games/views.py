@@ -33,7 +33,7 @@ def game_preview_api(request):
     
     try:
         # Find the game by match number
-        game = FriendlyGame.objects.get(match_number=match_number)
+        game = FriendlyGame.by_match_number(match_number)
         
         # Check if game is expired
         if game.is_expired():
@@ -650,7 +650,7 @@ def join_game(request):
         
         try:
             # Find the game by match number
-            game = FriendlyGame.objects.get(match_number=match_number)
+            game = FriendlyGame.by_match_number(match_number)
             
             # Check if game is expired
             if game.is_expired():
@@ -776,13 +776,6 @@ def join_game(request):
             except Player.DoesNotExist:
                 pass
     
-    # Get all players for search functionality
-    all_players = Player.objects.all().select_related('team')
-    players_json = json.dumps([{
-        'name': player.name,
-        'team': player.team.name if player.team else 'No Team'
-    } for player in all_players])
-    
     # Read match_number from URL query string so template can prefill deterministically
     prefill_match_number = request.GET.get('match_number', '').strip()
     if not (prefill_match_number.isdigit() and len(prefill_match_number) == 4):
@@ -802,7 +795,7 @@ def join_game(request):
 
     if prefill_match_number:
         try:
-            g = FriendlyGame.objects.get(match_number=prefill_match_number)
+            g = FriendlyGame.by_match_number(prefill_match_number)
             if not g.is_expired() and g.status in ['WAITING_FOR_PLAYERS', 'DRAFT']:
                 prefill_game = g
                 black_ps = list(g.players.filter(team='BLACK').select_related('player'))
@@ -821,7 +814,6 @@ def join_game(request):
 
     context = {
         'team_name': request.session.get('team_name', 'Guest'),
-        'players_json': players_json,
         'session_codename': session_codename,
         'auto_selected_player': auto_selected_player,
         'prefill_match_number': prefill_match_number,
@@ -1222,63 +1214,29 @@ def rematch(request, game_id):
 
 # ── Polling endpoint ────────────# ── Polling endpoint ────────────────────────────────────────────
 from django.http import JsonResponse as _FGJsonResponse
-from django.urls import reverse as _fg_reverse
 
 def game_status_api(request, game_id):
     """
-    Session-aware polling endpoint for game_detail.html.
+    Session-aware polling fallback for game_detail.html.
     Returns routing information for the current session user so the
     polling JS can redirect the opposing team to validation automatically.
-    """
-    try:
-        game = FriendlyGame.objects.get(id=game_id)
-    except FriendlyGame.DoesNotExist:
-        return _FGJsonResponse({'error': 'not found'}, status=404)
-
-    payload = {
-        'status': game.status,
-        'current_user_team': None,
-        'submitted_by_team': None,
-        'should_redirect_to_validation': False,
-        'validation_url': None,
-    }
-
-    # Check if a result is pending validation
-    pending = False
-    submitted_by_team = None
-    if hasattr(game, 'result'):
-        try:
-            result = game.result
-            if result.is_pending_validation():
-                pending = True
-                submitted_by_team = result.submitted_by_team  # 'BLACK' or 'WHITE'
-                payload['submitted_by_team'] = submitted_by_team
-        except Exception:
-            pass
-
-    if not pending:
-        return _FGJsonResponse(payload)
 
-    # Resolve current session user's team in this game
+    WebSocket clients receive the same fields in their personal
+    match.state_changed payload.  This endpoint answers from the cached
+    status snapshot (pfc_events.status) and honours If-None-Match.
+    """
     from pfc_core.session_utils import CodenameSessionManager
-    session_codename = CodenameSessionManager.get_logged_in_codename(request)
-    my_team = None
-    if session_codename:
-        for gp in game.players.all():
-            try:
-                if gp.player.codename_profile.codename == session_codename:
-                    my_team = gp.team  # 'BLACK' or 'WHITE'
-                    break
-            except Exception:
-                pass
+    from pfc_events.status import conditional_status_response, get_status, status_payload
 
-    payload['current_user_team'] = my_team
-
-    if my_team and submitted_by_team and my_team != submitted_by_team:
-        payload['should_redirect_to_validation'] = True
-        payload['validation_url'] = _fg_reverse('friendly_games:validate_result', args=[game.id])
+    snapshot = get_status('game', game_id)
+    if snapshot is None:
+        return _FGJsonResponse({'error': 'not found'}, status=404)
 
-    return _FGJsonResponse(payload)
+    payload = status_payload(
+        snapshot,
+        codename=CodenameSessionManager.get_logged_in_codename(request),
+    )
+    return conditional_status_response(request, payload)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # QR RESOLVE ENDPOINT — friendly games
@@ -0,0 +1,282 @@
+"""
+leaderboards/materialize.py
+===========================
+Incremental materialization of LeaderboardEntry rows.
+
+The leaderboard used to be rebuilt by deleting every entry and recreating
+them one ``objects.create`` at a time, on every page view.  A viewer arriving
+mid-rebuild saw an empty or half-filled table.
+
+Now rankings are computed in memory and diffed against the stored rows:
+only rows whose values changed are written (``bulk_update``), new teams are
+``bulk_create``-d and departed teams deleted — all inside one transaction
+that also bumps ``Leaderboard.version``.  Readers therefore see either the
+previous or the next complete snapshot, never a mixture.
+
+Design principles:
+  - Driven by result changes: leaderboards.signals calls
+    ``schedule_leaderboard_refresh`` when a match completes, leaves the
+    completed state or is deleted, and when a team joins or leaves the
+    tournament.  Page views only read.
+  - Incremental where the format allows it: traditional standings depend
+    only on each team's own matches, so only the affected teams' stats are
+    recomputed (once the change commits) and everyone else's are taken from
+    the stored rows.  Swiss, WTF and multi-stage standings have cross-team
+    tie-breaks (Buchholz, πετΑ, stage status) and are recomputed in full,
+    then diffed — by the automation worker, never in the request.
+  - No-op refreshes write nothing and keep the version unchanged.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+
+from matches.models import Match
+from tournaments.models import TournamentTeam
+
+from .models import Leaderboard, LeaderboardEntry
+from .swiss_ranking import (
+    get_global_multistage_rankings,
+    get_swiss_rankings,
+    is_multistage_team_tournament,
+    is_swiss_tournament,
+    is_wtf_tournament,
+)
+from .wtf_ranking import get_wtf_rankings, update_wtf_statistics
+
+logger = logging.getLogger(__name__)
+
+# LeaderboardEntry columns owned by the materializer (besides version).
+ENTRY_FIELDS = (
+    'position',
+    'matches_played',
+    'matches_won',
+    'matches_lost',
+    'points_scored',
+    'points_conceded',
+    'swiss_points',
+    'buchholz_score',
+    'stage_reached',
+    'tournament_status',
+)
+
+_STAT_FIELDS = ('matches_played', 'matches_won', 'matches_lost', 'points_scored', 'points_conceded')
+
+
+def _row(ranking, **overrides):
+    """Map a ranking dict onto LeaderboardEntry column values."""
+    row = {
+        'position': ranking['position'],
+        'matches_played': ranking['matches_played'],
+        'matches_won': ranking['matches_won'],
+        'matches_lost': ranking['matches_lost'],
+        'points_scored': ranking['points_scored'],
+        'points_conceded': ranking['points_conceded'],
+        'swiss_points': ranking.get('swiss_points', 0),
+        'buchholz_score': ranking.get('buchholz_score', 0.0),
+        'stage_reached': ranking.get('stage_reached', 1),
+        'tournament_status': ranking.get('tournament_status', 'active'),
+    }
+    row.update(overrides)
+    return row
+
+
+def _traditional_rows(tournament, existing, team_ids=None):
+    """
+    Wins / point-difference standings, recomputing only ``team_ids``.
+
+    Teams without a stored row are always recomputed; ``team_ids=None``
+    recomputes everyone.  Stats for the recomputed teams come from a single
+    match query.
+    """
+    active_ids = list(
+        TournamentTeam.objects.filter(tournament=tournament, is_active=True)
+        .values_list('team_id', flat=True)
+    )
+    if team_ids is None:
+        recompute = set(active_ids)
+    else:
+        recompute = (set(team_ids) | (set(active_ids) - set(existing))) & set(active_ids)
+
+    stats = {
+        team_id: {'matches_played': 0, 'matches_won': 0, 'points_scored': 0, 'points_conceded': 0}
+        for team_id in recompute
+    }
+    if recompute:
+        matches = Match.objects.filter(tournament=tournament, status='completed').filter(
+            Q(team1_id__in=recompute) | Q(team2_id__in=recompute)
+        ).values_list('team1_id', 'team2_id', 'winner_id', 'team1_score', 'team2_score')
+        for team1_id, team2_id, winner_id, score1, score2 in matches:
+            for team_id, scored, conceded in ((team1_id, score1, score2), (team2_id, score2, score1)):
+                team_stats = stats.get(team_id)
+                if team_stats is None:
+                    continue
+                team_stats['matches_played'] += 1
+                team_stats['matches_won'] += 1 if winner_id == team_id else 0
+                team_stats['points_scored'] += scored or 0
+                team_stats['points_conceded'] += conceded or 0
+
+    rankings = []
+    for team_id in active_ids:
+        if team_id in stats:
+            team_stats = stats[team_id]
+            team_stats['matches_lost'] = team_stats['matches_played'] - team_stats['matches_won']
+        else:
+            entry = existing[team_id]
+            team_stats = {field: getattr(entry, field) for field in _STAT_FIELDS}
+        rankings.append(dict(team_stats, team_id=team_id))
+
+    # Sort by wins (desc), then point difference (desc), then points scored (desc)
+    rankings.sort(key=lambda r: (
+        r['matches_won'],
+        r['points_scored'] - r['points_conceded'],
+        r['points_scored'],
+    ), reverse=True)
+
+    return {
+        ranking['team_id']: _row(dict(ranking, position=i + 1))
+        for i, ranking in enumerate(rankings)
+    }
+
+
+def has_cross_team_tiebreaks(tournament):
+    """True when any result can move every team (full recompute on the job queue)."""
+    return (
+        is_multistage_team_tournament(tournament)
+        or is_swiss_tournament(tournament)
+        or is_wtf_tournament(tournament)
+    )
+
+
+def compute_leaderboard_rows(tournament, existing, team_ids=None):
+    """Return {team_id: column values} for the tournament's current standings."""
+    if is_multistage_team_tournament(tournament):
+        rankings = get_global_multistage_rankings(tournament)
+        return {r['team'].id: _row(r) for r in rankings}
+
+    if is_swiss_tournament(tournament):
+        rankings = get_swiss_rankings(tournament)
+        return {
+            r['team'].id: _row(r, stage_reached=1, tournament_status='active')
+            for r in rankings
+        }
+
+    if is_wtf_tournament(tournament):
+        update_wtf_statistics(tournament)
+        rankings = get_wtf_rankings(tournament)
+        return {
+            r['team'].id: _row(
+                r,
+                buchholz_score=r.get('peta_index', 0.0),
+                stage_reached=1,
+                tournament_status='active',
+            )
+            for r in rankings
+        }
+
+    return _traditional_rows(tournament, existing, team_ids)
+
+
+def refresh_tournament_leaderboard(tournament, team_ids=None):
+    """
+    Bring the tournament's LeaderboardEntry rows up to date.
+
+    ``team_ids`` names the teams whose results changed (e.g. the two sides of
+    a match that just completed); None means "anything may have changed".
+    Returns the Leaderboard with its (possibly new) version.
+    """
+    leaderboard, _created = Leaderboard.objects.get_or_create(tournament=tournament)
+
+    with transaction.atomic():
+        # Serialise concurrent refreshes of the same leaderboard.
+        leaderboard = Leaderboard.objects.select_for_update().get(pk=leaderboard.pk)
+        existing = {entry.team_id: entry for entry in leaderboard.entries.all()}
+        rows = compute_leaderboard_rows(tournament, existing, team_ids)
+
+        version = leaderboard.version + 1
+        to_update = []
+        to_create = []
+        for team_id, values in rows.items():
+            entry = existing.get(team_id)
+            if entry is None:
+                to_create.append(LeaderboardEntry(
+                    leaderboard=leaderboard, team_id=team_id, version=version, **values
+                ))
+                continue
+            if any(getattr(entry, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(entry, field, value)
+                entry.version = version
+                to_update.append(entry)
+        departed = [team_id for team_id in existing if team_id not in rows]
+
+        if not (to_update or to_create or departed):
+            return leaderboard
+
+        if departed:
+            LeaderboardEntry.objects.filter(leaderboard=leaderboard, team_id__in=departed).delete()
+        if to_update:
+            LeaderboardEntry.objects.bulk_update(to_update, list(ENTRY_FIELDS) + ['version'])
+        if to_create:
+            LeaderboardEntry.objects.bulk_create(to_create)
+
+        leaderboard.version = version
+        leaderboard.save(update_fields=['version', 'last_updated'])
+
+    logger.info(
+        f"Leaderboard for tournament {tournament.id} -> v{version}: "
+        f"{len(to_update)} updated, {len(to_create)} added, {len(departed)} removed"
+    )
+    return leaderboard
+
+
+def schedule_leaderboard_refresh(tournament_id, team_ids=None):
+    """
+    Refresh the tournament's leaderboard once the current transaction commits.
+
+    Traditional standings are refreshed in place for ``team_ids`` (cheap);
+    formats with cross-team tie-breaks get a leaderboard job on the
+    tournament automation queue, coalesced with any pending engine run.
+    """
+    team_ids = [team_id for team_id in (team_ids or []) if team_id] or None
+
+    def refresh():
+        from tournaments.job_models import AutomationJob
+        from tournaments.job_queue import enqueue_automation_on_commit
+        from tournaments.models import Tournament
+        try:
+            tournament = Tournament.objects.filter(pk=tournament_id).first()
+            if tournament is None:
+                return  # Deleted along with its matches and teams
+            if has_cross_team_tiebreaks(tournament):
+                enqueue_automation_on_commit(tournament_id, event_type=AutomationJob.EVENT_LEADERBOARD)
+            else:
+                refresh_tournament_leaderboard(tournament, team_ids=team_ids)
+        except Exception as exc:
+            logger.warning("Failed to refresh leaderboard for tournament %s: %s", tournament_id, exc)
+
+    transaction.on_commit(refresh)
+
+
+def ensure_tournament_leaderboard(tournament):
+    """Materialize the leaderboard if it has never been built; otherwise just return it."""
+    leaderboard, _created = Leaderboard.objects.get_or_create(tournament=tournament)
+    if leaderboard.version == 0:
+        leaderboard = refresh_tournament_leaderboard(tournament)
+    return leaderboard
+
+
+def leaderboard_snapshot(leaderboard):
+    """
+    Entries of one leaderboard version, read in a single query.
+
+    Each row carries its leaderboard (and so the version) from the same
+    statement, so the version returned always matches the rows.
+    """
+    entries = list(
+        LeaderboardEntry.objects.filter(leaderboard=leaderboard)
+        .select_related('team', 'leaderboard')
+        .order_by('position')
+    )
+    version = entries[0].leaderboard.version if entries else leaderboard.version
+    return entries, version
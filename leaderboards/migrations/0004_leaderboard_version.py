@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaderboards', '0003_leaderboardentry_stage_reached_tournament_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaderboard',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped on every committed change to the entries (0 = never materialized)'),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Leaderboard version in which this row last changed'),
+        ),
+    ]
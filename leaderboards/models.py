@@ -7,6 +7,10 @@ class Leaderboard(models.Model):
     """Leaderboard model for storing tournament standings"""
     tournament = models.OneToOneField(Tournament, related_name='leaderboard', on_delete=models.CASCADE)
     last_updated = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Bumped on every committed change to the entries (0 = never materialized)"
+    )
     
     def __str__(self):
         return f"Leaderboard for {self.tournament.name}"
@@ -36,6 +40,10 @@ class LeaderboardEntry(models.Model):
         default='active',
         help_text="Team status: active, eliminated, champion, finalist, semi-finalist"
     )
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Leaderboard version in which this row last changed"
+    )
 
     class Meta:
         unique_together = ('leaderboard', 'team')
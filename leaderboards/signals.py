@@ -0,0 +1,58 @@
+"""
+Keep materialized leaderboards in step with match results.
+
+A leaderboard changes when a match enters or leaves the completed state (or
+a completed match's score is edited), when a completed match is deleted, and
+when a team joins, leaves or is (de)activated in the tournament.  The state
+an instance was loaded with is remembered at post_init, so spotting a
+transition costs no query.  Bulk ``QuerySet.update()`` calls bypass these
+signals and must call ``schedule_leaderboard_refresh`` themselves (see the
+match admin actions).
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from matches.models import Match
+from tournaments.models import TournamentTeam
+
+from .materialize import schedule_leaderboard_refresh
+
+
+@receiver(post_init, sender=Match)
+def remember_match_status(sender, instance, **kwargs):
+    instance._leaderboard_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Match)
+def refresh_leaderboard_on_match_result(sender, instance, **kwargs):
+    """Refresh the tournament leaderboard when a match's result counts, stops counting, or changes."""
+    was_completed = getattr(instance, '_leaderboard_status', None) == "completed"
+    instance._leaderboard_status = instance.status
+    if not instance.tournament_id or not (was_completed or instance.status == "completed"):
+        return
+    schedule_leaderboard_refresh(instance.tournament_id, team_ids=[instance.team1_id, instance.team2_id])
+
+
+@receiver(post_delete, sender=Match)
+def refresh_leaderboard_on_match_delete(sender, instance, **kwargs):
+    if instance.tournament_id and instance.status == "completed":
+        schedule_leaderboard_refresh(instance.tournament_id, team_ids=[instance.team1_id, instance.team2_id])
+
+
+@receiver(post_init, sender=TournamentTeam)
+def remember_team_activity(sender, instance, **kwargs):
+    instance._leaderboard_is_active = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=TournamentTeam)
+def refresh_leaderboard_on_team_change(sender, instance, created, **kwargs):
+    """Joining, leaving or (de)activating a team adds or removes its row."""
+    was_active = getattr(instance, '_leaderboard_is_active', None)
+    instance._leaderboard_is_active = instance.is_active
+    if created or was_active != instance.is_active:
+        schedule_leaderboard_refresh(instance.tournament_id, team_ids=[instance.team_id])
+
+
+@receiver(post_delete, sender=TournamentTeam)
+def refresh_leaderboard_on_team_removal(sender, instance, **kwargs):
+    schedule_leaderboard_refresh(instance.tournament_id)
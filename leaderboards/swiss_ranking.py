@@ -33,178 +33,178 @@ def is_wtf_tournament(tournament):
     
     return False
 
+def _swiss_scope(tournament, stage=None):
+    """Return (all tournament teams, ids of the teams being ranked) in one query."""
+    all_teams = list(
+        TournamentTeam.objects.filter(tournament=tournament).select_related('team')
+    )
+    in_scope = {
+        tt.id for tt in all_teams
+        if tt.is_active and (stage is None or tt.current_stage_number == stage.stage_number)
+    }
+    return all_teams, in_scope
+
+
+def compute_swiss_standings(tournament, stage=None, persist=True):
+    """
+    Swiss standings for a tournament or stage in two queries.
+
+    Loads every TournamentTeam and every completed match of the tournament
+    once, then computes in memory:
+      - Swiss points (3 per win, 3 for a bye) — tournament-wide, like
+        TournamentTeam.update_swiss_stats
+      - Buchholz (sum of opponents' Swiss points; a bye counts as self)
+      - fine-Buchholz (sum of opponents' Buchholz)
+      - points scored / conceded / difference (stage matches only)
+      - head-to-head wins among teams still tied after the above
+
+    Ranked teams are ordered by Swiss points, Buchholz, fine-Buchholz, point
+    difference, head-to-head, then most recently registered.  With
+    ``persist`` the new swiss_points / buchholz_score are written back in a
+    single bulk_update.  Returns the list of ranking dicts consumed by the
+    leaderboard views.
+    """
+    all_teams, in_scope = _swiss_scope(tournament, stage)
+    ranked = [tt for tt in all_teams if tt.id in in_scope]
+    by_team_id = {tt.team_id: tt for tt in all_teams}
+
+    matches = list(
+        Match.objects.filter(tournament=tournament, status='completed')
+        .values_list('stage_id', 'team1_id', 'team2_id', 'winner_id', 'team1_score', 'team2_score')
+    )
+
+    # Swiss points: recomputed for ranked teams, stored value for everyone else.
+    wins = {tt.team_id: 0 for tt in all_teams}
+    for _stage_id, _t1, _t2, winner_id, _s1, _s2 in matches:
+        if winner_id in wins:
+            wins[winner_id] += 1
+    points = {}
+    for tt in all_teams:
+        if tt.id in in_scope:
+            points[tt.team_id] = 3 * wins[tt.team_id] + (3 if tt.received_bye_in_round is not None else 0)
+        else:
+            points[tt.team_id] = tt.swiss_points
+
+    # Per-team match stats and opponents, restricted to the stage.
+    stats = {
+        tt.team_id: {'played': 0, 'won': 0, 'scored': 0, 'conceded': 0, 'opponents': []}
+        for tt in ranked
+    }
+    beat = set()
+    stage_id = stage.id if stage else None
+    for m_stage_id, team1_id, team2_id, winner_id, score1, score2 in matches:
+        if stage is not None and m_stage_id != stage_id:
+            continue
+        if winner_id and team1_id and team2_id:
+            beat.add((winner_id, team2_id if winner_id == team1_id else team1_id))
+        for team_id, opponent_id, scored, conceded in (
+            (team1_id, team2_id, score1, score2),
+            (team2_id, team1_id, score2, score1),
+        ):
+            team_stats = stats.get(team_id)
+            if team_stats is None:
+                continue
+            team_stats['played'] += 1
+            team_stats['won'] += 1 if winner_id == team_id else 0
+            team_stats['scored'] += scored or 0
+            team_stats['conceded'] += conceded or 0
+            opponent_tt = by_team_id.get(opponent_id)
+            if opponent_tt is None:
+                continue
+            if stage is not None and opponent_tt.current_stage_number != stage.stage_number:
+                logger.warning(f"Opponent {opponent_tt.team.name} not found in stage {stage.stage_number}")
+                continue
+            team_stats['opponents'].append(opponent_id)
+
+    buchholz = {}
+    for tt in ranked:
+        score = sum(points[o] for o in stats[tt.team_id]['opponents'])
+        if tt.received_bye_in_round:
+            score += points[tt.team_id]
+        buchholz[tt.team_id] = float(score)
+    fine_buchholz = {}
+    for tt in ranked:
+        score = sum(buchholz.get(o, by_team_id[o].buchholz_score) for o in stats[tt.team_id]['opponents'])
+        if tt.received_bye_in_round:
+            score += buchholz[tt.team_id]
+        fine_buchholz[tt.team_id] = score
+
+    def primary_key(tt):
+        team_stats = stats[tt.team_id]
+        return (
+            points[tt.team_id],
+            buchholz[tt.team_id],
+            fine_buchholz[tt.team_id],
+            team_stats['scored'] - team_stats['conceded'],
+        )
+
+    # Head-to-head: wins against the other members of each tie group.
+    groups = {}
+    for tt in ranked:
+        groups.setdefault(primary_key(tt), []).append(tt.team_id)
+    head_to_head = {}
+    for members in groups.values():
+        for team_id in members:
+            head_to_head[team_id] = sum(1 for other in members if (team_id, other) in beat)
+
+    ranked.sort(key=lambda tt: primary_key(tt) + (head_to_head[tt.team_id], tt.id), reverse=True)
+
+    changed = []
+    rankings = []
+    for i, tt in enumerate(ranked):
+        team_stats = stats[tt.team_id]
+        if tt.swiss_points != points[tt.team_id] or tt.buchholz_score != buchholz[tt.team_id]:
+            tt.swiss_points = points[tt.team_id]
+            tt.buchholz_score = buchholz[tt.team_id]
+            changed.append(tt)
+        rankings.append({
+            'position': i + 1,
+            'team': tt.team,
+            'tournament_team': tt,
+            'swiss_points': tt.swiss_points,
+            'buchholz_score': tt.buchholz_score,
+            'fine_buchholz_score': fine_buchholz[tt.team_id],
+            'head_to_head': head_to_head[tt.team_id],
+            'matches_played': team_stats['played'],
+            'matches_won': team_stats['won'],
+            'matches_lost': team_stats['played'] - team_stats['won'],
+            'points_scored': team_stats['scored'],
+            'points_conceded': team_stats['conceded'],
+            'point_difference': team_stats['scored'] - team_stats['conceded'],
+        })
+
+    if persist and changed:
+        TournamentTeam.objects.bulk_update(changed, ['swiss_points', 'buchholz_score'])
+
+    return rankings
+
+
 def calculate_buchholz_scores(tournament, stage=None):
     """
-    Calculate Buchholz scores for all teams in a tournament or stage.
+    Calculate and store Buchholz scores for all teams in a tournament or stage.
     Buchholz score = sum of all opponents' Swiss points.
-    Must be calculated after all Swiss points are updated.
     """
     logger.info(f"Calculating Buchholz scores for tournament {tournament.name}")
-    
-    # Get tournament teams
-    if stage:
-        # For multi-stage tournaments, only consider teams in this stage
-        tournament_teams = TournamentTeam.objects.filter(
-            tournament=tournament,
-            current_stage_number=stage.stage_number,
-            is_active=True
-        )
-        match_filter = Q(tournament=tournament, stage=stage, status='completed')
-    else:
-        tournament_teams = TournamentTeam.objects.filter(
-            tournament=tournament,
-            is_active=True
-        )
-        match_filter = Q(tournament=tournament, status='completed')
-    
-    # Calculate Buchholz for each team
-    for team_tt in tournament_teams:
-        buchholz_score = 0.0
-        opponents_count = 0
-        
-        # Get all completed matches for this team
-        team_matches = Match.objects.filter(match_filter).filter(
-            Q(team1=team_tt.team) | Q(team2=team_tt.team)
-        )
-        
-        for match in team_matches:
-            # Determine opponent
-            if match.team1 == team_tt.team:
-                opponent = match.team2
-            else:
-                opponent = match.team1
-            
-            if opponent:
-                # Get opponent's tournament team record
-                try:
-                    if stage:
-                        opponent_tt = TournamentTeam.objects.get(
-                            tournament=tournament,
-                            team=opponent,
-                            current_stage_number=stage.stage_number
-                        )
-                    else:
-                        opponent_tt = TournamentTeam.objects.get(
-                            tournament=tournament,
-                            team=opponent
-                        )
-                    
-                    # Add opponent's Swiss points to Buchholz score
-                    buchholz_score += opponent_tt.swiss_points
-                    opponents_count += 1
-                    
-                except TournamentTeam.DoesNotExist:
-                    logger.warning(f"Opponent {opponent.name} not found in tournament teams")
-                    continue
-        
-        # Handle bye rounds - typically count as playing against yourself
-        if team_tt.received_bye_in_round:
-            buchholz_score += team_tt.swiss_points
-            opponents_count += 1
-        
-        # Update Buchholz score
-        team_tt.buchholz_score = buchholz_score
-        team_tt.save()
-        
-        logger.debug(f"{team_tt.team.name}: {team_tt.swiss_points} Swiss pts, {buchholz_score} Buchholz ({opponents_count} opponents)")
-    
-    logger.info(f"Buchholz calculation completed for {tournament_teams.count()} teams")
+    rankings = compute_swiss_standings(tournament, stage)
+    logger.info(f"Buchholz calculation completed for {len(rankings)} teams")
+
 
 def get_swiss_rankings(tournament, stage=None):
     """
     Get Swiss tournament rankings with proper tie-breaking.
-    Returns teams ordered by: Swiss points (desc), Buchholz score (desc), points scored (desc)
+    Returns teams ordered by: Swiss points, Buchholz, fine-Buchholz,
+    point difference, head-to-head (all desc).
     """
     logger.info(f"Getting Swiss rankings for tournament {tournament.name}")
-    
-    # First, ensure all Swiss points are up to date
-    update_all_swiss_points(tournament, stage)
-    
-    # Then calculate Buchholz scores
-    calculate_buchholz_scores(tournament, stage)
-    
-    # Get tournament teams with proper ordering
-    if stage:
-        tournament_teams = TournamentTeam.objects.filter(
-            tournament=tournament,
-            current_stage_number=stage.stage_number,
-            is_active=True
-        )
-    else:
-        tournament_teams = TournamentTeam.objects.filter(
-            tournament=tournament,
-            is_active=True
-        )
-    
-    # Calculate additional stats for each team
-    rankings = []
-    for i, team_tt in enumerate(tournament_teams.order_by('-swiss_points', '-buchholz_score', '-id')):
-        # Get match statistics
-        if stage:
-            team_matches = Match.objects.filter(
-                tournament=tournament,
-                stage=stage,
-                status='completed'
-            ).filter(Q(team1=team_tt.team) | Q(team2=team_tt.team))
-        else:
-            team_matches = Match.objects.filter(
-                tournament=tournament,
-                status='completed'
-            ).filter(Q(team1=team_tt.team) | Q(team2=team_tt.team))
-        
-        matches_played = team_matches.count()
-        matches_won = team_matches.filter(winner=team_tt.team).count()
-        matches_lost = matches_played - matches_won
-        
-        # Calculate points scored and conceded
-        points_scored = 0
-        points_conceded = 0
-        
-        for match in team_matches:
-            if match.team1 == team_tt.team:
-                points_scored += match.team1_score or 0
-                points_conceded += match.team2_score or 0
-            else:
-                points_scored += match.team2_score or 0
-                points_conceded += match.team1_score or 0
-        
-        rankings.append({
-            'position': i + 1,
-            'team': team_tt.team,
-            'tournament_team': team_tt,
-            'swiss_points': team_tt.swiss_points,
-            'buchholz_score': team_tt.buchholz_score,
-            'matches_played': matches_played,
-            'matches_won': matches_won,
-            'matches_lost': matches_lost,
-            'points_scored': points_scored,
-            'points_conceded': points_conceded,
-            'point_difference': points_scored - points_conceded,
-        })
-    
+    rankings = compute_swiss_standings(tournament, stage)
     logger.info(f"Swiss rankings calculated for {len(rankings)} teams")
     return rankings
 
 def update_all_swiss_points(tournament, stage=None):
-    """Update Swiss points for all teams in a tournament or stage"""
+    """Update Swiss points (and Buchholz) for all teams in a tournament or stage"""
     logger.info(f"Updating Swiss points for tournament {tournament.name}")
-    
-    if stage:
-        tournament_teams = TournamentTeam.objects.filter(
-            tournament=tournament,
-            current_stage_number=stage.stage_number,
-            is_active=True
-        )
-    else:
-        tournament_teams = TournamentTeam.objects.filter(
-            tournament=tournament,
-            is_active=True
-        )
-    
-    for team_tt in tournament_teams:
-        team_tt.update_swiss_stats()
-    
-    logger.info(f"Swiss points updated for {tournament_teams.count()} teams")
+    rankings = compute_swiss_standings(tournament, stage)
+    logger.info(f"Swiss points updated for {len(rankings)} teams")
 
 def get_stage_rankings(tournament, stage_number):
     """Get rankings for a specific stage in a multi-stage tournament"""
@@ -1,3 +1,194 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from matches.models import Match
+from teams.models import Team
+from tournaments import job_queue
+from tournaments.job_models import AutomationJob
+from tournaments.models import Tournament, TournamentTeam
+
+from .materialize import leaderboard_snapshot, refresh_tournament_leaderboard
+from .models import Leaderboard, LeaderboardEntry
+from .swiss_ranking import get_swiss_rankings
+
+
+class SwissRankingTests(TestCase):
+    def _tournament(self, name, num_teams):
+        tournament = Tournament.objects.create(
+            name=name,
+            format='swiss',
+            play_format='triplet',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=1),
+        )
+        teams = []
+        for i in range(num_teams):
+            team = Team.objects.create(name=f"{name} {i}", pin=f"{name[:2]}{i:04d}")
+            TournamentTeam.objects.create(tournament=tournament, team=team)
+            teams.append(team)
+        return tournament, teams
+
+    def _play(self, tournament, winner, loser, winner_score=13, loser_score=5):
+        return Match.objects.create(
+            tournament=tournament,
+            team1=winner,
+            team2=loser,
+            winner=winner,
+            team1_score=winner_score,
+            team2_score=loser_score,
+            status='completed',
+        )
+
+    def _play_round_robin_round(self, tournament, teams):
+        for i in range(0, len(teams) - 1, 2):
+            self._play(tournament, teams[i], teams[i + 1])
+
+    def _count_queries(self, tournament):
+        with CaptureQueriesContext(connection) as ctx:
+            get_swiss_rankings(tournament)
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_field_size(self):
+        small, small_teams = self._tournament("small", 4)
+        large, large_teams = self._tournament("large", 24)
+        self._play_round_robin_round(small, small_teams)
+        self._play_round_robin_round(large, large_teams)
+
+        small_queries = self._count_queries(small)
+        large_queries = self._count_queries(large)
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertLessEqual(large_queries, 5)
+        # Nothing changed since the last call: read-only, two queries.
+        self.assertEqual(self._count_queries(large), 2)
+
+    def test_points_buchholz_and_tiebreaks(self):
+        tournament, (a, b, c, d) = self._tournament("ties", 4)
+        # Round 1: A beats B, C beats D.  Round 2: A beats C, D beats B.
+        self._play(tournament, a, b, 13, 2)
+        self._play(tournament, c, d, 13, 11)
+        self._play(tournament, a, c, 13, 12)
+        self._play(tournament, d, b, 13, 10)
+
+        rankings = get_swiss_rankings(tournament)
+        by_team = {r['team'].id: r for r in rankings}
+
+        self.assertEqual([r['team'].id for r in rankings][0], a.id)
+        self.assertEqual(by_team[a.id]['swiss_points'], 6)
+        # A played B (0 pts) and C (3 pts).
+        self.assertEqual(by_team[a.id]['buchholz_score'], 3.0)
+        # C and D both have 3 points; C's opponents (D, A) outscore D's (C, B).
+        self.assertEqual(by_team[c.id]['buchholz_score'], 9.0)
+        self.assertEqual(by_team[d.id]['buchholz_score'], 3.0)
+        self.assertLess(by_team[c.id]['position'], by_team[d.id]['position'])
+        self.assertEqual(by_team[b.id]['position'], 4)
+        self.assertEqual(by_team[a.id]['point_difference'], 12)
+
+        # Values are persisted on TournamentTeam.
+        stored = TournamentTeam.objects.get(tournament=tournament, team=c)
+        self.assertEqual((stored.swiss_points, stored.buchholz_score), (3, 9.0))
+
+    def test_head_to_head_counted_within_tie_group(self):
+        tournament, (a, b) = self._tournament("h2h", 2)
+        self._play(tournament, b, a, 13, 12)
+        self._play(tournament, a, b, 13, 12)
+        # Identical on every criterion: one head-to-head win each.
+        rankings = get_swiss_rankings(tournament)
+        self.assertEqual({r['head_to_head'] for r in rankings}, {1})
+
+
+class LeaderboardMaterializationTests(TestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(
+            name="Cup",
+            format='knockout',
+            play_format='triplet',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=1),
+        )
+        self.teams = []
+        for i in range(4):
+            team = Team.objects.create(name=f"Cup {i}", pin=f"cu{i:04d}")
+            TournamentTeam.objects.create(tournament=self.tournament, team=team)
+            self.teams.append(team)
+
+    def _complete(self, winner, loser):
+        with self.captureOnCommitCallbacks(execute=True):
+            Match.objects.create(
+                tournament=self.tournament, team1=winner, team2=loser, winner=winner,
+                team1_score=13, team2_score=7, status='completed',
+            )
+
+    def test_initial_build_and_noop_refresh(self):
+        leaderboard = refresh_tournament_leaderboard(self.tournament)
+        self.assertEqual(leaderboard.version, 1)
+        self.assertEqual(leaderboard.entries.count(), 4)
+
+        leaderboard = refresh_tournament_leaderboard(self.tournament)
+        self.assertEqual(leaderboard.version, 1)
+
+    def test_match_completion_updates_changed_rows_only(self):
+        a, b, c, d = self.teams
+        refresh_tournament_leaderboard(self.tournament)
+        d_entry_id = LeaderboardEntry.objects.get(team=d).id
+
+        self._complete(a, d)
+
+        entries, version = leaderboard_snapshot(self.tournament.leaderboard)
+        self.assertEqual(version, 2)
+        self.assertEqual([e.team_id for e in entries], [a.id, b.id, c.id, d.id])
+        self.assertEqual(entries[0].matches_won, 1)
+        self.assertEqual(entries[3].matches_lost, 1)
+        # Rows are updated in place, not deleted and recreated.
+        self.assertEqual(LeaderboardEntry.objects.get(team=d).id, d_entry_id)
+        # B and C kept their positions and stats, so their rows were not rewritten.
+        self.assertEqual([e.version for e in entries], [2, 1, 1, 2])
+
+    def test_reverts_deletes_and_withdrawals_refresh_the_leaderboard(self):
+        a, b, c, d = self.teams
+        refresh_tournament_leaderboard(self.tournament)
+        self._complete(c, a)
+        match = Match.objects.get(team1=c)
+        self.assertEqual(LeaderboardEntry.objects.get(team=c).position, 1)
+
+        # Reverted from completed: the win no longer counts
+        with self.captureOnCommitCallbacks(execute=True):
+            match.status = 'active'
+            match.save()
+        self.assertEqual(LeaderboardEntry.objects.get(team=c).matches_won, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Match.objects.filter(pk=match.pk).update(status='completed')
+            match.refresh_from_db()
+            match.delete()
+        self.assertEqual(LeaderboardEntry.objects.get(team=c).matches_won, 0)
+
+        version = Leaderboard.objects.get(tournament=self.tournament).version
+        with self.captureOnCommitCallbacks(execute=True):
+            withdrawn = TournamentTeam.objects.get(tournament=self.tournament, team=d)
+            withdrawn.is_active = False
+            withdrawn.save()
+        entries, new_version = leaderboard_snapshot(Leaderboard.objects.get(tournament=self.tournament))
+        self.assertEqual(new_version, version + 1)
+        self.assertEqual({e.team_id for e in entries}, {a.id, b.id, c.id})
+
+    def test_swiss_recompute_is_queued_not_run_in_the_request(self):
+        Tournament.objects.filter(pk=self.tournament.pk).update(format='swiss')
+        self.tournament.refresh_from_db()
+        refresh_tournament_leaderboard(self.tournament)
+        a, b, c, d = self.teams
+        with self.settings(TOURNAMENT_AUTOMATION_RUN_INLINE=False):
+            self._complete(d, a)
+        self.assertEqual(Leaderboard.objects.get(tournament=self.tournament).version, 1)
+        # The refresh rides on the automation pass the completion queued
+        self.assertEqual(AutomationJob.objects.filter(tournament=self.tournament).count(), 1)
 
-# Create your tests here.
+        with mock.patch('tournaments.automation_engine.TournamentEngine.process_automation', return_value=True):
+            self.assertTrue(job_queue.run_job(job_queue.claim_next_job(worker_id="w1")))
+        self.assertEqual(Leaderboard.objects.get(tournament=self.tournament).version, 2)
+        self.assertEqual(LeaderboardEntry.objects.get(team=d).swiss_points, 3)
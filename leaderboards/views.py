@@ -1,13 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.db.models import Sum, Count, F, Q
-from .models import Leaderboard, LeaderboardEntry, TeamStatistics, MatchStatistics
+from .models import LeaderboardEntry, TeamStatistics, MatchStatistics
 from .swiss_ranking import (
-    is_swiss_tournament, get_swiss_rankings, get_traditional_rankings,
+    is_swiss_tournament,
     get_stage_rankings, is_wtf_tournament,
-    is_multistage_team_tournament, get_global_multistage_rankings,
+    is_multistage_team_tournament,
 )
-from .wtf_ranking import get_wtf_rankings, get_wtf_stage_rankings, update_wtf_statistics
+from .wtf_ranking import get_wtf_stage_rankings
+from .materialize import ensure_tournament_leaderboard, leaderboard_snapshot, refresh_tournament_leaderboard
+from pfc_core import cache_regions
 from tournaments.models import Tournament
 from teams.models import Team
 from matches.models import Match
@@ -18,11 +20,8 @@ def leaderboard_index(request):
     leaderboards = []
     
     for tournament in tournaments:
-        # Get or create leaderboard
-        leaderboard, created = Leaderboard.objects.get_or_create(tournament=tournament)
-        
-        # Update leaderboard entries
-        update_tournament_leaderboard(tournament)
+        # Entries are refreshed on match completion; only build missing ones here
+        leaderboard = ensure_tournament_leaderboard(tournament)
         
         # Get top entries
         top_entries = leaderboard.entries.all().order_by('position')[:3]
@@ -40,31 +39,16 @@ def leaderboard_index(request):
     }
     return render(request, 'leaderboards/leaderboard_index.html', context)
 
-def tournament_leaderboard(request, tournament_id):
-    """View for displaying tournament leaderboard with Swiss support"""
-    tournament = get_object_or_404(Tournament, id=tournament_id)
-
-    # Get or create leaderboard
-    leaderboard, created = Leaderboard.objects.get_or_create(tournament=tournament)
-
-    # Update leaderboard entries
-    update_tournament_leaderboard(tournament)
-
-    # Get entries ordered by position
-    entries = leaderboard.entries.all().order_by('position')
+def _tournament_leaderboard_data(tournament, leaderboard):
+    """Everything tournament_leaderboard renders that depends on results."""
+    # Entries ordered by position, all from one committed version
+    entries, leaderboard_version = leaderboard_snapshot(leaderboard)
 
-    # Get Swiss-specific data if applicable
-    swiss_data = None
-    if is_swiss_tournament(tournament):
-        swiss_rankings = get_swiss_rankings(tournament)
-        swiss_data = {ranking['team'].id: ranking for ranking in swiss_rankings}
-
-    # Get WTF-specific data if applicable
-    wtf_data = None
-    if is_wtf_tournament(tournament):
-        update_wtf_statistics(tournament)
-        wtf_rankings = get_wtf_rankings(tournament)
-        wtf_data = {ranking['team'].id: ranking for ranking in wtf_rankings}
+    # Swiss points, Buchholz and πετΑ are materialized on the entries; the
+    # worker recomputes them, a page view never does
+    by_team = {entry.team_id: entry for entry in entries}
+    swiss_data = by_team if is_swiss_tournament(tournament) else None
+    wtf_data = by_team if is_wtf_tournament(tournament) else None
 
     # Determine if this is a multi-stage team tournament (not mêlée)
     is_multistage = is_multistage_team_tournament(tournament)
@@ -80,10 +64,39 @@ def tournament_leaderboard(request, tournament_id):
                 'num_qualifiers': stage.num_qualifiers,
             })
 
+    return {
+        'entries': entries,
+        'version': leaderboard_version,
+        'swiss_data': swiss_data,
+        'wtf_data': wtf_data,
+        'is_multistage': is_multistage,
+        'stages_summary': stages_summary,
+    }
+
+def tournament_leaderboard(request, tournament_id):
+    """View for displaying tournament leaderboard with Swiss support"""
+    tournament = get_object_or_404(Tournament, id=tournament_id)
+
+    # Entries are refreshed on match completion; only build missing ones here
+    leaderboard = ensure_tournament_leaderboard(tournament)
+
+    # Page data is cached per leaderboard version in the "leaderboards" region
+    data = cache_regions.region(cache_regions.LEADERBOARDS).get_or_set(
+        ("tournament", tournament.id, leaderboard.version),
+        lambda: _tournament_leaderboard_data(tournament, leaderboard),
+    )
+    entries = data['entries']
+    leaderboard_version = data['version']
+    swiss_data = data['swiss_data']
+    wtf_data = data['wtf_data']
+    is_multistage = data['is_multistage']
+    stages_summary = data['stages_summary']
+
     context = {
         'tournament': tournament,
         'leaderboard': leaderboard,
         'entries': entries,
+        'leaderboard_version': leaderboard_version,
         'is_swiss': is_swiss_tournament(tournament),
         'is_wtf': is_wtf_tournament(tournament),
         'is_multistage': is_multistage,
@@ -177,89 +190,17 @@ def match_statistics(request, match_id):
     }
     return render(request, 'leaderboards/match_statistics.html', context)
 
-def update_tournament_leaderboard(tournament):
+def update_tournament_leaderboard(tournament, team_ids=None):
     """Update leaderboard entries for a tournament.
 
     For multi-stage TEAM tournaments (not mêlée/super-mêlée), a unified global
     ranking is built that includes ALL participating teams across all stages.
     Eliminated teams are preserved with their status and stage reached.
 
-    For all other formats the existing per-format logic is used unchanged.
+    Only changed rows are written, in one transaction; see
+    leaderboards.materialize.
     """
-    leaderboard, created = Leaderboard.objects.get_or_create(tournament=tournament)
-
-    # Clear existing entries to rebuild
-    LeaderboardEntry.objects.filter(leaderboard=leaderboard).delete()
-
-    # ------------------------------------------------------------------ #
-    # Multi-stage TEAM tournament → unified global ranking                #
-    # ------------------------------------------------------------------ #
-    if is_multistage_team_tournament(tournament):
-        rankings = get_global_multistage_rankings(tournament)
-        for ranking in rankings:
-            LeaderboardEntry.objects.create(
-                leaderboard=leaderboard,
-                team=ranking['team'],
-                position=ranking['position'],
-                matches_played=ranking['matches_played'],
-                matches_won=ranking['matches_won'],
-                matches_lost=ranking['matches_lost'],
-                points_scored=ranking['points_scored'],
-                points_conceded=ranking['points_conceded'],
-                swiss_points=ranking.get('swiss_points', 0),
-                buchholz_score=ranking.get('buchholz_score', 0.0),
-                stage_reached=ranking.get('stage_reached', 1),
-                tournament_status=ranking.get('tournament_status', 'active'),
-            )
-        return
-
-    # ------------------------------------------------------------------ #
-    # All other formats — existing logic unchanged                        #
-    # ------------------------------------------------------------------ #
-    if is_swiss_tournament(tournament):
-        rankings = get_swiss_rankings(tournament)
-        for ranking in rankings:
-            LeaderboardEntry.objects.create(
-                leaderboard=leaderboard,
-                team=ranking['team'],
-                position=ranking['position'],
-                matches_played=ranking['matches_played'],
-                matches_won=ranking['matches_won'],
-                matches_lost=ranking['matches_lost'],
-                points_scored=ranking['points_scored'],
-                points_conceded=ranking['points_conceded'],
-                swiss_points=ranking.get('swiss_points', 0),
-                buchholz_score=ranking.get('buchholz_score', 0.0),
-            )
-    elif is_wtf_tournament(tournament):
-        update_wtf_statistics(tournament)
-        rankings = get_wtf_rankings(tournament)
-        for ranking in rankings:
-            LeaderboardEntry.objects.create(
-                leaderboard=leaderboard,
-                team=ranking['team'],
-                position=ranking['position'],
-                matches_played=ranking['matches_played'],
-                matches_won=ranking['matches_won'],
-                matches_lost=ranking['matches_lost'],
-                points_scored=ranking['points_scored'],
-                points_conceded=ranking['points_conceded'],
-                swiss_points=ranking.get('swiss_points', 0),
-                buchholz_score=ranking.get('peta_index', 0.0),
-            )
-    else:
-        rankings = get_traditional_rankings(tournament)
-        for ranking in rankings:
-            LeaderboardEntry.objects.create(
-                leaderboard=leaderboard,
-                team=ranking['team'],
-                position=ranking['position'],
-                matches_played=ranking['matches_played'],
-                matches_won=ranking['matches_won'],
-                matches_lost=ranking['matches_lost'],
-                points_scored=ranking['points_scored'],
-                points_conceded=ranking['points_conceded'],
-            )
+    return refresh_tournament_leaderboard(tournament, team_ids=team_ids)
 
 def update_team_statistics(team):
     """Update overall statistics for a team"""
@@ -465,7 +465,6 @@ def record_shot(request, match_type, pk):
                 practice_type,
             )
             Shot.objects.create(session=session, outcome=outcome)
-            session.refresh_from_db()
 
         combined = _get_player_shot_stats(player_id, match_type, pk)
         return JsonResponse({
@@ -521,9 +520,8 @@ def undo_last_shot(request, match_type, pk):
 
         session = last_shot.session
         undone_outcome = last_shot.outcome
-        last_shot.delete()
-        session.update_statistics()
-        session.refresh_from_db()
+        if not session.remove_last_shot(last_shot):
+            return JsonResponse({'ok': False, 'error': 'No shots to undo'}, status=404)
         return JsonResponse({
             'ok': True,
             'undone_outcome': undone_outcome,
@@ -108,16 +108,25 @@ class MatchAdmin(ActiveTeamMixin, ActiveTournamentMixin, admin.ModelAdmin):
         return format_html('&nbsp;'.join(buttons))
     actions_display.short_description = "Quick Actions"
     
+    def _update_status(self, queryset, status):
+        """Bulk status change; update() sends no signals, so refresh the leaderboards here."""
+        from leaderboards.materialize import schedule_leaderboard_refresh
+
+        tournament_ids = set(queryset.exclude(tournament=None).values_list('tournament_id', flat=True))
+        queryset.update(status=status)
+        for tournament_id in tournament_ids:
+            schedule_leaderboard_refresh(tournament_id)
+
     def mark_as_pending(self, request, queryset):
-        queryset.update(status='pending')
+        self._update_status(queryset, 'pending')
     mark_as_pending.short_description = "Mark selected matches as pending"
     
     def mark_as_active(self, request, queryset):
-        queryset.update(status='active')
+        self._update_status(queryset, 'active')
     mark_as_active.short_description = "Mark selected matches as active"
     
     def mark_as_completed(self, request, queryset):
-        queryset.update(status='completed')
+        self._update_status(queryset, 'completed')
     mark_as_completed.short_description = "Mark selected matches as completed"
     
     def assign_courts(self, request, queryset):
@@ -0,0 +1,192 @@
+"""
+matches/court_allocator.py
+==========================
+Court allocation for tournament matches.
+
+auto_assign_court used to rebuild the busy-court list with a fresh query on
+every call and pick from a materialised queryset, and the waiting-match
+signal repeated that for every waiting match.  A CourtAllocator loads each
+court pool once and keeps its free set in memory for the lifetime of one
+allocation pass:
+
+  pool      — the courts a match may use: its Poule's courts, else the
+              tournament's courts, else every court (same priority as before)
+  free set  — pool courts with is_available=True and no active match,
+              minus courts already claimed during this pass
+
+Claims are atomic: a court is only taken by the conditional UPDATE
+``is_available=True -> False``, so two workers (or two allocators with stale
+free sets) can never hand out the same court.  A lost race just drops the
+court from the free set and tries the next one.
+
+assign_waiting_matches() is the single FIFO pass over matches waiting for a
+court: oldest first, each match locked before it is started, and a match
+whose pool is exhausted is skipped without blocking matches from other pools.
+
+Design principles:
+  - The database stays the source of truth; the in-memory state only saves
+    queries within one pass and is thrown away afterwards.
+  - auto_assign_court(match) keeps its signature and return value.
+"""
+import logging
+import random
+
+from django.db import transaction
+from django.utils import timezone
+
+from courts.models import Court
+
+logger = logging.getLogger(__name__)
+
+
+class CourtAllocator:
+    """Free-court bookkeeping for one allocation pass."""
+
+    def __init__(self):
+        self._poule_courts = {}   # poule id -> [Court] (whole pool, loaded once)
+        self._tournament_courts = {}
+        self._all_courts = None
+        self._busy = None         # court id -> id of the active match using it
+        self._taken = set()       # court ids claimed (or lost) during this pass
+        self.conflicts = 0        # claims lost to a concurrent allocator
+
+    def _busy_courts(self):
+        if self._busy is None:
+            from .models import Match
+
+            self._busy = dict(
+                Match.objects.filter(status='active', court__isnull=False)
+                .values_list('court_id', 'id')
+            )
+        return self._busy
+
+    def _pool(self, match):
+        """(pool key, courts) for ``match``."""
+        if match.poule_id:
+            if match.poule_id not in self._poule_courts:
+                self._poule_courts[match.poule_id] = list(Court.objects.filter(poules=match.poule_id))
+            if self._poule_courts[match.poule_id]:
+                return ('poule', match.poule_id), self._poule_courts[match.poule_id]
+
+        if match.tournament_id not in self._tournament_courts:
+            self._tournament_courts[match.tournament_id] = list(
+                Court.objects.filter(tournamentcourt__tournament_id=match.tournament_id)
+            )
+        if self._tournament_courts[match.tournament_id]:
+            return ('tournament', match.tournament_id), self._tournament_courts[match.tournament_id]
+
+        if self._all_courts is None:
+            self._all_courts = list(Court.objects.all())
+        return ('all', None), self._all_courts
+
+    def pool_key(self, match):
+        return self._pool(match)[0]
+
+    def free_courts(self, match):
+        """Courts ``match`` could be given right now, according to this pass."""
+        _key, courts = self._pool(match)
+        busy = self._busy_courts()
+        return [
+            court for court in courts
+            if court.is_available
+            and court.id not in self._taken
+            and busy.get(court.id, match.id) == match.id
+        ]
+
+    def claim(self, match):
+        """
+        Assign a free court of ``match``'s pool to it.
+
+        Returns the Court, or None when the pool has no free court.
+        """
+        key, _courts = self._pool(match)
+        free = self.free_courts(match)
+        while free:
+            court = free.pop(random.randrange(len(free)))
+            self._taken.add(court.id)
+            if not Court.objects.filter(pk=court.pk, is_available=True).update(is_available=False):
+                self.conflicts += 1
+                logger.info(f"Court {court.id} was claimed concurrently; trying another {key[0]} court")
+                continue
+            court.is_available = False
+            self._busy_courts()[court.id] = match.id
+            match.court = court
+            match.save(update_fields=['court'])
+            logger.info(f"Assigned {key[0]} court {court.id} to match {match.id}")
+            return court
+
+        logger.info(f"No available {key[0]} courts for match {match.id}")
+        return None
+
+
+def start_match_on_court(match, court):
+    """Activate a waiting ``match`` that has just been given ``court``."""
+    match.status = "active"
+    # Use court-local time so start_time reflects the venue's local clock
+    try:
+        from courts.timezone_utils import get_court_local_now
+        court_complex = court.courtcomplex_set.first()
+        match.start_time = get_court_local_now(court_complex) if court_complex else timezone.now()
+    except Exception:
+        match.start_time = timezone.now()
+    match.waiting_for_court = False
+    match.save()
+
+    # This automatic promotion bypasses normal Match views, so emit the same
+    # post-commit lifecycle broadcast used by player-driven state transitions.
+    from pfc_events.signals import notify_match_state_changed
+    transaction.on_commit(
+        lambda match_id=match.pk: notify_match_state_changed(match_id, "active")
+    )
+
+
+def assign_waiting_matches(tournament=None, allocator=None):
+    """
+    One FIFO pass over matches waiting for a court.
+
+    Every waiting match (optionally only those of ``tournament``) gets a
+    court if its pool has one free; matches are served oldest first.
+    Returns the list of (match, court) assignments made.
+    """
+    from .models import Match
+    from .views import auto_register_players_to_billboard
+
+    allocator = allocator or CourtAllocator()
+    waiting = Match.objects.filter(status="pending_verification", waiting_for_court=True)
+    if tournament is not None:
+        waiting = waiting.filter(tournament=tournament)
+
+    assigned = []
+    exhausted = set()
+    for match in waiting.order_by("created_at", "id"):
+        key = allocator.pool_key(match)
+        if key in exhausted:
+            continue
+        if not allocator.free_courts(match):
+            exhausted.add(key)
+            continue
+
+        with transaction.atomic():
+            # Another worker may have started this match since the list was read
+            locked = (
+                Match.objects.select_for_update(skip_locked=True)
+                .filter(pk=match.pk, status="pending_verification", waiting_for_court=True)
+                .first()
+            )
+            if locked is None:
+                continue
+            court = allocator.claim(locked)
+            if court is None:
+                exhausted.add(key)
+                continue
+            start_match_on_court(locked, court)
+        assigned.append((locked, court))
+
+        # Auto-register players to Billboard when match starts
+        try:
+            auto_register_players_to_billboard(locked)
+        except Exception as e:
+            logger.error(f"Failed to auto-register players for match {locked.id} upon court assignment: {e}")
+        logger.info(f"Auto-assigned court {court.id} to waiting match {locked.id} and activated it")
+
+    return assigned
@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
+from matches.court_allocator import assign_waiting_matches
 from matches.models import Match
-from matches.utils import auto_assign_court  # Fixed import
-from django.utils import timezone
+from tournaments.models import Tournament
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,60 +9,50 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = 'Assign courts to matches that are waiting for courts'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tournament',
+            type=int,
+            help='Only assign waiting matches of this tournament id'
+        )
+
     def handle(self, *args, **options):
+        tournament = None
+        if options.get('tournament'):
+            tournament = Tournament.objects.get(pk=options['tournament'])
+
         # Find all matches waiting for courts
         waiting_matches = Match.objects.filter(
             status="pending_verification",
             waiting_for_court=True
-        ).order_by("created_at")
-        
-        if not waiting_matches.exists():
+        )
+        if tournament is not None:
+            waiting_matches = waiting_matches.filter(tournament=tournament)
+        waiting_count = waiting_matches.count()
+
+        if not waiting_count:
             self.stdout.write(self.style.SUCCESS('No matches waiting for courts.'))
             return
-        
-        assigned_count = 0
-        
-        for match in waiting_matches:
-            self.stdout.write(f'Checking match {match.id}: {match.team1} vs {match.team2}')
-            
-            # Try to assign a court
-            court = auto_assign_court(match)
-            
-            if court:
-                # Court assigned - activate the match
-                match.status = "active"
-                match.start_time = timezone.now()
-                match.waiting_for_court = False
-                match.save()
-                
-                # Auto-register players to Billboard when match starts
-                try:
-                    from matches.views import auto_register_players_to_billboard
-                    auto_register_players_to_billboard(match)
-                except Exception as e:
-                    self.stdout.write(self.style.WARNING(f"Failed to auto-register players for match {match.id}: {e}"))
-                
-                assigned_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'✅ Assigned Court {court.number} to match {match.id} and activated it'
-                    )
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'⏳ No available court for match {match.id}'
-                    )
+
+        # One FIFO pass: oldest waiting match first, courts claimed atomically
+        assigned = assign_waiting_matches(tournament=tournament)
+
+        for match, court in assigned:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'✅ Assigned Court {court.number} to match {match.id} and activated it'
                 )
-        
-        if assigned_count > 0:
+            )
+
+        if assigned:
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'Successfully assigned courts to {assigned_count} waiting matches.'
+                    f'Successfully assigned courts to {len(assigned)} waiting matches.'
                 )
             )
-        else:
+        if waiting_count > len(assigned):
             self.stdout.write(
-                self.style.WARNING('No courts could be assigned to waiting matches.')
+                self.style.WARNING(
+                    f'⏳ {waiting_count - len(assigned)} matches are still waiting for a court.'
+                )
             )
-
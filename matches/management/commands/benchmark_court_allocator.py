@@ -0,0 +1,178 @@
+"""
+Django management command that simulates court allocation for a busy event
+Usage: python manage.py benchmark_court_allocator [--courts 40] [--matches 200] [--workers 2]
+
+Creates a throw-away tournament with ``--courts`` courts and ``--matches``
+matches waiting for a court, then repeats allocation passes until every
+match has been played: each tick runs one assign_waiting_matches pass per
+simulated worker and completes a random share of the active matches.
+
+Workers are CourtAllocator instances whose free sets are loaded before any
+of them claims, so they race on the same stale view like concurrent Daphne
+workers would; the conditional court claim has to resolve every race.
+
+After every pass the command checks that no court holds two active matches
+and that matches started in FIFO order.  Everything runs inside a
+transaction that is rolled back, so no rows are left behind.
+"""
+
+import logging
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from courts.models import Court
+from matches.court_allocator import CourtAllocator, assign_waiting_matches
+from matches.models import Match
+from teams.models import Team
+from tournaments.models import Tournament, TournamentCourt
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Simulate court allocation for a large event and check that no court is double-assigned'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--courts',
+            type=int,
+            default=40,
+            help='Courts in the simulated event (default: 40)'
+        )
+        parser.add_argument(
+            '--matches',
+            type=int,
+            default=200,
+            help='Matches waiting for a court (default: 200)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Competing allocators per tick (default: 2)'
+        )
+        parser.add_argument(
+            '--finish-rate',
+            type=float,
+            default=0.3,
+            help='Share of active matches finishing per tick (default: 0.3)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed (default: 42)'
+        )
+        parser.add_argument(
+            '--verbose-allocation',
+            action='store_true',
+            help='Keep the allocator logger output (silenced by default)'
+        )
+
+    def handle(self, *args, **options):
+        if not options['verbose_allocation']:
+            for name in ('matches', 'pfc_events', 'billboard'):
+                logging.getLogger(name).setLevel(logging.CRITICAL)
+        random.seed(options['seed'])
+
+        try:
+            with transaction.atomic():
+                stats = self.simulate(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(f"courts            {options['courts']}")
+        self.stdout.write(f"matches           {options['matches']}")
+        self.stdout.write(f"workers           {options['workers']}")
+        self.stdout.write(f"ticks             {stats['ticks']}")
+        self.stdout.write(f"passes            {stats['passes']}")
+        self.stdout.write(f"assignments       {stats['assigned']}")
+        self.stdout.write(f"pass time         {1000 * stats['seconds']:.1f} ms total, "
+                          f"{1000 * stats['max_pass']:.2f} ms max")
+        self.stdout.write(f"throughput        {stats['assigned'] / max(stats['seconds'], 1e-9):.0f} assignments/s")
+        self.stdout.write(f"queries/assign    {stats['queries'] / max(stats['assigned'], 1):.1f}")
+        self.stdout.write(f"lost claims       {stats['conflicts']}")
+        self.stdout.write(f"fifo violations   {stats['fifo_violations']}")
+        if stats['double_assigned']:
+            raise CommandError(f"{stats['double_assigned']} courts were double-assigned")
+        if stats['assigned'] != options['matches']:
+            raise CommandError(f"Only {stats['assigned']} of {options['matches']} matches were started")
+        self.stdout.write(self.style.SUCCESS("No court was ever double-assigned"))
+
+    def seed(self, options):
+        now = timezone.now()
+        tournament = Tournament.objects.create(
+            name="Court allocator benchmark", format="round_robin", play_format="triplet",
+            start_date=now, end_date=now,
+        )
+        first_number = (Court.objects.aggregate(top=Max('number'))['top'] or 0) + 1
+        courts = Court.objects.bulk_create([
+            Court(number=first_number + i, is_available=True) for i in range(options['courts'])
+        ])
+        TournamentCourt.objects.bulk_create([
+            TournamentCourt(tournament=tournament, court=court) for court in courts
+        ])
+        teams = [Team.objects.create(name=f"Benchmark team {i}") for i in range(2)]
+        Match.objects.bulk_create([
+            Match(
+                tournament=tournament, team1=teams[0], team2=teams[1],
+                status="pending_verification", waiting_for_court=True,
+            )
+            for _ in range(options['matches'])
+        ])
+        return tournament
+
+    def simulate(self, options):
+        tournament = self.seed(options)
+        stats = {
+            'ticks': 0, 'passes': 0, 'assigned': 0, 'seconds': 0.0, 'max_pass': 0.0,
+            'queries': 0, 'conflicts': 0, 'fifo_violations': 0, 'double_assigned': 0,
+        }
+        last_started_id = 0
+        matches = Match.objects.filter(tournament=tournament)
+
+        while matches.filter(status__in=["pending_verification", "active"]).exists():
+            stats['ticks'] += 1
+            allocators = [CourtAllocator() for _ in range(options['workers'])]
+            waiting = matches.filter(waiting_for_court=True).order_by("id").first()
+            if waiting is not None:
+                for allocator in allocators:
+                    allocator.free_courts(waiting)  # load the pool before anyone claims
+
+            for allocator in allocators:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    assigned = assign_waiting_matches(tournament=tournament, allocator=allocator)
+                    elapsed = time.perf_counter() - started
+                stats['passes'] += 1
+                stats['seconds'] += elapsed
+                stats['max_pass'] = max(stats['max_pass'], elapsed)
+                stats['queries'] += len(queries.captured_queries)
+                stats['assigned'] += len(assigned)
+                stats['conflicts'] += allocator.conflicts
+                for match, _court in assigned:
+                    if match.id < last_started_id:
+                        stats['fifo_violations'] += 1
+                    last_started_id = match.id
+                stats['double_assigned'] += (
+                    matches.filter(status="active")
+                    .values('court_id').annotate(n=Count('id')).filter(n__gt=1).count()
+                )
+
+            active = list(matches.filter(status="active").values_list('id', 'court_id'))
+            if not active:
+                if waiting is not None:
+                    raise CommandError("Matches are waiting but no court could be assigned")
+                break
+            finishing = random.sample(active, max(1, int(len(active) * options['finish_rate'])))
+            Match.objects.filter(id__in=[match_id for match_id, _ in finishing]).update(status="completed")
+            Court.objects.filter(id__in=[court_id for _, court_id in finishing]).update(is_available=True)
+
+        return stats
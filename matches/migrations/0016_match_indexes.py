@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0010_courtcomplex_timezone_name'),
+        ('matches', '0015_match_vs_encounter_match_vs_lineup_team1_locked_and_more'),
+        ('teams', '0012_playerstatssnapshot'),
+        ('tournaments', '0027_automationjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', 'round', 'status'], name='matches_mat_tournam_27297e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'waiting_for_court', 'created_at'], name='matches_mat_status_e05119_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'court'], name='matches_mat_status_a02d15_idx'),
+        ),
+    ]
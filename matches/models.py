@@ -95,6 +95,16 @@ class Match(models.Model):
         help_text="True when team2 has submitted and locked their lineup for this VS sub-game",
     )
 
+    class Meta:
+        indexes = [
+            # Round pairing / progression: matches of a round by status
+            models.Index(fields=['tournament', 'round', 'status']),
+            # Court queue: matches waiting for a court, oldest first
+            models.Index(fields=['status', 'waiting_for_court', 'created_at']),
+            # Court occupancy: active match on a court
+            models.Index(fields=['status', 'court']),
+        ]
+
     @property
     def is_draw(self):
         """Check if the match ended in a draw (tie)"""
@@ -375,7 +375,8 @@ def update_friendly_game_ratings(friendly_game):
                         opponent_value=white_avg_rating,
                         own_score=black_score,
                         opponent_score=white_score,
-                        match_id=f"friendly_{friendly_game.id}"
+                        match_id=friendly_game.id,
+                        match_type="friendly"
                     )
                     new_rating = player_profile.value
                     updates.append({
@@ -397,7 +398,8 @@ def update_friendly_game_ratings(friendly_game):
                         opponent_value=black_avg_rating,
                         own_score=white_score,
                         opponent_score=black_score,
-                        match_id=f"friendly_{friendly_game.id}"
+                        match_id=friendly_game.id,
+                        match_type="friendly"
                     )
                     new_rating = player_profile.value
                     updates.append({
@@ -87,56 +87,15 @@ def auto_assign_waiting_matches_when_court_available(sender, instance, created,
     # Only trigger if court becomes available (not when created)
     if not created and instance.is_available:
         try:
-            from .models import Match
-            from .utils import auto_assign_court
-            from django.utils import timezone
-            
-            # Find matches waiting for courts
-            waiting_matches = Match.objects.filter(
-                status="pending_verification",
-                waiting_for_court=True
-            ).order_by("created_at")
-            
-            if waiting_matches.exists():
-                logger.info(f"Court {instance.name} became available, checking {waiting_matches.count()} waiting matches")
-                
-                for match in waiting_matches:
-                    # Try to assign this court or any other available court
-                    assigned_court = auto_assign_court(match)
-                    
-                    if assigned_court:
-                        # Court assigned - activate the match
-                        match.status = "active"
-                        # Use court-local time so start_time reflects the venue's local clock
-                        try:
-                            from courts.timezone_utils import get_court_local_now
-                            _complex = assigned_court.courtcomplex_set.first()
-                            match.start_time = get_court_local_now(_complex) if _complex else timezone.now()
-                        except Exception:
-                            match.start_time = timezone.now()
-                        match.waiting_for_court = False
-                        match.save()
-
-                        # This automatic promotion bypasses normal Match views,
-                        # so emit the same post-commit lifecycle broadcast used by
-                        # player-driven state transitions. It is not a Push action.
-                        from pfc_events.signals import notify_match_state_changed
-                        transaction.on_commit(
-                            lambda match_id=match.pk: notify_match_state_changed(match_id, "active")
-                        )
-                        
-                        # Auto-register players to Billboard when match starts
-                        try:
-                            from .views import auto_register_players_to_billboard
-                            auto_register_players_to_billboard(match)
-                        except Exception as e:
-                            logger.error(f"Failed to auto-register players for match {match.id} upon court assignment: {e}")
-                        
-                        logger.info(f"Auto-assigned court {assigned_court.name} to waiting match {match.id} and activated it")
-                        
-                        # Only assign one match per court availability event
-                        break
-                    
+            from .court_allocator import assign_waiting_matches
+
+            # One FIFO pass: every waiting match whose pool now has a free
+            # court is started, oldest first
+            assigned = assign_waiting_matches()
+            if assigned:
+                logger.info(
+                    f"Court {instance.name} became available, started {len(assigned)} waiting matches"
+                )
         except Exception as e:
             # Log the error but don't let it break court operations
             logger.error(f"Failed to auto-assign waiting matches when court {instance.name} became available: {e}")
@@ -1,3 +1,109 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from courts.models import Court
+from teams.models import Team
+from tournaments.models import Tournament, TournamentCourt
+
+from .court_allocator import CourtAllocator, assign_waiting_matches
+from .models import Match, MatchResult
+
+
+class CourtAllocatorTests(TestCase):
+    def setUp(self):
+        self.team1 = Team.objects.create(name="A", pin="ALLOC1")
+        self.team2 = Team.objects.create(name="B", pin="ALLOC2")
+
+    def _tournament(self, name, court_numbers):
+        now = timezone.now()
+        tournament = Tournament.objects.create(
+            name=name, format="round_robin", play_format="triplet",
+            start_date=now, end_date=now + timedelta(days=1),
+        )
+        for number in court_numbers:
+            TournamentCourt.objects.create(tournament=tournament, court=Court.objects.create(number=number))
+        return tournament
+
+    def _waiting(self, tournament):
+        return Match.objects.create(
+            tournament=tournament, team1=self.team1, team2=self.team2,
+            status="pending_verification", waiting_for_court=True,
+        )
+
+    def test_fifo_pass_does_not_block_other_pools(self):
+        first = self._tournament("First", [1])
+        second = self._tournament("Second", [2])
+        oldest = self._waiting(first)
+        queued = self._waiting(first)
+        other = self._waiting(second)
+
+        assigned = assign_waiting_matches()
+
+        self.assertEqual([match.id for match, _ in assigned], [oldest.id, other.id])
+        queued.refresh_from_db()
+        self.assertTrue(queued.waiting_for_court)
+        self.assertFalse(Court.objects.filter(is_available=True).exists())
+
+    def test_stale_allocators_never_share_a_court(self):
+        tournament = self._tournament("Race", [7])
+        first, second = self._waiting(tournament), self._waiting(tournament)
+        winner, loser = CourtAllocator(), CourtAllocator()
+        # Both see court 7 as free before either claims it
+        self.assertEqual(len(winner.free_courts(first)), 1)
+        self.assertEqual(len(loser.free_courts(second)), 1)
+
+        self.assertIsNotNone(winner.claim(first))
+        self.assertIsNone(loser.claim(second))
+        self.assertEqual(loser.conflicts, 1)
+        self.assertEqual(Match.objects.filter(court__number=7).count(), 1)
+
+
+class MatchStatusTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        tournament = Tournament.objects.create(
+            name="Status", format="round_robin", play_format="triplet",
+            start_date=now, end_date=now + timedelta(days=1),
+        )
+        self.team1 = Team.objects.create(name="Submitters", pin="STAT01")
+        self.team2 = Team.objects.create(name="Opponents", pin="STAT02")
+        self.match = Match.objects.create(
+            tournament=tournament, team1=self.team1, team2=self.team2, status="waiting_validation",
+        )
+        MatchResult.objects.create(match=self.match, submitted_by=self.team1)
+        self.url = reverse('match_status_api', args=[self.match.id])
+
+    def _poll_as(self, team, **headers):
+        session = self.client.session
+        session['team_pin'] = team.pin
+        session.save()
+        return self.client.get(self.url, **headers)
+
+    def test_only_the_opposing_team_is_sent_to_validation(self):
+        submitter = self._poll_as(self.team1).json()
+        self.assertEqual(submitter['current_user_team'], self.team1.id)
+        self.assertFalse(submitter['should_redirect_to_validation'])
+        self.assertIsNone(submitter['validation_url'])
+
+        opponent = self._poll_as(self.team2).json()
+        self.assertEqual(opponent['submitted_by_team'], self.team1.id)
+        self.assertTrue(opponent['should_redirect_to_validation'])
+        self.assertEqual(
+            opponent['validation_url'],
+            reverse('match_validate_result', args=[self.match.id, self.team2.id]),
+        )
+
+    def test_unchanged_status_is_not_modified(self):
+        first = self._poll_as(self.team2)
+        self.assertEqual(first.status_code, 200)
+
+        again = self._poll_as(self.team2, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
 
-# Create your tests here.
+        # The other side's payload differs, so its tag does not match
+        other = self._poll_as(self.team1, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(other.status_code, 200)
@@ -1356,63 +1356,27 @@ from django.http import JsonResponse as _JsonResponse
 
 def match_status_api(request, match_id):
     """
-    Session-aware polling endpoint for match_detail.html.
+    Session-aware polling fallback for match_detail.html.
     Returns routing information for the current session user so the
     polling JS can redirect the opposing team to validation automatically.
-    """
-    try:
-        match = Match.objects.select_related('team1', 'team2').get(id=match_id)
-    except Match.DoesNotExist:
-        return _JsonResponse({'error': 'not found'}, status=404)
-
-    payload = {
-        'status': match.status,
-        'current_user_team': None,
-        'submitted_by_team': None,
-        'should_redirect_to_validation': False,
-        'validation_url': None,
-    }
-
-    if match.status != 'waiting_validation':
-        return _JsonResponse(payload)
-
-    # Resolve submitted_by team
-    submitted_by_team = None
-    try:
-        submitted_by_team = match.result.submitted_by
-        payload['submitted_by_team'] = submitted_by_team.id if submitted_by_team else None
-    except Exception:
-        pass
 
-    # Resolve current session user's team in this match
-    my_team = None
-    codename = request.session.get('player_codename')
-    if codename:
-        try:
-            pc = PlayerCodename.objects.get(codename=codename.upper())
-            mp = MatchPlayer.objects.filter(match=match, player=pc.player).select_related('team').first()
-            if mp:
-                my_team = mp.team
-        except Exception:
-            pass
-    if my_team is None:
-        team_pin = request.session.get('team_pin')
-        if team_pin:
-            try:
-                t = Team.objects.get(pin=team_pin)
-                if t in (match.team1, match.team2):
-                    my_team = t
-            except Team.DoesNotExist:
-                pass
+    WebSocket clients receive the same fields in their personal
+    match.state_changed payload.  This endpoint answers from the cached
+    status snapshot (pfc_events.status) and honours If-None-Match, so an
+    unchanged poll is a cache read and an empty 304.
+    """
+    from pfc_events.status import conditional_status_response, get_status, status_payload
 
-    if my_team:
-        payload['current_user_team'] = my_team.id
-        # Opposing team should redirect; submitting team stays
-        if submitted_by_team and my_team != submitted_by_team:
-            payload['should_redirect_to_validation'] = True
-            payload['validation_url'] = reverse('match_validate_result', args=[match.id, my_team.id])
+    snapshot = get_status('match', match_id)
+    if snapshot is None:
+        return _JsonResponse({'error': 'not found'}, status=404)
 
-    return _JsonResponse(payload)
+    payload = status_payload(
+        snapshot,
+        codename=request.session.get('player_codename'),
+        team_pin=request.session.get('team_pin'),
+    )
+    return conditional_status_response(request, payload)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # QR RESOLVE ENDPOINT — tournament matches
@@ -17,6 +17,7 @@ import logging
 
 from .models import LiveScoreboard, ScoreUpdate, ScorekeeperRating, MatchPlayer
 from friendly_games.models import PlayerCodename, FriendlyGamePlayer
+from pfc_core import cache_regions
 from pfc_core.qr_action_auth import get_qr_action_player, issue_qr_action_token
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
@@ -130,13 +131,15 @@ def _broadcast_score(scoreboard, score_update=None):
         logger.warning("score broadcast failed for scoreboard %s: %s", scoreboard.id, exc)
 
 
-def live_scores_list(request):
-    """
-    Display all active live scoreboards.
-    This is the main /live-scores/ page.
-    """
+def _active_scoreboard_lists():
+    """(tournament scoreboards, friendly scoreboards) currently in play."""
     # Get all active scoreboards
-    active_scoreboards = LiveScoreboard.objects.filter(is_active=True).order_by('-updated_at')
+    active_scoreboards = LiveScoreboard.objects.filter(is_active=True).select_related(
+        'tournament_match__tournament',
+        'tournament_match__team1',
+        'tournament_match__team2',
+        'friendly_game',
+    ).order_by('-updated_at')
     
     # Separate tournament and friendly game scoreboards
     tournament_scoreboards = []
@@ -152,6 +155,18 @@ def live_scores_list(request):
             if scoreboard.friendly_game.status in ['ACTIVE', 'READY']:
                 friendly_scoreboards.append(scoreboard)
     
+    return tournament_scoreboards, friendly_scoreboards
+
+
+def live_scores_list(request):
+    """
+    Display all active live scoreboards.
+    This is the main /live-scores/ page.
+    """
+    tournament_scoreboards, friendly_scoreboards = cache_regions.region(cache_regions.LIVE_SCORES).get_or_set(
+        ("list",), _active_scoreboard_lists
+    )
+    
     context = {
         'tournament_scoreboards': tournament_scoreboards,
         'friendly_scoreboards': friendly_scoreboards,
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class PfcCoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pfc_core'
+
+    def ready(self):
+        import pfc_core.cache_invalidation  # noqa: F401 — cache region invalidation hooks
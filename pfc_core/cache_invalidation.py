@@ -0,0 +1,154 @@
+"""
+Signal hooks that invalidate cache regions when their source data changes.
+
+Invalidation runs after the transaction commits so a concurrent reader cannot
+repopulate the region with pre-commit data.
+
+Cached session identities (codename -> player, PIN -> team) are dropped
+directly on save; their short TTL bounds any race with a concurrent reader.
+
+Match / game routing snapshots are single keys, dropped after commit when
+the match, game, result or participants change.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache_regions, identity_cache
+
+
+def _invalidate_on_commit(*names):
+    transaction.on_commit(lambda: cache_regions.invalidate(*names))
+
+
+@receiver(post_save, sender='matches.Match')
+@receiver(post_delete, sender='matches.Match')
+def invalidate_for_match(sender, instance, **kwargs):
+    """Match results move leaderboards, ratings (market) and the live list."""
+    _invalidate_on_commit(
+        cache_regions.LEADERBOARDS,
+        cache_regions.MARKET,
+        cache_regions.LIVE_SCORES,
+    )
+
+
+@receiver(post_save, sender='friendly_games.FriendlyGame')
+@receiver(post_delete, sender='friendly_games.FriendlyGame')
+def invalidate_for_friendly_game(sender, instance, **kwargs):
+    """Friendly games move ratings (market) and the live list."""
+    _invalidate_on_commit(cache_regions.MARKET, cache_regions.LIVE_SCORES)
+
+
+@receiver(post_save, sender='teams.RatingEvent')
+def invalidate_for_rating_event(sender, instance, **kwargs):
+    """Rating changes move the market."""
+    _invalidate_on_commit(cache_regions.MARKET)
+
+
+@receiver(post_save, sender='matches.LiveScoreboard')
+def invalidate_for_scoreboard(sender, instance, **kwargs):
+    """Score changes are shown on the live list."""
+    _invalidate_on_commit(cache_regions.LIVE_SCORES)
+
+
+@receiver(post_save, sender='billboard.BillboardEntry')
+@receiver(post_delete, sender='billboard.BillboardEntry')
+def invalidate_for_billboard_entry(sender, instance, **kwargs):
+    """Presence declarations feed the court analytics API."""
+    _invalidate_on_commit(cache_regions.BILLBOARD_ANALYTICS)
+
+
+@receiver(post_save, sender='teams.Player')
+@receiver(post_delete, sender='teams.Player')
+@receiver(post_save, sender='teams.Team')
+@receiver(post_delete, sender='teams.Team')
+@receiver(post_save, sender='teams.TeamProfile')
+@receiver(post_delete, sender='teams.TeamProfile')
+def invalidate_for_search(sender, instance, **kwargs):
+    """Names, teams and team visibility (profile type) feed the name search."""
+    _invalidate_on_commit(cache_regions.NAME_SEARCH)
+
+
+# ---------------------------------------------------------------------------
+# Session identities (pfc_core.identity_cache)
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender='friendly_games.PlayerCodename')
+def forget_replaced_codename(sender, instance, update_fields=None, **kwargs):
+    """A changed codename must stop resolving to the player immediately."""
+    if instance.pk and (update_fields is None or 'codename' in update_fields):
+        old = sender.objects.filter(pk=instance.pk).values_list('codename', flat=True).first()
+        if old and old != instance.codename:
+            identity_cache.invalidate_codenames(old)
+
+
+@receiver(post_save, sender='friendly_games.PlayerCodename')
+@receiver(post_delete, sender='friendly_games.PlayerCodename')
+def forget_codename(sender, instance, **kwargs):
+    identity_cache.invalidate_codenames(instance.codename)
+
+
+@receiver(post_save, sender='teams.Player')
+@receiver(post_delete, sender='teams.Player')
+def forget_player_identity(sender, instance, **kwargs):
+    """Cached identities embed the player's name and team."""
+    from friendly_games.models import PlayerCodename
+
+    identity_cache.invalidate_codenames(
+        *PlayerCodename.objects.filter(player_id=instance.pk).values_list('codename', flat=True)
+    )
+
+
+@receiver(pre_save, sender='teams.Team')
+def forget_replaced_pin(sender, instance, update_fields=None, **kwargs):
+    if instance.pk and (update_fields is None or 'pin' in update_fields):
+        old = sender.objects.filter(pk=instance.pk).values_list('pin', flat=True).first()
+        if old and old != instance.pin:
+            identity_cache.invalidate_pins(old)
+
+
+@receiver(post_save, sender='teams.Team')
+@receiver(post_delete, sender='teams.Team')
+def forget_team_identity(sender, instance, **kwargs):
+    identity_cache.invalidate_pins(instance.pin)
+
+
+# ---------------------------------------------------------------------------
+# Match / game routing snapshots (pfc_events.status)
+# ---------------------------------------------------------------------------
+
+def _forget_status_on_commit(kind, object_id):
+    from pfc_events.status import forget_status
+
+    if object_id is not None:
+        transaction.on_commit(lambda: forget_status(kind, object_id))
+
+
+@receiver(post_save, sender='matches.Match')
+@receiver(post_delete, sender='matches.Match')
+def forget_match_status(sender, instance, **kwargs):
+    _forget_status_on_commit('match', instance.pk)
+
+
+@receiver(post_save, sender='matches.MatchResult')
+@receiver(post_delete, sender='matches.MatchResult')
+@receiver(post_save, sender='matches.MatchPlayer')
+@receiver(post_delete, sender='matches.MatchPlayer')
+def forget_match_status_for_child(sender, instance, **kwargs):
+    """Results decide who validates; MatchPlayer rows map codenames to teams."""
+    _forget_status_on_commit('match', instance.match_id)
+
+
+@receiver(post_save, sender='friendly_games.FriendlyGame')
+@receiver(post_delete, sender='friendly_games.FriendlyGame')
+def forget_game_status(sender, instance, **kwargs):
+    _forget_status_on_commit('game', instance.pk)
+
+
+@receiver(post_save, sender='friendly_games.FriendlyGameResult')
+@receiver(post_delete, sender='friendly_games.FriendlyGameResult')
+@receiver(post_save, sender='friendly_games.FriendlyGamePlayer')
+@receiver(post_delete, sender='friendly_games.FriendlyGamePlayer')
+def forget_game_status_for_child(sender, instance, **kwargs):
+    _forget_status_on_commit('game', instance.game_id)
@@ -0,0 +1,144 @@
+"""
+pfc_core/cache_regions.py
+=========================
+Named cache regions for hot read paths.
+
+A region is a namespace inside the default cache with its own timeout and a
+*generation* counter.  Every key written through a region embeds the current
+generation, so ``invalidate()`` is a single atomic ``incr`` — old entries are
+simply never read again and expire on their own.  This works the same on the
+Redis backend (shared by all Daphne workers) and on the local-memory fallback.
+
+Regions:
+  leaderboards         — tournament leaderboard page data
+  market               — PFC MARKET player rows
+  billboard_analytics  — court analytics API payloads
+  live_scores          — /live-scores/ scoreboard lists
+  match_status         — per match/game routing snapshots (pfc_events.status)
+  ai_reports           — AI Coach Report PDFs and their build status
+                         (keyed by activity fingerprint, so no invalidation hook)
+  name_search          — player / team search results (pfc_core.name_search)
+
+Invalidation hooks for Match / FriendlyGame / BillboardEntry saves live in
+pfc_core.cache_invalidation.
+
+Design principles:
+  - Only cache plain data (dicts, lists, model instances), never rendered
+    responses: pages include per-user navigation and CSRF tokens.
+  - Timeouts are a safety net; signal invalidation keeps data fresh.
+  - A cache outage must never break a page: errors fall through to the
+    producer.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARDS = "leaderboards"
+MARKET = "market"
+BILLBOARD_ANALYTICS = "billboard_analytics"
+LIVE_SCORES = "live_scores"
+MATCH_STATUS = "match_status"
+AI_REPORTS = "ai_reports"
+NAME_SEARCH = "name_search"
+
+DEFAULT_REGION_TIMEOUTS = {
+    LEADERBOARDS: 300,
+    MARKET: 300,
+    BILLBOARD_ANALYTICS: 60,
+    LIVE_SCORES: 15,
+    MATCH_STATUS: 300,
+    AI_REPORTS: 86400,
+    NAME_SEARCH: 300,
+}
+
+
+class CacheRegion:
+    """A namespaced, generation-invalidated slice of the default cache."""
+
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+        self._generation_key = f"region:{name}:generation"
+
+    def _generation(self):
+        generation = cache.get(self._generation_key)
+        if generation is None:
+            cache.add(self._generation_key, 1, None)
+            generation = cache.get(self._generation_key, 1)
+        return generation
+
+    def key(self, *parts):
+        suffix = ":".join(str(part) for part in parts)
+        return f"region:{self.name}:g{self._generation()}:{suffix}"
+
+    def get_or_set(self, parts, producer, timeout=None):
+        """
+        Return the cached value for ``parts``, calling ``producer()`` on a miss.
+
+        ``parts`` is a tuple of key components (e.g. ``("court", court_id)``).
+        """
+        try:
+            key = self.key(*parts)
+            value = cache.get(key)
+        except Exception as exc:
+            logger.warning("Cache region %s unavailable: %s", self.name, exc)
+            return producer()
+        if value is not None:
+            return value
+        value = producer()
+        try:
+            cache.set(key, value, self.timeout if timeout is None else timeout)
+        except Exception as exc:
+            logger.warning("Could not store %s in cache region %s: %s", parts, self.name, exc)
+        return value
+
+    def set(self, parts, value, timeout=None):
+        """Store ``value`` under ``parts`` (a producer-less get_or_set write)."""
+        try:
+            cache.set(self.key(*parts), value, self.timeout if timeout is None else timeout)
+        except Exception as exc:
+            logger.warning("Could not store %s in cache region %s: %s", parts, self.name, exc)
+
+    def forget(self, parts):
+        """Drop the single entry for ``parts``."""
+        try:
+            cache.delete(self.key(*parts))
+        except Exception as exc:
+            logger.warning("Could not drop %s from cache region %s: %s", parts, self.name, exc)
+
+    def invalidate(self):
+        """Drop every entry in the region (atomically, across workers)."""
+        try:
+            cache.incr(self._generation_key)
+        except ValueError:
+            # Generation key missing or evicted: start a new generation.
+            cache.add(self._generation_key, 2, None)
+        except Exception as exc:
+            logger.warning("Could not invalidate cache region %s: %s", self.name, exc)
+
+
+def _timeouts():
+    timeouts = dict(DEFAULT_REGION_TIMEOUTS)
+    timeouts.update(getattr(settings, "CACHE_REGION_TIMEOUTS", {}))
+    return timeouts
+
+
+_regions = {}
+
+
+def region(name):
+    """Return the CacheRegion called ``name`` (one of the constants above)."""
+    if name not in _regions:
+        timeouts = _timeouts()
+        if name not in timeouts:
+            raise KeyError(f"Unknown cache region: {name}")
+        _regions[name] = CacheRegion(name, timeouts[name])
+    return _regions[name]
+
+
+def invalidate(*names):
+    for name in names:
+        region(name).invalidate()
@@ -1,7 +1,21 @@
 # Context Processor for Authentication
+from django.utils.functional import SimpleLazyObject
+
 from .session_utils import SessionManager
 from .team_session_utils import TeamSessionManager
 
+# Keys SessionManager.get_session_context may provide
+SESSION_CONTEXT_KEYS = (
+    'session_codename',
+    'player_logged_in',
+    'team_pin',
+    'team_logged_in',
+    'logged_in_player',
+    'player_name',
+    'logged_in_team',
+    'team_name',
+)
+
 
 def auth_context(request):
     """
@@ -16,21 +30,31 @@ def auth_context(request):
     ``notify_player_id`` is None when no player is logged in, which
     prevents the global notification script from opening a connection
     for unauthenticated visitors.
+
+    Every value is lazy: nothing is read from the session or database
+    until a template actually uses it, and the session context is
+    resolved once per request (see pfc_core.identity_cache).
     """
-    # Get codename session data (includes logged_in_player Player instance)
-    codename_context = SessionManager.get_session_context(request)
-
-    # Get team session data
-    team_context = TeamSessionManager.get_team_session_data(request)
-
-    # Derive the Player PK for the global notification WebSocket.
-    # logged_in_player is a Player model instance (or None) already
-    # resolved by SessionManager.get_session_context.
-    logged_in_player = codename_context.get('logged_in_player')
-    notify_player_id = logged_in_player.pk if logged_in_player else None
-
-    return {
-        **codename_context,
-        'team_session': team_context,
-        'notify_player_id': notify_player_id,
+    resolved = {}
+
+    def codename_context():
+        # Get codename session data (includes logged_in_player Player instance)
+        if 'codename' not in resolved:
+            resolved['codename'] = SessionManager.get_session_context(request)
+        return resolved['codename']
+
+    def notify_player_id():
+        # Derive the Player PK for the global notification WebSocket.
+        logged_in_player = codename_context().get('logged_in_player')
+        return logged_in_player.pk if logged_in_player else None
+
+    context = {
+        key: SimpleLazyObject(lambda key=key: codename_context().get(key))
+        for key in SESSION_CONTEXT_KEYS
     }
+    context.update({
+        # Get team session data
+        'team_session': SimpleLazyObject(lambda: TeamSessionManager.get_team_session_data(request)),
+        'notify_player_id': SimpleLazyObject(notify_player_id),
+    })
+    return context
@@ -0,0 +1,141 @@
+"""
+pfc_core/identity_cache.py
+==========================
+Request-scoped (and short-TTL shared) resolution of session identities.
+
+Every template render runs ``auth_context``, which used to look up the
+logged-in player by codename and the logged-in team by PIN on every
+request — and views calling ``SessionManager.get_session_context`` did the
+same lookups again.  Resolution now goes through this module:
+
+  - One query per identity: codename → Player with team and profile via
+    ``select_related``; PIN → Team.
+  - Memoised on the request, so the context processor and the view share
+    the result.
+  - Optionally cached across requests in the default cache for
+    ``settings.IDENTITY_CACHE_TIMEOUT`` seconds (default 30; 0 disables).
+
+Design principles:
+  - Invalidation is explicit: login/logout drop the request memo, and
+    pfc_core.cache_invalidation drops shared entries when a codename,
+    player or team PIN changes.  The TTL is only a safety net.
+  - Unknown codenames / PINs are not cached, so a newly created codename
+    works immediately.
+  - A cache outage falls through to the database.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDENTITY_CACHE_TIMEOUT = 30
+
+_REQUEST_ATTR = '_pfc_identity'
+
+
+def _timeout():
+    return getattr(settings, 'IDENTITY_CACHE_TIMEOUT', DEFAULT_IDENTITY_CACHE_TIMEOUT)
+
+
+def _codename_key(codename):
+    return f"identity:codename:{codename.upper()}"
+
+
+def _pin_key(pin):
+    return f"identity:team:{pin.upper()}"
+
+
+def _load_player(codename):
+    from friendly_games.models import PlayerCodename
+
+    player_codename = (
+        PlayerCodename.objects
+        .select_related('player__team', 'player__profile')
+        .filter(codename=codename.upper())
+        .first()
+    )
+    return player_codename.player if player_codename else None
+
+
+def _load_team(pin):
+    from teams.models import Team
+
+    return Team.objects.filter(pin=pin.upper()).first()
+
+
+def _shared_get_or_load(key, loader):
+    timeout = _timeout()
+    if not timeout:
+        return loader()
+    try:
+        value = cache.get(key)
+    except Exception as exc:
+        logger.warning(f"Identity cache unavailable: {exc}")
+        return loader()
+    if value is not None:
+        return value
+    value = loader()
+    if value is not None:
+        try:
+            cache.set(key, value, timeout)
+        except Exception as exc:
+            logger.warning(f"Could not store {key} in identity cache: {exc}")
+    return value
+
+
+def _memo(request):
+    memo = getattr(request, _REQUEST_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(request, _REQUEST_ATTR, memo)
+    return memo
+
+
+def player_for_codename(request, codename):
+    """The Player behind ``codename`` (team and profile preloaded), or None."""
+    if not codename:
+        return None
+    memo = _memo(request)
+    key = _codename_key(codename)
+    if key not in memo:
+        memo[key] = _shared_get_or_load(key, lambda: _load_player(codename))
+    return memo[key]
+
+
+def team_for_pin(request, pin):
+    """The Team with ``pin``, or None."""
+    if not pin:
+        return None
+    memo = _memo(request)
+    key = _pin_key(pin)
+    if key not in memo:
+        memo[key] = _shared_get_or_load(key, lambda: _load_team(pin))
+    return memo[key]
+
+
+def forget_request_identity(request):
+    """Drop identities resolved for this request (login / logout)."""
+    if hasattr(request, _REQUEST_ATTR):
+        delattr(request, _REQUEST_ATTR)
+
+
+def invalidate_codenames(*codenames):
+    """Drop shared entries for these codenames."""
+    keys = [_codename_key(codename) for codename in codenames if codename]
+    if keys:
+        try:
+            cache.delete_many(keys)
+        except Exception as exc:
+            logger.warning(f"Could not invalidate identity cache: {exc}")
+
+
+def invalidate_pins(*pins):
+    """Drop shared entries for these team PINs."""
+    keys = [_pin_key(pin) for pin in pins if pin]
+    if keys:
+        try:
+            cache.delete_many(keys)
+        except Exception as exc:
+            logger.warning(f"Could not invalidate identity cache: {exc}")
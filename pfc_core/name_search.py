@@ -0,0 +1,221 @@
+"""
+pfc_core/name_search.py
+=======================
+Ranked, cached name search for players and teams (autocomplete endpoints).
+
+The search endpoints used to run ``name__icontains`` on every keystroke — a
+full table scan that also missed "Jose" for "José" and "Γιώργος" for
+"γιωργος".  Searches now go through ``search()``:
+
+  - ``Team.search_name`` / ``Player.search_name`` hold ``normalize_name(name)``
+    (accents stripped, case-folded, whitespace collapsed), maintained by the
+    models' save() and indexed.
+  - Prefix matches come from that index (``prefix_matches``).  When they do
+    not fill the result list, substring matches are added: on PostgreSQL
+    through a pg_trgm GIN index (teams migration 0014), elsewhere from an
+    in-process suffix array (``NameIndex``) built from the searchable rows.
+  - Ranking: exact match, name prefix, word prefix, any other substring;
+    shorter names first, then alphabetical.
+  - Results are cached in the ``name_search`` cache region; the region (and
+    with it every in-process index) is invalidated by
+    pfc_core.cache_invalidation when a player, team or team profile changes.
+
+Design principles:
+  - Results are plain dicts, ready for JsonResponse; endpoints may also let
+    the browser keep a response for RESPONSE_MAX_AGE seconds.
+  - Queries shorter than MIN_QUERY_LENGTH (after normalization) return
+    nothing, like the endpoints always did.
+"""
+import bisect
+import hashlib
+import logging
+import unicodedata
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Length
+
+from . import cache_regions
+
+logger = logging.getLogger(__name__)
+
+MIN_QUERY_LENGTH = 2
+
+# Browser cache lifetime of search responses (private: team results carry PINs)
+RESPONSE_MAX_AGE = 30
+
+SEARCH_NAME_MAX_LENGTH = 200
+
+# Rank of a match, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+
+def normalize_name(text):
+    """Accent- and case-folded form of ``text`` with single spaces ("Γιώργος  Ζαφείρης" -> "γιωργοσ ζαφειρησ")."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())[:SEARCH_NAME_MAX_LENGTH]
+
+
+def prefix_matches(queryset, term):
+    """Rows of ``queryset`` whose search_name starts with the normalized ``term`` (index range scan)."""
+    if connection.vendor == 'postgresql':
+        # Served by the varchar_pattern_ops index Django adds for db_index CharFields
+        return queryset.filter(search_name__startswith=term)
+    # Binary collation: the prefix is a plain B-tree range (LIKE would be case-insensitive and unindexed)
+    return queryset.filter(search_name__gte=term, search_name__lt=term + '\U0010ffff')
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    queryset: Callable        # () -> QuerySet of the searchable rows
+    fields: Tuple[str, ...]   # values() fields passed to ``serialize``
+    serialize: Callable       # values() row -> result dict
+    limit: int
+
+
+def _players():
+    from teams.models import Player
+    return Player.objects.all()
+
+
+def _visible_teams():
+    from teams.models import Team
+    # Same visibility rule as the public Teams page: not archived, not
+    # tournament-temp, not a subteam, full profile only
+    return Team.objects.filter(
+        is_archived=False,
+        is_tournament_temp=False,
+        parent_team__isnull=True,
+        profile__profile_type='full',
+    )
+
+
+SEARCHES: Dict[str, SearchSpec] = {
+    'players': SearchSpec(
+        queryset=_players,
+        fields=('id', 'name', 'team__name'),
+        serialize=lambda row: {'id': row['id'], 'name': row['name'], 'team_name': row['team__name']},
+        limit=15,
+    ),
+    'teams': SearchSpec(
+        queryset=_visible_teams,
+        fields=('id', 'name', 'pin'),
+        serialize=lambda row: {'id': row['id'], 'name': row['name'], 'pin': row['pin']},
+        limit=10,
+    ),
+}
+
+
+class NameIndex:
+    """
+    Sorted suffix array over the search names of a fixed set of rows.
+
+    Every suffix that starts a word or lies inside one is kept with its row
+    position and offset; a query is one bisect plus a scan of the suffixes
+    it prefixes.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        entries = sorted(
+            (row['search_name'][offset:], position, offset)
+            for position, row in enumerate(rows)
+            for offset in range(len(row['search_name']))
+            if row['search_name'][offset] != ' '
+        )
+        self.suffixes = [suffix for suffix, _position, _offset in entries]
+        self.locations = [(position, offset) for _suffix, position, offset in entries]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def search(self, term, limit, skip_prefix=False):
+        """The best ``limit`` rows containing ``term``, ranked.  ``skip_prefix`` drops name-prefix matches."""
+        best = {}
+        start = bisect.bisect_left(self.suffixes, term)
+        for index in range(start, len(self.suffixes)):
+            if not self.suffixes[index].startswith(term):
+                break
+            position, offset = self.locations[index]
+            name = self.rows[position]['search_name']
+            if offset == 0:
+                rank = EXACT if name == term else PREFIX
+            else:
+                rank = WORD_PREFIX if name[offset - 1] == ' ' else SUBSTRING
+            if rank < best.get(position, SUBSTRING + 1):
+                best[position] = rank
+        ranked = sorted(
+            (rank, len(self.rows[position]['search_name']), self.rows[position]['name'], position)
+            for position, rank in best.items()
+            if not (skip_prefix and rank <= PREFIX)
+        )
+        return [self.rows[position] for *_key, position in ranked[:limit]]
+
+
+# kind -> (region key the index was built under, NameIndex)
+_indexes: Dict[str, Tuple[str, NameIndex]] = {}
+
+
+def name_index(kind):
+    """This process's NameIndex for ``kind``, rebuilt when the search region was invalidated."""
+    spec = SEARCHES[kind]
+    try:
+        version = cache_regions.region(cache_regions.NAME_SEARCH).key(kind, 'index')
+    except Exception as exc:
+        logger.warning(f"Name search region unavailable, rebuilding the {kind} index: {exc}")
+        version = None
+    built = _indexes.get(kind)
+    if built is None or version is None or built[0] != version:
+        rows = list(spec.queryset().values(*spec.fields, 'search_name'))
+        built = (version, NameIndex(rows))
+        _indexes[kind] = built
+        logger.info(f"Built the {kind} name index: {len(rows)} rows")
+    return built[1]
+
+
+def _substring_matches(kind, spec, term, limit):
+    """Ranked non-prefix matches of ``term``: trigram index on PostgreSQL, NameIndex elsewhere."""
+    if connection.vendor != 'postgresql':
+        return name_index(kind).search(term, limit, skip_prefix=True)
+    return list(
+        spec.queryset()
+        .filter(search_name__contains=term)
+        .exclude(search_name__startswith=term)
+        .annotate(rank=Case(
+            When(search_name__contains=' ' + term, then=Value(WORD_PREFIX)),
+            default=Value(SUBSTRING),
+            output_field=IntegerField(),
+        ))
+        .order_by('rank', Length('search_name'), 'name')
+        .values(*spec.fields)[:limit]
+    )
+
+
+def _search(kind, term, limit):
+    spec = SEARCHES[kind]
+    rows = list(
+        prefix_matches(spec.queryset(), term)
+        .order_by(Length('search_name'), 'name')
+        .values(*spec.fields)[:limit]
+    )
+    if len(rows) < limit:
+        rows += _substring_matches(kind, spec, term, limit - len(rows))
+    return [spec.serialize(row) for row in rows]
+
+
+def search(kind, query, limit=None) -> List[dict]:
+    """
+    Ranked matches of ``query`` among the searchable rows of ``kind``
+    ('players' or 'teams'), at most ``limit`` (default: the kind's limit).
+    """
+    term = normalize_name(query)
+    if len(term) < MIN_QUERY_LENGTH:
+        return []
+    limit = limit or SEARCHES[kind].limit
+    return cache_regions.region(cache_regions.NAME_SEARCH).get_or_set(
+        # Hashed: names contain spaces and non-ASCII characters
+        (kind, limit, hashlib.sha1(term.encode()).hexdigest()), lambda: _search(kind, term, limit)
+    )
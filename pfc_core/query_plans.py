@@ -0,0 +1,66 @@
+"""
+pfc_core/query_plans.py
+=======================
+Query-plan inspection for hot filters.
+
+``full_scans(queryset)`` runs EXPLAIN for a queryset and returns the tables
+the planner reads with a full table scan.  pfc_core.tests uses it to pin the
+composite indexes declared on Match, BillboardEntry, TournamentTeam,
+AutomationLog and CertRatingHistory: a hot query that loses its index (a
+dropped index, a reordered filter, a new unindexed column) fails the suite
+instead of showing up as production latency.
+
+Backends:
+  sqlite      — EXPLAIN QUERY PLAN; "SCAN <table>" lines are full scans
+                (including index-ordered "SCAN <table> USING INDEX …").
+  postgresql  — EXPLAIN (FORMAT JSON) with enable_seqscan off, so the
+                planner only picks a Seq Scan when no index can serve the
+                query; "Seq Scan" nodes are full scans.
+
+Design principles:
+  - Only the question "is there an index path?" is answered; which index
+    the planner prefers on a tiny test dataset is not meaningful.
+  - Unsupported backends raise NotImplementedError rather than pass.
+"""
+import json
+import re
+
+from django.db import connections, transaction
+
+_SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?"?(\w+)"?')
+
+
+def _sqlite_full_scans(queryset):
+    return [match.group(1) for match in _SQLITE_SCAN.finditer(queryset.explain())]
+
+
+def _postgres_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _postgres_nodes(child)
+
+
+def _postgres_full_scans(queryset):
+    connection = connections[queryset.db]
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = json.loads(queryset.explain(format='json'))
+    # Django flattens the one-element JSON array depending on the driver
+    if isinstance(plan, list):
+        plan = plan[0]
+    return [
+        node['Relation Name']
+        for node in _postgres_nodes(plan['Plan'])
+        if node.get('Node Type') == 'Seq Scan'
+    ]
+
+
+def full_scans(queryset):
+    """Tables read with a full scan by the plan for ``queryset``."""
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        return _sqlite_full_scans(queryset)
+    if vendor == 'postgresql':
+        return _postgres_full_scans(queryset)
+    raise NotImplementedError(f"Query plan inspection is not supported on {vendor}")
@@ -30,57 +30,70 @@ def refresh_player_team_session(player, in_melee_assignment=True):
         logger.warning(f"Cannot refresh session for player {player.id if player else 'None'} - no team assigned")
         return 0
 
+    return _refresh_sessions({player.id: player}, in_melee_assignment)
+
+
+def _apply_team(session_data, player, in_melee_assignment):
+    """Write ``player``'s current team into decoded session data."""
+    # Update team-related session data
+    session_data['team_id'] = player.team.id
+    session_data['team_name'] = player.team.name
+
+    # Update team PIN if the team has one
+    if player.team.pin:
+        session_data['team_pin'] = player.team.pin
+        session_data['team_session_active'] = True
+
+        # Also update TeamPinSessionManager data
+        session_data['team_pin_session'] = {
+            'is_logged_in': True,
+            'team_pin': player.team.pin,
+            'team_name': player.team.name,
+            'team_id': player.team.id,
+            'login_time': timezone.now().isoformat()
+        }
+
+    # Signal to the client whether fast polling should be active.
+    # True  → player is in an active Mêlée assignment window.
+    # False → player has been restored; no recurring polling needed.
+    session_data['in_melee_assignment'] = in_melee_assignment
+
+
+def _refresh_sessions(players_by_id, in_melee_assignment):
+    """One pass over the active sessions for every player in ``players_by_id``."""
     updated_count = 0
 
     try:
         # Get all active sessions
         active_sessions = Session.objects.filter(expire_date__gte=timezone.now())
 
-        for session in active_sessions:
+        for session in active_sessions.iterator():
             try:
                 session_data = session.get_decoded()
 
-                # Check if this session belongs to our player
-                if session_data.get('player_id') == player.id:
-                    # Update team-related session data
-                    session_data['team_id'] = player.team.id
-                    session_data['team_name'] = player.team.name
-
-                    # Update team PIN if the team has one
-                    if player.team.pin:
-                        session_data['team_pin'] = player.team.pin
-                        session_data['team_session_active'] = True
-
-                        # Also update TeamPinSessionManager data
-                        session_data['team_pin_session'] = {
-                            'is_logged_in': True,
-                            'team_pin': player.team.pin,
-                            'team_name': player.team.name,
-                            'team_id': player.team.id,
-                            'login_time': timezone.now().isoformat()
-                        }
-
-                    # Signal to the client whether fast polling should be active.
-                    # True  → player is in an active Mêlée assignment window.
-                    # False → player has been restored; no recurring polling needed.
-                    session_data['in_melee_assignment'] = in_melee_assignment
-
-                    # Save the updated session
-                    session.session_data = Session.objects.encode(session_data)
-                    session.save()
-
-                    updated_count += 1
-                    logger.info(
-                        f"Refreshed team session for player {player.name} (ID: {player.id}) "
-                        f"- new team: {player.team.name}, in_melee_assignment={in_melee_assignment}"
-                    )
+                # Check if this session belongs to one of our players
+                player = players_by_id.get(session_data.get('player_id'))
+                if player is None:
+                    continue
+
+                _apply_team(session_data, player, in_melee_assignment)
+
+                # Save the updated session
+                session.session_data = Session.objects.encode(session_data)
+                session.save()
+
+                updated_count += 1
+                logger.info(
+                    f"Refreshed team session for player {player.name} (ID: {player.id}) "
+                    f"- new team: {player.team.name}, in_melee_assignment={in_melee_assignment}"
+                )
 
             except Exception as e:
                 logger.error(f"Error updating session {session.session_key}: {e}")
                 continue
 
     except Exception as e:
-        logger.error(f"Error refreshing player team session for player {player.id}: {e}")
+        logger.error(f"Error refreshing team sessions for players {list(players_by_id)}: {e}")
 
     return updated_count
 
@@ -99,16 +112,21 @@ def refresh_multiple_players_team_sessions(players, in_melee_assignment=True):
 
     Args:
         players:              List or QuerySet of Player objects whose teams have changed.
-        in_melee_assignment:  Passed through to refresh_player_team_session for each player.
+        in_melee_assignment:  Same meaning as for refresh_player_team_session.
 
     Returns:
         int: Total number of sessions updated
     """
-    total_updated = 0
-
+    players = list(players)
+    players_by_id = {}
     for player in players:
-        updated = refresh_player_team_session(player, in_melee_assignment=in_melee_assignment)
-        total_updated += updated
+        if player and player.team:
+            players_by_id[player.id] = player
+        else:
+            logger.warning(f"Cannot refresh session for player {player.id if player else 'None'} - no team assigned")
+
+    # Decoding every active session is the expensive part: do it once
+    total_updated = _refresh_sessions(players_by_id, in_melee_assignment) if players_by_id else 0
 
     logger.info(f"Refreshed team sessions for {len(players)} players - {total_updated} sessions updated")
     return total_updated
@@ -3,6 +3,8 @@ from django.utils import timezone
 from django.conf import settings
 import re
 
+from . import identity_cache
+
 class CodenameSessionManager:
     """
     Utility class for managing codename sessions
@@ -24,6 +26,7 @@ class CodenameSessionManager:
         request.session['player_codename'] = codename.upper()
         request.session['codename_login_time'] = timezone.now().isoformat()
         request.session['session_active'] = True
+        identity_cache.forget_request_identity(request)
         return True
     
     @staticmethod
@@ -32,6 +35,7 @@ class CodenameSessionManager:
         session_keys = ['player_codename', 'codename_login_time', 'session_active']
         for key in session_keys:
             request.session.pop(key, None)
+        identity_cache.forget_request_identity(request)
     
     @staticmethod
     def get_logged_in_codename(request):
@@ -81,6 +85,7 @@ class TeamPinSessionManager:
         request.session['team_pin'] = pin.upper()
         request.session['team_login_time'] = timezone.now().isoformat()
         request.session['team_session_active'] = True
+        identity_cache.forget_request_identity(request)
         return True
     
     @staticmethod
@@ -89,6 +94,7 @@ class TeamPinSessionManager:
         session_keys = ['team_pin', 'team_login_time', 'team_session_active']
         for key in session_keys:
             request.session.pop(key, None)
+        identity_cache.forget_request_identity(request)
     
     @staticmethod
     def get_logged_in_pin(request):
@@ -142,7 +148,12 @@ class SessionManager:
     
     @staticmethod
     def get_session_context(request):
-        """Get complete session context for templates"""
+        """
+        Get complete session context for templates.
+
+        Player and team lookups go through pfc_core.identity_cache, so
+        they are resolved at most once per request.
+        """
         context = {
             'session_codename': CodenameSessionManager.get_logged_in_codename(request),
             'player_logged_in': CodenameSessionManager.is_logged_in(request),
@@ -152,15 +163,14 @@ class SessionManager:
         
         # Add player object and name if logged in
         if context['player_logged_in'] and context['session_codename']:
-            player = TeamPinSessionManager.get_player_by_codename(context['session_codename'])
+            player = identity_cache.player_for_codename(request, context['session_codename'])
             context['logged_in_player'] = player
             context['player_name'] = player.name if player else context['session_codename']
         
         # Add team object if logged in
         if context['team_logged_in']:
-            team = TeamPinSessionManager.get_team_by_pin(context['team_pin'])
+            team = identity_cache.team_for_pin(request, context['team_pin'])
             context['logged_in_team'] = team
             context['team_name'] = team.name if team else None
         
         return context
-
@@ -85,6 +85,11 @@ GOOGLE_OAUTH_REDIRECT_URI = os.environ.get('GOOGLE_OAUTH_REDIRECT_URI', 'http://
 PFC_WEB_PUSH_VAPID_PUBLIC_KEY = os.environ.get('PFC_WEB_PUSH_VAPID_PUBLIC_KEY', '')
 PFC_WEB_PUSH_VAPID_PRIVATE_KEY = os.environ.get('PFC_WEB_PUSH_VAPID_PRIVATE_KEY', '')
 PFC_WEB_PUSH_VAPID_SUBJECT = os.environ.get('PFC_WEB_PUSH_VAPID_SUBJECT', '')
+# Push messages are queued in WebPushOutbox and sent by the `push_worker`
+# command.  PFC_WEB_PUSH_RUN_INLINE=True sends them right after the triggering
+# request commits instead (local development without a worker process).
+PFC_WEB_PUSH_RUN_INLINE = os.environ.get('PFC_WEB_PUSH_RUN_INLINE', 'False') == 'True'
+PFC_WEB_PUSH_CONCURRENCY = int(os.environ.get('PFC_WEB_PUSH_CONCURRENCY', 16))
 
 # Application definition
 
@@ -140,8 +145,65 @@ else:
         }
     }
 
+# ---------------------------------------------------------------------------
+# Cache — shared Redis when REDIS_URL is set (rate limits and cache regions
+# are then consistent across Daphne workers), per-process memory otherwise.
+# Named regions and their timeouts: see pfc_core/cache_regions.py.
+# ---------------------------------------------------------------------------
+if _REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": _REDIS_URL,
+            "KEY_PREFIX": "pfc",
+            "TIMEOUT": 300,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "pfc-local",
+            "TIMEOUT": 300,
+        }
+    }
+
+CACHE_REGION_TIMEOUTS = {
+    "leaderboards": int(os.environ.get("CACHE_TIMEOUT_LEADERBOARDS", 300)),
+    "market": int(os.environ.get("CACHE_TIMEOUT_MARKET", 300)),
+    "billboard_analytics": int(os.environ.get("CACHE_TIMEOUT_BILLBOARD_ANALYTICS", 60)),
+    "live_scores": int(os.environ.get("CACHE_TIMEOUT_LIVE_SCORES", 15)),
+    "match_status": int(os.environ.get("CACHE_TIMEOUT_MATCH_STATUS", 300)),
+    "ai_reports": int(os.environ.get("CACHE_TIMEOUT_AI_REPORTS", 86400)),
+}
+
+# Seconds a resolved codename/PIN identity is shared across requests (0 = per request only)
+IDENTITY_CACHE_TIMEOUT = int(os.environ.get("IDENTITY_CACHE_TIMEOUT", 30))
+
+# AI Coach Report: background build threads per process, and chart-rendering
+# processes per build (1 = render charts in the build thread).
+AI_REPORT_WORKERS = int(os.environ.get("AI_REPORT_WORKERS", 1))
+AI_REPORT_CHART_WORKERS = int(os.environ.get("AI_REPORT_CHART_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Mêlée team formation: seconds the partnership-aware search may spend per
+# generation or shuffle (tournaments.melee_formation).
+MELEE_FORMATION_TIME_BUDGET = float(os.environ.get("MELEE_FORMATION_TIME_BUDGET", 1.0))
+
 ASGI_APPLICATION = "pfc_core.asgi.application"
 
+# Tournament automation runs in the `automation_worker` management command.
+# Set TOURNAMENT_AUTOMATION_RUN_INLINE=True to run queued jobs right after the
+# triggering request commits (local development without a worker process).
+TOURNAMENT_AUTOMATION_RUN_INLINE = os.environ.get("TOURNAMENT_AUTOMATION_RUN_INLINE", "False") == "True"
+
+# Automation logs (tournaments.automation_logger): rows are buffered per
+# automation run and flushed every AUTOMATION_LOG_BUFFER_SIZE entries or
+# AUTOMATION_LOG_FLUSH_SECONDS; `prune_automation_logs` deletes rows older
+# than AUTOMATION_LOG_RETENTION_DAYS.
+AUTOMATION_LOG_BUFFER_SIZE = int(os.environ.get("AUTOMATION_LOG_BUFFER_SIZE", 50))
+AUTOMATION_LOG_FLUSH_SECONDS = float(os.environ.get("AUTOMATION_LOG_FLUSH_SECONDS", 5.0))
+AUTOMATION_LOG_RETENTION_DAYS = int(os.environ.get("AUTOMATION_LOG_RETENTION_DAYS", 30))
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -367,6 +429,7 @@ FRIENDLY_GAME_DEFAULT_COURT_COMPLEX_ID = 1
 SHOT_TRACKER_SETTINGS = {
     'MAX_SESSIONS_PER_USER': 10,  # Maximum active sessions per user
     'MAX_SHOTS_PER_SESSION': 1000,  # Maximum shots per session
+    'MAX_SHOTS_PER_BATCH': 200,  # Maximum shots per offline batch upload
     'SESSION_TIMEOUT_HOURS': 24,  # Auto-end sessions after 24 hours
     'RATE_LIMIT_SHOTS_PER_MINUTE': 60,  # Rate limit for shot recording
     'ENABLE_ACHIEVEMENTS': True,  # Enable achievement system
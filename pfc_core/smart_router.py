@@ -288,73 +288,84 @@ def _resolve_nearby_friendly_games(request, player):
 # ---------------------------------------------------------------------------
 # Friendly game resolution (games the player is already IN)
 # ---------------------------------------------------------------------------
-def _resolve_friendly_games(player, player_team):
-    """Resolve friendly games to their decision-state URLs."""
-    candidates = []
+def _friendly_game_candidate(game, participation):
+    """Decision-state candidate for one open friendly game of one participant."""
+    # Check if game needs validation from THIS player
+    if game.status == 'PENDING_VALIDATION' and hasattr(game, 'result'):
+        result = game.result
+        if result.submitted_by_team != participation.team:
+            # Other team submitted → player must validate
+            return {
+                'priority': PRIORITY_FRIENDLY_NEEDS_VALIDATION,
+                'url': reverse('friendly_games:validate_result',
+                               kwargs={'game_id': game.id}),
+                'label': _("Validate Friendly Game Result"),
+                'match_type': 'friendly',
+            }
+
+    if game.status == 'ACTIVE':
+        # Route to live scoreboard if available, so player enters live score mode
+        try:
+            scoreboard = game.live_scoreboard
+            active_url = reverse('scoreboard_detail',
+                                 kwargs={'scoreboard_id': scoreboard.id})
+        except Exception:
+            active_url = reverse('friendly_games:game_detail',
+                                 kwargs={'game_id': game.id})
+        return {
+            'priority': PRIORITY_FRIENDLY_ACTIVE,
+            'url': active_url,
+            'label': _("Active Friendly Game — Live Score"),
+            'match_type': 'friendly',
+        }
+    if game.status == 'PENDING_VALIDATION':
+        # Player's team already submitted — just info
+        return {
+            'priority': PRIORITY_FRIENDLY_WAITING,
+            'url': reverse('friendly_games:game_detail',
+                           kwargs={'game_id': game.id}),
+            'label': _("Waiting for Opponent Validation"),
+            'match_type': 'friendly',
+        }
+    if game.status in ['READY', 'WAITING_FOR_PLAYERS']:
+        return {
+            'priority': PRIORITY_FRIENDLY_SETUP,
+            'url': reverse('friendly_games:game_detail',
+                           kwargs={'game_id': game.id}),
+            'label': _("Friendly Game — Waiting for Players"),
+            'match_type': 'friendly',
+        }
+    return None
 
-    games = FriendlyGame.objects.filter(
-        players__player=player
-    ).exclude(
-        status__in=['COMPLETED', 'CANCELLED', 'EXPIRED']
-    ).distinct()
 
-    for game in games:
-        # Check if game needs validation from THIS player
-        if game.status == 'PENDING_VALIDATION' and hasattr(game, 'result'):
-            try:
-                participation = FriendlyGamePlayer.objects.get(
-                    game=game, player=player
-                )
-                result = game.result
-                if result.submitted_by_team != participation.team:
-                    # Other team submitted → player must validate
-                    candidates.append({
-                        'priority': PRIORITY_FRIENDLY_NEEDS_VALIDATION,
-                        'url': reverse('friendly_games:validate_result',
-                                       kwargs={'game_id': game.id}),
-                        'label': _("Validate Friendly Game Result"),
-                        'match_type': 'friendly',
-                    })
-                    continue
-            except FriendlyGamePlayer.DoesNotExist:
-                pass
+def _resolve_friendly_games_for_players(player_ids):
+    """
+    Resolve friendly games for several players at once: {player_id: [candidate, ...]}.
 
-        if game.status == 'ACTIVE':
-            # Route to live scoreboard if available, so player enters live score mode
-            try:
-                scoreboard = game.live_scoreboard
-                active_url = reverse('scoreboard_detail',
-                                     kwargs={'scoreboard_id': scoreboard.id})
-            except Exception:
-                active_url = reverse('friendly_games:game_detail',
-                                     kwargs={'game_id': game.id})
-            candidates.append({
-                'priority': PRIORITY_FRIENDLY_ACTIVE,
-                'url': active_url,
-                'label': _("Active Friendly Game — Live Score"),
-                'match_type': 'friendly',
-            })
-        elif game.status == 'PENDING_VALIDATION':
-            # Player's team already submitted — just info
-            candidates.append({
-                'priority': PRIORITY_FRIENDLY_WAITING,
-                'url': reverse('friendly_games:game_detail',
-                               kwargs={'game_id': game.id}),
-                'label': _("Waiting for Opponent Validation"),
-                'match_type': 'friendly',
-            })
-        elif game.status in ['READY', 'WAITING_FOR_PLAYERS']:
-            candidates.append({
-                'priority': PRIORITY_FRIENDLY_SETUP,
-                'url': reverse('friendly_games:game_detail',
-                               kwargs={'game_id': game.id}),
-                'label': _("Friendly Game — Waiting for Players"),
-                'match_type': 'friendly',
-            })
+    One query covers every open game of every player, with the game's result
+    and live scoreboard joined in.
+    """
+    candidates = {player_id: [] for player_id in player_ids}
+    participations = FriendlyGamePlayer.objects.filter(
+        player_id__in=player_ids,
+    ).exclude(
+        game__status__in=['COMPLETED', 'CANCELLED', 'EXPIRED']
+    ).select_related(
+        'game', 'game__result', 'game__live_scoreboard'
+    ).order_by('game_id')
 
+    for participation in participations:
+        candidate = _friendly_game_candidate(participation.game, participation)
+        if candidate:
+            candidates[participation.player_id].append(candidate)
     return candidates
 
 
+def _resolve_friendly_games(player, player_team):
+    """Resolve friendly games to their decision-state URLs."""
+    return _resolve_friendly_games_for_players([player.id])[player.id]
+
+
 # ---------------------------------------------------------------------------
 # Tournament match resolution
 # ---------------------------------------------------------------------------
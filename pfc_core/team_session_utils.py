@@ -10,6 +10,8 @@ from django.utils import timezone
 from datetime import timedelta
 import re
 
+from . import identity_cache
+
 
 class TeamSessionManager:
     """Manages team PIN sessions for authentication"""
@@ -45,7 +47,8 @@ class TeamSessionManager:
             request.session[cls.REMEMBER_KEY] = False
             # Default session expiry (browser close)
             request.session.set_expiry(0)
-            
+
+        identity_cache.forget_request_identity(request)
         return True
     
     @classmethod
@@ -55,6 +58,7 @@ class TeamSessionManager:
         for key in keys_to_remove:
             if key in request.session:
                 del request.session[key]
+        identity_cache.forget_request_identity(request)
     
     @classmethod
     def get_team_pin(cls, request):
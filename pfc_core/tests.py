@@ -0,0 +1,253 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from billboard.models import BillboardEntry
+from cert_ratings.models import CertifyingEntity, CertRatingHistory
+from courts.models import Court, CourtComplex
+from friendly_games.models import PlayerCodename
+from matches.models import Match
+from shooting.middleware import consume_shot_allowance
+from teams.models import Player, Team
+from tournaments.automation_logger import AutomationLog
+from tournaments.models import Round, Stage, Tournament, TournamentTeam
+
+from . import cache_regions, identity_cache, name_search
+from .context_processors import auth_context
+from .query_plans import full_scans
+from .session_utils import SessionManager
+
+
+class HotQueryPlanTests(TestCase):
+    """Hot filters must be served by an index, never by a full table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.tournament = Tournament.objects.create(
+            name="Plans", format="round_robin", play_format="triplet",
+            start_date=now, end_date=now + timedelta(days=1),
+        )
+        stage = Stage.objects.create(
+            tournament=cls.tournament, stage_number=1, format="round_robin", num_qualifiers=0,
+        )
+        cls.round = Round.objects.create(tournament=cls.tournament, stage=stage, number=1)
+        cls.court = Court.objects.create(number=901)
+        cls.complex = CourtComplex.objects.create(name="Plans complex", description="x")
+
+        teams = [Team.objects.create(name=f"T{i}", pin=f"PLAN{i:02d}") for i in range(8)]
+        TournamentTeam.objects.bulk_create([
+            TournamentTeam(tournament=cls.tournament, team=team, is_active=i % 3 != 0)
+            for i, team in enumerate(teams)
+        ])
+        statuses = ["pending", "pending_verification", "active", "completed"]
+        cls.matches = Match.objects.bulk_create([
+            Match(
+                tournament=cls.tournament, round=cls.round,
+                team1=teams[i % 8], team2=teams[(i + 1) % 8],
+                status=statuses[i % 4], court=cls.court if i % 4 == 2 else None,
+                waiting_for_court=i % 4 == 1,
+            )
+            for i in range(40)
+        ])
+        BillboardEntry.objects.bulk_create([
+            BillboardEntry(
+                codename=f"P{i % 12:05d}",
+                action_type="AT_COURTS" if i % 3 else "GOING_TO_COURTS",
+                court_complex=cls.complex,
+                is_active=i % 2 == 0,
+            )
+            for i in range(60)
+        ])
+        AutomationLog.objects.bulk_create([
+            AutomationLog(
+                tournament_id=cls.tournament.id,
+                event_type="error" if i % 5 == 0 else "decision",
+                message=f"event {i}",
+            )
+            for i in range(50)
+        ])
+        cls.entity = CertifyingEntity.objects.create(name="Plans entity")
+        player = Player.objects.create(name="Planner", team=teams[0])
+        CertRatingHistory.objects.bulk_create([
+            CertRatingHistory(
+                player=player, entity=cls.entity, match=match,
+                rating_before=1500, rating_after=1510, rating_change=10,
+            )
+            for match in cls.matches[:10]
+        ])
+
+    def _hot_queries(self):
+        now = timezone.now()
+        return {
+            "match: round by status": Match.objects.filter(
+                tournament=self.tournament, round=self.round, status="completed",
+            ),
+            "match: court queue": Match.objects.filter(
+                status="pending_verification", waiting_for_court=True,
+            ).order_by("created_at"),
+            "match: active on court": Match.objects.filter(status="active", court=self.court),
+            "billboard: live presence": BillboardEntry.objects.filter(
+                court_complex=self.complex, action_type="AT_COURTS", is_active=True,
+            ),
+            "billboard: presence window": BillboardEntry.objects.filter(
+                court_complex=self.complex, action_type__in=["AT_COURTS"],
+                created_at__gte=now - timedelta(hours=1), created_at__lt=now,
+            ),
+            "billboard: player check-out": BillboardEntry.objects.filter(
+                codename="P00001", action_type="AT_COURTS", is_active=True,
+            ),
+            "tournament team: active": TournamentTeam.objects.filter(
+                tournament=self.tournament, is_active=True,
+            ),
+            "tournament team: stage": self.tournament.tournamentteam_set.filter(
+                is_active=True, current_stage_number=2,
+            ),
+            "automation log: recent errors": AutomationLog.objects.filter(
+                tournament_id=self.tournament.id, event_type="error",
+                timestamp__gte=now - timedelta(hours=1),
+            ),
+            "automation log: latest": AutomationLog.objects.filter(
+                tournament_id=self.tournament.id,
+            ).order_by("-timestamp")[:20],
+            "cert history: processed": CertRatingHistory.objects.filter(
+                entity=self.entity, match=self.matches[0],
+            ),
+            "player: name prefix": name_search.prefix_matches(Player.objects.all(), "plan"),
+        }
+
+    def test_hot_queries_use_an_index(self):
+        for name, queryset in self._hot_queries().items():
+            with self.subTest(name):
+                self.assertEqual(full_scans(queryset), [], queryset.explain())
+
+    def test_unindexed_filter_is_reported(self):
+        # Guards against a plan parser that never finds anything
+        scans = full_scans(BillboardEntry.objects.filter(message="x"))
+        self.assertEqual(scans, [BillboardEntry._meta.db_table])
+
+
+class NameSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        team = Team.objects.create(name="Search team", pin="SRCH01")
+        for name in ["José  Dupont", "Josephine", "Ajos", "Γιώργος Παπαδόπουλος", "Marie Jost"]:
+            Player.objects.create(name=name, team=team)
+
+    def _names(self, query):
+        return [player["name"] for player in name_search.search("players", query)]
+
+    def test_ranked_accent_and_case_insensitive_matches(self):
+        self.assertEqual(name_search.normalize_name("  Γιώργος  ΠΑΠΑΔΌΠΟΥΛΟΣ "), "γιωργοσ παπαδοπουλοσ")
+        self.assertEqual(self._names("JOS"), ["Josephine", "José  Dupont", "Marie Jost", "Ajos"])
+        self.assertEqual(self._names("γιωργ"), ["Γιώργος Παπαδόπουλος"])
+        self.assertEqual(self._names("ΠΑΠΑΔΟΠ"), ["Γιώργος Παπαδόπουλος"])
+        self.assertEqual(self._names("j"), [])
+
+    def test_changes_invalidate_cached_results(self):
+        self.assertEqual(self._names("josephine"), ["Josephine"])
+        player = Player.objects.get(name="Josephine")
+        player.name = "Joséphine Blanc"
+        with self.captureOnCommitCallbacks(execute=True):
+            player.save(update_fields=["name"])
+        self.assertEqual(self._names("blanc"), ["Joséphine Blanc"])
+        self.assertEqual(self._names("josephine"), ["Joséphine Blanc"])
+
+
+class CacheRegionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+    def _produce(self):
+        self.calls.append(1)
+        return len(self.calls)
+
+    def test_invalidate_starts_a_new_generation(self):
+        market = cache_regions.region(cache_regions.MARKET)
+        live = cache_regions.region(cache_regions.LIVE_SCORES)
+        self.assertEqual(market.get_or_set(("rows", "en"), self._produce), 1)
+        self.assertEqual(market.get_or_set(("rows", "en"), self._produce), 1)
+        self.assertEqual(live.get_or_set(("list",), self._produce), 2)
+
+        cache_regions.invalidate(cache_regions.MARKET)
+        self.assertEqual(market.get_or_set(("rows", "en"), self._produce), 3)
+        # Other regions keep their entries
+        self.assertEqual(live.get_or_set(("list",), self._produce), 2)
+
+    def test_evicted_generation_still_invalidates(self):
+        market = cache_regions.region(cache_regions.MARKET)
+        market.get_or_set(("rows", "en"), self._produce)
+        cache.delete(market._generation_key)
+
+        market.invalidate()
+        self.assertEqual(market.get_or_set(("rows", "en"), self._produce), 2)
+
+
+@override_settings(SHOT_TRACKER_SETTINGS=dict(settings.SHOT_TRACKER_SETTINGS, RATE_LIMIT_SHOTS_PER_MINUTE=5))
+class ShotAllowanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_shots_until_the_limit(self):
+        self.assertTrue(consume_shot_allowance("limit:a", 3))
+        self.assertTrue(consume_shot_allowance("limit:a", 2))
+        self.assertFalse(consume_shot_allowance("limit:a"))
+        self.assertEqual(cache.get("limit:a"), 5)
+        # Each key has its own window
+        self.assertTrue(consume_shot_allowance("limit:b"))
+
+    def test_batch_opening_the_window_goes_through(self):
+        self.assertEqual([consume_shot_allowance("limit:a", 8) for _ in range(3)], [True, False, False])
+        self.assertEqual(cache.get("limit:a"), 8)
+
+    def test_rejected_batch_is_given_back(self):
+        self.assertTrue(consume_shot_allowance("limit:a", 4))
+        self.assertFalse(consume_shot_allowance("limit:a", 2))
+        self.assertEqual(cache.get("limit:a"), 4)
+        self.assertTrue(consume_shot_allowance("limit:a"))
+
+
+class IdentityCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.team = Team.objects.create(name="Identity team", pin="IDPIN1")
+        self.player = Player.objects.create(name="Alice", team=self.team)
+        PlayerCodename.objects.create(player=self.player, codename="IDCODE")
+
+    def _request(self, codename="IDCODE", pin="IDPIN1"):
+        request = RequestFactory().get("/")
+        request.session = SessionBase()
+        request.session.update({
+            "session_active": True, "player_codename": codename,
+            "team_session_active": True, "team_pin": pin,
+        })
+        return request
+
+    def test_context_resolves_identities_once_per_request(self):
+        request = self._request()
+        context = auth_context(request)
+        with self.assertNumQueries(0):
+            auth_context(request)  # Nothing is resolved until a template asks
+
+        with self.assertNumQueries(2):  # codename -> player, PIN -> team
+            self.assertEqual(context["player_name"], "Alice")
+        with self.assertNumQueries(0):
+            self.assertEqual(context["notify_player_id"], self.player.pk)
+            self.assertEqual(context["team_name"], "Identity team")
+            # A view asking again shares the request's resolution
+            self.assertEqual(SessionManager.get_session_context(request)["logged_in_team"], self.team)
+
+    def test_pin_change_drops_the_shared_entry(self):
+        self.assertEqual(identity_cache.team_for_pin(self._request(), "IDPIN1"), self.team)
+        with self.assertNumQueries(0):
+            identity_cache.team_for_pin(self._request(), "IDPIN1")
+
+        self.team.pin = "IDPIN2"
+        self.team.save()
+        self.assertIsNone(identity_cache.team_for_pin(self._request(), "IDPIN1"))
+        self.assertEqual(identity_cache.team_for_pin(self._request(), "IDPIN2"), self.team)
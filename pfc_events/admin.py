@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import WebPushSubscription
+from .models import WebPushOutbox, WebPushSubscription
 
 
 @admin.register(WebPushSubscription)
@@ -9,3 +9,11 @@ class WebPushSubscriptionAdmin(admin.ModelAdmin):
     list_filter = ("is_active", "locale")
     search_fields = ("player__name", "endpoint")
     readonly_fields = ("created_at", "updated_at", "last_success_at")
+
+
+@admin.register(WebPushOutbox)
+class WebPushOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "subscription", "status", "attempts", "last_status_code", "created_at", "sent_at")
+    list_filter = ("status",)
+    raw_id_fields = ("subscription",)
+    readonly_fields = ("created_at", "sent_at", "claimed_by", "claimed_at")
@@ -5,7 +5,7 @@ Two consumers:
 
 1. MatchEventConsumer — server-authoritative match state events.
    Groups: "match_{id}" / "game_{id}" (shared) + "player_{codename}" (personal)
-   Events: match.state_changed → client navigates via next_url (no HTTP fetch)
+   Events: match.state_changed → client navigates via next_url / validation_url
 
 2. ScoreboardConsumer — real-time score push for live scoreboards.
    Group: "scoreboard_{id}"
@@ -85,6 +85,13 @@ class MatchEventConsumer(AsyncWebsocketConsumer):
             "new_status": event.get("new_status", ""),
             "next_url":   event.get("next_url"),   # None for spectators
             "state_url":  event.get("state_url"),  # authoritative detail page after transition
+            "status_version": event.get("status_version"),
+            # Validation routing, personal payloads only (see pfc_events.status)
+            "personal": event.get("personal", False),
+            "current_user_team": event.get("current_user_team"),
+            "submitted_by_team": event.get("submitted_by_team"),
+            "should_redirect_to_validation": event.get("should_redirect_to_validation", False),
+            "validation_url": event.get("validation_url"),
         }))
 
     async def score_updated(self, event):
@@ -0,0 +1 @@
+# Management package for PFC events
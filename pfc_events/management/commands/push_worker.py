@@ -0,0 +1,101 @@
+"""
+Django management command that delivers queued Web Push messages
+Usage: python manage.py push_worker [--once] [--sleep 0.5] [--batch-size 200] [--concurrency 16] [--stats]
+"""
+
+import json
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from pfc_events.push_delivery import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    default_worker_id,
+    drain_outbox,
+    outbox_stats,
+    purge_finished,
+    requeue_stale_claims,
+)
+
+# Purge finished outbox rows at most this often (seconds)
+PURGE_INTERVAL = 600
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending Web Push outbox entries to push services'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox once and exit instead of polling forever'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Seconds to wait between polls when nothing is due (default: 0.5)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows claimed per batch (default: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'PFC_WEB_PUSH_CONCURRENCY', DEFAULT_CONCURRENCY),
+            help='Maximum push requests in flight (default: PFC_WEB_PUSH_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print outbox depth, latency and throughput as JSON and exit'
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(outbox_stats(), indent=2))
+            return
+
+        worker_id = default_worker_id()
+        self.stdout.write(self.style.SUCCESS(
+            f"Push worker {worker_id} started (concurrency {options['concurrency']})"
+        ))
+
+        delivered = 0
+        last_purge = 0.0
+        try:
+            while True:
+                close_old_connections()
+                requeue_stale_claims()
+                if time.monotonic() - last_purge > PURGE_INTERVAL:
+                    purge_finished()
+                    last_purge = time.monotonic()
+
+                totals = drain_outbox(
+                    worker_id=worker_id,
+                    batch_size=options['batch_size'],
+                    concurrency=options['concurrency'],
+                )
+                if totals['batches']:
+                    delivered += totals.get('sent', 0)
+                    self.stdout.write(
+                        f"sent={totals.get('sent', 0)} retry={totals.get('retry', 0)} "
+                        f"gone={totals.get('gone', 0)} failed={totals.get('failed', 0)} "
+                        f"expired={totals.get('expired', 0)} "
+                        f"in {totals['elapsed_seconds']}s ({totals['sent_per_second']}/s)"
+                    )
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['sleep'])
+
+                if options['once']:
+                    break
+        except KeyboardInterrupt:
+            self.stdout.write("\nStopped worker.")
+
+        self.stdout.write(f"Delivered {delivered} push message(s)")
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-17 06:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pfc_events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebPushOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.TextField(help_text='Serialized JSON payload, encrypted per device at delivery time')),
+                ('ttl', models.PositiveIntegerField(default=90)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed'), ('expired', 'Expired')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(help_text='Delivering after this is pointless (created_at + ttl)')),
+                ('claimed_by', models.CharField(blank=True, max_length=100)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('last_status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox', to='pfc_events.webpushsubscription')),
+            ],
+            options={
+                'verbose_name': 'Web Push outbox entry',
+                'verbose_name_plural': 'Web Push outbox',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='pfc_events__status_8567b8_idx')],
+            },
+        ),
+    ]
@@ -45,3 +45,55 @@ class WebPushSubscription(models.Model):
         if self.is_active:
             self.is_active = False
             self.save(update_fields=["is_active", "updated_at"])
+
+
+class WebPushOutbox(models.Model):
+    """One Push message waiting for (or delivered to) one subscription.
+
+    Notification helpers only insert rows here after commit; the
+    ``push_worker`` management command performs the HTTPS delivery (see
+    pfc_events.push_delivery).  Rows are disposable delivery state, not
+    notification history: delivered and dead rows are purged by the worker.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_EXPIRED = "expired"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+        (STATUS_EXPIRED, "Expired"),
+    ]
+
+    subscription = models.ForeignKey(
+        WebPushSubscription,
+        on_delete=models.CASCADE,
+        related_name="outbox",
+    )
+    data = models.TextField(help_text="Serialized JSON payload, encrypted per device at delivery time")
+    ttl = models.PositiveIntegerField(default=90)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(help_text="Delivering after this is pointless (created_at + ttl)")
+    claimed_by = models.CharField(max_length=100, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+        verbose_name = "Web Push outbox entry"
+        verbose_name_plural = "Web Push outbox"
+
+    def __str__(self):
+        return f"Push {self.pk} [{self.status}] for subscription {self.subscription_id}"
@@ -0,0 +1,357 @@
+"""
+pfc_events/push_delivery.py
+===========================
+Delivery worker for the Web Push outbox.
+
+``push_notifications`` only inserts WebPushOutbox rows after commit; this
+module claims due rows in batches and sends them to the push services.  It
+runs inside the ``push_worker`` management command (or inline when
+``PFC_WEB_PUSH_RUN_INLINE`` is set for local development).
+
+Outbox row states::
+
+    pending ──claim──▶ sending ──▶ sent
+       ▲                  │
+       └── retry/backoff ─┤
+                          ├──────▶ failed    (404/410 gone, 4xx, attempts used up)
+                          └──────▶ expired   (ttl elapsed before delivery)
+
+Design principles:
+  - Claims are conditional UPDATEs tagged with a per-batch token, so two
+    workers never send the same row.
+  - HTTPS calls run in a bounded thread pool sharing one pooled
+    requests.Session (keep-alive to FCM / Mozilla / Apple endpoints); threads
+    never touch the database.
+  - Outcomes are written back in bulk: one UPDATE for all sent rows, one for
+    all subscriptions that succeeded (last_success_at), one for all that are
+    gone (is_active=False).
+  - Backoff is per endpoint: a 429/5xx/network error delays every pending row
+    of that subscription (honouring Retry-After), and a 429 pauses the whole
+    push-service host for the rest of the batch.
+"""
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db.models import Avg, DurationField, ExpressionWrapper, F, Min
+from django.utils import timezone
+
+from .models import WebPushOutbox, WebPushSubscription
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_CONCURRENCY = 16
+REQUEST_TIMEOUT = 10
+# A row is given up after this many delivery attempts.
+MAX_ATTEMPTS = 5
+BASE_BACKOFF = timedelta(seconds=5)
+MAX_BACKOFF = timedelta(minutes=10)
+# Rows left "sending" longer than this belong to a dead worker.
+STALE_CLAIM = timedelta(minutes=5)
+# Sent / failed / expired rows are kept this long for stats, then purged.
+KEEP_FINISHED = timedelta(days=1)
+
+GONE_STATUS_CODES = (404, 410)
+RETRY_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _backoff(attempts, retry_after=None):
+    """Delay before retry number ``attempts`` (exponential, capped, Retry-After wins)."""
+    if retry_after is not None:
+        return min(timedelta(seconds=retry_after), MAX_BACKOFF)
+    return min(BASE_BACKOFF * (2 ** max(attempts - 1, 0)), MAX_BACKOFF)
+
+
+def _retry_after_seconds(response):
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return max(int(value), 0) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+_session = None
+
+
+def _http_session(concurrency):
+    """Process-wide requests.Session whose connection pool matches ``concurrency``."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        _session.mount("https://", adapter)
+    return _session
+
+
+_vapid = None
+
+
+def _vapid_key():
+    """Parse the VAPID private key once per process instead of once per send."""
+    global _vapid
+    if _vapid is None:
+        from py_vapid import Vapid
+
+        private_key = settings.PFC_WEB_PUSH_VAPID_PRIVATE_KEY
+        if os.path.isfile(private_key):
+            _vapid = Vapid.from_file(private_key_file=private_key)
+        else:
+            _vapid = Vapid.from_string(private_key=private_key)
+    return _vapid
+
+
+def requeue_stale_claims(stale_after=STALE_CLAIM):
+    """Return rows stuck in 'sending' (crashed worker) to the pending state."""
+    count = WebPushOutbox.objects.filter(
+        status=WebPushOutbox.STATUS_SENDING,
+        claimed_at__lt=timezone.now() - stale_after,
+    ).update(status=WebPushOutbox.STATUS_PENDING, claimed_by="")
+    if count:
+        logger.warning("Requeued %s stale Web Push outbox row(s)", count)
+    return count
+
+
+def claim_batch(worker_id=None, limit=DEFAULT_BATCH_SIZE):
+    """
+    Atomically claim up to ``limit`` due rows.
+
+    Expired rows met on the way are marked expired instead.  Returns the
+    claimed rows with their subscriptions loaded.
+    """
+    now = timezone.now()
+    WebPushOutbox.objects.filter(
+        status=WebPushOutbox.STATUS_PENDING,
+        expires_at__lte=now,
+    ).update(status=WebPushOutbox.STATUS_EXPIRED)
+
+    due_ids = list(
+        WebPushOutbox.objects.filter(
+            status=WebPushOutbox.STATUS_PENDING,
+            next_attempt_at__lte=now,
+        ).order_by("next_attempt_at", "id").values_list("id", flat=True)[:limit]
+    )
+    if not due_ids:
+        return []
+
+    token = f"{(worker_id or default_worker_id())[:60]}:{uuid.uuid4().hex[:12]}"
+    WebPushOutbox.objects.filter(
+        id__in=due_ids,
+        status=WebPushOutbox.STATUS_PENDING,
+    ).update(
+        status=WebPushOutbox.STATUS_SENDING,
+        claimed_by=token,
+        claimed_at=now,
+        attempts=F("attempts") + 1,
+    )
+    return list(
+        WebPushOutbox.objects.filter(claimed_by=token, status=WebPushOutbox.STATUS_SENDING)
+        .select_related("subscription")
+    )
+
+
+def _send_one(entry, session, paused_hosts):
+    """
+    Send one claimed row.  Runs in a pool thread: no database access.
+
+    Returns ``(entry, outcome, status_code, retry_after, error)`` where outcome
+    is 'sent', 'gone', 'retry' or 'failed'.
+    """
+    from pywebpush import WebPushException, webpush
+
+    subscription = entry.subscription
+    host = urlparse(subscription.endpoint).netloc
+    if paused_hosts.get(host, 0) > time.monotonic():
+        return entry, "retry", None, int(paused_hosts[host] - time.monotonic()) + 1, "push service paused (429)"
+
+    remaining_ttl = int((entry.expires_at - timezone.now()).total_seconds())
+    if remaining_ttl <= 0:
+        return entry, "expired", None, None, "ttl elapsed"
+
+    try:
+        webpush(
+            subscription_info={
+                "endpoint": subscription.endpoint,
+                "keys": {"p256dh": subscription.p256dh, "auth": subscription.auth},
+            },
+            data=entry.data,
+            vapid_private_key=_vapid_key(),
+            # webpush() writes "aud"/"exp" into the claims: one dict per send
+            vapid_claims={"sub": settings.PFC_WEB_PUSH_VAPID_SUBJECT},
+            content_encoding=subscription.content_encoding or "aes128gcm",
+            ttl=remaining_ttl,
+            timeout=REQUEST_TIMEOUT,
+            requests_session=session,
+        )
+        return entry, "sent", None, None, ""
+    except WebPushException as exc:
+        response = getattr(exc, "response", None)
+        status_code = getattr(response, "status_code", None)
+        if status_code in GONE_STATUS_CODES:
+            return entry, "gone", status_code, None, str(exc)[:500]
+        if status_code is None or status_code in RETRY_STATUS_CODES:
+            retry_after = _retry_after_seconds(response)
+            if status_code == 429:
+                paused_hosts[host] = time.monotonic() + (retry_after or BASE_BACKOFF.total_seconds())
+            return entry, "retry", status_code, retry_after, str(exc)[:500]
+        return entry, "failed", status_code, None, str(exc)[:500]
+    except Exception as exc:
+        # Connection errors, timeouts: the endpoint may recover
+        return entry, "retry", None, None, str(exc)[:500]
+
+
+def _record_results(results):
+    """Write a batch of send outcomes back with a handful of bulk UPDATEs."""
+    now = timezone.now()
+    by_outcome = defaultdict(list)
+    for result in results:
+        by_outcome[result[1]].append(result)
+
+    sent = by_outcome["sent"]
+    if sent:
+        WebPushOutbox.objects.filter(id__in=[entry.id for entry, *_ in sent]).update(
+            status=WebPushOutbox.STATUS_SENT, sent_at=now, last_status_code=201, last_error="",
+        )
+        WebPushSubscription.objects.filter(
+            id__in={entry.subscription_id for entry, *_ in sent}
+        ).update(is_active=True, last_success_at=now, updated_at=now)
+
+    gone = by_outcome["gone"]
+    if gone:
+        gone_subscriptions = {entry.subscription_id for entry, *_ in gone}
+        WebPushSubscription.objects.filter(id__in=gone_subscriptions).update(is_active=False, updated_at=now)
+        # Nothing else queued for a dead endpoint can be delivered either
+        WebPushOutbox.objects.filter(
+            subscription_id__in=gone_subscriptions,
+            status__in=[WebPushOutbox.STATUS_PENDING, WebPushOutbox.STATUS_SENDING],
+        ).update(status=WebPushOutbox.STATUS_FAILED, last_error="subscription gone")
+        logger.info("Deactivated %s invalid Web Push subscription(s)", len(gone_subscriptions))
+
+    if by_outcome["expired"]:
+        WebPushOutbox.objects.filter(
+            id__in=[entry.id for entry, *_ in by_outcome["expired"]]
+        ).update(status=WebPushOutbox.STATUS_EXPIRED)
+
+    for entry, _outcome, status_code, _retry_after, error in by_outcome["failed"]:
+        WebPushOutbox.objects.filter(pk=entry.pk).update(
+            status=WebPushOutbox.STATUS_FAILED, last_status_code=status_code, last_error=error,
+        )
+        logger.warning("Web Push delivery failed for subscription %s: %s", entry.subscription_id, error)
+
+    # Per-endpoint backoff: delay every pending row of the subscription, not just this one
+    for entry, _outcome, status_code, retry_after, error in by_outcome["retry"]:
+        if entry.attempts >= MAX_ATTEMPTS:
+            WebPushOutbox.objects.filter(pk=entry.pk).update(
+                status=WebPushOutbox.STATUS_FAILED, last_status_code=status_code, last_error=error,
+            )
+            continue
+        next_attempt_at = now + _backoff(entry.attempts, retry_after)
+        WebPushOutbox.objects.filter(pk=entry.pk).update(
+            status=WebPushOutbox.STATUS_PENDING,
+            claimed_by="",
+            next_attempt_at=next_attempt_at,
+            last_status_code=status_code,
+            last_error=error,
+        )
+        WebPushOutbox.objects.filter(
+            subscription_id=entry.subscription_id,
+            status=WebPushOutbox.STATUS_PENDING,
+            next_attempt_at__lt=next_attempt_at,
+        ).update(next_attempt_at=next_attempt_at)
+
+    return {outcome: len(rows) for outcome, rows in by_outcome.items()}
+
+
+def deliver_batch(entries, concurrency=None):
+    """Send claimed ``entries`` with at most ``concurrency`` requests in flight."""
+    if not entries:
+        return {}
+    concurrency = concurrency or getattr(settings, "PFC_WEB_PUSH_CONCURRENCY", DEFAULT_CONCURRENCY)
+    session = _http_session(concurrency)
+    paused_hosts = {}
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(entries)), thread_name_prefix="webpush") as pool:
+        results = list(pool.map(lambda entry: _send_one(entry, session, paused_hosts), entries))
+    return _record_results(results)
+
+
+def drain_outbox(worker_id=None, batch_size=DEFAULT_BATCH_SIZE, concurrency=None, max_batches=None):
+    """
+    Deliver due rows until none are left (or ``max_batches`` is reached).
+
+    Returns totals per outcome plus ``elapsed_seconds`` and
+    ``sent_per_second`` for throughput monitoring.
+    """
+    started = time.monotonic()
+    totals = defaultdict(int)
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        entries = claim_batch(worker_id=worker_id, limit=batch_size)
+        if not entries:
+            break
+        for outcome, count in deliver_batch(entries, concurrency=concurrency).items():
+            totals[outcome] += count
+        batches += 1
+
+    elapsed = time.monotonic() - started
+    totals = dict(totals)
+    totals["batches"] = batches
+    totals["elapsed_seconds"] = round(elapsed, 3)
+    totals["sent_per_second"] = round(totals.get("sent", 0) / elapsed, 1) if elapsed and batches else 0.0
+    if batches:
+        logger.info("Web Push outbox drained: %s", totals)
+    return totals
+
+
+def purge_finished(keep=KEEP_FINISHED):
+    """Delete delivered / dead rows older than ``keep``."""
+    deleted, _ = WebPushOutbox.objects.filter(
+        status__in=[WebPushOutbox.STATUS_SENT, WebPushOutbox.STATUS_FAILED, WebPushOutbox.STATUS_EXPIRED],
+        created_at__lt=timezone.now() - keep,
+    ).delete()
+    return deleted
+
+
+def outbox_stats(window=timedelta(hours=1)):
+    """
+    Outbox depth, delivery latency and throughput for monitoring.
+
+    ``avg_delivery_latency_seconds`` is enqueue → sent over rows sent inside
+    ``window``; ``sent_per_minute`` is the average rate over the same window.
+    """
+    now = timezone.now()
+    pending = WebPushOutbox.objects.filter(status=WebPushOutbox.STATUS_PENDING)
+    oldest_pending = pending.aggregate(oldest=Min("created_at"))["oldest"]
+    recent_sent = WebPushOutbox.objects.filter(
+        status=WebPushOutbox.STATUS_SENT,
+        sent_at__gte=now - window,
+    )
+    latency = recent_sent.annotate(
+        latency=ExpressionWrapper(F("sent_at") - F("created_at"), output_field=DurationField()),
+    ).aggregate(avg=Avg("latency"))["avg"]
+    sent_count = recent_sent.count()
+    recent = WebPushOutbox.objects.filter(created_at__gte=now - window)
+
+    return {
+        "pending": pending.count(),
+        "sending": WebPushOutbox.objects.filter(status=WebPushOutbox.STATUS_SENDING).count(),
+        "oldest_pending_age_seconds": round((now - oldest_pending).total_seconds(), 3) if oldest_pending else None,
+        "sent_in_window": sent_count,
+        "failed_in_window": recent.filter(status=WebPushOutbox.STATUS_FAILED).count(),
+        "expired_in_window": recent.filter(status=WebPushOutbox.STATUS_EXPIRED).count(),
+        "sent_per_minute": round(sent_count / (window.total_seconds() / 60), 2),
+        "avg_delivery_latency_seconds": round(latency.total_seconds(), 3) if latency is not None else None,
+    }
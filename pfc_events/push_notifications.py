@@ -3,10 +3,17 @@
 This module intentionally has no Match-state persistence. It delivers prompts
 only after the surrounding database transaction commits successfully. The
 existing Match/Friendly Game rows and Smart resolver remain authoritative.
+
+Web Push is queued, not sent: after commit one query finds the affected
+devices and one bulk INSERT adds their WebPushOutbox rows.  The HTTPS calls to
+push services happen in the ``push_worker`` command (pfc_events.push_delivery),
+so request latency does not depend on how many devices players own.
 """
 
 import json
 import logging
+from collections import defaultdict
+from datetime import timedelta
 from urllib.parse import urlparse
 
 from asgiref.sync import async_to_sync
@@ -16,7 +23,7 @@ from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
 
-from .models import WebPushSubscription
+from .models import WebPushOutbox, WebPushSubscription
 
 logger = logging.getLogger(__name__)
 
@@ -59,61 +66,54 @@ def _send_open_session_event(player_id, event_type, payload):
         logger.warning("Could not send transient event %s to player %s: %s", event_type, player_id, exc)
 
 
-def _send_web_push(player_id, payload, dedupe_key=None, ttl=90, locale=None):
-    """Deliver a small encrypted Push payload to active devices for one player."""
-    if dedupe_key:
-        cache_key = f"pfc-push:{dedupe_key}"
-        if not cache.add(cache_key, True, timeout=45):
-            return
-
-    if not _push_enabled():
-        return
-
-    try:
-        from pywebpush import WebPushException, webpush
-    except ImportError:
-        logger.warning("Web Push is configured but pywebpush is unavailable")
-        return
-
-    subscriptions_query = WebPushSubscription.objects.filter(
-        player_id=player_id,
+def _active_subscriptions_by_locale(player_ids):
+    """{(player_id, locale): [subscription_id, ...]} for active devices, in one query."""
+    grouped = defaultdict(list)
+    for subscription_id, player_id, locale in WebPushSubscription.objects.filter(
+        player_id__in=player_ids,
         is_active=True,
-    )
-    if locale:
-        subscriptions_query = subscriptions_query.filter(locale=locale)
-    subscriptions = list(subscriptions_query)
-    if not subscriptions:
-        return
+    ).values_list("id", "player_id", "locale"):
+        grouped[(player_id, _locale(locale))].append(subscription_id)
+    return grouped
 
-    vapid_claims = {"sub": settings.PFC_WEB_PUSH_VAPID_SUBJECT}
-    serialized_payload = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
 
-    for subscription in subscriptions:
-        try:
-            webpush(
-                subscription_info={
-                    "endpoint": subscription.endpoint,
-                    "keys": {"p256dh": subscription.p256dh, "auth": subscription.auth},
-                },
-                data=serialized_payload,
-                vapid_private_key=settings.PFC_WEB_PUSH_VAPID_PRIVATE_KEY,
-                vapid_claims=vapid_claims,
+def _queue_web_push(messages):
+    """Queue encrypted-at-delivery Push messages in the outbox.
+
+    ``messages`` is an iterable of ``(subscription_ids, payload, dedupe_key,
+    ttl)``.  A message whose dedupe key was queued in the last 45 seconds is
+    skipped.  Returns the number of outbox rows created.
+    """
+    if not _push_enabled():
+        return 0
+
+    now = timezone.now()
+    rows = []
+    for subscription_ids, payload, dedupe_key, ttl in messages:
+        if not subscription_ids:
+            continue
+        if dedupe_key and not cache.add(f"pfc-push:{dedupe_key}", True, timeout=45):
+            continue
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        rows.extend(
+            WebPushOutbox(
+                subscription_id=subscription_id,
+                data=data,
                 ttl=ttl,
+                created_at=now,
+                next_attempt_at=now,
+                expires_at=now + timedelta(seconds=ttl),
             )
-            WebPushSubscription.objects.filter(pk=subscription.pk).update(
-                is_active=True,
-                last_success_at=timezone.now(),
-            )
-        except WebPushException as exc:
-            response = getattr(exc, "response", None)
-            status_code = getattr(response, "status_code", None)
-            if status_code in (404, 410):
-                WebPushSubscription.objects.filter(pk=subscription.pk).update(is_active=False)
-                logger.info("Removed invalid Web Push subscription %s (%s)", subscription.pk, status_code)
-            else:
-                logger.warning("Web Push delivery failed for subscription %s: %s", subscription.pk, exc)
-        except Exception as exc:
-            logger.warning("Unexpected Web Push delivery failure for subscription %s: %s", subscription.pk, exc)
+            for subscription_id in subscription_ids
+        )
+    if not rows:
+        return 0
+
+    WebPushOutbox.objects.bulk_create(rows)
+    if getattr(settings, "PFC_WEB_PUSH_RUN_INLINE", False):
+        from .push_delivery import drain_outbox
+        drain_outbox()
+    return len(rows)
 
 
 def _schedule_after_commit(callback):
@@ -130,13 +130,8 @@ def notify_invitation_created(invitation):
     invite_type = invitation.invite_type
 
     def deliver():
-        locales = {
-            _locale(value)
-            for value in WebPushSubscription.objects.filter(
-                player_id=recipient_id, is_active=True
-            ).values_list("locale", flat=True)
-        }
-        for locale in locales:
+        messages = []
+        for (_player_id, locale), subscription_ids in _active_subscriptions_by_locale([recipient_id]).items():
             if message:
                 body = f"{sender_name}: {_safe_preview(message)}"
             elif locale == "el":
@@ -151,8 +146,8 @@ def notify_invitation_created(invitation):
                     if invite_type == "team_build"
                     else f"{sender_name} sent you a play invitation."
                 )
-            _send_web_push(
-                recipient_id,
+            messages.append((
+                subscription_ids,
                 {
                     "type": "invitation",
                     "title": "PFC",
@@ -160,10 +155,10 @@ def notify_invitation_created(invitation):
                     "tag": f"pfc-invitation-{invite_token}",
                     "url": "/invites/",
                 },
-                dedupe_key=f"invitation:{invite_token}:{locale}",
-                ttl=300,
-                locale=locale,
-            )
+                f"invitation:{invite_token}:{locale}",
+                300,
+            ))
+        _queue_web_push(messages)
 
     _schedule_after_commit(deliver)
 
@@ -210,28 +205,23 @@ def notify_match_action_required(players, event_kind, object_type, object_id):
                 },
             )
 
-            # The same prompt is sent to subscribed devices. Each device gets a
-            # locale-specific body; clicking only opens/focuses PFC root.
-            locales = {
-                _locale(value)
-                for value in WebPushSubscription.objects.filter(
-                    player_id=player_id, is_active=True
-                ).values_list("locale", flat=True)
-            }
-            for locale in locales:
-                _send_web_push(
-                    player_id,
-                    {
-                        "type": "match_action_required",
-                        "title": "PFC",
-                        "body": _match_body(event_kind, locale),
-                        "tag": f"pfc-match-{object_type}-{object_id}",
-                        "url": "/",
-                    },
-                    dedupe_key=f"match:{object_type}:{object_id}:{event_kind}:{player_id}:{locale}",
-                    ttl=90,
-                    locale=locale,
-                )
+        # The same prompt is queued for subscribed devices. Each device gets a
+        # locale-specific body; clicking only opens/focuses PFC root.
+        _queue_web_push(
+            (
+                subscription_ids,
+                {
+                    "type": "match_action_required",
+                    "title": "PFC",
+                    "body": _match_body(event_kind, locale),
+                    "tag": f"pfc-match-{object_type}-{object_id}",
+                    "url": "/",
+                },
+                f"match:{object_type}:{object_id}:{event_kind}:{player_id}:{locale}",
+                90,
+            )
+            for (player_id, locale), subscription_ids in _active_subscriptions_by_locale(player_ids).items()
+        )
 
     _schedule_after_commit(deliver)
 
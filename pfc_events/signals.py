@@ -18,54 +18,96 @@ Two channel groups are used per match:
 The personal group carries a personalised next_url so the client navigates
 without any follow-up HTTP request.
 
+Fan-out cost is independent of roster size: codenames for every recipient
+come from one query, next_url is resolved once per team (tournament) or in
+one bulk query (friendly), and all group sends are gathered concurrently in a
+single event-loop hop, so Redis round-trips overlap instead of queueing.
+Each broadcast logs its timing ("broadcast match 12 ...") and returns the
+figures as a dict.
+
 Payload shape:
     {
         "type":       "match.state_changed",
         "match_type": "tournament" | "friendly",
         "match_id":   <int>,
         "new_status": "<status string>",
-        "next_url":   "/matches/detail/3/" | null
+        "next_url":   "/matches/detail/3/" | null,
+        "status_version": "<snapshot version>",
+        # personal payloads only — see pfc_events.status:
+        "personal": true,
+        "current_user_team", "submitted_by_team",
+        "should_redirect_to_validation", "validation_url"
     }
+
+The routing fields are computed once per transition from the status
+snapshot, which also backs the ETag polling fallback
+(match_status_api / game_status_api).
 """
 
+import asyncio
 import logging
+import time
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
+from .status import refresh_status, status_payload
+
 logger = logging.getLogger('pfc_events')
 
 
 # ---------------------------------------------------------------------------
-# Internal: compute next_url for a single player
+# Internal: compute next_url / codenames for every recipient in bulk
 # ---------------------------------------------------------------------------
 
-def _next_url_for_player(player, player_team, match_type):
+def _best_url(candidates):
+    if not candidates:
+        return None
+    return min(candidates, key=lambda c: c['priority'])['url']
+
+
+def _next_urls_for_players(player_list, match_type):
     """
     Delegate to smart_router helpers to compute the single best next_url
-    for this player right now.  Returns a URL string or None.
+    for every player right now.  Returns {player_id: URL string or None}.
+
+    Tournament routing depends only on the team, so it is resolved once per
+    team; friendly routing is resolved for all players in one query.
     """
+    next_urls = {}
     try:
         from pfc_core.smart_router import (
             _resolve_tournament_matches,
-            _resolve_friendly_games,
+            _resolve_friendly_games_for_players,
         )
-        candidates = []
         if match_type == 'match':
-            candidates.extend(_resolve_tournament_matches(player_team))
+            team_urls = {}
+            for player, player_team in player_list:
+                if player_team.id not in team_urls:
+                    team_urls[player_team.id] = _best_url(_resolve_tournament_matches(player_team))
+                next_urls[player.id] = team_urls[player_team.id]
         else:
-            candidates.extend(_resolve_friendly_games(player, player_team))
-
-        if not candidates:
-            return None
-        candidates.sort(key=lambda c: c['priority'])
-        return candidates[0]['url']
+            candidates = _resolve_friendly_games_for_players([player.id for player, _team in player_list])
+            for player, _team in player_list:
+                next_urls[player.id] = _best_url(candidates.get(player.id))
     except Exception as exc:
-        logger.warning("_next_url_for_player failed for player %s: %s", getattr(player, 'id', '?'), exc)
-        return None
+        logger.warning("_next_urls_for_players failed for %s players: %s", len(player_list), exc)
+    return next_urls
+
+
+def _codenames_for_players(player_ids):
+    """{player_id: [codename, ...]} in one query."""
+    from friendly_games.models import PlayerCodename
+
+    codenames = {}
+    for player_id, codename in PlayerCodename.objects.filter(
+        player_id__in=player_ids
+    ).values_list('player_id', 'codename'):
+        codenames.setdefault(player_id, []).append(codename)
+    return codenames
 
 
 # ---------------------------------------------------------------------------
-# Internal: low-level group_send wrapper
+# Internal: low-level group_send wrappers
 # ---------------------------------------------------------------------------
 
 def _group_send(channel_layer, group_name: str, payload: dict):
@@ -76,22 +118,57 @@ def _group_send(channel_layer, group_name: str, payload: dict):
         logger.warning("group_send to %s failed: %s", group_name, exc)
 
 
+async def _gather_group_sends(channel_layer, messages):
+    return await asyncio.gather(
+        *(channel_layer.group_send(group_name, payload) for group_name, payload in messages),
+        return_exceptions=True,
+    )
+
+
+def _group_send_many(channel_layer, messages):
+    """
+    Send [(group_name, payload), ...] concurrently in one event-loop hop.
+
+    Logs failures per group and never raises.  Returns the number of failed sends.
+    """
+    if not messages:
+        return 0
+    try:
+        results = async_to_sync(_gather_group_sends)(channel_layer, messages)
+    except Exception as exc:
+        logger.warning("group_send batch of %s failed: %s", len(messages), exc)
+        return len(messages)
+    failures = 0
+    for (group_name, _payload), result in zip(messages, results):
+        if isinstance(result, Exception):
+            failures += 1
+            logger.warning("group_send to %s failed: %s", group_name, result)
+    return failures
+
+
 # ---------------------------------------------------------------------------
 # Internal: broadcast fat payloads to shared + personal groups
 # ---------------------------------------------------------------------------
 
 def _broadcast_to_all(match_type: str, object_id: int, new_status: str,
-                      team1=None, team2=None, player_list=None):
+                      team1=None, team2=None, player_list=None, snapshot=None):
     """
     1. Push a shared payload to the match/game group (spectators).
     2. For each player, compute their next_url and push to "player_{codename}".
 
     player_list: [(player, player_team), ...] — used for friendly games.
     team1/team2: Team model instances — used for tournament matches.
+    snapshot: pfc_events.status snapshot; adds each player's validation
+              routing to their personal payload.
+
+    Returns {"groups", "players", "failed", "resolve_ms", "send_ms"} (None
+    when Channels is not configured).
     """
     channel_layer = get_channel_layer()
     if channel_layer is None:
-        return  # Channels not configured (unit tests)
+        return None  # Channels not configured (unit tests)
+
+    started = time.perf_counter()
 
     # Every connected detail page can use this authoritative URL to replace
     # stale state immediately after a server-side transition.
@@ -103,15 +180,15 @@ def _broadcast_to_all(match_type: str, object_id: int, new_status: str,
 
     # 1. Shared broadcast (spectators / scoreboard_embed)
     shared_group = f"{match_type}_{object_id}"
-    shared_payload = {
+    messages = [(shared_group, {
         "type":       "match.state_changed",
         "match_type": match_type,
         "match_id":   object_id,
         "new_status": new_status,
         "next_url":   None,
         "state_url":  state_url,
-    }
-    _group_send(channel_layer, shared_group, shared_payload)
+        "status_version": snapshot["version"] if snapshot else None,
+    })]
 
     # 2. Build player list from team rosters if not supplied directly
     if player_list is None:
@@ -120,31 +197,65 @@ def _broadcast_to_all(match_type: str, object_id: int, new_status: str,
             if team is None:
                 continue
             try:
-                for p in team.players.select_related('team').all():
+                for p in team.players.all():
                     player_list.append((p, team))
             except Exception as exc:
                 logger.warning("Could not iterate team %s players: %s", getattr(team, 'id', '?'), exc)
 
-    # 3. Personal broadcast per player
-    for player, player_team in player_list:
-        try:
-            codenames = list(player.codenames.values_list('codename', flat=True))
-        except Exception:
-            continue
-        if not codenames:
-            continue
+    # 3. Personal broadcast per player (codenames and next_url resolved in bulk)
+    try:
+        codenames = _codenames_for_players([player.id for player, _team in player_list])
+    except Exception as exc:
+        logger.warning("Could not load codenames for %s %s: %s", match_type, object_id, exc)
+        codenames = {}
+    recipients = [(player, team) for player, team in player_list if codenames.get(player.id)]
+    next_urls = _next_urls_for_players(recipients, match_type) if recipients else {}
 
-        next_url = _next_url_for_player(player, player_team, match_type)
+    for player, player_team in recipients:
         personal_payload = {
             "type":       "match.state_changed",
             "match_type": match_type,
             "match_id":   object_id,
             "new_status": new_status,
-            "next_url":   next_url,
+            "next_url":   next_urls.get(player.id),
             "state_url":  state_url,
+            "status_version": snapshot["version"] if snapshot else None,
+            "personal":   True,
         }
-        for codename in codenames:
-            _group_send(channel_layer, f"player_{codename}", personal_payload)
+        if snapshot:
+            personal_payload.update(status_payload(
+                snapshot, codename=codenames[player.id][0], team_id=player_team.id,
+            ))
+            personal_payload.pop("status")  # already sent as new_status
+        for codename in codenames[player.id]:
+            messages.append((f"player_{codename}", personal_payload))
+
+    resolved = time.perf_counter()
+    failed = _group_send_many(channel_layer, messages)
+    finished = time.perf_counter()
+
+    stats = {
+        "groups": len(messages),
+        "players": len(recipients),
+        "failed": failed,
+        "resolve_ms": round((resolved - started) * 1000, 2),
+        "send_ms": round((finished - resolved) * 1000, 2),
+    }
+    logger.info(
+        "broadcast %s %s -> %s: %s groups, %s players, %s failed, resolve %.1fms, send %.1fms",
+        match_type, object_id, new_status, stats["groups"], stats["players"],
+        stats["failed"], stats["resolve_ms"], stats["send_ms"],
+    )
+    return stats
+
+
+def _refresh_snapshot(kind, object_id):
+    """Recompute the routing snapshot for this transition; None on failure."""
+    try:
+        return refresh_status(kind, object_id)
+    except Exception as exc:
+        logger.warning("Could not build %s %s status snapshot: %s", kind, object_id, exc)
+        return None
 
 
 # ---------------------------------------------------------------------------
@@ -174,14 +285,15 @@ def notify_match_state_changed(match_id: int, new_status: str, match=None):
                     "new_status": new_status,
                     "next_url": None,
                 })
-            return
+            return None
 
-    _broadcast_to_all(
+    return _broadcast_to_all(
         match_type='match',
         object_id=match_id,
         new_status=new_status,
         team1=getattr(match, 'team1', None),
         team2=getattr(match, 'team2', None),
+        snapshot=_refresh_snapshot('match', match_id),
     )
 
 
@@ -197,9 +309,7 @@ def notify_game_state_changed(game_id: int, new_status: str, game=None):
     if game is None:
         try:
             from friendly_games.models import FriendlyGame
-            game = FriendlyGame.objects.prefetch_related(
-                'players__player__team', 'players__player__codenames'
-            ).get(pk=game_id)
+            game = FriendlyGame.objects.get(pk=game_id)
         except Exception as exc:
             logger.warning("notify_game_state_changed: cannot load game %s: %s", game_id, exc)
             channel_layer = get_channel_layer()
@@ -211,7 +321,7 @@ def notify_game_state_changed(game_id: int, new_status: str, game=None):
                     "new_status": new_status,
                     "next_url": None,
                 })
-            return
+            return None
 
     try:
         for gp in game.players.select_related('player', 'player__team').all():
@@ -220,9 +330,10 @@ def notify_game_state_changed(game_id: int, new_status: str, game=None):
     except Exception as exc:
         logger.warning("notify_game_state_changed: player list error: %s", exc)
 
-    _broadcast_to_all(
+    return _broadcast_to_all(
         match_type='game',
         object_id=game_id,
         new_status=new_status,
         player_list=player_list,
+        snapshot=_refresh_snapshot('game', game_id),
     )
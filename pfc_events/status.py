@@ -0,0 +1,175 @@
+"""
+pfc_events/status.py
+====================
+Routing status for match / game detail pages, computed once per transition.
+
+A *status snapshot* holds everything match_status_api / game_status_api need
+to answer any viewer without touching the database:
+
+    {
+        "status":             "<Match/FriendlyGame status>",
+        "submitted_by_team":  <team id> | "BLACK" | "WHITE" | None,
+        "pending":            True when a result waits for validation,
+        "codename_sides":     {codename: team id / side},   # participants
+        "pin_sides":          {team PIN: team id},          # tournament only
+        "validation_urls":    {team id / side: URL},
+        "version":            short hash of the above,
+    }
+
+Snapshots are built by notify_match_state_changed / notify_game_state_changed
+right after a state transition, cached in the "match_status" region and used
+twice: to put each participant's routing fields into their personal
+WebSocket payload, and to serve the conditional (ETag) polling fallback.
+Model saves drop the cached snapshot (pfc_core.cache_invalidation), so a
+transition that is not broadcast is still picked up by the fallback.
+
+Design principles:
+  - Same decisions as the old per-poll code: only the opposing team of a
+    pending result is sent to validation.
+  - The polling fallback costs a cache read; unchanged responses are 304.
+"""
+import hashlib
+import json
+
+from django.http import HttpResponseNotModified, JsonResponse
+from django.urls import reverse
+
+from pfc_core import cache_regions
+
+
+def _region():
+    return cache_regions.region(cache_regions.MATCH_STATUS)
+
+
+def _versioned(snapshot):
+    snapshot["version"] = hashlib.sha1(
+        json.dumps(snapshot, sort_keys=True, default=str).encode()
+    ).hexdigest()[:12]
+    return snapshot
+
+
+def build_match_status(match_id):
+    """Snapshot for tournament match ``match_id`` (None if it does not exist)."""
+    from matches.models import Match, MatchPlayer
+
+    match = Match.objects.select_related('team1', 'team2', 'result').filter(id=match_id).first()
+    if match is None:
+        return None
+
+    snapshot = {
+        "status": match.status,
+        "submitted_by_team": None,
+        "pending": match.status == 'waiting_validation',
+        "codename_sides": {},
+        "pin_sides": {},
+        "validation_urls": {},
+    }
+    if snapshot["pending"]:
+        result = getattr(match, 'result', None)
+        snapshot["submitted_by_team"] = result.submitted_by_id if result else None
+        snapshot["codename_sides"] = {
+            codename: team_id
+            for codename, team_id in MatchPlayer.objects.filter(
+                match=match, player__codename_profile__isnull=False,
+            ).values_list('player__codename_profile__codename', 'team_id')
+        }
+        for team in (match.team1, match.team2):
+            if team is not None:
+                snapshot["pin_sides"][team.pin] = team.id
+                snapshot["validation_urls"][team.id] = reverse('match_validate_result', args=[match.id, team.id])
+    return _versioned(snapshot)
+
+
+def build_game_status(game_id):
+    """Snapshot for friendly game ``game_id`` (None if it does not exist)."""
+    from friendly_games.models import FriendlyGame, FriendlyGamePlayer
+
+    game = FriendlyGame.objects.select_related('result').filter(id=game_id).first()
+    if game is None:
+        return None
+
+    snapshot = {
+        "status": game.status,
+        "submitted_by_team": None,
+        "pending": False,
+        "codename_sides": {},
+        "pin_sides": {},
+        "validation_urls": {},
+    }
+    result = getattr(game, 'result', None)
+    if result is not None and result.is_pending_validation():
+        snapshot["pending"] = True
+        snapshot["submitted_by_team"] = result.submitted_by_team  # 'BLACK' or 'WHITE'
+        snapshot["codename_sides"] = {
+            codename: side
+            for codename, side in FriendlyGamePlayer.objects.filter(
+                game=game, player__codename_profile__isnull=False,
+            ).values_list('player__codename_profile__codename', 'team')
+        }
+        url = reverse('friendly_games:validate_result', args=[game.id])
+        snapshot["validation_urls"] = {'BLACK': url, 'WHITE': url}
+    return _versioned(snapshot)
+
+
+_BUILDERS = {'match': build_match_status, 'game': build_game_status}
+
+
+def refresh_status(kind, object_id):
+    """Rebuild and cache the snapshot for ``kind`` ('match' / 'game') ``object_id``."""
+    snapshot = _BUILDERS[kind](object_id)
+    if snapshot is not None:
+        _region().set((kind, object_id), snapshot)
+    return snapshot
+
+
+def get_status(kind, object_id):
+    """Cached snapshot, built on a miss (None if the object does not exist)."""
+    return _region().get_or_set((kind, object_id), lambda: _BUILDERS[kind](object_id))
+
+
+def forget_status(kind, object_id):
+    _region().forget((kind, object_id))
+
+
+def status_payload(snapshot, codename=None, team_pin=None, team_id=None):
+    """
+    The polling payload for one viewer.
+
+    The viewer's side comes from their codename (participants), then their
+    team PIN session, then ``team_id`` (roster team, used for pushes).
+    """
+    payload = {
+        'status': snapshot["status"],
+        'current_user_team': None,
+        'submitted_by_team': snapshot["submitted_by_team"],
+        'should_redirect_to_validation': False,
+        'validation_url': None,
+    }
+    if not snapshot["pending"]:
+        return payload
+
+    my_side = snapshot["codename_sides"].get(codename.upper() if codename else None)
+    if my_side is None and team_pin:
+        my_side = snapshot["pin_sides"].get(team_pin)
+    if my_side is None and team_id in snapshot["validation_urls"]:
+        my_side = team_id
+
+    payload['current_user_team'] = my_side
+    submitted_by = snapshot["submitted_by_team"]
+    # Opposing team should redirect; submitting team stays
+    if my_side is not None and submitted_by is not None and my_side != submitted_by:
+        payload['should_redirect_to_validation'] = True
+        payload['validation_url'] = snapshot["validation_urls"].get(my_side)
+    return payload
+
+
+def conditional_status_response(request, payload):
+    """JSON response with an ETag; 304 when the client already has this payload."""
+    etag = '"%s"' % hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(payload)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
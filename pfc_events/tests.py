@@ -0,0 +1,187 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from friendly_games.models import PlayerCodename
+from matches.models import Match, MatchResult
+from teams.models import Player, Team
+from tournaments.models import Tournament
+
+from . import push_delivery
+from .models import WebPushOutbox, WebPushSubscription
+from .signals import notify_match_state_changed
+
+
+class RecordingChannelLayer:
+    """Collects group_send calls instead of delivering them."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, message))
+
+
+class PushDeliveryTests(TestCase):
+    def setUp(self):
+        team = Team.objects.create(name="Push team", pin="PUSH01")
+        self.player = Player.objects.create(name="Pushed", team=team)
+        self.first = self._subscription("https://fcm.example/first")
+        self.second = self._subscription("https://fcm.example/second")
+
+    def _subscription(self, endpoint):
+        return WebPushSubscription.objects.create(player=self.player, endpoint=endpoint, p256dh="key", auth="auth")
+
+    def _row(self, subscription, **fields):
+        now = timezone.now()
+        fields.setdefault("expires_at", now + timedelta(minutes=5))
+        return WebPushOutbox.objects.create(subscription=subscription, data="{}", **fields)
+
+    def _claim(self, *rows):
+        claimed = push_delivery.claim_batch(worker_id="test")
+        self.assertEqual({entry.pk for entry in claimed}, {row.pk for row in rows})
+        return {entry.pk: entry for entry in claimed}
+
+    def test_claims_never_overlap(self):
+        due = [self._row(self.first) for _ in range(3)]
+        later = self._row(self.first, next_attempt_at=timezone.now() + timedelta(minutes=1))
+        stale = self._row(self.second, expires_at=timezone.now() - timedelta(seconds=1))
+
+        first = push_delivery.claim_batch(worker_id="w1", limit=2)
+        second = push_delivery.claim_batch(worker_id="w2", limit=2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual({entry.pk for entry in first} | {entry.pk for entry in second}, {row.pk for row in due})
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(first[0].claimed_by, second[0].claimed_by)
+        self.assertEqual(push_delivery.claim_batch(worker_id="w3"), [])
+
+        self.assertEqual(second[0].attempts, 1)
+        self.assertEqual(WebPushOutbox.objects.get(pk=later.pk).status, WebPushOutbox.STATUS_PENDING)
+        self.assertEqual(WebPushOutbox.objects.get(pk=stale.pk).status, WebPushOutbox.STATUS_EXPIRED)
+
+    def test_gone_endpoints_are_deactivated(self):
+        sent, gone = self._row(self.first), self._row(self.second)
+        entries = self._claim(sent, gone)
+        queued = self._row(self.second, next_attempt_at=timezone.now() + timedelta(minutes=1))
+
+        totals = push_delivery._record_results([
+            (entries[sent.pk], "sent", None, None, ""),
+            (entries[gone.pk], "gone", 410, None, "410 Gone"),
+        ])
+
+        self.assertEqual((totals["sent"], totals["gone"]), (1, 1))
+        self.second.refresh_from_db()
+        self.assertFalse(self.second.is_active)
+        self.assertIsNotNone(WebPushSubscription.objects.get(pk=self.first.pk).last_success_at)
+        # Nothing else can reach the dead endpoint either
+        self.assertEqual(
+            set(WebPushOutbox.objects.filter(subscription=self.second).values_list("status", flat=True)),
+            {WebPushOutbox.STATUS_FAILED},
+        )
+        self.assertEqual(WebPushOutbox.objects.get(pk=queued.pk).last_error, "subscription gone")
+
+    def test_not_found_is_treated_as_gone(self):
+        row = self._row(self.first)
+        entries = self._claim(row)
+        push_delivery._record_results([(entries[row.pk], "gone", 404, None, "404 Not Found")])
+        self.assertFalse(WebPushSubscription.objects.get(pk=self.first.pk).is_active)
+
+    def test_retry_backs_off_the_whole_endpoint(self):
+        throttled, failing = self._row(self.first), self._row(self.second)
+        entries = self._claim(throttled, failing)
+        waiting = self._row(self.first)
+        other = self._row(self.second)
+        before = timezone.now()
+
+        push_delivery._record_results([
+            (entries[throttled.pk], "retry", 429, 120, "429 Too Many Requests"),
+            (entries[failing.pk], "retry", 503, None, "503 Service Unavailable"),
+        ])
+
+        # Retry-After wins, and holds back every row of that endpoint
+        for row in (throttled, waiting):
+            row.refresh_from_db()
+            self.assertEqual(row.status, WebPushOutbox.STATUS_PENDING)
+            self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=120))
+        self.assertEqual(throttled.last_status_code, 429)
+        # Without Retry-After the exponential backoff applies, per endpoint
+        backoff = before + push_delivery._backoff(1)
+        for row in (failing, other):
+            row.refresh_from_db()
+            self.assertGreaterEqual(row.next_attempt_at, backoff)
+            self.assertLess(row.next_attempt_at, before + timedelta(seconds=120))
+        self.assertEqual(push_delivery.claim_batch(worker_id="test"), [])
+
+    def test_retries_stop_after_max_attempts(self):
+        row = self._row(self.first, attempts=push_delivery.MAX_ATTEMPTS - 1)
+        entries = self._claim(row)
+        push_delivery._record_results([(entries[row.pk], "retry", 503, None, "503 Service Unavailable")])
+        row.refresh_from_db()
+        self.assertEqual(row.status, WebPushOutbox.STATUS_FAILED)
+        self.assertTrue(WebPushSubscription.objects.get(pk=self.first.pk).is_active)
+
+
+class BroadcastTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        tournament = Tournament.objects.create(
+            name="Broadcast", format="round_robin", play_format="triplet",
+            start_date=now, end_date=now + timedelta(days=1),
+        )
+        self.team1 = Team.objects.create(name="Submitters", pin="CAST01")
+        self.team2 = Team.objects.create(name="Opponents", pin="CAST02")
+        self.match = Match.objects.create(
+            tournament=tournament, team1=self.team1, team2=self.team2, status="waiting_validation",
+        )
+        MatchResult.objects.create(match=self.match, submitted_by=self.team1)
+        self.codenames = {}
+        for team in (self.team1, self.team2):
+            self._add_players(team, 2)
+        # Players without a codename cannot be connected to a personal group
+        Player.objects.create(name="Anonymous", team=self.team2)
+
+    def _add_players(self, team, count):
+        for _ in range(count):
+            player = Player.objects.create(name=f"{team.name} player", team=team)
+            self.codenames[PlayerCodename.objects.create(player=player).codename] = team
+
+    def _broadcast(self):
+        layer = RecordingChannelLayer()
+        match = Match.objects.select_related('team1', 'team2').get(pk=self.match.pk)
+        with mock.patch('pfc_events.signals.get_channel_layer', return_value=layer), \
+                CaptureQueriesContext(connection) as queries:
+            stats = notify_match_state_changed(match.id, match.status, match=match)
+        return layer.sent, stats, len(queries.captured_queries)
+
+    def test_one_message_per_group_with_personal_routing(self):
+        sent, stats, _queries = self._broadcast()
+
+        groups = [group for group, _message in sent]
+        self.assertEqual(sorted(groups), sorted([f"match_{self.match.id}"] + [f"player_{c}" for c in self.codenames]))
+        self.assertEqual(stats["groups"], len(groups))
+        self.assertEqual(stats["players"], len(self.codenames))
+        self.assertEqual(stats["failed"], 0)
+
+        messages = dict(sent)
+        shared = messages[f"match_{self.match.id}"]
+        self.assertIsNone(shared["next_url"])
+        self.assertNotIn("personal", shared)
+        for codename, team in self.codenames.items():
+            personal = messages[f"player_{codename}"]
+            self.assertTrue(personal["personal"])
+            self.assertEqual(personal["type"], "match.state_changed")
+            self.assertEqual(personal["current_user_team"], team.id)
+            self.assertEqual(personal["should_redirect_to_validation"], team == self.team2)
+
+    def test_query_count_does_not_grow_with_the_rosters(self):
+        _sent, _stats, small = self._broadcast()
+        self._add_players(self.team1, 3)
+        self._add_players(self.team2, 3)
+        sent, _stats, large = self._broadcast()
+
+        self.assertEqual(len(sent), 1 + len(self.codenames))
+        self.assertEqual(large, small)
@@ -45,6 +45,7 @@ class PracticeSessionAdmin(admin.ModelAdmin):
         'hits',
         'carreaux',
         'misses',
+        'best_streak',
         'session_duration',
         'hit_percentage_display',
         'carreau_percentage_display',
@@ -63,6 +64,7 @@ class PracticeSessionAdmin(admin.ModelAdmin):
                 'hits', 
                 'carreaux', 
                 'misses',
+                'best_streak',
                 'hit_percentage_display',
                 'carreau_percentage_display'
             )
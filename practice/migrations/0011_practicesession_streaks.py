@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-17 07:36
+
+from django.db import migrations, models
+
+SUCCESS_OUTCOMES = {'hit', 'petit_carreau', 'carreau', 'perfect', 'petit_perfect', 'good', 'fair'}
+
+
+def backfill_streaks(apps, schema_editor):
+    """Compute every session's current and best success streak from its shots, in one pass."""
+    PracticeSession = apps.get_model('practice', 'PracticeSession')
+    Shot = apps.get_model('practice', 'Shot')
+    sessions = []
+    session_id, current, best = None, 0, 0
+
+    def close_session():
+        if session_id is not None and best:
+            sessions.append(PracticeSession(id=session_id, current_streak=current, best_streak=best))
+
+    shots = Shot.objects.order_by('session_id', 'sequence_number').values_list('session_id', 'outcome')
+    for shot_session_id, outcome in shots.iterator(chunk_size=5000):
+        if shot_session_id != session_id:
+            close_session()
+            session_id, current, best = shot_session_id, 0, 0
+            if len(sessions) >= 1000:
+                PracticeSession.objects.bulk_update(sessions, ['current_streak', 'best_streak'])
+                sessions = []
+        current = current + 1 if outcome in SUCCESS_OUTCOMES else 0
+        best = max(best, current)
+    close_session()
+    PracticeSession.objects.bulk_update(sessions, ['current_streak', 'best_streak'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practice', '0010_practicestatistics_total_petit_carreaux'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='practicesession',
+            name='best_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='practicesession',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practice', '0011_practicesession_streaks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shot',
+            name='best_streak_before',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='shot',
+            name='streak_before',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 07:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practice', '0012_shot_streak_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shot',
+            name='client_id',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='shot',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name='shot',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id', ''), _negated=True), fields=('session', 'client_id'), name='unique_practice_shot_client_id'),
+        ),
+    ]
@@ -9,12 +9,54 @@ Adds:
 All new fields are nullable/blank so existing sessions are fully unaffected.
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
 
 
+# Shot outcome -> PracticeSession counter it increments
+OUTCOME_COUNTERS = {
+    # Shooting practice
+    'hit': 'hits',
+    'petit_carreau': 'petit_carreaux',
+    'carreau': 'carreaux',
+    'miss': 'misses',
+    # Pointing practice
+    'perfect': 'perfects',
+    'petit_perfect': 'petit_perfects',
+    'good': 'goods',
+    'fair': 'fairs',
+    'far': 'fars',
+}
+
+# Tir de Précision point value of each scoring outcome (others score 0)
+TDP_POINTS = {
+    'tdp_touche': 1,
+    'tdp_reussi': 3,
+    'tdp_carreau': 5,
+    'tdp_jack_touche': 3,
+    'tdp_jack_reussi': 5,
+}
+
+# Drill types scored with tdp_score
+SCORED_DRILL_TYPES = ('tir_de_precision', 'tactical', 'sequence', 'hidden_target')
+
+# Outcomes that extend a streak (shooting hits and pointing successes)
+SUCCESS_OUTCOMES = frozenset(['hit', 'petit_carreau', 'carreau', 'perfect', 'petit_perfect', 'good', 'fair'])
+
+
+def success_streaks(outcomes):
+    """(current streak, best streak) of consecutive SUCCESS_OUTCOMES in ``outcomes``."""
+    current = best = 0
+    for outcome in outcomes:
+        current = current + 1 if outcome in SUCCESS_OUTCOMES else 0
+        best = max(best, current)
+    return current, best
+
+
 class PracticeSession(models.Model):
     """
     A shooting practice session linked to a player via codename.
@@ -114,6 +156,9 @@ class PracticeSession(models.Model):
         default=0,
         help_text="Total Tir de Précision score (max 100 for a full 20-shot session)"
     )
+    # Streak state: successes since the last failed shot, and the session best
+    current_streak = models.PositiveIntegerField(default=0)
+    best_streak = models.PositiveIntegerField(default=0)
 
     is_active = models.BooleanField(default=True, db_index=True)
 
@@ -179,36 +224,161 @@ class PracticeSession(models.Model):
         return (self.misses / self.total_shots) * 100
 
     def end_session(self):
-        if self.is_active:
-            self.ended_at = timezone.now()
-            self.is_active = False
-            self.save(update_fields=['ended_at', 'is_active'])
+        """
+        End the session; returns False when it had already ended.
+
+        The conditional UPDATE lets exactly one of several concurrent calls
+        end the session, and only that call adds it to the running totals.
+        """
+        ended_at = timezone.now()
+        with transaction.atomic():
+            ended = type(self).objects.filter(pk=self.pk, is_active=True).update(
+                is_active=False, ended_at=ended_at,
+            )
+            if ended:
+                PracticeStatistics.record_session(self)
+        self.is_active = False
+        if ended:
+            self.ended_at = ended_at
+        return bool(ended)
+
+    STATISTICS_FIELDS = [
+        'total_shots', 'hits', 'petit_carreaux', 'carreaux', 'misses',
+        'perfects', 'petit_perfects', 'goods', 'fairs', 'fars', 'tdp_score',
+        'current_streak', 'best_streak',
+    ]
+
+    def lock_statistics(self):
+        """Lock the session row and reload its statistics (call inside a transaction)"""
+        current = type(self).objects.select_for_update().values(*self.STATISTICS_FIELDS).get(pk=self.pk)
+        for field, value in current.items():
+            setattr(self, field, value)
+
+    def _counter_changes(self, outcome, sign):
+        """{counter field: delta} for adding (sign=1) or removing (sign=-1) one shot with ``outcome``"""
+        changes = {'total_shots': sign}
+        counter = OUTCOME_COUNTERS.get(outcome)
+        if counter:
+            changes[counter] = sign
+        if self.drill_type in SCORED_DRILL_TYPES and TDP_POINTS.get(outcome):
+            changes['tdp_score'] = sign * TDP_POINTS[outcome]
+        return changes
+
+    def _write_statistics(self, changes, current_streak, best_streak):
+        """One UPDATE: counters move by ``changes`` (F() expressions), streaks are set"""
+        type(self).objects.filter(pk=self.pk).update(
+            current_streak=current_streak,
+            best_streak=best_streak,
+            **{field: F(field) + delta for field, delta in changes.items()},
+        )
+        for field, delta in changes.items():
+            setattr(self, field, getattr(self, field) + delta)
+        self.current_streak, self.best_streak = current_streak, best_streak
+
+    def apply_shot(self, shot):
+        """
+        Count a newly saved shot into the statistics.
+
+        The caller holds the row lock (Shot.save uses lock_statistics), so the
+        streaks follow from the loaded state; the cost is one UPDATE however
+        many shots the session already has.
+        """
+        streak = self.current_streak + 1 if shot.outcome in SUCCESS_OUTCOMES else 0
+        self._write_statistics(self._counter_changes(shot.outcome, 1), streak, max(self.best_streak, streak))
+
+    def new_shots(self, shots):
+        """The shots of a batch that record_shots would create (client_id not seen yet)."""
+        client_ids = {shot['client_id'] for shot in shots if shot.get('client_id')}
+        seen = set(
+            Shot.objects.filter(session=self, client_id__in=client_ids).values_list('client_id', flat=True)
+        ) if client_ids else set()
+        fresh = []
+        for fields in shots:
+            client_id = fields.get('client_id', '')
+            if client_id:
+                if client_id in seen:
+                    continue
+                seen.add(client_id)
+            fresh.append(fields)
+        return fresh
+
+    def record_shots(self, shots):
+        """
+        Record a batch of shots (dicts of Shot fields) in order.
+
+        Shots whose ``client_id`` the session already has, or that repeat one
+        earlier in the batch, are skipped, so a client can resend a batch it
+        is unsure about.  The batch costs one bulk INSERT and one statistics
+        UPDATE.  Client timestamps are kept, but never later than now.
+
+        Returns (created shots, number of duplicates skipped).
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            self.lock_statistics()
+            sequence_number = self.shots.aggregate(last=Max('sequence_number'))['last'] or 0
+            streak, best = self.current_streak, self.best_streak
+            changes = {}
+            created = []
+            for fields in self.new_shots(shots):
+                sequence_number += 1
+                shot = Shot(session=self, sequence_number=sequence_number, streak_before=streak,
+                            best_streak_before=best, **fields)
+                shot.timestamp = min(shot.timestamp or now, now)
+                created.append(shot)
+                for field, delta in self._counter_changes(shot.outcome, 1).items():
+                    changes[field] = changes.get(field, 0) + delta
+                streak = streak + 1 if shot.outcome in SUCCESS_OUTCOMES else 0
+                best = max(best, streak)
+            if created:
+                Shot.objects.bulk_create(created)
+                self._write_statistics(changes, streak, best)
+        return created, len(shots) - len(created)
+
+    def remove_last_shot(self, shot):
+        """
+        Undo ``shot``, the session's latest, restoring the streaks it snapshotted.
+
+        Returns False when the shot was already gone (e.g. a repeated undo).
+        """
+        with transaction.atomic():
+            self.lock_statistics()
+            deleted, _ = Shot.objects.filter(pk=shot.pk).delete()
+            if not deleted:
+                return False
+            if shot.streak_before is None:
+                # Recorded before shots carried a snapshot
+                self.update_statistics()
+            else:
+                self._write_statistics(
+                    self._counter_changes(shot.outcome, -1), shot.streak_before, shot.best_streak_before
+                )
+        return True
 
     def update_statistics(self):
-        """Recalculate statistics from shots"""
+        """Recalculate statistics from shots: one aggregate query plus one outcome scan for streaks"""
         shots = self.shots.all()
-        self.total_shots = shots.count()
-        # Shooting practice stats
-        self.hits = shots.filter(outcome='hit').count()
-        self.petit_carreaux = shots.filter(outcome='petit_carreau').count()
-        self.carreaux = shots.filter(outcome='carreau').count()
-        self.misses = shots.filter(outcome='miss').count()
-        # Pointing practice stats
-        self.perfects = shots.filter(outcome='perfect').count()
-        self.petit_perfects = shots.filter(outcome='petit_perfect').count()
-        self.goods = shots.filter(outcome='good').count()
-        self.fairs = shots.filter(outcome='fair').count()
-        self.fars = shots.filter(outcome='far').count()
+        totals = shots.aggregate(
+            total_shots=Count('id'),
+            tdp_score=Sum(Case(
+                *[When(outcome=outcome, then=Value(points)) for outcome, points in TDP_POINTS.items()],
+                default=Value(0),
+            )),
+            **{
+                counter: Count('id', filter=Q(outcome=outcome))
+                for outcome, counter in OUTCOME_COUNTERS.items()
+            },
+        )
+        self.total_shots = totals['total_shots']
+        for counter in OUTCOME_COUNTERS.values():
+            setattr(self, counter, totals[counter])
         # Tir de Précision / Tactical / Sequence score (all use tdp_score field)
-        if self.drill_type in ('tir_de_precision', 'tactical', 'sequence', 'hidden_target'):
-            score = 0
-            for s in shots:
-                score += s.tdp_points
-            self.tdp_score = score
-        self.save(update_fields=[
-            'total_shots', 'hits', 'petit_carreaux', 'carreaux', 'misses',
-            'perfects', 'petit_perfects', 'goods', 'fairs', 'fars', 'tdp_score'
-        ])
+        if self.drill_type in SCORED_DRILL_TYPES:
+            self.tdp_score = totals['tdp_score'] or 0
+        self.current_streak, self.best_streak = success_streaks(
+            shots.order_by('sequence_number').values_list('outcome', flat=True)
+        )
+        self.save(update_fields=self.STATISTICS_FIELDS)
 
 
 class Shot(models.Model):
@@ -309,7 +479,7 @@ class Shot(models.Model):
         db_index=True
     )
 
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
 
     # Optional distance measurement (for pointing practice)
     distance_cm = models.PositiveIntegerField(
@@ -334,10 +504,24 @@ class Shot(models.Model):
 
     notes = models.CharField(max_length=200, blank=True)
 
+    # Session streak state just before this shot, restored when it is undone
+    streak_before = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    best_streak_before = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    # Client-generated id of shots recorded offline, makes batch uploads idempotent
+    client_id = models.CharField(max_length=64, blank=True, default='')
+
     class Meta:
         db_table = 'practice_shots'
         ordering = ['sequence_number']
         unique_together = ['session', 'sequence_number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'client_id'],
+                condition=~Q(client_id=''),
+                name='unique_practice_shot_client_id',
+            ),
+        ]
         indexes = [
             models.Index(fields=['session', 'sequence_number']),
             models.Index(fields=['outcome', 'timestamp']),
@@ -349,16 +533,7 @@ class Shot(models.Model):
     @property
     def tdp_points(self):
         """Return the Tir de Précision point value for this shot outcome."""
-        mapping = {
-            'tdp_manque': 0,
-            'tdp_touche': 1,
-            'tdp_reussi': 3,
-            'tdp_carreau': 5,
-            'tdp_jack_manque': 0,
-            'tdp_jack_touche': 3,
-            'tdp_jack_reussi': 5,
-        }
-        return mapping.get(self.outcome, 0)
+        return TDP_POINTS.get(self.outcome, 0)
 
     @property
     def tdp_outcome_label(self):
@@ -375,6 +550,21 @@ class Shot(models.Model):
         return labels.get(self.outcome, self.get_outcome_display())
 
     def save(self, *args, **kwargs):
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            self.session.update_statistics()
+            return
+
+        with transaction.atomic():
+            # The session's counters and streaks change with this shot
+            self.session.lock_statistics()
+            self._assign_sequence_number()
+            self.streak_before = self.session.current_streak
+            self.best_streak_before = self.session.best_streak
+            super().save(*args, **kwargs)
+            self.session.apply_shot(self)
+
+    def _assign_sequence_number(self):
         if not self.sequence_number:
             last_shot = Shot.objects.filter(session=self.session).order_by('-sequence_number').first()
             self.sequence_number = (last_shot.sequence_number + 1) if last_shot else 1
@@ -385,9 +575,6 @@ class Shot(models.Model):
                 from django.core.exceptions import ValidationError
                 raise ValidationError(f"Sequence tracking is ON. Expected shot #{expected_number}, got #{self.sequence_number}")
 
-        super().save(*args, **kwargs)
-        self.session.update_statistics()
-
 
 class PracticeStatistics(models.Model):
     """
@@ -438,56 +625,55 @@ class PracticeStatistics(models.Model):
             return 0.0
         return (self.total_carreaux / self.total_shots) * 100
 
+    @classmethod
+    def record_session(cls, session):
+        """
+        Add a just-ended session to its player's running totals.
+
+        One UPDATE with F() expressions; the first session of a player builds
+        the row from scratch instead (update_for_player).
+        """
+        totals = PracticeSession.objects.filter(pk=session.pk).values(
+            'total_shots', 'hits', 'petit_carreaux', 'carreaux', 'misses', 'best_streak', 'practice_type',
+        ).first()
+        if totals is None:
+            return
+        # best_hit_streak only follows shooting sessions (pointing successes are not hits)
+        best_streak = totals['best_streak'] if totals['practice_type'] == 'shooting' else 0
+        updated = cls.objects.filter(player_codename=session.player_codename).update(
+            total_sessions=F('total_sessions') + 1,
+            total_shots=F('total_shots') + totals['total_shots'],
+            total_hits=F('total_hits') + totals['hits'],
+            total_petit_carreaux=F('total_petit_carreaux') + totals['petit_carreaux'],
+            total_carreaux=F('total_carreaux') + totals['carreaux'],
+            total_misses=F('total_misses') + totals['misses'],
+            best_hit_streak=Greatest(F('best_hit_streak'), Value(best_streak)),
+            last_updated=timezone.now(),
+        )
+        if not updated:
+            cls.update_for_player(session.player_codename)
+
     @classmethod
     def update_for_player(cls, player_codename):
-        sessions = PracticeSession.objects.filter(
+        """Rebuild a player's statistics from their completed sessions in one aggregate query"""
+        totals = PracticeSession.objects.filter(
             player_codename=player_codename,
             is_active=False
+        ).aggregate(
+            total_sessions=Count('id'),
+            total_shots=Sum('total_shots'),
+            total_hits=Sum('hits'),
+            total_petit_carreaux=Sum('petit_carreaux'),
+            total_carreaux=Sum('carreaux'),
+            total_misses=Sum('misses'),
+            best_hit_streak=Max('best_streak', filter=Q(practice_type='shooting')),
         )
 
-        if not sessions.exists():
+        if not totals['total_sessions']:
             return
 
-        total_sessions = sessions.count()
-        total_shots = sum(s.total_shots for s in sessions)
-        total_hits = sum(s.hits for s in sessions)
-        total_petit_carreaux = sum(s.petit_carreaux for s in sessions)
-        total_carreaux = sum(s.carreaux for s in sessions)
-        total_misses = sum(s.misses for s in sessions)
-
-        best_streak = 0
-        for session in sessions:
-            current_streak = 0
-            max_session_streak = 0
-            for shot in session.shots.all():
-                if shot.outcome in ['hit', 'petit_carreau', 'carreau']:
-                    current_streak += 1
-                    max_session_streak = max(max_session_streak, current_streak)
-                else:
-                    current_streak = 0
-            best_streak = max(best_streak, max_session_streak)
-
-        stats, created = cls.objects.get_or_create(
+        stats, created = cls.objects.update_or_create(
             player_codename=player_codename,
-            defaults={
-                'total_sessions': total_sessions,
-                'total_shots': total_shots,
-                'total_hits': total_hits,
-                'total_petit_carreaux': total_petit_carreaux,
-                'total_carreaux': total_carreaux,
-                'total_misses': total_misses,
-                'best_hit_streak': best_streak,
-            }
+            defaults={field: value or 0 for field, value in totals.items()},
         )
-
-        if not created:
-            stats.total_sessions = total_sessions
-            stats.total_shots = total_shots
-            stats.total_hits = total_hits
-            stats.total_petit_carreaux = total_petit_carreaux
-            stats.total_carreaux = total_carreaux
-            stats.total_misses = total_misses
-            stats.best_hit_streak = best_streak
-            stats.save()
-
         return stats
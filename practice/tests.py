@@ -0,0 +1,99 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import PracticeSession, PracticeStatistics, Shot
+
+
+class PracticeStatisticsTests(TestCase):
+    OUTCOMES = ['hit', 'carreau', 'miss', 'petit_carreau', 'hit', 'hit', 'miss', 'carreau']
+
+    def _session(self, outcomes, **kwargs):
+        session = PracticeSession.objects.create(player_codename="SHOOT1", **kwargs)
+        for outcome in outcomes:
+            Shot.objects.create(session=session, outcome=outcome)
+        return session
+
+    def test_incremental_counters_match_a_full_recount(self):
+        session = self._session(self.OUTCOMES)
+        incremental = PracticeSession.objects.values(*PracticeSession.STATISTICS_FIELDS).get(pk=session.pk)
+        self.assertEqual(
+            (incremental['total_shots'], incremental['hits'], incremental['carreaux'], incremental['misses']),
+            (8, 3, 2, 2),
+        )
+        self.assertEqual((incremental['current_streak'], incremental['best_streak']), (1, 3))
+
+        session.update_statistics()
+        self.assertEqual(
+            PracticeSession.objects.values(*PracticeSession.STATISTICS_FIELDS).get(pk=session.pk), incremental
+        )
+
+    def test_shot_cost_does_not_grow_with_the_session(self):
+        session = self._session(['hit'] * 5)
+        with CaptureQueriesContext(connection) as early:
+            Shot.objects.create(session=session, outcome='hit')
+        for _ in range(40):
+            Shot.objects.create(session=session, outcome='miss')
+        with CaptureQueriesContext(connection) as late:
+            Shot.objects.create(session=session, outcome='hit')
+        self.assertEqual(len(early.captured_queries), len(late.captured_queries))
+
+    def test_ended_sessions_are_added_to_running_totals(self):
+        self._session(self.OUTCOMES).end_session()
+        self._session(['hit'] * 4 + ['miss']).end_session()
+        self._session(['perfect'] * 6, practice_type='pointing').end_session()
+
+        running = PracticeStatistics.objects.values().get(player_codename="SHOOT1")
+        self.assertEqual(
+            (running['total_sessions'], running['total_shots'], running['total_hits'], running['best_hit_streak']),
+            (3, 19, 7, 4),
+        )
+        # A second end request (e.g. a stale copy of the session) adds nothing
+        stale = PracticeSession.objects.filter(player_codename="SHOOT1").first()
+        stale.is_active = True
+        self.assertFalse(stale.end_session())
+        self.assertEqual(PracticeStatistics.objects.get(player_codename="SHOOT1").total_sessions, 3)
+
+        PracticeStatistics.update_for_player("SHOOT1")
+        rebuilt = PracticeStatistics.objects.values().get(player_codename="SHOOT1")
+        running.pop('last_updated'), rebuilt.pop('last_updated')
+        self.assertEqual(running, rebuilt)
+
+    def test_undo_restores_the_pre_shot_snapshot(self):
+        session = self._session(['hit', 'hit', 'hit', 'miss', 'hit'])
+        before = PracticeSession.objects.values(*PracticeSession.STATISTICS_FIELDS).get(pk=session.pk)
+        Shot.objects.create(session=session, outcome='carreau')
+        Shot.objects.create(session=session, outcome='hit')
+        Shot.objects.create(session=session, outcome='hit')
+        self.assertEqual((session.current_streak, session.best_streak), (4, 4))
+
+        for _ in range(3):
+            last_shot = session.shots.order_by('-sequence_number').first()
+            self.assertTrue(session.remove_last_shot(last_shot))
+        self.assertFalse(session.remove_last_shot(last_shot))
+
+        self.assertEqual(PracticeSession.objects.values(*PracticeSession.STATISTICS_FIELDS).get(pk=session.pk), before)
+        self.assertEqual((session.total_shots, session.current_streak, session.best_streak), (5, 1, 3))
+
+    def test_batch_matches_single_shots_and_replays_are_skipped(self):
+        single = self._session(self.OUTCOMES)
+        batched = PracticeSession.objects.create(player_codename="SHOOT2")
+        batch = [{'client_id': f'c{i}', 'outcome': outcome} for i, outcome in enumerate(self.OUTCOMES)]
+
+        created, duplicates = batched.record_shots(batch[:5])
+        self.assertEqual((len(created), duplicates), (5, 0))
+        # What the view charges against the rate limit
+        self.assertEqual(batched.new_shots(batch + [batch[-1]]), batch[5:])
+        created, duplicates = batched.record_shots(batch + [batch[-1]])
+        self.assertEqual((len(created), duplicates), (3, 6))
+
+        fields = PracticeSession.STATISTICS_FIELDS
+        self.assertEqual(
+            PracticeSession.objects.values(*fields).get(pk=batched.pk),
+            PracticeSession.objects.values(*fields).get(pk=single.pk),
+        )
+        self.assertEqual(list(batched.shots.values_list('sequence_number', flat=True)), list(range(1, 9)))
+
+        # Batched shots carry their streak snapshot like single ones
+        self.assertTrue(batched.remove_last_shot(created[-1]))
+        self.assertEqual((batched.total_shots, batched.current_streak, batched.best_streak), (7, 0, 3))
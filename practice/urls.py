@@ -16,6 +16,7 @@ urlpatterns = [
     # API endpoints for session management
     path('api/start-session/', views.start_session, name='start_session'),
     path('api/record-shot/', views.record_shot, name='record_shot'),
+    path('api/record-shots/', views.record_shots_batch, name='record_shots_batch'),
     path('api/undo-shot/', views.undo_last_shot, name='undo_shot'),
     path('api/end-session/', views.end_session, name='end_session'),
 
@@ -13,13 +13,19 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.db import transaction
 import json
+import logging
 
 from pfc_core.session_utils import CodenameSessionManager, SessionManager
+from shooting.middleware import consume_shot_allowance
+from shooting.permissions import get_shot_tracker_setting
 from .models import PracticeSession, Shot, PracticeStatistics
 from .utils import calculate_session_summary, get_player_progress_summary
 
+logger = logging.getLogger(__name__)
+
 
 def practice_home(request):
     """Main practice page — shows available practice types."""
@@ -274,6 +280,81 @@ def start_session(request):
         return JsonResponse({'error': 'Failed to start session'}, status=500)
 
 
+# All valid outcomes (regular + TdP)
+VALID_OUTCOMES = [
+    'miss', 'hit', 'petit_carreau', 'carreau',
+    'tdp_manque', 'tdp_touche', 'tdp_reussi', 'tdp_carreau',
+    'tdp_jack_manque', 'tdp_jack_touche', 'tdp_jack_reussi',
+    'perfect', 'petit_perfect', 'good', 'fair', 'far',
+]
+
+
+def _shot_fields(session, outcome, atelier=None, shot_distance=''):
+    """Validated Shot fields for ``session``, or (None, error message)."""
+    if outcome not in VALID_OUTCOMES:
+        return None, 'Invalid shot outcome'
+    fields = {'outcome': outcome}
+    # Validate TdP-specific fields (also used for Tactical, Sequence, and Hidden Target)
+    if session.drill_type in ('tir_de_precision', 'tactical', 'sequence', 'hidden_target'):
+        try:
+            atelier = int(atelier)
+        except (TypeError, ValueError):
+            atelier = None
+        if atelier not in range(1, 6):
+            return None, 'atelier (1-5) required for this drill type'
+        if shot_distance not in Shot.TDP_DISTANCES:
+            return None, 'shot_distance (6m/7m/8m/9m) required for this drill type'
+        fields['atelier'] = atelier
+        fields['shot_distance'] = shot_distance
+    return fields, None
+
+
+def _recent_shots(session):
+    return list(session.shots.order_by('-sequence_number')[:10].values(
+        'sequence_number', 'outcome', 'timestamp', 'atelier', 'shot_distance'
+    ))
+
+
+def _session_stats(session):
+    """Live statistics of ``session`` for the practice UI."""
+    stats = {
+        'total_shots': session.total_shots,
+        'current_streak': session.current_streak,
+    }
+
+    if session.practice_type == 'shooting':
+        if session.drill_type in ('tir_de_precision', 'tactical', 'sequence', 'hidden_target'):
+            stats.update({
+                'tdp_score': session.tdp_score,
+                'misses': session.misses,
+            })
+        else:
+            stats.update({
+                'hits': session.hits,
+                'petit_carreaux': session.petit_carreaux,
+                'carreaux': session.carreaux,
+                'misses': session.misses,
+                'hit_percentage': round(session.hit_percentage, 1),
+                'carreau_percentage': round(session.carreau_percentage, 1),
+            })
+    elif session.practice_type == 'pointing':
+        total = session.total_shots
+        stats.update({
+            'perfects': session.perfects,
+            'petit_perfects': session.petit_perfects,
+            'goods': session.goods,
+            'fairs': session.fairs,
+            'fars': session.fars,
+            'perfect_percentage': round((session.perfects / total * 100) if total > 0 else 0, 1),
+            'good_percentage': round((session.goods / total * 100) if total > 0 else 0, 1),
+            'success_percentage': round(
+                ((session.perfects + session.petit_perfects + session.goods + session.fairs) / total * 100)
+                if total > 0 else 0, 1
+            ),
+        })
+    return stats
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def record_shot(request):
@@ -287,14 +368,7 @@ def record_shot(request):
         atelier = data.get('atelier', None)       # int 1-5, only for TdP
         shot_distance = data.get('shot_distance', '')  # e.g. '6m', only for TdP
 
-        # All valid outcomes (regular + TdP)
-        valid_outcomes = [
-            'miss', 'hit', 'petit_carreau', 'carreau',
-            'tdp_manque', 'tdp_touche', 'tdp_reussi', 'tdp_carreau',
-            'tdp_jack_manque', 'tdp_jack_touche', 'tdp_jack_reussi',
-            'perfect', 'petit_perfect', 'good', 'fair', 'far',
-        ]
-        if outcome not in valid_outcomes:
+        if outcome not in VALID_OUTCOMES:
             return JsonResponse({'error': 'Invalid shot outcome'}, status=400)
 
         codename = CodenameSessionManager.get_logged_in_codename(request)
@@ -307,89 +381,107 @@ def record_shot(request):
         if not session:
             return JsonResponse({'error': 'No active session found'}, status=404)
 
-        # Validate TdP-specific fields (also used for Tactical, Sequence, and Hidden Target)
-        if session.drill_type in ('tir_de_precision', 'tactical', 'sequence', 'hidden_target'):
-            if atelier is None or int(atelier) not in range(1, 6):
-                return JsonResponse({'error': 'atelier (1-5) required for this drill type'}, status=400)
-            if shot_distance not in Shot.TDP_DISTANCES:
-                return JsonResponse({'error': 'shot_distance (6m/7m/8m/9m) required for this drill type'}, status=400)
+        shot_kwargs, error = _shot_fields(session, outcome, atelier, shot_distance)
+        if error:
+            return JsonResponse({'error': error}, status=400)
 
         with transaction.atomic():
-            shot_kwargs = {
-                'session': session,
-                'outcome': outcome,
-            }
-            if session.drill_type in ('tir_de_precision', 'tactical', 'sequence', 'hidden_target'):
-                shot_kwargs['atelier'] = int(atelier)
-                shot_kwargs['shot_distance'] = shot_distance
+            # Shot.save locks the session and counts the shot into it (one UPDATE);
+            # `session` carries the new counters and streak afterwards
+            shot = Shot.objects.create(session=session, **shot_kwargs)
 
-            shot = Shot.objects.create(**shot_kwargs)
-
-            session.refresh_from_db()
-
-            recent_shots = list(session.shots.order_by('-sequence_number')[:10].values(
-                'sequence_number', 'outcome', 'timestamp', 'atelier', 'shot_distance'
-            ))
-
-            current_streak = 0
-            success_outcomes = ['hit', 'petit_carreau', 'carreau', 'perfect', 'petit_perfect', 'good', 'fair']
-            for shot_data in session.shots.order_by('-sequence_number'):
-                if shot_data.outcome in success_outcomes:
-                    current_streak += 1
-                else:
-                    break
+            recent_shots = _recent_shots(session)
 
         response_data = {
             'success': True,
             'shot_number': shot.sequence_number,
             'outcome': outcome,
-            'session_stats': {
-                'total_shots': session.total_shots,
-                'current_streak': current_streak,
-            },
+            'session_stats': _session_stats(session),
             'recent_shots': recent_shots,
         }
-
-        if session.practice_type == 'shooting':
-            if session.drill_type in ('tir_de_precision', 'tactical', 'sequence', 'hidden_target'):
-                response_data['session_stats'].update({
-                    'tdp_score': session.tdp_score,
-                    'tdp_points_this_shot': shot.tdp_points,
-                    'misses': session.misses,
-                })
-            else:
-                response_data['session_stats'].update({
-                    'hits': session.hits,
-                    'petit_carreaux': session.petit_carreaux,
-                    'carreaux': session.carreaux,
-                    'misses': session.misses,
-                    'hit_percentage': round(session.hit_percentage, 1),
-                    'carreau_percentage': round(session.carreau_percentage, 1),
-                })
-        elif session.practice_type == 'pointing':
-            total = session.total_shots
-            response_data['session_stats'].update({
-                'perfects': session.perfects,
-                'petit_perfects': session.petit_perfects,
-                'goods': session.goods,
-                'fairs': session.fairs,
-                'fars': session.fars,
-                'perfect_percentage': round((session.perfects / total * 100) if total > 0 else 0, 1),
-                'good_percentage': round((session.goods / total * 100) if total > 0 else 0, 1),
-                'success_percentage': round(
-                    ((session.perfects + session.petit_perfects + session.goods + session.fairs) / total * 100)
-                    if total > 0 else 0, 1
-                ),
-            })
+        if 'tdp_score' in response_data['session_stats']:
+            response_data['session_stats']['tdp_points_this_shot'] = shot.tdp_points
 
         return JsonResponse(response_data)
 
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON data'}, status=400)
-    except Exception as e:
+    except Exception:
+        logger.exception("Failed to record practice shot")
         return JsonResponse({'error': 'Failed to record shot'}, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def record_shots_batch(request):
+    """
+    Record an ordered batch of shots in the active session.
+
+    For phones that queue shots while offline: body is
+    {"shots": [{"client_id": "...", "outcome": "hit", "atelier": 1,
+    "shot_distance": "6m", "timestamp": "<ISO 8601>"}, ...]}.  client_id
+    makes replays harmless (shots the session already has are skipped);
+    the whole batch is validated first and written with one bulk insert.
+    """
+    if not CodenameSessionManager.is_logged_in(request):
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+    shots = data.get('shots') if isinstance(data, dict) else None
+    if not isinstance(shots, list) or not shots:
+        return JsonResponse({'error': 'shots must be a non-empty list'}, status=400)
+    max_batch = get_shot_tracker_setting('MAX_SHOTS_PER_BATCH', 200)
+    if len(shots) > max_batch:
+        return JsonResponse({'error': f'At most {max_batch} shots per batch'}, status=400)
+
+    codename = CodenameSessionManager.get_logged_in_codename(request)
+    session = PracticeSession.objects.filter(
+        player_codename=codename,
+        is_active=True
+    ).first()
+    if not session:
+        return JsonResponse({'error': 'No active session found'}, status=404)
+
+    batch = []
+    for position, item in enumerate(shots):
+        if not isinstance(item, dict):
+            return JsonResponse({'error': f'shots[{position}]: expected an object'}, status=400)
+        fields, error = _shot_fields(
+            session, item.get('outcome'), item.get('atelier'), item.get('shot_distance', '')
+        )
+        if error:
+            return JsonResponse({'error': f'shots[{position}]: {error}'}, status=400)
+        fields['client_id'] = str(item.get('client_id') or '')[:64]
+        timestamp = parse_datetime(item['timestamp']) if isinstance(item.get('timestamp'), str) else None
+        if timestamp is not None:
+            fields['timestamp'] = timezone.make_aware(timestamp) if timezone.is_naive(timestamp) else timestamp
+        batch.append(fields)
+
+    # Only shots the session does not have yet count against the per-minute limit
+    new_shots = session.new_shots(batch)
+    if new_shots and not consume_shot_allowance(f'practice_shot_rate_limit:{codename}', len(new_shots)):
+        return JsonResponse({'error': 'Rate limit exceeded. Please slow down.', 'retry_after': 60}, status=429)
+
+    try:
+        created, duplicates = session.record_shots(batch)
+        recent_shots = _recent_shots(session)
+    except Exception:
+        logger.exception(f"Failed to record a batch of {len(batch)} practice shots")
+        return JsonResponse({'error': 'Failed to record shots'}, status=500)
+
+    return JsonResponse({
+        'success': True,
+        'accepted': len(created),
+        'duplicates': duplicates,
+        'last_shot_number': created[-1].sequence_number if created else None,
+        'session_stats': _session_stats(session),
+        'recent_shots': recent_shots,
+    })
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def undo_last_shot(request):
@@ -414,19 +506,14 @@ def undo_last_shot(request):
 
     try:
         with transaction.atomic():
-            last_shot.delete()
-            session.update_statistics()
+            if not session.remove_last_shot(last_shot):
+                return JsonResponse({'error': 'No shots to undo'}, status=400)
 
             recent_shots = list(session.shots.order_by('-sequence_number')[:10].values(
                 'sequence_number', 'outcome', 'timestamp', 'atelier', 'shot_distance'
             ))
 
-            current_streak = 0
-            for shot_data in session.shots.order_by('-sequence_number'):
-                if shot_data.outcome in ['hit', 'carreau']:
-                    current_streak += 1
-                else:
-                    break
+            current_streak = session.current_streak
 
         response = {
             'success': True,
@@ -470,8 +557,8 @@ def end_session(request):
 
     try:
         with transaction.atomic():
+            # end_session() adds the session to the player's PracticeStatistics
             session.end_session()
-            PracticeStatistics.update_for_player(codename)
             summary = calculate_session_summary(session)
 
         return JsonResponse({
@@ -11,6 +11,38 @@ from django.conf import settings
 from .permissions import get_shot_tracker_setting
 
 
+def consume_shot_allowance(cache_key, shots=1):
+    """
+    Count ``shots`` against the per-minute shot limit kept under ``cache_key``.
+    
+    Returns False (and gives the shots back) when they would exceed
+    RATE_LIMIT_SHOTS_PER_MINUTE.  Batch uploads count every new shot they
+    carry; a batch that opens the window is let through whole, so an
+    offline backlog larger than the limit (up to MAX_SHOTS_PER_BATCH) can
+    still be replayed, one batch per window.
+    """
+    rate_limit = get_shot_tracker_setting('RATE_LIMIT_SHOTS_PER_MINUTE', 60)
+    
+    # Open a 60 second window if none exists, then count the shots with
+    # an atomic increment (no lost updates between concurrent workers).
+    cache.add(cache_key, 0, 60)
+    try:
+        current_count = cache.incr(cache_key, shots)
+    except ValueError:
+        # Window expired between add() and incr(): these are its first shots
+        cache.add(cache_key, shots, 60)
+        current_count = shots
+    
+    if current_count <= rate_limit or current_count == shots:
+        return True
+    # Rejected shots are not recorded, so they do not use up the window
+    try:
+        cache.decr(cache_key, shots)
+    except ValueError:
+        pass
+    return False
+
+
 class ShotTrackerRateLimitMiddleware:
     """
     Rate limiting middleware for shot recording endpoints
@@ -20,7 +52,8 @@ class ShotTrackerRateLimitMiddleware:
         self.get_response = get_response
         
     def __call__(self, request):
-        # Check if this is a shot recording request
+        # Check if this is a shot recording request (batch uploads are
+        # counted per shot by the view, once the batch has been validated)
         if (request.path.startswith('/api/shoot/') and 
             request.method == 'POST' and 
             '/event/' in request.path):
@@ -40,21 +73,7 @@ class ShotTrackerRateLimitMiddleware:
         if not request.user.is_authenticated:
             return True  # Skip for anonymous users
         
-        # Get rate limit from settings
-        rate_limit = get_shot_tracker_setting('RATE_LIMIT_SHOTS_PER_MINUTE', 60)
-        
-        # Create cache key
-        cache_key = f'shot_rate_limit:{request.user.id}'
-        
-        # Get current count
-        current_count = cache.get(cache_key, 0)
-        
-        if current_count >= rate_limit:
-            return False
-        
-        # Increment counter
-        cache.set(cache_key, current_count + 1, 60)  # 60 second window
-        return True
+        return consume_shot_allowance(f'shot_rate_limit:{request.user.id}')
 
 
 class ShotTrackerSecurityMiddleware:
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 07:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shooting', '0006_alter_shotsession_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shotevent',
+            name='client_id',
+            field=models.CharField(blank=True, default='', help_text='Client-generated id of shots recorded offline (makes batch uploads idempotent)', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='shotevent',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name='shotevent',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id', ''), _negated=True), fields=('session', 'client_id'), name='unique_shot_event_client_id'),
+        ),
+    ]
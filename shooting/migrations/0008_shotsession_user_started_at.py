@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-17 07:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shooting', '0007_shotevent_client_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shotsession',
+            index=models.Index(fields=['user', '-started_at'], name='shooting_sh_user_id_949178_idx'),
+        ),
+    ]
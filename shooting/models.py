@@ -51,6 +51,7 @@ class ShotSession(models.Model):
         ordering = ['-started_at']
         indexes = [
             models.Index(fields=['user', 'mode']),
+            models.Index(fields=['user', '-started_at']),
             models.Index(fields=['match_id']),
             models.Index(fields=['is_active']),
         ]
@@ -97,11 +98,22 @@ class ShotEvent(models.Model):
     session = models.ForeignKey(ShotSession, on_delete=models.CASCADE, related_name='events')
     idx = models.PositiveIntegerField(help_text="Sequential index within session")
     is_hit = models.BooleanField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+    client_id = models.CharField(
+        max_length=64, blank=True, default='',
+        help_text="Client-generated id of shots recorded offline (makes batch uploads idempotent)"
+    )
     
     class Meta:
         ordering = ['idx']
         unique_together = [('session', 'idx')]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'client_id'],
+                condition=~models.Q(client_id=''),
+                name='unique_shot_event_client_id',
+            ),
+        ]
         indexes = [
             models.Index(fields=['session', 'idx']),
             models.Index(fields=['timestamp']),
@@ -184,35 +196,90 @@ class ShotSessionManager:
         Record a shot event and update session counters.
         Returns updated session data and any newly unlocked achievements.
         """
+        result = ShotSessionManager.record_shots(session, [{'is_hit': is_hit}])
+        return {
+            'event': result['events'][0],
+            'session': result['session'],
+            'unlocked_achievements': result['unlocked_achievements']
+        }
+    
+    @staticmethod
+    def new_shots(session, shots):
+        """The shots of a batch that record_shots would create (client_id not seen yet)."""
+        client_ids = {shot['client_id'] for shot in shots if shot.get('client_id')}
+        seen = set(
+            session.events.filter(client_id__in=client_ids).values_list('client_id', flat=True)
+        ) if client_ids else set()
+        fresh = []
+        for shot in shots:
+            client_id = shot.get('client_id') or ''
+            if client_id:
+                if client_id in seen:
+                    continue
+                seen.add(client_id)
+            fresh.append(shot)
+        return fresh
+    
+    @staticmethod
+    def record_shots(session, shots):
+        """
+        Record an ordered batch of shots (dicts with is_hit and optional
+        client_id / timestamp) with one bulk insert and one session update.
+        
+        Shots whose client_id the session already has, or that repeat one
+        earlier in the batch, are skipped so offline clients can safely
+        resend.  Client timestamps are kept, but never later than now.
+        Returns the created events, the session, newly unlocked achievements
+        and the number of duplicates skipped.
+        """
         if not session.is_active:
             raise ValueError("Cannot record shots in an ended session")
         
+        now = timezone.now()
         with transaction.atomic():
-            # Create the shot event
-            event = ShotEvent.objects.create(
-                session=session,
-                is_hit=is_hit
-            )
-            
-            # Update counters
-            session.total_shots += 1
-            if is_hit:
-                session.total_hits += 1
-                session.current_streak += 1
-                session.best_streak = max(session.best_streak, session.current_streak)
-            else:
-                session.current_streak = 0
+            # Serialize concurrent uploads to the same session
+            locked = ShotSession.objects.select_for_update().values(
+                'total_shots', 'total_hits', 'current_streak', 'best_streak'
+            ).get(pk=session.pk)
+            for field, value in locked.items():
+                setattr(session, field, value)
             
-            session.save(update_fields=['total_shots', 'total_hits', 'current_streak', 'best_streak'])
+            next_idx = session.events.aggregate(last=models.Max('idx'))['last']
+            next_idx = 0 if next_idx is None else next_idx + 1
             
-            # Check for new achievements
-            newly_unlocked = ShotSessionManager._check_achievements(session)
+            events = []
+            runs = []  # (streak before, streak after) of every run of hits in the batch
+            for shot in ShotSessionManager.new_shots(session, shots):
+                events.append(ShotEvent(
+                    session=session,
+                    idx=next_idx + len(events),
+                    is_hit=shot['is_hit'],
+                    timestamp=min(shot.get('timestamp') or now, now),
+                    client_id=shot.get('client_id') or '',
+                ))
+                session.total_shots += 1
+                if shot['is_hit']:
+                    if not runs or runs[-1][1] != session.current_streak:
+                        runs.append((session.current_streak, session.current_streak))
+                    session.total_hits += 1
+                    session.current_streak += 1
+                    session.best_streak = max(session.best_streak, session.current_streak)
+                    runs[-1] = (runs[-1][0], session.current_streak)
+                else:
+                    session.current_streak = 0
             
-            return {
-                'event': event,
-                'session': session,
-                'unlocked_achievements': newly_unlocked
-            }
+            unlocked = []
+            if events:
+                ShotEvent.objects.bulk_create(events)
+                session.save(update_fields=['total_shots', 'total_hits', 'current_streak', 'best_streak'])
+                unlocked = ShotSessionManager._check_achievements(session, runs)
+        
+        return {
+            'events': events,
+            'session': session,
+            'unlocked_achievements': unlocked,
+            'duplicates': len(shots) - len(events),
+        }
     
     @staticmethod
     def undo_last_shot(session):
@@ -262,27 +329,35 @@ class ShotSessionManager:
         session.save(update_fields=['total_shots', 'total_hits', 'current_streak', 'best_streak'])
     
     @staticmethod
-    def _check_achievements(session):
-        """Check for newly unlocked achievements based on current streak"""
-        if session.current_streak == 0:
+    def _check_achievements(session, runs):
+        """
+        Award the achievements whose streak threshold was reached by ``runs``
+        ((streak before, streak after) pairs of the hits just recorded).
+        """
+        if not runs or session.user is None:
             return []
         
-        # Get achievements that match current streak
-        matching_achievements = Achievement.objects.filter(
-            threshold=session.current_streak,
+        # Get achievements whose threshold one of the runs passed through
+        candidates = Achievement.objects.filter(
+            threshold__lte=max(after for _before, after in runs),
             is_active=True
         )
+        reached = [
+            achievement for achievement in candidates
+            if any(before < achievement.threshold <= after for before, after in runs)
+        ]
+        if not reached:
+            return []
         
-        newly_unlocked = []
-        for achievement in matching_achievements:
-            # Check if not already earned in this session
-            earned, created = EarnedAchievement.objects.get_or_create(
-                user=session.user,
-                session=session,
-                achievement=achievement
-            )
-            
-            if created:
-                newly_unlocked.append(achievement)
-        
+        # Skip the ones already earned in this session
+        earned = set(
+            EarnedAchievement.objects.filter(
+                session=session, achievement__in=reached
+            ).values_list('achievement_id', flat=True)
+        )
+        newly_unlocked = [achievement for achievement in reached if achievement.id not in earned]
+        EarnedAchievement.objects.bulk_create([
+            EarnedAchievement(user=session.user, session=session, achievement=achievement)
+            for achievement in newly_unlocked
+        ])
         return newly_unlocked
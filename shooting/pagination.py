@@ -0,0 +1,20 @@
+"""
+Pagination for the Shot Accuracy Tracker API
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class SessionCursorPagination(CursorPagination):
+    """
+    Newest sessions first, with an opaque cursor.
+    
+    Unlike page numbers, a cursor stays cheap on the last page of a heavy
+    user (no OFFSET) and does not skip or repeat sessions created while
+    paging.
+    """
+    
+    ordering = ('-started_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -5,6 +5,7 @@ DRF Serializers for Shot Accuracy Tracker API
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import ShotSession, ShotEvent, Achievement, EarnedAchievement
+from .permissions import get_shot_tracker_setting
 
 
 class AchievementSerializer(serializers.ModelSerializer):
@@ -34,12 +35,71 @@ class ShotEventSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'idx', 'timestamp']
 
 
-class ShotSessionSerializer(serializers.ModelSerializer):
-    """Serializer for ShotSession model"""
+def _query_list(serializer, param):
+    """Comma-separated values of query parameter ``param`` of the serializer's request"""
+    request = serializer.context.get('request')
+    if request is None:
+        return None
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Trim a serializer's output from its request's query parameters.
+    
+    ``?fields=a,b`` keeps only those fields (plus ``id``); fields listed in
+    EXPANDABLE_FIELDS are left out unless named in ``?expand=``.
+    """
+    
+    EXPANDABLE_FIELDS = ()
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = _query_list(self, 'expand') or set()
+        for name in set(self.EXPANDABLE_FIELDS) - expand:
+            self.fields.pop(name, None)
+        only = _query_list(self, 'fields')
+        if only:
+            for name in set(self.fields) - only - {'id'}:
+                self.fields.pop(name)
+
+
+def encode_events_compact(events):
+    """
+    Columnar encoding of a session's events (in idx order).
+    
+    idx values are contiguous (events are append-only and undo removes the
+    last one), so ``start_idx`` plus a '1'/'0' hit string carry them; times
+    are milliseconds after the first event.
+    """
+    if not events:
+        return {'start_idx': 0, 'count': 0, 'hits': '', 'first_timestamp': None, 'offsets_ms': []}
+    first = events[0].timestamp
+    return {
+        'start_idx': events[0].idx,
+        'count': len(events),
+        'hits': ''.join('1' if event.is_hit else '0' for event in events),
+        'first_timestamp': first.isoformat(),
+        'offsets_ms': [round((event.timestamp - first).total_seconds() * 1000) for event in events],
+    }
+
+
+class ShotSessionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for ShotSession model
+    
+    Events are embedded only with ``?expand=events``; add
+    ``&event_format=compact`` for the columnar encoding.
+    """
+    
+    EXPANDABLE_FIELDS = ('events',)
     
     hit_rate = serializers.ReadOnlyField()
     hit_percentage = serializers.ReadOnlyField()
-    events = ShotEventSerializer(many=True, read_only=True)
+    events = serializers.SerializerMethodField()
     earned_achievements = EarnedAchievementSerializer(many=True, read_only=True)
     
     class Meta:
@@ -54,6 +114,13 @@ class ShotSessionSerializer(serializers.ModelSerializer):
             'best_streak', 'current_streak', 'hit_rate', 'hit_percentage'
         ]
     
+    def get_events(self, obj):
+        """Events as objects, or columnar with ?event_format=compact (uses the prefetched events)"""
+        events = list(obj.events.all())
+        if 'compact' in (_query_list(self, 'event_format') or ()):
+            return encode_events_compact(events)
+        return ShotEventSerializer(events, many=True).data
+    
     def validate(self, data):
         """Validate session data according to business rules"""
         mode = data.get('mode')
@@ -108,6 +175,29 @@ class ShotEventCreateSerializer(serializers.Serializer):
         return value
 
 
+class ShotEventBatchItemSerializer(serializers.Serializer):
+    """One shot of a batch upload"""
+    
+    client_id = serializers.CharField(max_length=64, required=False, allow_blank=True, default='')
+    is_hit = serializers.BooleanField()
+    timestamp = serializers.DateTimeField(required=False)
+
+
+class ShotEventBatchSerializer(serializers.Serializer):
+    """Serializer for batch uploads of shots recorded offline, in order"""
+    
+    shots = ShotEventBatchItemSerializer(many=True)
+    
+    def validate_shots(self, value):
+        """Reject empty and oversized batches"""
+        max_batch = get_shot_tracker_setting('MAX_SHOTS_PER_BATCH', 200)
+        if not value:
+            raise serializers.ValidationError("At least one shot is required")
+        if len(value) > max_batch:
+            raise serializers.ValidationError(f"At most {max_batch} shots per batch")
+        return value
+
+
 class SessionSummarySerializer(serializers.Serializer):
     """Serializer for session summary responses"""
     
@@ -145,8 +235,8 @@ class SessionSummarySerializer(serializers.Serializer):
             }
 
 
-class SessionListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for session lists"""
+class SessionListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Lightweight serializer for session lists (supports ?fields=)"""
     
     hit_percentage = serializers.ReadOnlyField()
     duration = serializers.SerializerMethodField()
@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .models import Achievement, EarnedAchievement, ShotSession, ShotSessionManager
+
+
+class ShotBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("shooter", password="pw")
+        self.session = ShotSession.objects.create(user=self.user, mode="practice")
+        # Seeded achievements start at 5 in a row
+        for threshold in (2, 3):
+            Achievement.objects.create(code=f"TEST_STREAK_{threshold}", name=f"{threshold} in a row", threshold=threshold)
+
+    def test_batch_upload_is_idempotent_and_awards_passed_thresholds(self):
+        hits = [True, True, True, False, True]
+        shots = [{'client_id': f'e{i}', 'is_hit': is_hit} for i, is_hit in enumerate(hits)]
+        self.client.force_login(self.user)
+        url = f"/api/shoot/sessions/{self.session.pk}/events/batch/"
+
+        response = self.client.post(url, {'shots': shots}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['accepted'], body['duplicates']), (5, 0))
+        self.assertEqual((body['total_shots'], body['total_hits'], body['best_streak']), (5, 4, 3))
+        self.assertEqual([a['code'] for a in body['unlocked']], ['TEST_STREAK_2', 'TEST_STREAK_3'])
+
+        response = self.client.post(url, {'shots': shots}, content_type="application/json")
+        self.assertEqual((response.json()['accepted'], response.json()['duplicates']), (0, 5))
+
+        result = ShotSessionManager.record_shot(self.session, True)
+        self.assertEqual(result['event'].idx, 5)
+        self.assertEqual((self.session.current_streak, result['unlocked_achievements']), (2, []))
+        self.assertEqual(EarnedAchievement.objects.filter(session=self.session).count(), 2)
+
+    def test_batch_shots_count_against_the_rate_limit(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        url = f"/api/shoot/sessions/{self.session.pk}/events/batch/"
+
+        def post(first, count):
+            shots = [{'client_id': f'r{i}', 'is_hit': True} for i in range(first, first + count)]
+            return self.client.post(url, {'shots': shots}, content_type="application/json")
+
+        with override_settings(SHOT_TRACKER_SETTINGS={**settings.SHOT_TRACKER_SETTINGS, 'RATE_LIMIT_SHOTS_PER_MINUTE': 4}):
+            # An offline backlog over the limit goes through when it opens the window
+            self.assertEqual(post(0, 6).status_code, 200)
+            self.assertEqual(post(6, 1).status_code, 429)
+            # A resent batch only has duplicates, which are not charged
+            resent = post(0, 6)
+            self.assertEqual(resent.status_code, 200)
+            self.assertEqual(resent.json()['accepted'], 0)
+        self.assertEqual(ShotSession.objects.get(pk=self.session.pk).total_shots, 6)
+
+
+class SessionApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("reader", password="pw")
+        self.sessions = []
+        for hits in ([True, False, True, True], [False], [True, True]):
+            session = ShotSession.objects.create(user=self.user, mode="practice")
+            ShotSessionManager.record_shots(session, [{'is_hit': is_hit} for is_hit in hits])
+            self.sessions.append(session)
+        self.client.force_login(self.user)
+
+    def test_detail_embeds_events_only_on_demand(self):
+        url = f"/api/shoot/sessions/{self.sessions[0].pk}/"
+        body = self.client.get(url).json()
+        self.assertNotIn('events', body)
+        self.assertEqual(body['total_shots'], 4)
+
+        body = self.client.get(url, {'expand': 'events', 'event_format': 'compact'}).json()
+        self.assertEqual((body['events']['start_idx'], body['events']['hits']), (0, '1011'))
+        self.assertEqual(len(body['events']['offsets_ms']), 4)
+
+        body = self.client.get(url, {'expand': 'events', 'fields': 'events,total_hits'}).json()
+        self.assertEqual(set(body), {'id', 'events', 'total_hits'})
+        self.assertEqual([event['is_hit'] for event in body['events']], [True, False, True, True])
+
+    def test_list_is_cursor_paginated(self):
+        page = self.client.get("/api/shoot/sessions/", {'page_size': 2}).json()
+        self.assertEqual(len(page['results']), 2)
+        rest = self.client.get(page['next']).json()
+        self.assertIsNone(rest['next'])
+        ids = [row['id'] for row in page['results'] + rest['results']]
+        self.assertEqual(ids, [str(session.pk) for session in reversed(self.sessions)])
+
+    def test_user_stats_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get("/api/shoot/user-stats/").json()
+        stats_queries = [q for q in queries.captured_queries if 'shooting_' in q['sql']]
+        self.assertEqual(len(stats_queries), 1)
+        self.assertEqual(
+            (body['total_sessions'], body['total_shots'], body['total_hits'], body['best_streak_ever']),
+            (3, 7, 5, 2),
+        )
+        self.assertEqual(len(body['recent_sessions']), 3)
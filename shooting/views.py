@@ -9,7 +9,8 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
-from django.db.models import Sum, Max, Count, Q
+from django.db.models import Sum, Max, Count, Q, Prefetch, Window, Subquery, OuterRef, IntegerField
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.cache import cache
 from django.conf import settings
@@ -17,11 +18,24 @@ import time
 
 from .models import ShotSession, ShotEvent, Achievement, EarnedAchievement, ShotSessionManager
 from .serializers import (
-    ShotSessionSerializer, ShotSessionCreateSerializer, ShotEventCreateSerializer,
+    ShotSessionSerializer, ShotSessionCreateSerializer, ShotEventCreateSerializer, ShotEventBatchSerializer,
     SessionSummarySerializer, AchievementSerializer, SessionListSerializer,
     UserStatsSerializer
 )
-from .permissions import CanAccessSession, CanCreateSession
+from .pagination import SessionCursorPagination
+from .middleware import consume_shot_allowance
+from .permissions import CanAccessSession, CanCreateSession, get_shot_tracker_setting
+
+
+def _prefetch_session_details(queryset, request):
+    """Prefetch what ShotSessionSerializer nests: achievements always, events only when expanded"""
+    queryset = queryset.prefetch_related(
+        Prefetch('earned_achievements', queryset=EarnedAchievement.objects.select_related('achievement'))
+    )
+    expand = {item.strip() for item in request.query_params.get('expand', '').split(',')}
+    if 'events' in expand:
+        queryset = queryset.prefetch_related(Prefetch('events', queryset=ShotEvent.objects.order_by('idx')))
+    return queryset
 
 
 class ShotSessionViewSet(ModelViewSet):
@@ -31,14 +45,18 @@ class ShotSessionViewSet(ModelViewSet):
     
     serializer_class = ShotSessionSerializer
     permission_classes = []  # Temporarily allow anonymous access for testing
+    pagination_class = SessionCursorPagination
     
     def get_queryset(self):
         """Filter sessions by current user or allow anonymous sessions"""
         if self.request.user.is_authenticated:
-            return ShotSession.objects.filter(user=self.request.user)
+            queryset = ShotSession.objects.filter(user=self.request.user)
         else:
             # For anonymous users, return sessions without user (testing mode)
-            return ShotSession.objects.filter(user__isnull=True)
+            queryset = ShotSession.objects.filter(user__isnull=True)
+        if self.action == 'retrieve':
+            queryset = _prefetch_session_details(queryset, self.request)
+        return queryset
     
     def get_serializer_class(self):
         """Use different serializers for different actions"""
@@ -151,6 +169,64 @@ class ShotSessionViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    @action(detail=True, methods=['post'], url_path='events/batch')
+    def events_batch(self, request, pk=None):
+        """
+        Add an ordered batch of shot events, e.g. shots recorded offline.
+        
+        Shots carrying a client_id the session already has are skipped, so
+        a batch can be resent until the client sees a response.  Only the
+        shots that will be created count against the per-minute shot limit.
+        """
+        session = self.get_object()
+        
+        # Check session permissions
+        if not self._can_modify_session(request.user, session):
+            return Response(
+                {'error': 'You do not have permission to modify this session'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        # Check if session is active
+        if not session.is_active:
+            return Response(
+                {'error': 'Cannot add events to an ended session'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        batch_serializer = ShotEventBatchSerializer(data=request.data)
+        batch_serializer.is_valid(raise_exception=True)
+        shots = batch_serializer.validated_data['shots']
+        
+        new_shots = ShotSessionManager.new_shots(session, shots)
+        max_shots = get_shot_tracker_setting('MAX_SHOTS_PER_SESSION', 1000)
+        if session.total_shots + len(new_shots) > max_shots:
+            return Response(
+                {'error': f'A session holds at most {max_shots} shots'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if new_shots and request.user.is_authenticated and not consume_shot_allowance(
+            f'shot_rate_limit:{request.user.id}', len(new_shots)
+        ):
+            return Response(
+                {'error': 'Rate limit exceeded. Please slow down.', 'retry_after': 60},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+        
+        try:
+            result = ShotSessionManager.record_shots(session, shots)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        response_data = SessionSummarySerializer(result).data
+        response_data['accepted'] = len(result['events'])
+        response_data['duplicates'] = result['duplicates']
+        return Response(response_data, status=status.HTTP_200_OK)
+    
     @action(detail=True, methods=['post'])
     def undo(self, request, pk=None):
         """Undo the last shot event"""
@@ -263,22 +339,36 @@ class UserStatsView(APIView):
         """Get comprehensive user shooting statistics"""
         user = request.user
         
-        # Get user's sessions
-        sessions = ShotSession.objects.filter(user=user)
-        
-        # Calculate aggregate stats
-        stats = sessions.aggregate(
-            total_sessions=Count('id'),
-            total_shots=Sum('total_shots'),
-            total_hits=Sum('total_hits'),
-            best_streak_ever=Max('best_streak')
+        # One query: the 10 most recent sessions, each annotated with the
+        # user's totals (window aggregates run before the LIMIT) and
+        # achievement count
+        totals = {'partition_by': 'user'}
+        achievements = (
+            EarnedAchievement.objects.filter(user=OuterRef('user'))
+            .values('user').annotate(count=Count('id')).values('count')
+        )
+        recent_sessions = list(
+            ShotSession.objects.filter(user=user)
+            .annotate(
+                user_total_sessions=Window(Count('id'), **totals),
+                user_total_shots=Window(Sum('total_shots'), **totals),
+                user_total_hits=Window(Sum('total_hits'), **totals),
+                user_best_streak=Window(Max('best_streak'), **totals),
+                user_achievements=Coalesce(Subquery(achievements, output_field=IntegerField()), 0),
+            )
+            .order_by('-started_at')[:10]
         )
         
-        # Handle null values
-        stats['total_sessions'] = stats['total_sessions'] or 0
-        stats['total_shots'] = stats['total_shots'] or 0
-        stats['total_hits'] = stats['total_hits'] or 0
-        stats['best_streak_ever'] = stats['best_streak_ever'] or 0
+        # Handle users without sessions (they cannot have achievements either)
+        latest = recent_sessions[0] if recent_sessions else None
+        stats = {
+            'total_sessions': latest.user_total_sessions if latest else 0,
+            'total_shots': (latest.user_total_shots or 0) if latest else 0,
+            'total_hits': (latest.user_total_hits or 0) if latest else 0,
+            'best_streak_ever': (latest.user_best_streak or 0) if latest else 0,
+            'achievements_count': latest.user_achievements if latest else 0,
+            'recent_sessions': recent_sessions,
+        }
         
         # Calculate overall hit rate
         if stats['total_shots'] > 0:
@@ -286,12 +376,6 @@ class UserStatsView(APIView):
         else:
             stats['overall_hit_rate'] = 0.0
         
-        # Count achievements
-        stats['achievements_count'] = EarnedAchievement.objects.filter(user=user).count()
-        
-        # Get recent sessions
-        stats['recent_sessions'] = sessions.order_by('-started_at')[:10]
-        
         serializer = UserStatsSerializer(stats)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -316,13 +400,12 @@ class AchievementListView(APIView):
 @permission_classes([])  # Temporarily allow anonymous access
 def active_session(request):
     """Get user's current active session if any"""
-    active_session = ShotSession.objects.filter(
-        user=request.user,
-        is_active=True
+    active_session = _prefetch_session_details(
+        ShotSession.objects.filter(user=request.user, is_active=True), request
     ).first()
     
     if active_session:
-        serializer = ShotSessionSerializer(active_session)
+        serializer = ShotSessionSerializer(active_session, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
     else:
         return Response(
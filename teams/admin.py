@@ -389,16 +389,15 @@ class PlayerProfileAdmin(admin.ModelAdmin):
     
     def rating_history_display(self, obj):
         """Display rating history in a readable format"""
-        if not obj.rating_history:
+        # Show last 10 entries
+        recent_history = obj.get_rating_history(limit=10)
+        if not recent_history:
             return "No rating history yet"
         
         history_html = '<div style="max-height: 200px; overflow-y: auto;">'
         history_html += '<table style="width: 100%; font-size: 12px;">'
         history_html += '<tr style="background-color: #f8f9fa;"><th>Date</th><th>Change</th><th>New Rating</th><th>Match</th></tr>'
         
-        # Show last 10 entries
-        recent_history = obj.rating_history[-10:] if len(obj.rating_history) > 10 else obj.rating_history
-        
         for entry in reversed(recent_history):  # Most recent first
             try:
                 date = entry.get('timestamp', 'Unknown')[:10]  # Just the date part
@@ -422,8 +421,9 @@ class PlayerProfileAdmin(admin.ModelAdmin):
                 
         history_html += '</table></div>'
         
-        if len(obj.rating_history) > 10:
-            history_html += f'<p style="font-style: italic; margin-top: 10px;">Showing last 10 of {len(obj.rating_history)} entries</p>'
+        total_entries = obj.player.rating_events.count()
+        if total_entries > 10:
+            history_html += f'<p style="font-style: italic; margin-top: 10px;">Showing last 10 of {total_entries} entries</p>'
             
         return history_html
     rating_history_display.allow_tags = True
@@ -6,4 +6,4 @@ class TeamsConfig(AppConfig):
     name = 'teams'
 
     def ready(self):
-        import teams.signals  # noqa: F401 — registers post_save signal for Team
+        import teams.signals  # noqa: F401 — registers Team profile and player stats signals
@@ -0,0 +1,39 @@
+"""
+Django management command that rebuilds PlayerStatsSnapshot rows from
+TeamMatchParticipant data
+Usage: python manage.py rebuild_player_stats [--player 12 --player 34] [--batch-size 500]
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from teams.models import PlayerStatsSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized player statistics used by the player leaderboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--player',
+            type=int,
+            action='append',
+            dest='player_ids',
+            help='Only rebuild this player id (repeatable; default: all players)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Snapshots written per upsert statement (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = PlayerStatsSnapshot.rebuild(
+            player_ids=options['player_ids'],
+            batch_size=options['batch_size'],
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {written} player stats snapshots in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,53 @@
+"""
+Django management command that recomputes every player rating from the
+RatingEvent log
+Usage: python manage.py replay_ratings [--apply] [--tolerance 0.01] [--batch-size 500]
+
+Without --apply the command only reports how far stored ratings are from
+the replayed ones.
+"""
+
+from django.core.management.base import BaseCommand
+from teams.rating_replay import replay_ratings
+
+
+class Command(BaseCommand):
+    help = 'Replay the rating event log and report (or fix) drifted player ratings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='Write replayed ratings to drifted player profiles'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.01,
+            help='Largest difference still counted as in sync (default: 0.01)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Profiles written per UPDATE statement (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        result = replay_ratings(
+            apply=options['apply'],
+            tolerance=options['tolerance'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(f"events            {result.events}")
+        self.stdout.write(f"matches           {result.matches}")
+        self.stdout.write(f"players           {len(result.ratings)}")
+        self.stdout.write(f"drifted profiles  {result.drifted}")
+        self.stdout.write(f"max drift         {result.max_drift:.2f}")
+        self.stdout.write(f"replay time       {result.elapsed * 1000:.0f} ms")
+        if options['apply']:
+            self.stdout.write(self.style.SUCCESS(f'Updated {result.updated} player ratings'))
+        elif result.drifted:
+            self.stdout.write(self.style.WARNING('Run with --apply to write the replayed ratings'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All player ratings match the event log'))
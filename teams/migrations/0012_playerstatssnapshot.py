@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-17 06:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0011_playerprofile_privacy_boules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches_played', models.PositiveIntegerField(default=0)),
+                ('matches_won', models.PositiveIntegerField(default=0)),
+                ('matches_lost', models.PositiveIntegerField(default=0)),
+                ('matches_drawn', models.PositiveIntegerField(default=0)),
+                ('win_rate', models.FloatField(default=0.0, help_text='Percentage, one decimal')),
+                ('pointer_played', models.PositiveIntegerField(default=0)),
+                ('pointer_won', models.PositiveIntegerField(default=0)),
+                ('pointer_win_rate', models.FloatField(default=0.0)),
+                ('milieu_played', models.PositiveIntegerField(default=0)),
+                ('milieu_won', models.PositiveIntegerField(default=0)),
+                ('milieu_win_rate', models.FloatField(default=0.0)),
+                ('tirer_played', models.PositiveIntegerField(default=0)),
+                ('tirer_won', models.PositiveIntegerField(default=0)),
+                ('tirer_win_rate', models.FloatField(default=0.0)),
+                ('flex_played', models.PositiveIntegerField(default=0)),
+                ('flex_won', models.PositiveIntegerField(default=0)),
+                ('flex_win_rate', models.FloatField(default=0.0)),
+                ('best_position', models.CharField(blank=True, default='', max_length=20)),
+                ('best_position_win_rate', models.FloatField(default=0.0)),
+                ('format_stats', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats_snapshot', to='teams.player')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-win_rate', 'matches_played'], name='teams_playe_win_rat_7277df_idx'), models.Index(fields=['matches_played'], name='teams_playe_matches_06090b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2 on 2026-10-17 07:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def copy_rating_history(apps, schema_editor):
+    """
+    Copy each profile's rating_history JSON entries into RatingEvent rows.
+    Friendly games were recorded with match_id "friendly_<id>".
+    """
+    PlayerProfile = apps.get_model('teams', 'PlayerProfile')
+    RatingEvent = apps.get_model('teams', 'RatingEvent')
+    events = []
+    profiles = PlayerProfile.objects.exclude(rating_history=[]).values_list('player_id', 'rating_history')
+    for player_id, history in profiles.iterator():
+        if not isinstance(history, list):
+            continue
+        for entry in history:
+            try:
+                timestamp = parse_datetime(entry['timestamp'])
+                if timestamp is None:
+                    continue
+                match_type = entry.get('match_type') or 'tournament'
+                match_id = entry.get('match_id')
+                if isinstance(match_id, str) and match_id.startswith('friendly_'):
+                    match_type, match_id = 'friendly', match_id[len('friendly_'):]
+                events.append(RatingEvent(
+                    player_id=player_id,
+                    match_type=match_type,
+                    match_id=int(match_id) if match_id else None,
+                    old_value=float(entry['old_value']),
+                    new_value=float(entry['new_value']),
+                    change=float(entry.get('change', entry['new_value'] - entry['old_value'])),
+                    opponent_value=float(entry.get('opponent_value') or 0.0),
+                    own_score=int(entry.get('own_score') or 0),
+                    opponent_score=int(entry.get('opponent_score') or 0),
+                    timestamp=timestamp,
+                ))
+            except (KeyError, TypeError, ValueError):
+                continue
+        if len(events) >= 1000:
+            RatingEvent.objects.bulk_create(events)
+            events = []
+    RatingEvent.objects.bulk_create(events)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0012_playerstatssnapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='playerprofile',
+            name='rating_history',
+            field=models.JSONField(blank=True, default=list, help_text='Legacy rating history; superseded by RatingEvent and no longer written'),
+        ),
+        migrations.CreateModel(
+            name='RatingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_type', models.CharField(choices=[('tournament', 'Tournament'), ('friendly', 'Friendly')], default='tournament', max_length=20)),
+                ('match_id', models.PositiveIntegerField(blank=True, help_text='Match or FriendlyGame id, depending on match_type', null=True)),
+                ('old_value', models.FloatField()),
+                ('new_value', models.FloatField()),
+                ('change', models.FloatField()),
+                ('opponent_value', models.FloatField()),
+                ('own_score', models.IntegerField(default=0)),
+                ('opponent_score', models.IntegerField(default=0)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_events', to='teams.player')),
+            ],
+            options={
+                'ordering': ['timestamp', 'id'],
+                'indexes': [models.Index(fields=['player', 'timestamp'], name='teams_ratin_player__925a77_idx'), models.Index(fields=['timestamp'], name='teams_ratin_timesta_859213_idx'), models.Index(fields=['match_type', 'match_id'], name='teams_ratin_match_t_1be254_idx')],
+            },
+        ),
+        migrations.RunPython(copy_rating_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2 on 2026-10-17 07:47
+
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+
+def normalize_name(text):
+    # Copy of pfc_core.name_search.normalize_name at the time of this migration
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())[:200]
+
+
+def backfill_search_names(apps, schema_editor):
+    for model_name in ('Team', 'Player'):
+        model = apps.get_model('teams', model_name)
+        batch = []
+        for row in model.objects.only('id', 'name').iterator(chunk_size=2000):
+            row.search_name = normalize_name(row.name)
+            batch.append(row)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, ['search_name'])
+                batch = []
+        model.objects.bulk_update(batch, ['search_name'])
+
+
+TRIGRAM_INDEXES = (
+    ('teams_team_search_name_trgm', 'teams_team'),
+    ('teams_player_search_name_trgm', 'teams_player'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """GIN trigram indexes for substring search; PostgreSQL only (other backends search in process)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except Exception as exc:
+        # Without the extension substring matches fall back to a sequential scan
+        print(f"\n  pg_trgm unavailable, skipping trigram indexes: {exc}")
+        return
+    for index_name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} USING gin (search_name gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _table in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0013_ratingevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(backfill_search_names, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
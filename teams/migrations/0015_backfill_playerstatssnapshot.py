@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def backfill_player_stats(apps, schema_editor):
+    """Build every player's snapshot, so the player leaderboard is populated on deploy."""
+    from teams.stats_models import rebuild_snapshots
+
+    rebuild_snapshots(
+        apps.get_model('teams', 'PlayerStatsSnapshot'),
+        apps.get_model('matches', 'TeamMatchParticipant'),
+        apps.get_model('teams', 'Player'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0014_search_name'),
+        ('matches', '0016_match_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_player_stats, migrations.RunPython.noop),
+    ]
@@ -8,6 +8,7 @@ from django.utils import timezone
 from datetime import datetime
 import json
 from django.core.exceptions import ValidationError
+from pfc_core.name_search import SEARCH_NAME_MAX_LENGTH, normalize_name
 from pfc_core.media_uploads import (
     player_profile_picture_path,
     team_logo_path,
@@ -27,6 +28,8 @@ def generate_pin():
 class Team(models.Model):
     """Team model for storing team information"""
     name = models.CharField(max_length=100)
+    # normalize_name(name), kept by save(); see pfc_core.name_search
+    search_name = models.CharField(max_length=SEARCH_NAME_MAX_LENGTH, blank=True, default='', editable=False, db_index=True)
     pin = models.CharField(max_length=6, unique=True, default=generate_pin)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -67,6 +70,13 @@ class Team(models.Model):
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+    
     def get_pin(self, user=None):
         """
         Return the PIN only if the user is staff, otherwise return masked PIN
@@ -116,6 +126,8 @@ class Team(models.Model):
 class Player(models.Model):
     """Player model for storing player information"""
     name = models.CharField(max_length=100)
+    # normalize_name(name), kept by save(); see pfc_core.name_search
+    search_name = models.CharField(max_length=SEARCH_NAME_MAX_LENGTH, blank=True, default='', editable=False, db_index=True)
     team = models.ForeignKey(Team, related_name='players', on_delete=models.CASCADE)
     is_captain = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -123,6 +135,13 @@ class Player(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.team.name})"
+    
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
 
 class TeamAvailability(models.Model):
     """Model for tracking team availability for tournaments"""
@@ -179,7 +198,7 @@ class PlayerProfile(models.Model):
     rating_history = models.JSONField(
         default=list,
         blank=True,
-        help_text="History of rating changes with timestamps and match details"
+        help_text="Legacy rating history; superseded by RatingEvent and no longer written"
     )
     
     # Preferences
@@ -611,26 +630,7 @@ class PlayerProfile(models.Model):
             float: Rating change (positive for improvement, negative for decline)
         """
         try:
-            # Base calculation factors
-            score_difference = own_score - opponent_score
-            rating_ratio = opponent_value / max(self.value, 1.0)  # Avoid division by zero
-            
-            # Determine if this was a win, loss, or draw
-            if score_difference > 0:  # Win
-                # Winning against higher-rated opponent gives more points
-                base_change = abs(score_difference) * rating_ratio * 0.5
-                rating_change = min(base_change, 20.0)  # Cap maximum gain
-            elif score_difference < 0:  # Loss
-                # Losing to lower-rated opponent loses more points
-                base_change = abs(score_difference) * (self.value / max(opponent_value, 1.0)) * 0.5
-                rating_change = -min(base_change, 15.0)  # Cap maximum loss
-            else:  # Draw (rare in petanque, but handle it)
-                # Small adjustment based on rating difference
-                rating_change = (opponent_value - self.value) * 0.1
-                rating_change = max(-2.0, min(2.0, rating_change))  # Small adjustment
-            
-            return round(rating_change, 2)
-            
+            return rating_change(self.value, opponent_value, own_score, opponent_score)
         except Exception as e:
             # If calculation fails, return 0 (no rating change)
             print(f"Rating calculation error for {self.player}: {e}")
@@ -652,6 +652,10 @@ class PlayerProfile(models.Model):
             bool: True if update successful, False otherwise
         """
         try:
+            # Legacy callers pass friendly games as "friendly_<id>"
+            if isinstance(match_id, str) and match_id.startswith('friendly_'):
+                match_type, match_id = 'friendly', match_id[len('friendly_'):]
+            
             with transaction.atomic():
                 # Calculate rating change
                 rating_change = self.calculate_rating_change(opponent_value, own_score, opponent_score)
@@ -662,33 +666,21 @@ class PlayerProfile(models.Model):
                 # Apply rating change
                 self.value = max(0.0, self.value + rating_change)
                 
-                # Add to rating history
-                history_entry = {
-                    'timestamp': timezone.now().isoformat(),
-                    'old_value': old_value,
-                    'new_value': self.value,
-                    'change': rating_change,
-                    'opponent_value': opponent_value,
-                    'own_score': own_score,
-                    'opponent_score': opponent_score,
-                    'match_type': match_type
-                }
-                
-                if match_id:
-                    history_entry['match_id'] = match_id
-                
-                # Ensure rating_history is a list
-                if not isinstance(self.rating_history, list):
-                    self.rating_history = []
-                
-                self.rating_history.append(history_entry)
-                
-                # Keep only last 50 entries to prevent excessive data growth
-                if len(self.rating_history) > 50:
-                    self.rating_history = self.rating_history[-50:]
+                # Append to the rating event log (never rewritten, never truncated)
+                RatingEvent.objects.create(
+                    player_id=self.player_id,
+                    match_type=match_type,
+                    match_id=int(match_id) if match_id else None,
+                    old_value=old_value,
+                    new_value=self.value,
+                    change=rating_change,
+                    opponent_value=opponent_value,
+                    own_score=own_score,
+                    opponent_score=opponent_score,
+                )
                 
                 # Save changes
-                self.save()
+                self.save(update_fields=['value', 'updated_at'])
                 
                 return True
                 
@@ -697,6 +689,18 @@ class PlayerProfile(models.Model):
             print(f"Rating update failed for {self.player}: {e}")
             return False
     
+    def get_rating_history(self, limit=None):
+        """
+        Rating changes of this player, oldest first.
+        
+        Entries are dicts in the shape the ``rating_history`` JSON used to have
+        (timestamp, old_value, new_value, change, ...), read from RatingEvent.
+        
+        Args:
+            limit (int, optional): Only the most recent ``limit`` entries
+        """
+        return RatingEvent.history_for(self.player_id, limit=limit)
+    
     def get_rating_trend(self, last_n_matches=10):
         """
         Get rating trend for the last N matches.
@@ -708,14 +712,11 @@ class PlayerProfile(models.Model):
             dict: Trend information with direction and change
         """
         try:
-            if not self.rating_history or len(self.rating_history) < 2:
-                return {'trend': 'stable', 'change': 0.0, 'matches': 0}
-            
             # Get last N entries
-            recent_history = self.rating_history[-last_n_matches:]
+            recent_history = self.get_rating_history(limit=last_n_matches)
             
             if len(recent_history) < 2:
-                return {'trend': 'stable', 'change': 0.0, 'matches': len(recent_history)}
+                return {'trend': 'stable', 'change': 0.0, 'matches': 0}
             
             # Calculate total change over period
             start_value = recent_history[0]['old_value']
@@ -1816,3 +1817,9 @@ Team.release_player = release_player
 Team.get_main_roster = get_main_roster
 Team.get_unassigned_players = get_unassigned_players
 
+
+# Import denormalized per-player statistics
+from .stats_models import PlayerStatsSnapshot
+
+# Import the append-only rating log
+from .rating_models import RatingEvent, rating_change
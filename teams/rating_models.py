@@ -0,0 +1,134 @@
+"""
+teams/rating_models.py
+======================
+Append-only log of player rating changes.
+
+PlayerProfile.update_rating used to append each change to the profile's
+``rating_history`` JSON list and rewrite the whole row, keeping only the
+last 50 entries.  Older changes were lost, every reader parsed the blob in
+Python, and the market had to walk every profile's list to compute trends.
+
+RatingEvent stores one row per rating change instead.  Rows are only ever
+inserted: the (player, timestamp) index serves per-player history and
+"rating at time T" lookups, the timestamp index serves market windows.
+
+``rating_history`` is kept on PlayerProfile as a legacy column: migration
+0013 copied it into this table and nothing writes it any more.  Readers use
+PlayerProfile.get_rating_history(), which returns the same dict shape.
+
+Full recomputation from the log: teams.rating_replay /
+``python manage.py replay_ratings``.
+"""
+from django.db import models
+from django.utils import timezone
+
+
+RATING_BASELINE = 100.0
+
+
+def rating_change(own_value, opponent_value, own_score, opponent_score):
+    """
+    Rating change for one player after a match.
+
+    Modified Elo-style rule adapted for petanque scoring (see
+    PlayerProfile.calculate_rating_change, which delegates here).
+    """
+    score_difference = own_score - opponent_score
+    rating_ratio = opponent_value / max(own_value, 1.0)  # Avoid division by zero
+
+    if score_difference > 0:  # Win
+        # Winning against higher-rated opponent gives more points
+        base_change = abs(score_difference) * rating_ratio * 0.5
+        change = min(base_change, 20.0)  # Cap maximum gain
+    elif score_difference < 0:  # Loss
+        # Losing to lower-rated opponent loses more points
+        base_change = abs(score_difference) * (own_value / max(opponent_value, 1.0)) * 0.5
+        change = -min(base_change, 15.0)  # Cap maximum loss
+    else:  # Draw (rare in petanque, but handle it)
+        change = (opponent_value - own_value) * 0.1
+        change = max(-2.0, min(2.0, change))  # Small adjustment
+
+    return round(change, 2)
+
+
+class RatingEvent(models.Model):
+    """One rating change of one player, caused by one match."""
+
+    MATCH_TYPES = [
+        ('tournament', 'Tournament'),
+        ('friendly', 'Friendly'),
+    ]
+
+    player = models.ForeignKey(
+        'teams.Player',
+        on_delete=models.CASCADE,
+        related_name='rating_events',
+    )
+    match_type = models.CharField(max_length=20, choices=MATCH_TYPES, default='tournament')
+    match_id = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text="Match or FriendlyGame id, depending on match_type",
+    )
+
+    old_value = models.FloatField()
+    new_value = models.FloatField()
+    change = models.FloatField()
+    opponent_value = models.FloatField()
+    own_score = models.IntegerField(default=0)
+    opponent_score = models.IntegerField(default=0)
+
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['timestamp', 'id']
+        indexes = [
+            models.Index(fields=['player', 'timestamp']),
+            models.Index(fields=['timestamp']),
+            models.Index(fields=['match_type', 'match_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.player}: {self.old_value:.1f} → {self.new_value:.1f} ({self.match_type} #{self.match_id})"
+
+    def as_history_entry(self):
+        """The entry in the legacy ``PlayerProfile.rating_history`` shape."""
+        entry = {
+            'timestamp': self.timestamp.isoformat(),
+            'old_value': self.old_value,
+            'new_value': self.new_value,
+            'change': self.change,
+            'opponent_value': self.opponent_value,
+            'own_score': self.own_score,
+            'opponent_score': self.opponent_score,
+            'match_type': self.match_type,
+        }
+        if self.match_id is not None:
+            entry['match_id'] = self.match_id
+        return entry
+
+    @classmethod
+    def history_for(cls, player, limit=None):
+        """Legacy-shaped history of ``player``, oldest first (last ``limit`` entries)."""
+        events = cls.objects.filter(player=player).order_by('-timestamp', '-id')
+        if limit is not None:
+            events = events[:limit]
+        return [event.as_history_entry() for event in reversed(list(events))]
+
+    @classmethod
+    def rating_at(cls, player, moment):
+        """
+        ``player``'s rating at ``moment`` according to the log.
+
+        The new value of the last change at or before ``moment``, else the old
+        value of the first change after it; None when the player has no events.
+        """
+        before = (
+            cls.objects.filter(player=player, timestamp__lte=moment)
+            .order_by('-timestamp', '-id').values_list('new_value', flat=True).first()
+        )
+        if before is not None:
+            return before
+        return (
+            cls.objects.filter(player=player, timestamp__gt=moment)
+            .order_by('timestamp', 'id').values_list('old_value', flat=True).first()
+        )
@@ -0,0 +1,149 @@
+"""
+teams/rating_replay.py
+======================
+Recompute every player rating from the rating event log.
+
+replay_ratings() streams RatingEvent rows once, in chronological order, and
+re-applies the rating rule match by match, exactly like
+matches.rating_integration does live:
+
+  - the events of one match are grouped by (match_type, match_id), not by
+    position: each row carries its match's event count, the match is held
+    back until all of them have been read and is applied then, in order of
+    its last event.  Events of matches completing concurrently interleave in
+    the log (every row is timestamped on its own).
+  - a match's events are split into sides by their (own, opponent) score
+  - both sides' average ratings are taken before anyone in the match is
+    updated; a side without rated players counts as RATING_BASELINE
+  - events without a match id keep their recorded opponent value
+
+Each player starts from the old value of their first event, which is
+RATING_BASELINE for anyone whose full history is in the log and the last
+known rating for histories that were truncated before the log existed.
+
+Design principles:
+  - One pass, constant memory per player: rows are read with .iterator()
+    and only the matches still being read and the running ratings are kept.
+  - The log is never rewritten.  With ``apply=True`` only PlayerProfile.value
+    is corrected, in bulk, for players whose replayed rating drifted.
+  - ``change_fn`` can be swapped for a candidate rule to see what the
+    ratings would have been under it.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.utils import timezone
+
+from pfc_core import cache_regions
+
+from .rating_models import RATING_BASELINE, RatingEvent, rating_change
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReplayResult:
+    ratings: Dict[int, float] = field(default_factory=dict)  # player id -> replayed rating
+    events: int = 0
+    matches: int = 0
+    drifted: int = 0          # profiles whose stored value differs from the replay
+    max_drift: float = 0.0
+    updated: int = 0          # profiles written (apply=True only)
+    elapsed: float = 0.0
+
+
+def _apply_match(ratings, rows, change_fn):
+    """Re-apply one match's events (player_id, own, opponent, opponent_value) to ``ratings``."""
+    sides: Dict[Tuple[int, int], List[int]] = {}
+    for player_id, own_score, opponent_score, _opponent_value in rows:
+        sides.setdefault((own_score, opponent_score), []).append(player_id)
+    averages = {
+        key: sum(ratings[p] for p in players) / len(players)
+        for key, players in sides.items()
+    }
+    for player_id, own_score, opponent_score, recorded_opponent in rows:
+        if recorded_opponent is None:
+            opponent_value = averages.get((opponent_score, own_score), RATING_BASELINE)
+        else:
+            opponent_value = recorded_opponent
+        change = change_fn(ratings[player_id], opponent_value, own_score, opponent_score)
+        ratings[player_id] = max(0.0, ratings[player_id] + change)
+
+
+def replay_ratings(apply=False, tolerance=0.01, batch_size=500, chunk_size=2000,
+                   change_fn: Callable = rating_change) -> ReplayResult:
+    """
+    Replay the whole rating event log.
+
+    Returns a ReplayResult with the replayed rating of every player in the
+    log and how far the stored profile values are from it.  With
+    ``apply=True`` drifted profiles get the replayed value (``batch_size``
+    rows per UPDATE) and the market cache is invalidated.
+    """
+    from .models import PlayerProfile
+
+    started = time.perf_counter()
+    result = ReplayResult()
+    ratings = result.ratings
+
+    rows = (
+        RatingEvent.objects
+        .annotate(match_events=Window(Count('id'), partition_by=[F('match_type'), F('match_id')]))
+        .order_by('timestamp', 'id')
+        .values_list('player_id', 'match_type', 'match_id', 'own_score', 'opponent_score',
+                     'opponent_value', 'old_value', 'match_events')
+        .iterator(chunk_size=chunk_size)
+    )
+    # (match_type, match_id) -> events read so far, for matches not fully read yet
+    open_matches: Dict[Tuple[str, int], List[tuple]] = {}
+    for (player_id, match_type, match_id, own_score, opponent_score, opponent_value, old_value,
+         match_events) in rows:
+        result.events += 1
+        ratings.setdefault(player_id, old_value)
+        if match_id is None:
+            # Without a match there is no other side to average: keep the recorded opponent
+            _apply_match(ratings, [(player_id, own_score, opponent_score, opponent_value)], change_fn)
+            result.matches += 1
+            continue
+        key = (match_type, match_id)
+        events = open_matches.setdefault(key, [])
+        events.append((player_id, own_score, opponent_score, None))
+        if len(events) == match_events:
+            _apply_match(ratings, open_matches.pop(key), change_fn)
+            result.matches += 1
+
+    drifted = []
+    now = timezone.now()
+    stored = (
+        PlayerProfile.objects.filter(player_id__in=RatingEvent.objects.values('player_id'))
+        .only('id', 'player_id', 'value')
+    )
+    for profile in stored.iterator(chunk_size=chunk_size):
+        replayed = ratings.get(profile.player_id)
+        if replayed is None:  # first event logged after the stream was read
+            continue
+        drift = abs(profile.value - replayed)
+        result.max_drift = max(result.max_drift, drift)
+        if drift > tolerance:
+            profile.value = replayed
+            profile.updated_at = now
+            drifted.append(profile)
+    result.drifted = len(drifted)
+
+    if apply and drifted:
+        with transaction.atomic():
+            PlayerProfile.objects.bulk_update(drifted, ['value', 'updated_at'], batch_size=batch_size)
+            transaction.on_commit(lambda: cache_regions.invalidate(cache_regions.MARKET))
+        result.updated = len(drifted)
+
+    result.elapsed = time.perf_counter() - started
+    logger.info(
+        f"Replayed {result.events} rating events ({result.matches} matches, {len(ratings)} players) "
+        f"in {result.elapsed * 1000:.0f} ms: {result.drifted} drifted by up to {result.max_drift:.2f}, "
+        f"{result.updated} profiles updated"
+    )
+    return result
@@ -0,0 +1,186 @@
+"""
+teams/report_charts.py
+======================
+Matplotlib charts for the AI Coach Report, rendered to PNG bytes.
+
+This module deliberately imports nothing from Django: charts are rendered
+in a process pool, and worker processes (started with the "spawn" method,
+which is safe inside a threaded ASGI server) only need to import this file.
+Chart inputs are plain lists / dicts so they pickle cheaply.
+
+Usage:
+    pngs = render_charts([('rating', (history,)), ('score_flow', (updates, title))])
+"""
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def parse_ts(ts_str):
+    if not ts_str:
+        return None
+    try:
+        return datetime.fromisoformat(str(ts_str).replace('Z', '+00:00'))
+    except Exception:
+        return None
+
+
+def build_rating_chart(history):
+    """Line chart of rating evolution — green/red per-segment colouring."""
+    fig, ax = plt.subplots(figsize=(10, 2.8), facecolor='#0f172a')
+    ax.set_facecolor('#1e293b')
+
+    values = [100.0] + [e.get('new_value', 100.0) for e in history]
+    labels = ['Start'] + [
+        parse_ts(e.get('timestamp', '')).strftime('%b %d')
+        if parse_ts(e.get('timestamp', '')) else f'M{i+1}'
+        for i, e in enumerate(history)
+    ]
+    x = list(range(len(values)))
+
+    # Per-segment colour
+    for i in range(1, len(values)):
+        c = '#10b981' if values[i] >= values[i-1] else '#ef4444'
+        ax.plot([x[i-1], x[i]], [values[i-1], values[i]], color=c, linewidth=1.5)
+
+    ax.fill_between(x, values, min(values) - 5, alpha=0.10, color='#3b82f6')
+    ax.axhline(100.0, color='#64748b', linewidth=0.7, linestyle='--', label='Baseline (100)')
+
+    # Peak and trough annotations
+    if len(values) > 1:
+        peak_i = int(np.argmax(values))
+        trough_i = int(np.argmin(values))
+        ax.annotate(f'Peak {values[peak_i]:.1f}',
+                    xy=(x[peak_i], values[peak_i]),
+                    xytext=(0, 6), textcoords='offset points',
+                    color='#10b981', fontsize=6.5, ha='center')
+        ax.annotate(f'Low {values[trough_i]:.1f}',
+                    xy=(x[trough_i], values[trough_i]),
+                    xytext=(0, -10), textcoords='offset points',
+                    color='#ef4444', fontsize=6.5, ha='center')
+
+    step = max(1, len(x) // 10)
+    ax.set_xticks(x[::step])
+    ax.set_xticklabels([labels[i] for i in x[::step]],
+                       color='#94a3b8', fontsize=7, rotation=30, ha='right')
+    ax.tick_params(axis='y', colors='#94a3b8', labelsize=7)
+    ax.spines[:].set_color('#334155')
+    ax.set_title('Rating Evolution', color='#e2e8f0', fontsize=9, pad=6)
+    ax.set_ylabel('Rating', color='#94a3b8', fontsize=7)
+    fig.tight_layout(pad=0.5)
+    return fig
+
+
+def build_score_flow_chart(updates, title='Score Flow'):
+    """Step chart of score progression during a match."""
+    if not updates:
+        return None
+    fig, ax = plt.subplots(figsize=(8, 2.2), facecolor='#0f172a')
+    ax.set_facecolor('#1e293b')
+    t1 = [u['team1_score'] for u in updates]
+    t2 = [u['team2_score'] for u in updates]
+    x = list(range(len(updates)))
+    ax.step(x, t1, where='post', color='#3b82f6', linewidth=1.5, label='Team 1')
+    ax.step(x, t2, where='post', color='#f59e0b', linewidth=1.5, label='Team 2')
+    ax.fill_between(x, t1, t2, where=[a > b for a, b in zip(t1, t2)],
+                    alpha=0.12, color='#3b82f6', step='post')
+    ax.fill_between(x, t2, t1, where=[b > a for a, b in zip(t1, t2)],
+                    alpha=0.12, color='#f59e0b', step='post')
+    ax.tick_params(colors='#94a3b8', labelsize=7)
+    ax.spines[:].set_color('#334155')
+    ax.set_title(title, color='#e2e8f0', fontsize=8, pad=4)
+    ax.legend(fontsize=7, facecolor='#1e293b', labelcolor='#e2e8f0',
+              edgecolor='#334155', loc='upper left')
+    fig.tight_layout(pad=0.4)
+    return fig
+
+
+def build_practice_bar(rates, dates, practice_type):
+    """Bar chart of practice session hit rates (``dates`` are axis labels)."""
+    if not rates:
+        return None
+    fig, ax = plt.subplots(figsize=(10, 2.5), facecolor='#0f172a')
+    ax.set_facecolor('#1e293b')
+    rates = rates[-20:]
+    dates = dates[-20:]
+    x = list(range(len(rates)))
+    colours = ['#10b981' if r >= 60 else '#f59e0b' if r >= 40 else '#ef4444' for r in rates]
+    ax.bar(x, rates, color=colours, width=0.7, edgecolor='#334155', linewidth=0.3)
+    ax.axhline(50, color='#64748b', linewidth=0.7, linestyle='--')
+    ax.set_xticks(x)
+    ax.set_xticklabels(dates, color='#94a3b8', fontsize=6.5, rotation=40, ha='right')
+    ax.tick_params(axis='y', colors='#94a3b8', labelsize=7)
+    ax.set_ylim(0, 105)
+    ax.set_ylabel('%', color='#94a3b8', fontsize=7)
+    ax.spines[:].set_color('#334155')
+    ax.set_title(f'{practice_type.capitalize()} Practice — Success Rate per Session',
+                 color='#e2e8f0', fontsize=8, pad=4)
+    fig.tight_layout(pad=0.4)
+    return fig
+
+
+CHART_BUILDERS = {
+    'rating': build_rating_chart,
+    'score_flow': build_score_flow_chart,
+    'practice_bar': build_practice_bar,
+}
+
+
+def render_chart(name, args):
+    """Build chart ``name`` from ``args`` and return PNG bytes (None if there is no chart)."""
+    fig = CHART_BUILDERS[name](*args)
+    if fig is None:
+        return None
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=150, bbox_inches='tight',
+                facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def _render_chart_spec(spec):
+    return render_chart(*spec)
+
+
+_pool = None
+
+
+def _chart_pool(workers):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _pool
+
+
+def render_charts(specs, workers=None):
+    """
+    Render ``[(name, args), ...]`` to a list of PNG bytes (or None), in order.
+
+    Charts are spread over a shared process pool of ``workers`` processes
+    (default: CPU count, at most 4).  With one chart, one worker, or a pool
+    failure, charts are rendered in this process instead.
+    """
+    global _pool
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    if len(specs) <= 1 or workers <= 1:
+        return [render_chart(name, args) for name, args in specs]
+    try:
+        return list(_chart_pool(workers).map(_render_chart_spec, specs))
+    except Exception as exc:
+        logger.warning(f"Chart process pool failed ({exc}); rendering in-process")
+        _pool = None
+        return [render_chart(name, args) for name, args in specs]
@@ -11,9 +11,14 @@ accidentally exposed in the public team directory.
 
 The profile_type can be upgraded to 'full' later by the team captain
 or admin when the team intentionally wants a public presence.
+
+Also keeps PlayerStatsSnapshot rows current: when a match's participation
+records change, or a match enters, leaves or is edited in the completed
+state, the players involved are rebuilt after the transaction commits.
 """
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 
 
@@ -36,3 +41,51 @@ def create_team_profile(sender, instance, created, **kwargs):
             team=instance,
             profile_type='minimal',
         )
+
+
+# ---------------------------------------------------------------------------
+# PlayerStatsSnapshot maintenance
+# ---------------------------------------------------------------------------
+
+
+def _refresh_player_stats_on_commit(player_ids):
+    """Rebuild the given players' snapshots once the transaction commits."""
+    player_ids = {player_id for player_id in player_ids if player_id}
+    if not player_ids:
+        return
+
+    def refresh():
+        from teams.models import PlayerStatsSnapshot
+        PlayerStatsSnapshot.rebuild(player_ids)
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender='matches.TeamMatchParticipant')
+@receiver(post_delete, sender='matches.TeamMatchParticipant')
+def refresh_stats_for_participant(sender, instance, **kwargs):
+    """A participation record was added, changed or removed."""
+    _refresh_player_stats_on_commit([instance.player_id])
+
+
+@receiver(post_init, sender='matches.Match')
+def remember_match_status_for_stats(sender, instance, **kwargs):
+    instance._stats_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender='matches.Match')
+def refresh_stats_for_match(sender, instance, **kwargs):
+    """
+    A match's result started counting, stopped counting (rejected or
+    reopened) or was corrected; participation rows are untouched in those
+    cases, so refresh everyone recorded on the match.
+    """
+    was_completed = getattr(instance, '_stats_status', None) == 'completed'
+    instance._stats_status = instance.status
+    if not (was_completed or instance.status == 'completed'):
+        return
+
+    from matches.models_participant import TeamMatchParticipant
+
+    player_ids = TeamMatchParticipant.objects.filter(match=instance).values_list('player_id', flat=True)
+    _refresh_player_stats_on_commit(player_ids)
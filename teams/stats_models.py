@@ -0,0 +1,217 @@
+"""
+teams/stats_models.py
+=====================
+Denormalized per-player match statistics.
+
+The player leaderboard used to call ``get_accurate_statistics()`` and
+``get_position_stats()`` on every profile — 2–4 TeamMatchParticipant
+queries per player.  PlayerStatsSnapshot stores the same numbers in one
+row per player so the leaderboard can filter, sort and paginate in SQL.
+
+Source of truth is unchanged: TeamMatchParticipant rows (played=True) of
+completed matches, with the same win / loss / draw attribution as
+``TeamMatchParticipant.match_result_for_player``.
+
+Maintenance:
+  - Incremental: teams.signals refreshes the snapshots of the players in a
+    match when its participation records or its result change.
+  - Full: ``python manage.py rebuild_player_stats``; teams migration 0015
+    ran it once when the table was introduced.
+"""
+from django.db import models
+
+
+# Positions with their own columns (leaderboard tabs and best-position sort).
+SNAPSHOT_POSITIONS = ('pointer', 'milieu', 'tirer', 'flex')
+
+
+def _win_rate(won, played):
+    return round((won / played) * 100, 1) if played else 0.0
+
+
+class PlayerStatsSnapshot(models.Model):
+    """Overall, per-position and per-format match counts for one player."""
+
+    player = models.OneToOneField(
+        'teams.Player',
+        on_delete=models.CASCADE,
+        related_name='stats_snapshot',
+    )
+
+    # Overall
+    matches_played = models.PositiveIntegerField(default=0)
+    matches_won = models.PositiveIntegerField(default=0)
+    matches_lost = models.PositiveIntegerField(default=0)
+    matches_drawn = models.PositiveIntegerField(default=0)
+    win_rate = models.FloatField(default=0.0, help_text="Percentage, one decimal")
+
+    # Per position
+    pointer_played = models.PositiveIntegerField(default=0)
+    pointer_won = models.PositiveIntegerField(default=0)
+    pointer_win_rate = models.FloatField(default=0.0)
+    milieu_played = models.PositiveIntegerField(default=0)
+    milieu_won = models.PositiveIntegerField(default=0)
+    milieu_win_rate = models.FloatField(default=0.0)
+    tirer_played = models.PositiveIntegerField(default=0)
+    tirer_won = models.PositiveIntegerField(default=0)
+    tirer_win_rate = models.FloatField(default=0.0)
+    flex_played = models.PositiveIntegerField(default=0)
+    flex_won = models.PositiveIntegerField(default=0)
+    flex_win_rate = models.FloatField(default=0.0)
+    best_position = models.CharField(max_length=20, blank=True, default='')
+    best_position_win_rate = models.FloatField(default=0.0)
+
+    # Per match format: {"triplet": {"matches_played": 3, "matches_won": 2, "win_rate": 66.7}, ...}
+    format_stats = models.JSONField(default=dict, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-win_rate', 'matches_played']),
+            models.Index(fields=['matches_played']),
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.player} ({self.matches_played} played)"
+
+    def position_stats(self):
+        """Per-position stats in the ``PlayerProfile.get_position_stats`` shape."""
+        stats = {}
+        for position in SNAPSHOT_POSITIONS:
+            played = getattr(self, f'{position}_played')
+            if played:
+                stats[position] = {
+                    'matches_played': played,
+                    'matches_won': getattr(self, f'{position}_won'),
+                    'win_rate': getattr(self, f'{position}_win_rate'),
+                }
+        return stats
+
+    @classmethod
+    def rebuild(cls, player_ids=None, batch_size=500):
+        """
+        Recompute snapshots from participation data.
+
+        ``player_ids`` limits the rebuild to those players (the incremental
+        path); None rebuilds everyone.  One participation query plus one
+        upsert per ``batch_size`` players.  Returns the number of snapshots
+        written.
+        """
+        from matches.models_participant import TeamMatchParticipant
+        from .models import Player
+
+        return rebuild_snapshots(cls, TeamMatchParticipant, Player, player_ids, batch_size)
+
+
+def rebuild_snapshots(snapshot_model, participant_model, player_model, player_ids=None, batch_size=500):
+    """
+    PlayerStatsSnapshot.rebuild over the given model classes.
+
+    Takes the models as arguments so data migrations can run it on their
+    historical models (teams migration 0015).
+    """
+    participations = participant_model.objects.filter(
+        played=True,
+        match__status='completed',
+    )
+    if player_ids is not None:
+        player_ids = set(player_ids)
+        if not player_ids:
+            return 0
+        participations = participations.filter(player_id__in=player_ids)
+        targets = player_ids
+    else:
+        targets = set(player_model.objects.values_list('id', flat=True))
+
+    totals = {player_id: _empty_totals() for player_id in targets}
+    rows = participations.values_list(
+        'player_id', 'team_id', 'position',
+        'match__winner_id', 'match__loser_id', 'match__match_type',
+    )
+    for player_id, team_id, position, winner_id, loser_id, match_type in rows.iterator():
+        t = totals.setdefault(player_id, _empty_totals())
+        if winner_id is None:
+            result = None
+        elif winner_id == team_id:
+            result = 'win'
+        elif loser_id == team_id:
+            result = 'loss'
+        else:
+            result = 'draw'
+        t['matches_played'] += 1
+        if result == 'win':
+            t['matches_won'] += 1
+        elif result == 'loss':
+            t['matches_lost'] += 1
+        elif result == 'draw':
+            t['matches_drawn'] += 1
+
+        position_totals = t['positions'].setdefault(position, [0, 0])
+        position_totals[0] += 1
+        position_totals[1] += 1 if result == 'win' else 0
+
+        format_totals = t['formats'].setdefault(match_type or 'unknown', [0, 0])
+        format_totals[0] += 1
+        format_totals[1] += 1 if result == 'win' else 0
+
+    snapshots = [_from_totals(snapshot_model, player_id, t) for player_id, t in totals.items()]
+    update_fields = [
+        f.name for f in snapshot_model._meta.concrete_fields
+        if f.name not in ('id', 'player')
+    ]
+    for start in range(0, len(snapshots), batch_size):
+        snapshot_model.objects.bulk_create(
+            snapshots[start:start + batch_size],
+            update_conflicts=True,
+            unique_fields=['player'],
+            update_fields=update_fields,
+        )
+    return len(snapshots)
+
+
+def _empty_totals():
+    return {
+        'matches_played': 0,
+        'matches_won': 0,
+        'matches_lost': 0,
+        'matches_drawn': 0,
+        'positions': {},
+        'formats': {},
+    }
+
+
+def _from_totals(snapshot_model, player_id, t):
+    from django.utils import timezone
+
+    snapshot = snapshot_model(
+        player_id=player_id,
+        matches_played=t['matches_played'],
+        matches_won=t['matches_won'],
+        matches_lost=t['matches_lost'],
+        matches_drawn=t['matches_drawn'],
+        win_rate=_win_rate(t['matches_won'], t['matches_played']),
+        format_stats={
+            match_format: {
+                'matches_played': played,
+                'matches_won': won,
+                'win_rate': _win_rate(won, played),
+            }
+            for match_format, (played, won) in t['formats'].items()
+        },
+        updated_at=timezone.now(),
+    )
+    # Best position = highest win rate among positions played (first wins ties),
+    # as in the old player_leaderboard loop.
+    best_position, best_rate = '', 0.0
+    for position, (played, won) in t['positions'].items():
+        rate = _win_rate(won, played)
+        if position in SNAPSHOT_POSITIONS:
+            setattr(snapshot, f'{position}_played', played)
+            setattr(snapshot, f'{position}_won', won)
+            setattr(snapshot, f'{position}_win_rate', rate)
+        if played > 0 and rate > best_rate:
+            best_position, best_rate = position, rate
+    snapshot.best_position = best_position
+    snapshot.best_position_win_rate = best_rate
+    return snapshot
@@ -1,3 +1,351 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from matches.models import LiveScoreboard, Match, ScoreUpdate
+from matches.models_participant import TeamMatchParticipant
+from tournaments.models import Tournament
+
+from .models import Player, PlayerProfile, PlayerStatsSnapshot, RatingEvent, Team
+from .rating_replay import replay_ratings
+from .views_ai_report import _report_keys, build_ai_report_pdf
+from .views_market import market_trends
+
+
+class PlayerStatsSnapshotTests(TestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(
+            name="Stats",
+            format='round_robin',
+            play_format='triplet',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=1),
+        )
+        self.home = Team.objects.create(name="Home", pin="HOME01")
+        self.away = Team.objects.create(name="Away", pin="AWAY01")
+
+    def _player(self, name, team):
+        player = Player.objects.create(name=name, team=team)
+        PlayerProfile.objects.create(player=player)
+        return player
+
+    def _play(self, winner, loser, lineup):
+        """Complete a match; ``lineup`` is [(player, team, position), ...]."""
+        with self.captureOnCommitCallbacks(execute=True):
+            match = Match.objects.create(
+                tournament=self.tournament,
+                team1=winner,
+                team2=loser,
+                winner=winner,
+                loser=loser,
+                team1_score=13,
+                team2_score=7,
+                status='completed',
+                match_type='triplet',
+            )
+            for player, team, position in lineup:
+                TeamMatchParticipant.objects.create(
+                    match=match, team=team, player=player, position=position, played=True,
+                )
+        return match
+
+    def test_snapshot_maintained_on_match_completion(self):
+        alice = self._player("Alice", self.home)
+        bob = self._player("Bob", self.away)
+
+        self._play(self.home, self.away, [(alice, self.home, 'pointer'), (bob, self.away, 'tirer')])
+        self._play(self.away, self.home, [(alice, self.home, 'tirer'), (bob, self.away, 'tirer')])
+        self._play(self.home, self.away, [(alice, self.home, 'pointer'), (bob, self.away, 'milieu')])
+
+        alice_stats = PlayerStatsSnapshot.objects.get(player=alice)
+        self.assertEqual(alice_stats.matches_played, 3)
+        self.assertEqual(alice_stats.matches_won, 2)
+        self.assertEqual(alice_stats.matches_lost, 1)
+        self.assertEqual(alice_stats.win_rate, 66.7)
+        self.assertEqual(alice_stats.pointer_played, 2)
+        self.assertEqual(alice_stats.pointer_win_rate, 100.0)
+        self.assertEqual(alice_stats.tirer_won, 0)
+        self.assertEqual(alice_stats.best_position, 'pointer')
+        self.assertEqual(alice_stats.format_stats['triplet']['matches_played'], 3)
+
+        # Matches the per-player computation it replaces
+        self.assertEqual(
+            alice.profile.get_accurate_statistics()['win_rate'], alice_stats.win_rate
+        )
+        self.assertEqual(alice.profile.get_position_stats(), alice_stats.position_stats())
+
+    def test_migration_backfills_existing_history(self):
+        alice = self._player("Alice", self.home)
+        bob = self._player("Bob", self.away)
+        self._play(self.home, self.away, [(alice, self.home, 'pointer'), (bob, self.away, 'tirer')])
+        PlayerStatsSnapshot.objects.all().delete()
+
+        migration = import_module('teams.migrations.0015_backfill_playerstatssnapshot')
+        migration.backfill_player_stats(apps, None)
+        self.assertEqual(
+            dict(PlayerStatsSnapshot.objects.values_list('player__name', 'matches_won')),
+            {"Alice": 1, "Bob": 0},
+        )
+
+    def test_result_correction_refreshes_snapshot(self):
+        alice = self._player("Alice", self.home)
+        match = self._play(self.home, self.away, [(alice, self.home, 'milieu')])
+        self.assertEqual(PlayerStatsSnapshot.objects.get(player=alice).matches_won, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            match.winner, match.loser = self.away, self.home
+            match.save()
+
+        snapshot = PlayerStatsSnapshot.objects.get(player=alice)
+        self.assertEqual((snapshot.matches_won, snapshot.matches_lost), (0, 1))
+
+    def test_reopened_match_stops_counting(self):
+        alice = self._player("Alice", self.home)
+        match = self._play(self.home, self.away, [(alice, self.home, 'pointer')])
+        self.assertEqual(PlayerStatsSnapshot.objects.get(player=alice).matches_won, 1)
+
+        # A fresh instance, as a view rejecting the result would load it
+        match = Match.objects.get(pk=match.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            match.status = 'waiting_validation'
+            match.save()
+
+        snapshot = PlayerStatsSnapshot.objects.get(player=alice)
+        self.assertEqual((snapshot.matches_played, snapshot.matches_won), (0, 0))
+
+    def test_full_rebuild_matches_incremental(self):
+        alice = self._player("Alice", self.home)
+        self._play(self.home, self.away, [(alice, self.home, 'pointer')])
+        before = PlayerStatsSnapshot.objects.get(player=alice)
+        PlayerStatsSnapshot.objects.all().delete()
+
+        PlayerStatsSnapshot.rebuild()
+
+        after = PlayerStatsSnapshot.objects.get(player=alice)
+        self.assertEqual(
+            (after.matches_played, after.matches_won, after.pointer_played),
+            (before.matches_played, before.matches_won, before.pointer_played),
+        )
+
+    def _leaderboard_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('player_leaderboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def _qualified_players(self, count, start=0):
+        players = [self._player(f"P{start + i}", self.home) for i in range(count)]
+        snapshots = [
+            PlayerStatsSnapshot(
+                player=player,
+                matches_played=12,
+                matches_won=i % 12,
+                win_rate=round((i % 12) / 12 * 100, 1),
+                pointer_played=12,
+                pointer_won=i % 12,
+                pointer_win_rate=round((i % 12) / 12 * 100, 1),
+            )
+            for i, player in enumerate(players)
+        ]
+        PlayerStatsSnapshot.objects.bulk_create(snapshots)
+        return players
+
+    def test_leaderboard_query_count_independent_of_player_count(self):
+        self._qualified_players(3)
+        small_queries, _ = self._leaderboard_queries()
+
+        self._qualified_players(30, start=3)
+        large_queries, response = self._leaderboard_queries()
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(response.context['ranked_players'], 33)
+        rates = [p.accurate_win_rate for p in response.context['players']]
+        self.assertEqual(rates, sorted(rates, reverse=True))
+
+    def test_leaderboard_enforces_minimum_and_paginates(self):
+        self._qualified_players(55)
+        newcomer = self._player("Newcomer", self.home)
+        PlayerStatsSnapshot.objects.create(player=newcomer, matches_played=3, matches_won=3, win_rate=100.0)
+
+        _, response = self._leaderboard_queries()
+        self.assertEqual(response.context['total_players'], 56)
+        self.assertEqual(response.context['ranked_players'], 55)
+        self.assertEqual(len(response.context['players']), 50)
+
+        response = self.client.get(reverse('player_leaderboard'), {'page': 2})
+        self.assertEqual(len(response.context['players']), 5)
+        self.assertNotIn(newcomer.id, [p.id for p in response.context['players']])
+
+
+class AICoachReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.create(
+            name="Report",
+            format='round_robin',
+            play_format='triplet',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=1),
+        )
+        self.home = Team.objects.create(name="Home", pin="HOME02")
+        self.away = Team.objects.create(name="Away", pin="AWAY02")
+        self.player = Player.objects.create(name="Alice", team=self.home)
+        PlayerProfile.objects.create(player=self.player)
+
+    def _play(self, scored=True):
+        with self.captureOnCommitCallbacks(execute=True):
+            match = Match.objects.create(
+                tournament=self.tournament,
+                team1=self.home,
+                team2=self.away,
+                winner=self.home,
+                loser=self.away,
+                team1_score=13,
+                team2_score=7,
+                status='completed',
+                match_type='triplet',
+            )
+            TeamMatchParticipant.objects.create(
+                match=match, team=self.home, player=self.player, position='pointer', played=True,
+            )
+        if scored:
+            scoreboard, _created = LiveScoreboard.objects.get_or_create(tournament_match=match)
+            for t1, t2 in ((0, 2), (4, 2), (9, 5), (13, 7)):
+                ScoreUpdate.objects.create(
+                    scoreboard=scoreboard, team1_score=t1, team2_score=t2, scorekeeper_codename="ABC123",
+                )
+        return match
+
+    def test_score_logs_loaded_in_bulk(self):
+        self._play()
+        self._play(scored=False)
+        with CaptureQueriesContext(connection) as small:
+            pdf = build_ai_report_pdf(Player.objects.get(pk=self.player.pk))
+        self.assertTrue(pdf.startswith(b'%PDF'))
+
+        for _ in range(4):
+            self._play()
+        with CaptureQueriesContext(connection) as large:
+            build_ai_report_pdf(Player.objects.get(pk=self.player.pk))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def _login(self):
+        session = self.client.session
+        session['player_id'] = self.player.id
+        session.save()
+
+    def test_view_serves_cached_pdf_and_reports_generation(self):
+        self._login()
+        url = reverse('ai_coach_report', args=[self.player.id])
+        status_url = reverse('ai_coach_report_status', args=[self.player.id])
+        pdf_key, status_key = _report_keys(self.player)
+
+        # A build already in flight: the view answers with the status page
+        cache.set(status_key, 'generating')
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'generating')
+        self.assertEqual(self.client.get(status_url).json()['status'], 'generating')
+
+        cache.set(pdf_key, b'%PDF-cached')
+        self.assertEqual(self.client.get(status_url).json()['status'], 'ready')
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'%PDF-cached')
+
+        # New activity changes the key, so the cached PDF is no longer served
+        self._play()
+        self.assertEqual(self.client.get(status_url).json()['status'], 'missing')
+
+
+
+class RatingEventTests(TestCase):
+    def setUp(self):
+        team = Team.objects.create(name="Rated", pin="RATE01")
+        self.profiles = [
+            PlayerProfile.objects.create(player=Player.objects.create(name=f"R{i}", team=team))
+            for i in range(4)
+        ]
+
+    def _play(self, winners, losers, scores=(13, 7), match_id=None):
+        """Rate a match the way matches.rating_integration does."""
+        winner_avg = sum(p.value for p in winners) / len(winners)
+        loser_avg = sum(p.value for p in losers) / len(losers)
+        for profile in winners:
+            profile.update_rating(loser_avg, scores[0], scores[1], match_id=match_id)
+        for profile in losers:
+            profile.update_rating(winner_avg, scores[1], scores[0], match_id=match_id)
+
+    def test_history_is_not_truncated(self):
+        a, b = self.profiles[:2]
+        for match_id in range(1, 61):
+            self._play([a], [b], match_id=match_id)
+
+        self.assertEqual(a.player.rating_events.count(), 60)
+        history = a.get_rating_history()
+        self.assertEqual(len(history), 60)
+        self.assertEqual(history[0]['old_value'], 100.0)
+        self.assertEqual(history[-1]['new_value'], PlayerProfile.objects.get(pk=a.pk).value)
+        self.assertEqual([e['match_id'] for e in a.get_rating_history(limit=2)], [59, 60])
+        self.assertEqual(PlayerProfile.objects.get(pk=a.pk).rating_history, [])
+
+    def test_replay_reproduces_and_repairs_ratings(self):
+        a, b, c, d = self.profiles
+        self._play([a, b], [c, d], match_id=1)
+        self._play([a, c], [b, d], (13, 12), match_id=2)
+        self._play([d], [a], (13, 0), match_id=3)
+
+        result = replay_ratings()
+        self.assertEqual(result.events, 10)
+        self.assertEqual(result.matches, 3)
+        self.assertEqual(result.drifted, 0)
+
+        expected = PlayerProfile.objects.get(pk=d.pk).value
+        PlayerProfile.objects.filter(pk=d.pk).update(value=250.0)
+        result = replay_ratings(apply=True)
+        self.assertEqual((result.drifted, result.updated), (1, 1))
+        self.assertAlmostEqual(PlayerProfile.objects.get(pk=d.pk).value, expected)
+
+    def test_replay_groups_interleaved_matches(self):
+        a, b, c, d = self.profiles
+        self._play([a, b], [c, d], match_id=1)
+        # Matches 2 and 3 complete concurrently: their events interleave in the log
+        self._play([a], [c], match_id=2)
+        self._play([d], [b], match_id=3)
+        start = timezone.now()
+        order = [(a, 2), (d, 3), (c, 2), (b, 3)]
+        for offset, (profile, match_id) in enumerate(order):
+            RatingEvent.objects.filter(player=profile.player, match_id=match_id).update(
+                timestamp=start + timedelta(seconds=offset)
+            )
+
+        result = replay_ratings()
+        self.assertEqual((result.events, result.matches), (8, 3))
+        self.assertEqual(result.drifted, 0)
+
+    def test_market_trends_window_and_fallback(self):
+        a, b = self.profiles[:2]
+        for match_id in range(1, 4):
+            self._play([a], [b], match_id=match_id)
+        RatingEvent.objects.filter(player=b.player).update(timestamp=timezone.now() - timedelta(days=10))
+
+        with CaptureQueriesContext(connection) as queries:
+            trends = market_trends()
+        self.assertEqual(len(queries.captured_queries), 2)
 
-# Create your tests here.
+        a_events = list(a.player.rating_events.all())
+        self.assertEqual(trends[a.player_id]['games_analyzed'], 3)
+        self.assertAlmostEqual(trends[a.player_id]['change'], round(sum(e.change for e in a_events), 2))
+        self.assertEqual(trends[a.player_id]['direction'], 'up')
+        b_events = list(b.player.rating_events.all())
+        self.assertEqual(trends[b.player_id]['games_analyzed'], 2)
+        self.assertAlmostEqual(trends[b.player_id]['change'], round(b_events[1].change + b_events[2].change, 2))
+        self.assertEqual(trends[b.player_id]['direction'], 'down')
+        self.assertNotIn(self.profiles[2].player_id, trends)
@@ -2,12 +2,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from .views_market import pfc_market
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
 from django.db.models import Q, Count, Prefetch
 from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
 from .models import Team, Player, TeamAvailability, PlayerProfile, TeamProfile
 from .forms import TeamForm, PlayerForm, TeamAvailabilityForm, PublicPlayerForm, EditPlayerProfileForm
 from .utils import get_recent_matches_with_participation, get_player_participation_summary
 from matches.models import Match, MatchActivation
+from pfc_core import name_search
 from pfc_core.session_utils import CodenameSessionManager
 from friendly_games.models import PlayerCodename
 
@@ -540,18 +543,16 @@ def team_search_api(request):
         if len(query) < 2:  # Require at least 2 characters
             return JsonResponse({'teams': []})
         
-        # Search teams by name (case-insensitive).
-        # Strict visibility rule: not archived, not tournament-temp, not a subteam,
-        # full profile only (same rule as the public Teams page).
-        teams = Team.objects.filter(
-            name__icontains=query,
-            is_archived=False,
-            is_tournament_temp=False,
-            parent_team__isnull=True,
-            profile__profile_type='full',
-        ).values('id', 'name')[:10]  # Limit to 10 results
+        # Ranked, accent-insensitive search over visible teams (same strict
+        # visibility rule as the public Teams page, see pfc_core.name_search)
+        teams = [
+            {'id': team['id'], 'name': team['name']}
+            for team in name_search.search('teams', query)
+        ]
         
-        return JsonResponse({'teams': list(teams)})
+        response = JsonResponse({'teams': teams})
+        patch_cache_control(response, private=True, max_age=name_search.RESPONSE_MAX_AGE)
+        return response
     
     return JsonResponse({'error': 'Invalid request method'}, status=405)
 
@@ -610,9 +611,35 @@ def player_login(request):
     return redirect('home')  # Redirect back to home page
 
 # New views for player statistics
+# Leaderboard sort keys backed by PlayerStatsSnapshot columns
+LEADERBOARD_STAT_SORTS = {
+    'win_rate': 'stats_snapshot__win_rate',
+    'matches_played': 'stats_snapshot__matches_played',
+    'matches_won': 'stats_snapshot__matches_won',
+    'best_position_win_rate': 'stats_snapshot__best_position_win_rate',
+}
+LEADERBOARD_MIN_MATCHES = 10
+LEADERBOARD_PAGE_SIZE = 50
+
+
+def _attach_snapshot_stats(player):
+    """Expose a player's PlayerStatsSnapshot under the names the template uses."""
+    snapshot = player.stats_snapshot
+    player.accurate_matches_played = snapshot.matches_played
+    player.accurate_matches_won = snapshot.matches_won
+    player.accurate_win_rate = snapshot.win_rate
+    player.position_stats = snapshot.position_stats()
+    player.best_position = snapshot.best_position or None
+    player.best_position_win_rate = snapshot.best_position_win_rate
+    return player
+
+
 def player_leaderboard(request):
     """
-    Display a leaderboard of all players with their statistics
+    Display a leaderboard of all players with their statistics.
+
+    Statistics come from PlayerStatsSnapshot (maintained on match
+    completion), so filtering, sorting and pagination all happen in SQL.
     """
     # Get filter parameters
     team_id = request.GET.get('team')
@@ -625,7 +652,7 @@ def player_leaderboard(request):
     players = Player.objects.filter(
         profile__isnull=False,
         profile__hide_public_statistics=False,
-    ).select_related('team', 'profile')
+    )
     
     # Apply filters
     if team_id:
@@ -636,105 +663,26 @@ def player_leaderboard(request):
     
     if position:
         players = players.filter(profile__preferred_position=position)
-    
-    # Convert to list and add accurate statistics for each player
-    players_with_stats = []
-    for player in players:
-        try:
-            # Get accurate overall statistics
-            accurate_stats = player.profile.get_accurate_statistics()
-            player.accurate_matches_played = accurate_stats['matches_played']
-            player.accurate_matches_won = accurate_stats['matches_won']
-            player.accurate_win_rate = accurate_stats['win_rate']
-            
-            # Get position-based statistics
-            position_stats = player.profile.get_position_stats()
-            player.position_stats = position_stats
-            
-            # Calculate best position (position with highest win rate)
-            best_position = None
-            best_win_rate = 0
-            for pos, stats in position_stats.items():
-                if stats['matches_played'] > 0 and stats['win_rate'] > best_win_rate:
-                    best_position = pos
-                    best_win_rate = stats['win_rate']
-            
-            player.best_position = best_position
-            player.best_position_win_rate = best_win_rate
-            
-            players_with_stats.append(player)
-        except Exception:
-            # Fallback to stored values if anything goes wrong
-            player.accurate_matches_played = player.profile.matches_played
-            player.accurate_matches_won = player.profile.matches_won
-            player.accurate_win_rate = player.profile.win_rate()
-            player.position_stats = {}
-            player.best_position = None
-            player.best_position_win_rate = 0
-            players_with_stats.append(player)
-    
-    # Apply sorting with accurate statistics
-    if sort_by == 'win_rate':
-        players_with_stats.sort(
-            key=lambda p: p.accurate_win_rate, 
-            reverse=(order == 'desc')
-        )
-    elif sort_by == 'matches_played':
-        players_with_stats.sort(
-            key=lambda p: p.accurate_matches_played, 
-            reverse=(order == 'desc')
-        )
-    elif sort_by == 'matches_won':
-        players_with_stats.sort(
-            key=lambda p: p.accurate_matches_won, 
-            reverse=(order == 'desc')
-        )
-    elif sort_by == 'best_position_win_rate':
-        players_with_stats.sort(
-            key=lambda p: p.best_position_win_rate, 
-            reverse=(order == 'desc')
-        )
-    else:
-        # For other fields, use the original sorting
-        order_prefix = '-' if order == 'desc' else ''
-        sort_field = f"{order_prefix}profile__{sort_by}"
-        players_with_stats = list(Player.objects.filter(
-            profile__isnull=False,
-            profile__hide_public_statistics=False,
-        ).select_related('team', 'profile').order_by(sort_field))
-        
-        # Still need to add accurate stats for display
-        for player in players_with_stats:
-            try:
-                accurate_stats = player.profile.get_accurate_statistics()
-                player.accurate_matches_played = accurate_stats['matches_played']
-                player.accurate_matches_won = accurate_stats['matches_won']
-                player.accurate_win_rate = accurate_stats['win_rate']
-                
-                position_stats = player.profile.get_position_stats()
-                player.position_stats = position_stats
-                
-                best_position = None
-                best_win_rate = 0
-                for pos, stats in position_stats.items():
-                    if stats['matches_played'] > 0 and stats['win_rate'] > best_win_rate:
-                        best_position = pos
-                        best_win_rate = stats['win_rate']
-                
-                player.best_position = best_position
-                player.best_position_win_rate = best_win_rate
-            except Exception:
-                player.accurate_matches_played = player.profile.matches_played
-                player.accurate_matches_won = player.profile.matches_won
-                player.accurate_win_rate = player.profile.win_rate()
-                player.position_stats = {}
-                player.best_position = None
-                player.best_position_win_rate = 0
-    
+
     # ── 10-match minimum: record total before filtering ──────────────
-    MIN_MATCHES = 10
-    total_players = len(players_with_stats)
-    players_with_stats = [p for p in players_with_stats if p.accurate_matches_played >= MIN_MATCHES]
+    total_players = players.count()
+    qualified = players.filter(
+        stats_snapshot__matches_played__gte=LEADERBOARD_MIN_MATCHES,
+    ).select_related('team', 'profile', 'stats_snapshot')
+
+    # Apply sorting: snapshot columns for statistics, profile fields otherwise
+    order_prefix = '-' if order == 'desc' else ''
+    if sort_by in LEADERBOARD_STAT_SORTS:
+        sort_field = LEADERBOARD_STAT_SORTS[sort_by]
+    elif sort_by in {f.name for f in PlayerProfile._meta.concrete_fields}:
+        sort_field = f"profile__{sort_by}"
+    else:
+        sort_field = LEADERBOARD_STAT_SORTS['win_rate']
+    qualified = qualified.order_by(f"{order_prefix}{sort_field}", 'id')
+
+    page_obj = Paginator(qualified, LEADERBOARD_PAGE_SIZE).get_page(request.GET.get('page'))
+    for player in page_obj:
+        _attach_snapshot_stats(player)
 
     # Create position-specific leaderboards (Flex removed)
     position_leaderboards = {}
@@ -747,24 +695,24 @@ def player_leaderboard(request):
     
     for pos in positions:
         position_players = []
-        for player in players_with_stats:
-            if pos in player.position_stats and player.position_stats[pos]['matches_played'] > 0:
-                # Create a copy of player with position-specific stats
-                pos_player = type('obj', (object,), {
-                    'id': player.id,
-                    'name': player.name,
-                    'team': player.team,
-                    'profile': player.profile,
-                    'is_captain': getattr(player, 'is_captain', False),
-                    'position': position_display_names[pos],
-                    'matches_played': player.position_stats[pos]['matches_played'],
-                    'matches_won': player.position_stats[pos]['matches_won'],
-                    'win_rate': player.position_stats[pos]['win_rate']
-                })()
-                position_players.append(pos_player)
-        
-        # Sort by win rate for this position
-        position_players.sort(key=lambda p: p.win_rate, reverse=True)
+        position_qs = qualified.filter(
+            **{f'stats_snapshot__{pos}_played__gt': 0}
+        ).order_by(f'-stats_snapshot__{pos}_win_rate', 'id')
+        for player in position_qs:
+            snapshot = player.stats_snapshot
+            # Create a copy of player with position-specific stats
+            pos_player = type('obj', (object,), {
+                'id': player.id,
+                'name': player.name,
+                'team': player.team,
+                'profile': player.profile,
+                'is_captain': getattr(player, 'is_captain', False),
+                'position': position_display_names[pos],
+                'matches_played': getattr(snapshot, f'{pos}_played'),
+                'matches_won': getattr(snapshot, f'{pos}_won'),
+                'win_rate': getattr(snapshot, f'{pos}_win_rate'),
+            })()
+            position_players.append(pos_player)
         position_leaderboards[position_display_names[pos]] = position_players
     
     # Get selectable teams for the filter dropdown.
@@ -775,9 +723,16 @@ def player_leaderboard(request):
         parent_team__isnull=True,
         profile__profile_type='full',
     ).order_by('name')
+
+    # Current filters without the page number, for pagination links
+    query_params = request.GET.copy()
+    query_params.pop('page', None)
     
     context = {
-        'players': players_with_stats,
+        'players': page_obj.object_list,
+        'page_obj': page_obj,
+        'ranked_players': page_obj.paginator.count,
+        'query_string': query_params.urlencode(),
         'position_leaderboards': position_leaderboards,
         'teams': teams,
         'selected_team': int(team_id) if team_id else None,
@@ -1229,11 +1184,11 @@ def player_profile(request, player_id):
     # Prepare rating history data for chart
     rating_chart_data = {'has_data': False}
     try:
-        if hasattr(player, 'profile') and player.profile and player.profile.rating_history:
+        if hasattr(player, 'profile') and player.profile:
             import json
             from datetime import datetime
             
-            history = player.profile.rating_history
+            history = player.profile.get_rating_history()
             if history and len(history) > 0:
                 # Prepare data for Chart.js
                 labels = []  # Timestamps
@@ -2256,10 +2211,8 @@ def player_search_api(request):
         if len(query) < 2:  # Require at least 2 characters
             return JsonResponse({'players': []})
         
-        # Search players by name (case-insensitive)
-        players = Player.objects.filter(
-            name__icontains=query
-        ).select_related('team').values('id', 'name', 'team__name')[:15]  # Limit to 15 results
+        # Ranked, accent-insensitive search (pfc_core.name_search)
+        players = name_search.search('players', query)
         
         # Format the results to include team information
         formatted_players = []
@@ -2267,11 +2220,13 @@ def player_search_api(request):
             formatted_players.append({
                 'id': player['id'],
                 'name': player['name'],
-                'team_name': player['team__name'],
-                'display_name': f"{player['name']} ({player['team__name']})"
+                'team_name': player['team_name'],
+                'display_name': f"{player['name']} ({player['team_name']})"
             })
         
-        return JsonResponse({'players': formatted_players})
+        response = JsonResponse({'players': formatted_players})
+        patch_cache_control(response, private=True, max_age=name_search.RESPONSE_MAX_AGE)
+        return response
     
     return JsonResponse({'error': 'Invalid request method'}, status=405)
 
@@ -7,6 +7,18 @@ Optimised for AI readability (petA UMP) and human coaching analysis.
 Accessible via: /teams/players/<player_id>/ai-coach-report/
 Only the player themselves (session match) or staff can download.
 
+Generation pipeline
+-------------------
+  - All LiveScoreboard / ScoreUpdate rows the report needs are loaded in two
+    bulk queries (_load_score_logs) instead of per match.
+  - Sections only queue their charts (_ChartBatch); the charts are rendered
+    together in a process pool (teams.report_charts) just before doc.build.
+  - Finished PDFs are cached in the "ai_reports" cache region, keyed by the
+    player's last-activity fingerprint, so they are rebuilt only after new
+    matches, games, practice or profile changes.
+  - On a cache miss the view starts a background build and answers with a
+    "generating…" page that polls ai_coach_report_status.
+
 Section map
 -----------
   0  AI Reader Instructions (verbatim — selectable text)
@@ -24,18 +36,21 @@ Section map
  12  Data Quality Notes  (discrepancy flags for the AI reader)
 """
 
+import hashlib
 import io
+import logging
 import math
 from collections import defaultdict
-from datetime import datetime, timezone as dt_timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone as dt_timezone
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import numpy as np
 
-from django.http import HttpResponse, Http404
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.utils import timezone
 
 from reportlab.lib import colors
@@ -48,7 +63,18 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 
+from pfc_core import cache_regions
+
+from . import report_charts
 from .models import Player, PlayerProfile
+from .report_charts import parse_ts as _parse_ts
+
+logger = logging.getLogger(__name__)
+
+# Bump when the report layout changes so cached PDFs are rebuilt.
+REPORT_VERSION = 2
+# Upper bound on one background build; a stale "generating" flag expires after this.
+GENERATION_TIMEOUT = 600
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Colour palette
@@ -183,126 +209,52 @@ def _data_table(headers, rows, ST, col_widths=None):
     return tbl
 
 
-def _matplotlib_to_image(fig, width_mm=170):
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', dpi=150, bbox_inches='tight',
-                facecolor=fig.get_facecolor())
-    buf.seek(0)
-    plt.close(fig)
-    img = Image(buf, width=width_mm * mm)
-    img.hAlign = 'CENTER'
-    return img
+class _PendingChart:
+    """Placeholder flowable for a queued chart; replaced by _ChartBatch.resolve()."""
 
+    def __init__(self, index, width_mm, space_after):
+        self.index = index
+        self.width_mm = width_mm
+        self.space_after = space_after
 
-# ─────────────────────────────────────────────────────────────────────────────
-# Chart builders
-# ─────────────────────────────────────────────────────────────────────────────
-def _build_rating_chart(history):
-    """Line chart of rating evolution — green/red per-segment colouring."""
-    fig, ax = plt.subplots(figsize=(10, 2.8), facecolor='#0f172a')
-    ax.set_facecolor('#1e293b')
-
-    values = [100.0] + [e.get('new_value', 100.0) for e in history]
-    labels = ['Start'] + [
-        _parse_ts(e.get('timestamp', '')).strftime('%b %d')
-        if _parse_ts(e.get('timestamp', '')) else f'M{i+1}'
-        for i, e in enumerate(history)
-    ]
-    x = list(range(len(values)))
-
-    # Per-segment colour
-    for i in range(1, len(values)):
-        c = '#10b981' if values[i] >= values[i-1] else '#ef4444'
-        ax.plot([x[i-1], x[i]], [values[i-1], values[i]], color=c, linewidth=1.5)
-
-    ax.fill_between(x, values, min(values) - 5, alpha=0.10, color='#3b82f6')
-    ax.axhline(100.0, color='#64748b', linewidth=0.7, linestyle='--', label='Baseline (100)')
-
-    # Peak and trough annotations
-    if len(values) > 1:
-        peak_i = int(np.argmax(values))
-        trough_i = int(np.argmin(values))
-        ax.annotate(f'Peak {values[peak_i]:.1f}',
-                    xy=(x[peak_i], values[peak_i]),
-                    xytext=(0, 6), textcoords='offset points',
-                    color='#10b981', fontsize=6.5, ha='center')
-        ax.annotate(f'Low {values[trough_i]:.1f}',
-                    xy=(x[trough_i], values[trough_i]),
-                    xytext=(0, -10), textcoords='offset points',
-                    color='#ef4444', fontsize=6.5, ha='center')
-
-    step = max(1, len(x) // 10)
-    ax.set_xticks(x[::step])
-    ax.set_xticklabels([labels[i] for i in x[::step]],
-                       color='#94a3b8', fontsize=7, rotation=30, ha='right')
-    ax.tick_params(axis='y', colors='#94a3b8', labelsize=7)
-    ax.spines[:].set_color('#334155')
-    ax.set_title('Rating Evolution', color='#e2e8f0', fontsize=9, pad=6)
-    ax.set_ylabel('Rating', color='#94a3b8', fontsize=7)
-    fig.tight_layout(pad=0.5)
-    return fig
-
-
-def _build_score_flow_chart(updates, title='Score Flow'):
-    """Step chart of score progression during a match."""
-    if not updates:
-        return None
-    fig, ax = plt.subplots(figsize=(8, 2.2), facecolor='#0f172a')
-    ax.set_facecolor('#1e293b')
-    t1 = [u['team1_score'] for u in updates]
-    t2 = [u['team2_score'] for u in updates]
-    x = list(range(len(updates)))
-    ax.step(x, t1, where='post', color='#3b82f6', linewidth=1.5, label='Team 1')
-    ax.step(x, t2, where='post', color='#f59e0b', linewidth=1.5, label='Team 2')
-    ax.fill_between(x, t1, t2, where=[a > b for a, b in zip(t1, t2)],
-                    alpha=0.12, color='#3b82f6', step='post')
-    ax.fill_between(x, t2, t1, where=[b > a for a, b in zip(t1, t2)],
-                    alpha=0.12, color='#f59e0b', step='post')
-    ax.tick_params(colors='#94a3b8', labelsize=7)
-    ax.spines[:].set_color('#334155')
-    ax.set_title(title, color='#e2e8f0', fontsize=8, pad=4)
-    ax.legend(fontsize=7, facecolor='#1e293b', labelcolor='#e2e8f0',
-              edgecolor='#334155', loc='upper left')
-    fig.tight_layout(pad=0.4)
-    return fig
-
-
-def _build_practice_bar(sessions, practice_type):
-    """Bar chart of practice session hit rates."""
-    if not sessions:
-        return None
-    fig, ax = plt.subplots(figsize=(10, 2.5), facecolor='#0f172a')
-    ax.set_facecolor('#1e293b')
-    rates = [s.hit_percentage for s in sessions[-20:]]
-    dates = [s.started_at.strftime('%b %d') for s in sessions[-20:]]
-    x = list(range(len(rates)))
-    colours = ['#10b981' if r >= 60 else '#f59e0b' if r >= 40 else '#ef4444' for r in rates]
-    ax.bar(x, rates, color=colours, width=0.7, edgecolor='#334155', linewidth=0.3)
-    ax.axhline(50, color='#64748b', linewidth=0.7, linestyle='--')
-    ax.set_xticks(x)
-    ax.set_xticklabels(dates, color='#94a3b8', fontsize=6.5, rotation=40, ha='right')
-    ax.tick_params(axis='y', colors='#94a3b8', labelsize=7)
-    ax.set_ylim(0, 105)
-    ax.set_ylabel('%', color='#94a3b8', fontsize=7)
-    ax.spines[:].set_color('#334155')
-    ax.set_title(f'{practice_type.capitalize()} Practice — Success Rate per Session',
-                 color='#e2e8f0', fontsize=8, pad=4)
-    fig.tight_layout(pad=0.4)
-    return fig
+
+class _ChartBatch:
+    """
+    Charts requested while laying out the sections.
+
+    Sections call ``add()`` and append the returned placeholder; ``resolve()``
+    renders every chart in one report_charts.render_charts call and swaps the
+    placeholders for Image flowables.
+    """
+
+    def __init__(self):
+        self.specs = []
+
+    def add(self, name, *args, width_mm=170, space_after=3):
+        self.specs.append((name, args))
+        return _PendingChart(len(self.specs) - 1, width_mm, space_after)
+
+    def resolve(self, elements):
+        workers = getattr(settings, 'AI_REPORT_CHART_WORKERS', None)
+        pngs = report_charts.render_charts(self.specs, workers=workers)
+        resolved = []
+        for el in elements:
+            if not isinstance(el, _PendingChart):
+                resolved.append(el)
+                continue
+            png = pngs[el.index]
+            if png is None:
+                continue
+            img = Image(io.BytesIO(png), width=el.width_mm * mm)
+            img.hAlign = 'CENTER'
+            resolved.append(img)
+            resolved.append(Spacer(1, el.space_after))
+        return resolved
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Utility
 # ─────────────────────────────────────────────────────────────────────────────
-def _parse_ts(ts_str):
-    if not ts_str:
-        return None
-    try:
-        return datetime.fromisoformat(str(ts_str).replace('Z', '+00:00'))
-    except Exception:
-        return None
-
-
 def _fmt_ts(ts_str):
     dt = _parse_ts(ts_str)
     return dt.strftime('%Y-%m-%d %H:%M') if dt else '—'
@@ -391,6 +343,52 @@ def _get_player_ranking(player_profile):
         return None, None
 
 
+class _ScoreLogs:
+    """ScoreUpdate logs for the report, loaded in bulk by _load_score_logs."""
+
+    def __init__(self):
+        self.matches = {}                  # match_id -> [update dicts]
+        self.friendly = {}                 # friendly game_id -> [update dicts]
+        self.scoreboard_match_ids = set()  # matches with a LiveScoreboard at all
+
+
+def _load_score_logs(tournament_matches, friendly_matches):
+    """
+    Load every scoreboard and score update the report needs in two queries.
+
+    Each log is a list of {team1_score, team2_score, update_type, timestamp}
+    dicts in timestamp order — the same shape the sections used to query one
+    match at a time.
+    """
+    from django.db.models import Q
+    from matches.models import LiveScoreboard, ScoreUpdate
+
+    logs = _ScoreLogs()
+    match_ids = [m.id for m in tournament_matches]
+    game_ids = [m['game_id'] for m in friendly_matches[:20] if m.get('game_id')]
+    if not match_ids and not game_ids:
+        return logs
+
+    owners = {}
+    for sb_id, match_id, game_id in LiveScoreboard.objects.filter(
+        Q(tournament_match_id__in=match_ids) | Q(friendly_game_id__in=game_ids)
+    ).values_list('id', 'tournament_match_id', 'friendly_game_id'):
+        if match_id in match_ids:
+            owners[sb_id] = (logs.matches, match_id)
+            logs.scoreboard_match_ids.add(match_id)
+        elif game_id is not None:
+            owners[sb_id] = (logs.friendly, game_id)
+    if not owners:
+        return logs
+
+    for row in ScoreUpdate.objects.filter(scoreboard_id__in=owners).order_by(
+        'scoreboard_id', 'timestamp', 'id'
+    ).values('scoreboard_id', 'team1_score', 'team2_score', 'update_type', 'timestamp'):
+        target, owner_id = owners[row.pop('scoreboard_id')]
+        target.setdefault(owner_id, []).append(row)
+    return logs
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Cover page
 # ─────────────────────────────────────────────────────────────────────────────
@@ -528,18 +526,16 @@ def _section_identity(player, profile, ST, elements):
 # ─────────────────────────────────────────────────────────────────────────────
 # Section 2 — Rating Evolution & Trend Analysis
 # ─────────────────────────────────────────────────────────────────────────────
-def _section_rating(profile, ST, elements):
+def _section_rating(profile, ST, elements, charts):
     elements += _section_header('2. RATING EVOLUTION & TREND ANALYSIS', ST)
 
-    history = profile.rating_history or []
+    history = profile.get_rating_history()
     if not history:
         elements.append(Paragraph('No rating history available.', ST['body']))
         elements.append(Spacer(1, 6))
         return
 
-    fig = _build_rating_chart(history)
-    elements.append(_matplotlib_to_image(fig, width_mm=165))
-    elements.append(Spacer(1, 4))
+    elements.append(charts.add('rating', history, width_mm=165, space_after=4))
 
     changes = [e.get('change', 0) for e in history]
     values  = [e.get('new_value', 100.0) for e in history]
@@ -653,23 +649,14 @@ def _section_match_history(player, tournament_matches, lineup_map, ST, elements)
 # ─────────────────────────────────────────────────────────────────────────────
 # Section 4 — Score Progression Analysis
 # ─────────────────────────────────────────────────────────────────────────────
-def _section_score_progression(player, tournament_matches, ST, elements):
+def _section_score_progression(player, tournament_matches, score_logs, ST, elements, charts):
     elements += _section_header('4. SCORE PROGRESSION ANALYSIS (ScoreUpdate Log)', ST)
 
-    from matches.models import LiveScoreboard, ScoreUpdate
-
-    scored_matches = []
-    for m in tournament_matches[:20]:
-        # Use the correct field name: tournament_match (not the generic 'match')
-        sb = LiveScoreboard.objects.filter(tournament_match=m).first()
-        if sb:
-            updates = list(
-                ScoreUpdate.objects.filter(scoreboard=sb)
-                .order_by('timestamp')
-                .values('team1_score', 'team2_score', 'update_type', 'timestamp')
-            )
-            if updates:
-                scored_matches.append((m, updates))
+    scored_matches = [
+        (m, score_logs.matches[m.id])
+        for m in tournament_matches[:20]
+        if score_logs.matches.get(m.id)
+    ]
 
     if not scored_matches:
         elements.append(Paragraph('No score progression data available for recent matches.', ST['body']))
@@ -691,10 +678,7 @@ def _section_score_progression(player, tournament_matches, ST, elements):
         final    = f"{updates[-1]['team1_score']}-{updates[-1]['team2_score']}"
         title    = f"{date_str}  vs {opp}  [{final}]  Pattern: {pattern.upper()}"
 
-        fig = _build_score_flow_chart(updates, title=title)
-        if fig:
-            elements.append(_matplotlib_to_image(fig, width_mm=155))
-            elements.append(Spacer(1, 3))
+        elements.append(charts.add('score_flow', updates, title, width_mm=155))
 
         if flow:
             flow_pairs = [
@@ -724,11 +708,9 @@ def _section_score_progression(player, tournament_matches, ST, elements):
 # ─────────────────────────────────────────────────────────────────────────────
 # Section 5 — Match-Flow Aggregate
 # ─────────────────────────────────────────────────────────────────────────────
-def _section_match_flow_aggregate(player, tournament_matches, ST, elements):
+def _section_match_flow_aggregate(player, tournament_matches, score_logs, ST, elements):
     elements += _section_header('5. MATCH-FLOW AGGREGATE', ST)
 
-    from matches.models import LiveScoreboard, ScoreUpdate
-
     total_with_data = 0
     comeback_wins   = 0
     lost_after_lead = 0
@@ -739,15 +721,7 @@ def _section_match_flow_aggregate(player, tournament_matches, ST, elements):
     max_deficit_ever= 0
 
     for m in tournament_matches:
-        # Use the correct field name: tournament_match (not the generic 'match')
-        sb = LiveScoreboard.objects.filter(tournament_match=m).first()
-        if not sb:
-            continue
-        updates = list(
-            ScoreUpdate.objects.filter(scoreboard=sb)
-            .order_by('timestamp')
-            .values('team1_score', 'team2_score', 'update_type', 'timestamp')
-        )
+        updates = score_logs.matches.get(m.id)
         if not updates:
             continue
         my_side = 'team1' if getattr(m, 'player_team', None) == m.team1 else 'team2'
@@ -810,7 +784,11 @@ def _section_teammate_stats(player, tournament_matches, lineup_map, ST, elements
     })
 
     history = getattr(player, 'profile', None)
-    history_list = (history.rating_history or []) if history else []
+    history_list = history.get_rating_history() if history else []
+    change_by_match = {
+        e['match_id']: e.get('change', 0.0) for e in history_list
+        if e.get('match_type') == 'tournament' and 'match_id' in e
+    }
 
     for m in tournament_matches:
         my_side  = 'team1' if getattr(m, 'player_team', None) == m.team1 else 'team2'
@@ -824,8 +802,8 @@ def _section_teammate_stats(player, tournament_matches, lineup_map, ST, elements
         diff = p_score - o_score
 
         # Find rating change for this match from history
-        rating_change = 0.0
-        if m.end_time:
+        rating_change = change_by_match.get(m.id, 0.0)
+        if m.id not in change_by_match and m.end_time:
             for entry in history_list:
                 ts = _parse_ts(entry.get('timestamp', ''))
                 if ts and abs((ts - m.end_time.replace(tzinfo=dt_timezone.utc)).total_seconds()) < 3600:
@@ -946,7 +924,9 @@ def _section_role_format(player, profile, ST, elements):
     elements += _section_header('8. ROLE & FORMAT BREAKDOWN', ST)
 
     role_dist   = profile.get_role_distribution()
-    format_stats = profile.get_format_stats()
+    # The denormalized snapshot carries the same per-format dict without a per-match walk
+    snapshot = getattr(player, 'stats_snapshot', None)
+    format_stats = snapshot.format_stats if snapshot else profile.get_format_stats()
 
     if role_dist:
         elements.append(Paragraph('Role Distribution (from MatchPlayer records)', ST['label']))
@@ -1010,7 +990,7 @@ def _section_tournament_breakdown(player, tournament_matches, ST, elements):
 # ─────────────────────────────────────────────────────────────────────────────
 # Section 10 — Friendly Game Breakdown
 # ─────────────────────────────────────────────────────────────────────────────
-def _section_friendly_games(player, friendly_matches, ST, elements):
+def _section_friendly_games(player, friendly_matches, score_logs, ST, elements, charts):
     elements += _section_header('10. FRIENDLY GAME BREAKDOWN', ST)
 
     if not friendly_matches:
@@ -1049,24 +1029,13 @@ def _section_friendly_games(player, friendly_matches, ST, elements):
     elements.append(Spacer(1, 4))
 
     # ── Friendly game score progression (reuses existing ScoreUpdate log) ──
-    from matches.models import LiveScoreboard, ScoreUpdate
     elements += _section_header('10b. FRIENDLY GAME SCORE PROGRESSION', ST)
 
-    scored_friendly = []
-    for m in friendly_matches[:20]:
-        game_id = m.get('game_id')
-        if not game_id:
-            continue
-        # Use the correct field name: friendly_game
-        sb = LiveScoreboard.objects.filter(friendly_game_id=game_id).first()
-        if sb:
-            updates = list(
-                ScoreUpdate.objects.filter(scoreboard=sb)
-                .order_by('timestamp')
-                .values('team1_score', 'team2_score', 'update_type', 'timestamp')
-            )
-            if updates:
-                scored_friendly.append((m, updates))
+    scored_friendly = [
+        (m, score_logs.friendly[m['game_id']])
+        for m in friendly_matches[:20]
+        if m.get('game_id') and score_logs.friendly.get(m['game_id'])
+    ]
 
     if not scored_friendly:
         elements.append(Paragraph('No score progression data available for recent friendly games.', ST['body']))
@@ -1087,10 +1056,7 @@ def _section_friendly_games(player, friendly_matches, ST, elements):
             final    = f"{updates[-1]['team1_score']}-{updates[-1]['team2_score']}"
             title    = f"{date_str}  {m.get('game_name', 'Friendly Game')}  [{final}]  Pattern: {pattern.upper()}"
 
-            fig = _build_score_flow_chart(updates, title=title)
-            if fig:
-                elements.append(_matplotlib_to_image(fig, width_mm=155))
-                elements.append(Spacer(1, 3))
+            elements.append(charts.add('score_flow', updates, title, width_mm=155))
 
             if flow:
                 flow_pairs = [
@@ -1120,7 +1086,7 @@ def _section_friendly_games(player, friendly_matches, ST, elements):
 # ─────────────────────────────────────────────────────────────────────────────
 # Section 11 — Practice Data
 # ─────────────────────────────────────────────────────────────────────────────
-def _section_practice(player, ST, elements):
+def _section_practice(player, ST, elements, charts):
     elements += _section_header('11. PRACTICE & IN-GAME (ING) PERFORMANCE EVIDENCE', ST)
 
     from practice.models import PracticeSession
@@ -1219,17 +1185,15 @@ def _section_practice(player, ST, elements):
     elements.append(_kv_table(pairs, ST, cols=3))
     elements.append(Spacer(1, 4))
 
-    if shooting_sessions:
-        fig = _build_practice_bar(shooting_sessions, 'shooting')
-        if fig:
-            elements.append(_matplotlib_to_image(fig, width_mm=165))
-            elements.append(Spacer(1, 3))
-
-    if pointing_sessions:
-        fig = _build_practice_bar(pointing_sessions, 'pointing')
-        if fig:
-            elements.append(_matplotlib_to_image(fig, width_mm=165))
-            elements.append(Spacer(1, 3))
+    for practice_type, sessions in (('shooting', shooting_sessions), ('pointing', pointing_sessions)):
+        if sessions:
+            elements.append(charts.add(
+                'practice_bar',
+                [s.hit_percentage for s in sessions],
+                [s.started_at.strftime('%b %d') for s in sessions],
+                practice_type,
+                width_mm=165,
+            ))
 
     elements.append(Paragraph('Valid Practice Sessions (last 20)', ST['label']))
     headers = ['Date', 'Type', 'Dist', 'Shots', 'Success%', 'Carreaux%', 'Miss%', 'Duration']
@@ -1332,7 +1296,7 @@ def _section_practice(player, ST, elements):
 # ─────────────────────────────────────────────────────────────────────────────
 # Section 12 — Data Quality Notes
 # ─────────────────────────────────────────────────────────────────────────────
-def _section_data_quality(player, profile, tournament_matches, lineup_map, ST, elements):
+def _section_data_quality(player, profile, tournament_matches, lineup_map, score_logs, ST, elements):
     elements += _section_header('12. DATA QUALITY NOTES', ST)
 
     notes = []
@@ -1348,22 +1312,19 @@ def _section_data_quality(player, profile, tournament_matches, lineup_map, ST, e
             f'or matches not yet reflected in the counter.'
         )
 
-    # Rating history truncation
-    history = profile.rating_history or []
-    if len(history) < profile.matches_played:
+    # Rating history gaps
+    history_count = profile.player.rating_events.count()
+    if history_count < profile.matches_played:
         notes.append(
-            f'Rating history has {len(history)} entries but profile shows '
+            f'Rating history has {history_count} entries but profile shows '
             f'{profile.matches_played} matches played. '
-            f'{profile.matches_played - len(history)} match(es) may be missing from history.'
+            f'{profile.matches_played - history_count} match(es) may be missing from history.'
         )
 
     # Missing score progressions
-    from matches.models import LiveScoreboard
-    matches_with_sb = 0
-    for m in tournament_matches[:20]:
-        # Use the correct field name: tournament_match (not the generic 'match')
-        if LiveScoreboard.objects.filter(tournament_match=m).exists():
-            matches_with_sb += 1
+    matches_with_sb = sum(
+        1 for m in tournament_matches[:20] if m.id in score_logs.scoreboard_match_ids
+    )
     if tournament_matches and matches_with_sb < len(tournament_matches[:20]):
         notes.append(
             f'Score progression data available for {matches_with_sb} of '
@@ -1391,51 +1352,10 @@ def _section_data_quality(player, profile, tournament_matches, lineup_map, ST, e
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Main view
+# Report data & PDF build
 # ─────────────────────────────────────────────────────────────────────────────
-def ai_coach_report(request, player_id):
-    """
-    Generate and stream the AI Coach Report PDF (v2) for a player.
-    Access: own profile (session match), legacy player_id session, or staff.
-    """
-    player = get_object_or_404(
-        Player.objects.select_related('profile', 'team'),
-        id=player_id
-    )
-
-    # Access control
-    is_own = False
-
-    # 1. Staff / superuser
-    if hasattr(request, 'user') and request.user.is_authenticated and request.user.is_staff:
-        is_own = True
-
-    # 2. Codename-based session (primary login)
-    if not is_own:
-        session_codename = request.session.get('player_codename')
-        if session_codename and request.session.get('session_active'):
-            try:
-                from friendly_games.models import PlayerCodename as _PC
-                _pc = _PC.objects.get(codename=session_codename.upper())
-                is_own = (_pc.player_id == player.id)
-            except Exception:
-                pass
-
-    # 3. Legacy player_id session
-    if not is_own:
-        session_player_id = request.session.get('player_id')
-        if session_player_id and int(session_player_id) == player.id:
-            is_own = True
-
-    if not is_own:
-        from django.core.exceptions import PermissionDenied
-        raise PermissionDenied("You do not have permission to access this player's AI Coach Report.")
-
-    profile = getattr(player, 'profile', None)
-    if profile is None:
-        raise Http404("Player profile not found.")
-
-    # ── Gather tournament matches ─────────────────────────────────────────────
+def _tournament_matches(player):
+    """Completed tournament matches (≤50) annotated with player_team / scores / won."""
     from django.db.models import Q
     from matches.models import Match, MatchPlayer
 
@@ -1485,7 +1405,13 @@ def ai_coach_report(request, player_id):
         m.opponent_name  = opp_name
         m.player_won     = p_score > o_score
 
-    # Build lineup_map: {match_id: {'team1': [MatchPlayer, ...], 'team2': [...]}}
+    return tournament_matches
+
+
+def _lineup_map(tournament_matches):
+    """{match_id: {'team1': [MatchPlayer, ...], 'team2': [...]}}"""
+    from matches.models import MatchPlayer
+
     lineup_map = defaultdict(lambda: {'team1': [], 'team2': []})
     try:
         all_mps = MatchPlayer.objects.filter(
@@ -1499,8 +1425,10 @@ def ai_coach_report(request, player_id):
                 lineup_map[m.id]['team2'].append(mp)
     except Exception:
         pass
+    return lineup_map
+
 
-    # ── Gather friendly matches ───────────────────────────────────────────────
+def _friendly_matches(player):
     friendly_matches = []
     try:
         from friendly_games.models import FriendlyGamePlayer
@@ -1520,8 +1448,18 @@ def ai_coach_report(request, player_id):
             })
     except Exception:
         pass
+    return friendly_matches
+
+
+def build_ai_report_pdf(player):
+    """Build the AI Coach Report v2 for ``player`` and return the PDF bytes."""
+    profile = player.profile
+
+    tournament_matches = _tournament_matches(player)
+    lineup_map = _lineup_map(tournament_matches)
+    friendly_matches = _friendly_matches(player)
+    score_logs = _load_score_logs(tournament_matches, friendly_matches)
 
-    # ── Build PDF ─────────────────────────────────────────────────────────────
     buf = io.BytesIO()
     doc = SimpleDocTemplate(
         buf,
@@ -1534,6 +1472,7 @@ def ai_coach_report(request, player_id):
     )
 
     ST = _styles()
+    charts = _ChartBatch()
     elements = []
 
     _cover_page(player, profile, ST, elements)
@@ -1543,14 +1482,14 @@ def ai_coach_report(request, player_id):
     elements.append(PageBreak())
 
     _section_identity(player, profile, ST, elements)
-    _section_rating(profile, ST, elements)
+    _section_rating(profile, ST, elements, charts)
     elements.append(PageBreak())
 
     _section_match_history(player, tournament_matches, lineup_map, ST, elements)
     elements.append(PageBreak())
 
-    _section_score_progression(player, tournament_matches, ST, elements)
-    _section_match_flow_aggregate(player, tournament_matches, ST, elements)
+    _section_score_progression(player, tournament_matches, score_logs, ST, elements, charts)
+    _section_match_flow_aggregate(player, tournament_matches, score_logs, ST, elements)
     elements.append(PageBreak())
 
     _section_teammate_stats(player, tournament_matches, lineup_map, ST, elements)
@@ -1561,19 +1500,209 @@ def ai_coach_report(request, player_id):
     _section_tournament_breakdown(player, tournament_matches, ST, elements)
     elements.append(PageBreak())
 
-    _section_friendly_games(player, friendly_matches, ST, elements)
+    _section_friendly_games(player, friendly_matches, score_logs, ST, elements, charts)
     elements.append(PageBreak())
 
-    _section_practice(player, ST, elements)
+    _section_practice(player, ST, elements, charts)
     elements.append(PageBreak())
 
-    _section_data_quality(player, profile, tournament_matches, lineup_map, ST, elements)
+    _section_data_quality(player, profile, tournament_matches, lineup_map, score_logs, ST, elements)
+
+    doc.build(charts.resolve(elements))
+    return buf.getvalue()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Report cache & background generation
+# ─────────────────────────────────────────────────────────────────────────────
+def _activity_fingerprint(player):
+    """
+    Short hash of everything whose change should produce a new report.
+
+    A handful of aggregate queries: profile/player timestamps, the latest
+    change to a participated match, completed friendly games and practice
+    sessions (count, latest start/end, total shots).
+    """
+    from django.db.models import Count, Max, Q, Sum
+    from friendly_games.models import FriendlyGamePlayer, PlayerCodename
+    from matches.models import Match
+    from practice.models import PracticeSession
+
+    parts = [REPORT_VERSION, player.updated_at, player.profile.updated_at]
+
+    try:
+        from matches.models_participant import TeamMatchParticipant
+        match_ids = TeamMatchParticipant.objects.filter(
+            player=player, played=True
+        ).values('match_id')
+        matches = Match.objects.filter(id__in=match_ids, status='completed')
+    except ImportError:
+        matches = Match.objects.filter(
+            Q(team1=player.team) | Q(team2=player.team), status='completed'
+        )
+    parts.append(matches.aggregate(n=Count('id'), last=Max('updated_at')))
+
+    parts.append(FriendlyGamePlayer.objects.filter(
+        player=player, codename_verified=True, game__status='COMPLETED'
+    ).aggregate(n=Count('id'), last=Max('game__completed_at')))
+
+    codename = PlayerCodename.objects.filter(player=player).values_list('codename', flat=True).first()
+    if codename:
+        parts.append(PracticeSession.objects.filter(player_codename=codename).aggregate(
+            n=Count('id'), started=Max('started_at'), ended=Max('ended_at'), shots=Sum('total_shots'),
+        ))
+
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+def _report_keys(player):
+    """(pdf_key, status_key) for the player's current activity fingerprint."""
+    region = cache_regions.region(cache_regions.AI_REPORTS)
+    fingerprint = _activity_fingerprint(player)
+    return (region.key('pdf', player.id, fingerprint),
+            region.key('status', player.id, fingerprint))
+
+
+_executor = None
+
+
+def _report_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'AI_REPORT_WORKERS', 1),
+            thread_name_prefix='ai-report',
+        )
+    return _executor
+
+
+def _generate_report(player_id, pdf_key, status_key):
+    """Background job: build the PDF and publish it under ``pdf_key``."""
+    from django.core.cache import cache
+
+    region = cache_regions.region(cache_regions.AI_REPORTS)
+    try:
+        player = Player.objects.select_related('profile', 'team').get(id=player_id)
+        pdf = build_ai_report_pdf(player)
+        cache.set(pdf_key, pdf, region.timeout)
+        cache.set(status_key, 'ready', region.timeout)
+        logger.info(f"AI coach report for player {player_id} generated ({len(pdf)} bytes)")
+    except Exception:
+        logger.exception(f"AI coach report for player {player_id} failed")
+        cache.set(status_key, 'failed', GENERATION_TIMEOUT)
+    finally:
+        close_old_connections()
+
+
+def _report_state(player, start=False):
+    """
+    Return (status, pdf) where status is 'ready', 'generating', 'failed' or 'missing'.
+
+    ``start=True`` queues a background build when there is no cached PDF and
+    none is already running (a failed build is retried).
+    """
+    from django.core.cache import cache
+
+    pdf_key, status_key = _report_keys(player)
+    pdf = cache.get(pdf_key)
+    if pdf is not None:
+        return 'ready', pdf
+
+    status = cache.get(status_key)
+    if not start:
+        return (status if status in ('generating', 'failed') else 'missing'), None
+    if status == 'failed':
+        cache.delete(status_key)
+    # cache.add is atomic: only one request per fingerprint queues a build
+    if cache.add(status_key, 'generating', GENERATION_TIMEOUT):
+        _report_executor().submit(_generate_report, player.id, pdf_key, status_key)
+    return 'generating', None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Views
+# ─────────────────────────────────────────────────────────────────────────────
+def _report_player(request, player_id):
+    """
+    Load the player and enforce report access.
+    Access: own profile (session match), legacy player_id session, or staff.
+    """
+    player = get_object_or_404(
+        Player.objects.select_related('profile', 'team'),
+        id=player_id
+    )
+
+    # Access control
+    is_own = False
+
+    # 1. Staff / superuser
+    if hasattr(request, 'user') and request.user.is_authenticated and request.user.is_staff:
+        is_own = True
 
-    doc.build(elements)
-    buf.seek(0)
+    # 2. Codename-based session (primary login)
+    if not is_own:
+        session_codename = request.session.get('player_codename')
+        if session_codename and request.session.get('session_active'):
+            try:
+                from friendly_games.models import PlayerCodename as _PC
+                _pc = _PC.objects.get(codename=session_codename.upper())
+                is_own = (_pc.player_id == player.id)
+            except Exception:
+                pass
+
+    # 3. Legacy player_id session
+    if not is_own:
+        session_player_id = request.session.get('player_id')
+        if session_player_id and int(session_player_id) == player.id:
+            is_own = True
+
+    if not is_own:
+        from django.core.exceptions import PermissionDenied
+        raise PermissionDenied("You do not have permission to access this player's AI Coach Report.")
+
+    if getattr(player, 'profile', None) is None:
+        raise Http404("Player profile not found.")
+    return player
+
+
+def _status_payload(player, status):
+    return {
+        'status': status,
+        'download_url': reverse('ai_coach_report', args=[player.id]),
+        'status_url': reverse('ai_coach_report_status', args=[player.id]),
+    }
+
+
+def ai_coach_report(request, player_id):
+    """
+    Serve the AI Coach Report PDF (v2) for a player.
+
+    A cached report for the player's current activity is returned directly.
+    Otherwise a background build is started and a "generating…" page (or a
+    202 JSON status for XHR / JSON clients) is returned; the page polls
+    ai_coach_report_status and reloads this URL once the PDF is ready.
+    """
+    player = _report_player(request, player_id)
+
+    status, pdf = _report_state(player, start=True)
+    if pdf is None:
+        payload = _status_payload(player, status)
+        wants_json = (request.headers.get('x-requested-with') == 'XMLHttpRequest'
+                      or 'application/json' in request.headers.get('accept', ''))
+        if wants_json:
+            return JsonResponse(payload, status=202)
+        return render(request, 'teams/ai_report_generating.html',
+                      {'player': player, **payload}, status=202)
 
     filename = (f'PFC_AICoachReport_v2_{player.name.replace(" ", "_")}'
                 f'_{timezone.now().strftime("%Y%m%d")}.pdf')
-    response = HttpResponse(buf.read(), content_type='application/pdf')
+    response = HttpResponse(pdf, content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
+
+
+def ai_coach_report_status(request, player_id):
+    """JSON status of the player's AI Coach Report: ready / generating / failed / missing."""
+    player = _report_player(request, player_id)
+    status, _pdf = _report_state(player)
+    return JsonResponse(_status_payload(player, status))
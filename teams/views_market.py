@@ -3,69 +3,17 @@ PFC MARKET - Stock Exchange Style Player Leaderboard
 Shows all players ranked by rating with trend indicators based on recent 3-day window.
 """
 from django.shortcuts import render
-from django.db.models import Q
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
-from django.utils.translation import gettext as _, ngettext
+from django.utils.translation import get_language, gettext as _, ngettext
 from datetime import timedelta
-from .models import PlayerProfile
+from pfc_core import cache_regions
+from .models import PlayerProfile, RatingEvent
 import json
 
 
-def calculate_player_trend(profile, window_days=3):
-    """
-    Calculate player's rating trend based on games played in the last `window_days` days.
-    Falls back to last 2 games if no activity in the window (so the market is never empty).
-
-    Returns: {
-        'direction': 'up' | 'down' | 'neutral',
-        'change': float (total change in window),
-        'percentage': float (percentage change),
-        'games_analyzed': int,
-        'window_label': str  (e.g. '3d' or '2 games')
-    }
-    """
-    day_label = ngettext('%(count)s day', '%(count)s days', window_days) % {'count': window_days}
-    empty = {
-        'direction': 'neutral',
-        'change': 0.0,
-        'percentage': 0.0,
-        'games_analyzed': 0,
-        'window_label': day_label
-    }
-
-    if not profile.rating_history:
-        return empty
-
-    history = profile.rating_history
-    if not history:
-        return empty
-
-    # --- Try 3-day window first ---
-    cutoff = timezone.now() - timedelta(days=window_days)
-    recent_games = []
-    for entry in history:
-        ts_str = entry.get('timestamp')
-        if ts_str:
-            try:
-                from django.utils.dateparse import parse_datetime
-                ts = parse_datetime(ts_str)
-                if ts and ts >= cutoff:
-                    recent_games.append(entry)
-            except Exception:
-                pass
-
-    window_label = day_label
-
-    # --- Fallback: last 2 games if window is empty ---
-    if not recent_games:
-        recent_games = history[-2:] if len(history) >= 2 else history[-1:]
-        window_label = ngettext('%(count)s game', '%(count)s games', len(recent_games)) % {'count': len(recent_games)}
-
-    # Sum changes
-    total_change = sum(g.get('change', 0) for g in recent_games)
-
-    # Base rating for percentage
-    base_rating = recent_games[0].get('old_value', 100.0) if recent_games else 100.0
+def _trend(total_change, base_rating, games, window_label):
     percentage_change = (total_change / base_rating * 100) if base_rating > 0 else 0.0
 
     if total_change > 0:
@@ -79,24 +27,104 @@ def calculate_player_trend(profile, window_days=3):
         'direction': direction,
         'change': round(total_change, 2),
         'percentage': round(percentage_change, 2),
-        'games_analyzed': len(recent_games),
+        'games_analyzed': games,
         'window_label': window_label
     }
 
 
-def pfc_market(request):
+def _day_label(window_days):
+    return ngettext('%(count)s day', '%(count)s days', window_days) % {'count': window_days}
+
+
+def market_trends(player_ids=None, window_days=3):
     """
-    Display the PFC MARKET leaderboard - stock exchange style ranking
-    of all players by rating with trend indicators.
+    Rating trend of every player with rating events, keyed by player id.
+
+    The trend covers the changes of the last `window_days` days; a player
+    without activity in the window falls back to their last 2 games (so the
+    market is never empty).  Players without any rating event are absent.
+
+    Two queries over the rating event log, both served by its indexes:
+      - in-window totals, per player: Sum / Count of the changes and the
+        old value of the first change, as window functions over the
+        (timestamp) range, one row kept per player
+      - fallback: the last 2 changes per remaining player, ranked with
+        ROW_NUMBER() over (player, timestamp DESC)
+
+    Each value: {
+        'direction': 'up' | 'down' | 'neutral',
+        'change': float (total change in window),
+        'percentage': float (percentage change),
+        'games_analyzed': int,
+        'window_label': str  (e.g. '3 days' or '2 games')
+    }
+    """
+    day_label = _day_label(window_days)
+    cutoff = timezone.now() - timedelta(days=window_days)
+    events = RatingEvent.objects.all()
+    if player_ids is not None:
+        events = events.filter(player_id__in=player_ids)
+
+    per_player = F('player_id')
+    chronological = [F('timestamp').asc(), F('id').asc()]
+    in_window = (
+        events.filter(timestamp__gte=cutoff)
+        .annotate(
+            position=Window(RowNumber(), partition_by=per_player, order_by=chronological),
+            total=Window(Sum('change'), partition_by=per_player),
+            games=Window(Count('id'), partition_by=per_player),
+        )
+        .filter(position=1)
+        .values_list('player_id', 'total', 'games', 'old_value')
+    )
+    trends = {
+        player_id: _trend(total, base_rating, games, day_label)
+        for player_id, total, games, base_rating in in_window
+    }
+
+    # --- Fallback: last 2 games if window is empty ---
+    latest = (
+        events.exclude(player_id__in=events.filter(timestamp__gte=cutoff).values('player_id'))
+        .annotate(recency=Window(
+            RowNumber(), partition_by=per_player,
+            order_by=[F('timestamp').desc(), F('id').desc()],
+        ))
+        .filter(recency__lte=2)
+        .order_by('player_id', 'timestamp', 'id')
+        .values_list('player_id', 'change', 'old_value')
+    )
+    games = {}
+    for player_id, change, old_value in latest:
+        games.setdefault(player_id, []).append((change, old_value))
+    for player_id, recent_games in games.items():
+        window_label = ngettext('%(count)s game', '%(count)s games', len(recent_games)) % {'count': len(recent_games)}
+        trends[player_id] = _trend(
+            sum(change for change, _ in recent_games), recent_games[0][1], len(recent_games), window_label
+        )
+    return trends
+
+
+def calculate_player_trend(profile, window_days=3):
     """
+    Rating trend of one player (see market_trends for the window rules).
+    """
+    empty = _trend(0.0, 100.0, 0, _day_label(window_days))
+    return market_trends([profile.player_id], window_days).get(profile.player_id, empty)
+
+
+def build_market_rows():
+    """Rating and trend for every active player profile, highest rating first."""
     # Get all active player profiles with ratings
     # Inactive profiles are excluded (admin can deactivate a profile without deleting it)
     profiles = PlayerProfile.objects.filter(is_active=True).select_related('player__team').order_by('-value')
     
-    # Calculate trend for each player
+    # Trends of all players at once, from the rating event log
+    trends = market_trends()
+    empty = _trend(0.0, 100.0, 0, _day_label(3))
+    
     market_data = []
     for profile in profiles:
-        trend = calculate_player_trend(profile)
+        trend = trends.get(profile.player_id, empty)
         
         market_data.append({
             'player': profile.player,
@@ -109,6 +137,20 @@ def pfc_market(request):
             'team': profile.player.team.name if profile.player.team else _('No Team'),
             'rank': 0  # Will be set after sorting
         })
+    return market_data
+
+
+def pfc_market(request):
+    """
+    Display the PFC MARKET leaderboard - stock exchange style ranking
+    of all players by rating with trend indicators.
+    """
+    # Rows are shared between requests; copy them before ranking / sorting.
+    # The key includes the language because window labels are translated.
+    rows = cache_regions.region(cache_regions.MARKET).get_or_set(
+        ("rows", get_language()), build_market_rows
+    )
+    market_data = [dict(row) for row in rows]
     
     # Get sorting parameter from request
     sort_by = request.GET.get('sort', 'rating')  # 'rating' or 'trend'
@@ -21,6 +21,8 @@ from .models import (
     TournamentRegistrationVoucherRedemption,
 )
 from .poule_models import Poule, PouleTeam
+from .job_models import AutomationJob
+from .job_queue import requeue_job
 from .admin_helpers import (
     retry_automation_action,
     advance_stage_action, 
@@ -145,6 +147,7 @@ class TournamentAdmin(admin.ModelAdmin):
         "generate_melee_teams_random",
         "generate_melee_teams_balanced",
         "generate_melee_teams_snake_draft",
+        "generate_melee_teams_partnership_aware",
         "restore_melee_players_to_original_teams",
     ]
     
@@ -278,6 +281,12 @@ class TournamentAdmin(admin.ModelAdmin):
     
     generate_melee_teams_snake_draft.short_description = "Generate Mêlée teams (Snake Draft)"
     
+    def generate_melee_teams_partnership_aware(self, request, queryset):
+        """Generate Mêlée teams avoiding previous partners while balancing ratings"""
+        self._generate_melee_teams_with_algorithm(request, queryset, 'partnership_aware', 'Fresh Partners')
+    
+    generate_melee_teams_partnership_aware.short_description = "Generate Mêlée teams (Fresh Partners)"
+    
     def _generate_melee_teams_with_algorithm(self, request, queryset, algorithm, algorithm_name):
         """Helper method to generate Mêlée teams with specified algorithm"""
         success_count = 0
@@ -712,5 +721,27 @@ class MeleePlayerAdmin(ActiveTeamMixin, ActiveTournamentMixin, MeleePlayerSwapAd
 
 
 
+@admin.register(AutomationJob)
+class AutomationJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "tournament", "event_type", "status", "attempts", "created_at", "started_at", "finished_at")
+    list_filter = ("status", "event_type")
+    search_fields = ("tournament__name",)
+    readonly_fields = ("created_at", "started_at", "finished_at", "worker_id", "last_error")
+    ordering = ("-created_at",)
+    actions = ["requeue_jobs"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("tournament")
+
+    @admin.action(description="Requeue selected jobs")
+    def requeue_jobs(self, request, queryset):
+        count = 0
+        # One by one: a tournament holds at most one pending job, extra ones are coalesced
+        for job in queryset.exclude(status=AutomationJob.STATUS_RUNNING):
+            requeue_job(job, attempts=0, last_error="", finished_at=None, next_attempt_at=timezone.now())
+            count += 1
+        messages.success(request, f"Requeued {count} automation job(s)")
+
+
 # ── Poule / Group admin (registers PouleAdmin) ────────────────────────────────
 from . import poule_admin  # noqa: F401, E402
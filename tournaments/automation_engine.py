@@ -1,7 +1,6 @@
 # automation_engine.py - Complete Tournament Automation System Rebuild
 
 import logging
-import random
 from django.db import transaction
 from django.db.models import Q, Count
 from .models import Tournament, TournamentTeam, Round, Stage
@@ -17,7 +16,14 @@ class TournamentEngine:
         self.current_stage = self.get_current_stage()
         
     def process_automation(self):
-        """Main automation entry point with comprehensive safeguards"""
+        """
+        Main automation entry point; runs one automation pass.
+
+        Callers go through the job queue (tournaments.job_queue), which
+        allows one running job per tournament, so this method takes no lock
+        of its own.  ``automation_status`` only reports progress: it is
+        'processing' while the pass runs and 'idle' afterwards.
+        """
         from django.db import transaction
 
         # Independent Games is a native non-algorithmic format. Scheduled
@@ -32,35 +38,10 @@ class TournamentEngine:
         
         try:
             with transaction.atomic():
-                # Refresh tournament data to get latest status
-                self.tournament.refresh_from_db()
-                current_status = getattr(self.tournament, 'automation_status', 'idle')
-                
-                # Safeguard 1: Check if automation is already running
-                if current_status != 'idle':
-                    logger.info(f"🔒 Tournament {self.tournament.id} automation already running (status: {current_status}). Skipping.")
-                    return True
-                
                 logger.info(f"🚀 Processing automation for tournament {self.tournament.id}")
-                
-                # Set status to processing with atomic update
-                updated = Tournament.objects.filter(
-                    id=self.tournament.id,
-                    automation_status='idle'
-                ).update(automation_status='processing')
-                
-                if updated == 0:
-                    logger.info(f"🔒 Tournament {self.tournament.id} status changed by another process. Skipping.")
-                    return True
-                
-                # Refresh to get updated status
+                Tournament.objects.filter(id=self.tournament.id).update(automation_status='processing')
                 self.tournament.refresh_from_db()
                 
-                # Safeguard 2: Double-check we have processing status
-                if self.tournament.automation_status != 'processing':
-                    logger.warning(f"⚠️ Tournament {self.tournament.id} status not 'processing' after update. Aborting.")
-                    return False
-                
                 # Determine what action to take
                 result = True
                 action_taken = "none"
@@ -89,16 +70,9 @@ class TournamentEngine:
                 return result
                 
         except Exception as e:
-            # Ensure status is reset even on error
-            try:
-                self.tournament.refresh_from_db()
-                if self.tournament.automation_status == 'processing':
-                    self.tournament.automation_status = "idle"
-                    self.tournament.save()
-            except:
-                pass
-            
-            logger.error(f"❌ Automation failed for tournament {self.tournament.id}, status reset to idle for retry")
+            # The transaction rolled back the 'processing' marker; the job
+            # queue retries the pass
+            logger.error(f"❌ Automation failed for tournament {self.tournament.id}")
             return self.handle_automation_error(e)
     
     def get_current_stage(self):
@@ -585,190 +559,43 @@ class MatchGenerator:
 
 
 class SwissGenerator(MatchGenerator):
-    """Swiss system match generator with fallback strategies"""
+    """Swiss system match generator backed by the min-cost pairing engine"""
     
     def generate_matches(self, teams):
-        """Generate Swiss pairings with multiple fallback strategies"""
+        """Generate Swiss pairings: fewest rematches first, then closest scores"""
+        from .pairing_engine import LEVEL_REMATCH
+        from .swiss_algorithms import PairingContext, plan_swiss_pairings
+        
         logger.info(f"🇨🇭 Generating Swiss pairings for {len(teams)} teams")
         
-        # Handle bye if odd number of teams
-        bye_team = None
-        if len(teams) % 2 != 0:
-            bye_team = self.assign_bye(teams)
-            teams = [t for t in teams if t != bye_team]
+        teams = sorted(teams, key=lambda t: -t.swiss_points)
+        context = PairingContext.load(self.tournament, teams)
+        plan = plan_swiss_pairings(teams, context)
         
-        # Try different pairing strategies
-        matches_created = 0
+        if plan.bye is not None:
+            self.assign_bye(plan.bye)
         
-        # Strategy 1: Ideal Swiss pairing (no repeats)
-        pairings = self.try_ideal_pairing(teams)
-        if pairings:
-            logger.info("✅ Using ideal Swiss pairing (no repeats)")
-            matches_created = self.create_matches_from_pairings(pairings)
+        rematches = plan.violations.get(LEVEL_REMATCH, 0)
+        if rematches:
+            logger.warning(f"⚠️ Swiss pairing needs {rematches} repeat pairing(s)")
         else:
-            # Strategy 2: Allow minimal repeats
-            pairings = self.try_minimal_repeats(teams)
-            if pairings:
-                logger.warning("⚠️ Using minimal repeat pairing strategy")
-                matches_created = self.create_matches_from_pairings(pairings)
-            else:
-                # Strategy 3: Random pairing (last resort)
-                logger.warning("🎲 Using random pairing (last resort)")
-                matches_created = self.random_pairing(teams)
+            logger.info("✅ Using ideal Swiss pairing (no repeats)")
         
-        return matches_created
+        return self.create_matches_from_pairings(plan.pairs)
     
-    def assign_bye(self, teams):
-        """Assign bye to lowest-ranked team that hasn't had one"""
-        for team_tt in reversed(teams):  # Start from lowest ranked
-            if team_tt.received_bye_in_round is None:
-                team_tt.received_bye_in_round = self.round_obj.number
-                team_tt.swiss_points += 3  # Bye points
-                team_tt.save()
-                
-                logger.info(f"🚫 Bye assigned to {team_tt.team.name}")
-                return team_tt
-        
-        # All teams have had byes - assign to last team anyway
-        bye_team = teams[-1]
+    def assign_bye(self, bye_team):
+        """Give the bye chosen by the pairing engine (lowest-ranked team without one)"""
+        had_bye = bye_team.received_bye_in_round is not None
         bye_team.received_bye_in_round = self.round_obj.number
-        bye_team.swiss_points += 3
+        bye_team.swiss_points += 3  # Bye points
         bye_team.save()
         
-        logger.warning(f"🚫 Bye assigned to {bye_team.team.name} (all teams had previous byes)")
+        if had_bye:
+            logger.warning(f"🚫 Bye assigned to {bye_team.team.name} (all teams had previous byes)")
+        else:
+            logger.info(f"🚫 Bye assigned to {bye_team.team.name}")
         return bye_team
     
-    def try_ideal_pairing(self, teams):
-        """Try to pair teams without any repeats"""
-        # Group teams by points
-        point_groups = self.group_teams_by_points(teams)
-        
-        all_pairings = []
-        unpaired_teams = []
-        
-        for point_group in point_groups:
-            group_pairings, group_unpaired = self.pair_within_group_no_repeats(point_group)
-            all_pairings.extend(group_pairings)
-            unpaired_teams.extend(group_unpaired)
-        
-        # Try to pair remaining teams across point groups
-        if unpaired_teams:
-            cross_pairings, still_unpaired = self.pair_across_groups_no_repeats(unpaired_teams)
-            all_pairings.extend(cross_pairings)
-            
-            if still_unpaired:
-                logger.debug(f"Could not pair {len(still_unpaired)} teams without repeats")
-                return None
-        
-        return all_pairings
-    
-    def try_minimal_repeats(self, teams):
-        """Allow minimal repeats if necessary"""
-        # Simple approach: pair sequentially, allowing repeats
-        pairings = []
-        available_teams = teams.copy()
-        
-        while len(available_teams) >= 2:
-            team1 = available_teams.pop(0)
-            
-            # Try to find best opponent (fewest previous meetings)
-            best_opponent = None
-            min_meetings = float('inf')
-            
-            for team2 in available_teams:
-                meetings = self.count_previous_meetings(team1, team2)
-                if meetings < min_meetings:
-                    min_meetings = meetings
-                    best_opponent = team2
-            
-            if best_opponent:
-                available_teams.remove(best_opponent)
-                pairings.append((team1, best_opponent))
-                
-                if min_meetings > 0:
-                    logger.warning(f"⚠️ Repeat pairing: {team1.team.name} vs {best_opponent.team.name} ({min_meetings} previous meetings)")
-        
-        return pairings
-    
-    def random_pairing(self, teams):
-        """Last resort: random pairing"""
-        available_teams = teams.copy()
-        random.shuffle(available_teams)
-        
-        matches_created = 0
-        while len(available_teams) >= 2:
-            team1 = available_teams.pop()
-            team2 = available_teams.pop()
-            
-            self.create_match(team1, team2)
-            matches_created += 1
-        
-        return matches_created
-    
-    def group_teams_by_points(self, teams):
-        """Group teams by Swiss points"""
-        point_groups = {}
-        for team in teams:
-            points = team.swiss_points
-            if points not in point_groups:
-                point_groups[points] = []
-            point_groups[points].append(team)
-        
-        # Return groups in descending point order
-        return [point_groups[points] for points in sorted(point_groups.keys(), reverse=True)]
-    
-    def pair_within_group_no_repeats(self, group):
-        """Pair teams within same point group, avoiding repeats"""
-        pairings = []
-        unpaired = group.copy()
-        
-        while len(unpaired) >= 2:
-            team1 = unpaired.pop(0)
-            opponent_found = False
-            
-            for i, team2 in enumerate(unpaired):
-                if not self.have_played_before(team1, team2):
-                    unpaired.pop(i)
-                    pairings.append((team1, team2))
-                    opponent_found = True
-                    break
-            
-            if not opponent_found:
-                # Can't pair team1 without repeats
-                break
-        
-        return pairings, unpaired
-    
-    def pair_across_groups_no_repeats(self, teams):
-        """Try to pair remaining teams across point groups"""
-        pairings = []
-        unpaired = teams.copy()
-        
-        while len(unpaired) >= 2:
-            team1 = unpaired.pop(0)
-            opponent_found = False
-            
-            for i, team2 in enumerate(unpaired):
-                if not self.have_played_before(team1, team2):
-                    unpaired.pop(i)
-                    pairings.append((team1, team2))
-                    opponent_found = True
-                    break
-            
-            if not opponent_found:
-                break
-        
-        return pairings, unpaired
-    
-    def have_played_before(self, team1_tt, team2_tt):
-        """Check if two teams have played before"""
-        return team2_tt.team in team1_tt.opponents_played.all()
-    
-    def count_previous_meetings(self, team1_tt, team2_tt):
-        """Count how many times two teams have played"""
-        # Simple check - could be enhanced to count actual meetings
-        return 1 if self.have_played_before(team1_tt, team2_tt) else 0
-    
     def create_matches_from_pairings(self, pairings):
         """Create matches from list of team pairings"""
         matches_created = 0
@@ -1,58 +1,94 @@
 """
 Tournament Automation Logging System
 Provides comprehensive logging and monitoring for tournament automation debugging
+
+AutomationLogger buffers the AutomationLog rows of an automation run and
+writes them with one bulk_create:
+  - when the run ends (``with AutomationLogger(...)`` or ``flush()``)
+  - when AUTOMATION_LOG_BUFFER_SIZE entries are waiting, or the oldest has
+    waited AUTOMATION_LOG_FLUSH_SECONDS (checked as entries are added)
+  - right away for errors
+
+Each flush is announced on the AUTOMATION_LOG_GROUP channel-layer group once
+its transaction commits; ``automation_monitor --follow`` waits on it instead
+of polling.  Rows older than AUTOMATION_LOG_RETENTION_DAYS are removed by
+prune_automation_logs() (``python manage.py prune_automation_logs``), and
+iter_log_pages() reads the table in keyset pages for exports.
+
+Text output goes to the shared "tournaments.automation" logger, configured
+in settings.LOGGING, with the tournament id prefixed to every message.
 """
 
 import logging
 import json
+import time
 import traceback
-from datetime import datetime
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
-from typing import Dict, Any, Optional, List
-import os
+from typing import Dict, Any, Iterator, Optional, List
+
+logger = logging.getLogger("tournaments.automation")
+
+# Channel-layer group told about every flush (see announce_flush)
+AUTOMATION_LOG_GROUP = "automation_logs"
+
+
+class _TournamentLogAdapter(logging.LoggerAdapter):
+    """Prefix messages with the tournament id ("T12 | ...")."""
+
+    def process(self, msg, kwargs):
+        return f"T{self.extra['tournament_id']} | {msg}", kwargs
+
 
 class AutomationLogger:
     """Comprehensive logging system for tournament automation"""
     
-    def __init__(self, tournament_id: int):
+    def __init__(self, tournament_id: int, buffer_size: Optional[int] = None,
+                 flush_seconds: Optional[float] = None):
         self.tournament_id = tournament_id
         self.logger = self._setup_logger()
+        self.buffer_size = buffer_size or getattr(settings, 'AUTOMATION_LOG_BUFFER_SIZE', 50)
+        self.flush_seconds = (
+            flush_seconds if flush_seconds is not None
+            else getattr(settings, 'AUTOMATION_LOG_FLUSH_SECONDS', 5.0)
+        )
+        self._pending: List['AutomationLog'] = []
+        self._pending_since = None  # monotonic time of the oldest pending entry
         
     def _setup_logger(self):
-        """Setup dedicated logger for automation"""
-        logger_name = f"automation.tournament_{self.tournament_id}"
-        logger = logging.getLogger(logger_name)
-        
-        if not logger.handlers:
-            # Create logs directory if it doesn't exist
-            log_dir = os.path.join(settings.BASE_DIR, 'logs', 'automation')
-            os.makedirs(log_dir, exist_ok=True)
-            
-            # File handler for detailed logs
-            log_file = os.path.join(log_dir, f'tournament_{self.tournament_id}.log')
-            file_handler = logging.FileHandler(log_file)
-            file_handler.setLevel(logging.DEBUG)
-            
-            # Console handler for immediate feedback
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.INFO)
-            
-            # Detailed formatter
-            formatter = logging.Formatter(
-                '%(asctime)s | %(levelname)s | T%(tournament_id)s | %(funcName)s:%(lineno)d | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            
-            file_handler.setFormatter(formatter)
-            console_handler.setFormatter(formatter)
-            
-            logger.addHandler(file_handler)
-            logger.addHandler(console_handler)
-            logger.setLevel(logging.DEBUG)
-            
-        return logger
+        """Shared automation logger; no per-tournament handlers to leak"""
+        return _TournamentLogAdapter(logger, {'tournament_id': self.tournament_id})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+    def _record(self, **fields):
+        """Buffer one AutomationLog row, flushing when a threshold is reached"""
+        self._pending.append(
+            AutomationLog(tournament_id=self.tournament_id, timestamp=timezone.now(), **fields)
+        )
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        if len(self._pending) >= self.buffer_size or now - self._pending_since >= self.flush_seconds:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write the buffered rows with one bulk_create; returns how many were written"""
+        if not self._pending:
+            return 0
+        entries, self._pending, self._pending_since = self._pending, [], None
+        AutomationLog.objects.bulk_create(entries)
+        transaction.on_commit(lambda: announce_flush(self.tournament_id, entries))
+        return len(entries)
     
     def log_automation_start(self, trigger_type: str, trigger_data: Dict[str, Any]):
         """Log automation process start"""
@@ -66,12 +102,10 @@ class AutomationLogger:
         )
         
         # Store in database for monitoring
-        AutomationLog.objects.create(
-            tournament_id=self.tournament_id,
+        self._record(
             event_type='automation_start',
             trigger_type=trigger_type,
-            data=trigger_data,
-            timestamp=timezone.now()
+            data=trigger_data
         )
     
     def log_tournament_state(self, tournament):
@@ -198,13 +232,11 @@ class AutomationLogger:
                 extra={'tournament_id': self.tournament_id}
             )
         
-        AutomationLog.objects.create(
-            tournament_id=self.tournament_id,
+        self._record(
             event_type='decision',
             message=decision,
             reasoning=reasoning,
-            data=data or {},
-            timestamp=timezone.now()
+            data=data or {}
         )
     
     def log_action(self, action: str, details: str, data: Dict[str, Any] = None):
@@ -224,13 +256,11 @@ class AutomationLogger:
                 extra={'tournament_id': self.tournament_id}
             )
         
-        AutomationLog.objects.create(
-            tournament_id=self.tournament_id,
+        self._record(
             event_type='action',
             message=action,
             details=details,
-            data=data or {},
-            timestamp=timezone.now()
+            data=data or {}
         )
     
     def log_error(self, error: Exception, context: str, data: Dict[str, Any] = None):
@@ -252,14 +282,14 @@ class AutomationLogger:
             extra={'tournament_id': self.tournament_id}
         )
         
-        AutomationLog.objects.create(
-            tournament_id=self.tournament_id,
+        self._record(
             event_type='error',
             message=f"{type(error).__name__}: {str(error)}",
             context=context,
-            data=error_info,
-            timestamp=timezone.now()
+            data=error_info
         )
+        # Errors are what monitoring waits for: don't hold them back
+        self.flush()
     
     def log_success(self, action: str, result: Dict[str, Any]):
         """Log successful automation completion"""
@@ -272,12 +302,10 @@ class AutomationLogger:
             extra={'tournament_id': self.tournament_id}
         )
         
-        AutomationLog.objects.create(
-            tournament_id=self.tournament_id,
+        self._record(
             event_type='success',
             message=action,
-            data=result,
-            timestamp=timezone.now()
+            data=result
         )
     
     def log_status_change(self, old_status: str, new_status: str, reason: str):
@@ -287,13 +315,11 @@ class AutomationLogger:
             extra={'tournament_id': self.tournament_id}
         )
         
-        AutomationLog.objects.create(
-            tournament_id=self.tournament_id,
+        self._record(
             event_type='status_change',
             message=f"{old_status} → {new_status}",
             reasoning=reason,
-            data={'old_status': old_status, 'new_status': new_status},
-            timestamp=timezone.now()
+            data={'old_status': old_status, 'new_status': new_status}
         )
 
 
@@ -317,18 +343,92 @@ class AutomationLog(models.Model):
     context = models.TextField(blank=True)
     trigger_type = models.CharField(max_length=50, blank=True)
     data = models.JSONField(default=dict)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event is logged, not when its buffer is flushed
+    timestamp = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-timestamp']
         indexes = [
             models.Index(fields=['tournament_id', '-timestamp']),
             models.Index(fields=['event_type', '-timestamp']),
+            models.Index(fields=['tournament_id', 'event_type', '-timestamp']),
         ]
     
     def __str__(self):
         return f"T{self.tournament_id} | {self.event_type} | {self.message[:50]}"
 
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON shape used by the logs API and the export"""
+        return {
+            'id': self.id,
+            'tournament_id': self.tournament_id,
+            'event_type': self.event_type,
+            'message': self.message,
+            'details': self.details,
+            'reasoning': self.reasoning,
+            'context': self.context,
+            'timestamp': self.timestamp.isoformat(),
+            'data': self.data,
+        }
+
+
+def announce_flush(tournament_id: int, entries: List[AutomationLog]):
+    """Tell AUTOMATION_LOG_GROUP that ``entries`` were written. Logs but never raises."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(AUTOMATION_LOG_GROUP, {
+            'type': 'automation_logs.flushed',
+            'tournament_id': tournament_id,
+            'count': len(entries),
+            'has_error': any(entry.event_type == 'error' for entry in entries),
+        })
+    except Exception as exc:
+        logger.warning(f"Announcing {len(entries)} automation log(s) for T{tournament_id} failed: {exc}")
+
+
+def iter_log_pages(queryset, page_size: int = 500, after_id: int = 0) -> Iterator[List[AutomationLog]]:
+    """
+    Yield ``queryset``'s rows oldest first, ``page_size`` at a time.
+
+    Pages are fetched by keyset (id > last id seen), so each page costs the
+    same however deep into the table it is and nothing is held in memory
+    beyond the current page.
+    """
+    queryset = queryset.order_by('id')
+    while True:
+        page = list(queryset.filter(id__gt=after_id)[:page_size])
+        if not page:
+            return
+        yield page
+        after_id = page[-1].id
+
+
+def prune_automation_logs(older_than=None, batch_size: int = 5000, dry_run: bool = False) -> int:
+    """
+    Delete automation logs older than ``older_than``.
+
+    Defaults to AUTOMATION_LOG_RETENTION_DAYS ago.  Rows are deleted oldest
+    first, ``batch_size`` per DELETE, so the table is never locked for long.
+    Returns the number of rows deleted (or that would be, with ``dry_run``).
+    """
+    if older_than is None:
+        older_than = timezone.now() - timedelta(days=getattr(settings, 'AUTOMATION_LOG_RETENTION_DAYS', 30))
+    expired = AutomationLog.objects.filter(timestamp__lt=older_than)
+    if dry_run:
+        return expired.count()
+
+    deleted = 0
+    while True:
+        ids = list(expired.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += AutomationLog.objects.filter(id__in=ids).delete()[0]
+    if deleted:
+        logger.info(f"Pruned {deleted} automation log(s) older than {older_than:%Y-%m-%d %H:%M}")
+    return deleted
+
 
 class AutomationMonitor:
     """Real-time monitoring for automation status"""
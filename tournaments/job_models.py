@@ -0,0 +1,118 @@
+"""
+tournaments/job_models.py
+=========================
+Durable background job queue for tournament automation.
+
+Match completion no longer runs TournamentEngine inside the HTTP request that
+saved the final score.  Instead the post_save signal records a
+"round completed" AutomationJob and returns immediately; the
+``automation_worker`` management command picks jobs up and runs the engine,
+one tournament at a time.
+
+Design principles:
+  - Additive: the Tournament.automation_status field is still maintained by the
+    engine for display, but mutual exclusion now lives in the job states below.
+  - Coalescing: at most one *pending* job exists per tournament, so a burst of
+    score submissions at the end of a round produces a single engine run.
+  - Exclusive: at most one *running* job exists per tournament, so two workers
+    never run TournamentEngine on the same tournament.  Both rules are partial
+    unique constraints, not just checks in the queue helpers.
+  - Durable: jobs survive worker restarts; stale "running" jobs are requeued
+    and failed jobs are retried with exponential backoff (next_attempt_at).
+"""
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class AutomationJob(models.Model):
+    """A unit of tournament automation work waiting for (or done by) the worker."""
+
+    EVENT_ROUND_COMPLETED = "round_completed"
+    EVENT_MANUAL = "manual"
+    # Standings changed without the engine having anything to do (deleted or
+    # reverted match, team withdrawn): only the leaderboard is recomputed
+    EVENT_LEADERBOARD = "leaderboard"
+    EVENT_TYPE_CHOICES = [
+        (EVENT_ROUND_COMPLETED, "Round Completed"),
+        (EVENT_MANUAL, "Manual Trigger"),
+        (EVENT_LEADERBOARD, "Leaderboard Refresh"),
+    ]
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    tournament = models.ForeignKey(
+        'tournaments.Tournament',
+        on_delete=models.CASCADE,
+        related_name='automation_jobs',
+    )
+    event_type = models.CharField(
+        max_length=30,
+        choices=EVENT_TYPE_CHOICES,
+        default=EVENT_ROUND_COMPLETED,
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Trigger details, e.g. the ids of the matches that completed",
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    worker_id = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="The worker leaves the job alone until then (retry backoff)",
+    )
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['tournament', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tournament'],
+                condition=Q(status='pending'),
+                name='one_pending_automation_job',
+            ),
+            models.UniqueConstraint(
+                fields=['tournament'],
+                condition=Q(status='running'),
+                name='one_running_automation_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} [{self.status}] {self.event_type} for tournament {self.tournament_id}"
+
+    @property
+    def queue_latency_seconds(self):
+        """Seconds between enqueue and the worker picking the job up."""
+        if not self.started_at:
+            return None
+        return (self.started_at - self.created_at).total_seconds()
+
+    @property
+    def run_seconds(self):
+        """Seconds the worker spent running the job."""
+        if not self.started_at or not self.finished_at:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
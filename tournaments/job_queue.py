@@ -0,0 +1,338 @@
+"""
+tournaments/job_queue.py
+========================
+Enqueue / claim / run helpers for the tournament automation job queue.
+
+The request path only ever calls ``enqueue_automation`` (one or two cheap
+queries, independent of tournament size).  Everything expensive — pairing the
+next round, creating its matches, assigning badges, recomputing Swiss / WTF
+standings — happens in ``run_job`` inside the ``automation_worker``
+management command.
+
+Job state machine::
+
+    pending ──claim──▶ running ──▶ done
+       ▲                  │
+       └── backoff ───────┴──────▶ failed   (after MAX_ATTEMPTS)
+
+A tournament has at most one pending and at most one running job, enforced by
+partial unique constraints on AutomationJob.  A trigger that would create a
+second pending job is folded into the existing one, and a claim that would
+start a second running job fails, so two workers can never run the engine on
+the same tournament.  Failed runs go back to pending with an exponential
+backoff (``next_attempt_at``).
+"""
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, DurationField, ExpressionWrapper, F, Min
+from django.utils import timezone
+
+from .job_models import AutomationJob
+
+logger = logging.getLogger("tournaments")
+
+# Jobs left "running" longer than this are assumed to belong to a dead worker.
+DEFAULT_STALE_AFTER = timedelta(minutes=10)
+# A job that fails this many times stays failed until an admin requeues it.
+MAX_ATTEMPTS = 3
+# Delay before retrying a failed job, doubled after every further failure.
+RETRY_BASE_DELAY = timedelta(seconds=30)
+RETRY_MAX_DELAY = timedelta(minutes=15)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay(attempts):
+    """Backoff before the next try of a job that has failed ``attempts`` times."""
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+
+def _fold_into_pending(tournament_id, match_ids, event_type=None):
+    """Add ``match_ids`` to the tournament's pending job; returns it (None if there is none)."""
+    job = AutomationJob.objects.filter(
+        tournament_id=tournament_id, status=AutomationJob.STATUS_PENDING,
+    ).first()
+    if job is None:
+        return None
+    changes = {}
+    known = job.payload.setdefault('match_ids', [])
+    new_ids = [match_id for match_id in match_ids if match_id and match_id not in known]
+    if new_ids:
+        known.extend(new_ids)
+        changes['payload'] = job.payload
+    # Every engine pass also refreshes the leaderboard, not the other way round
+    if job.event_type == AutomationJob.EVENT_LEADERBOARD and event_type not in (None, AutomationJob.EVENT_LEADERBOARD):
+        job.event_type = changes['event_type'] = event_type
+    if changes:
+        AutomationJob.objects.filter(pk=job.pk).update(**changes)
+    return job
+
+
+def enqueue_automation(tournament_id, event_type=AutomationJob.EVENT_ROUND_COMPLETED, match_id=None):
+    """
+    Record that a tournament needs an automation pass.
+
+    If the tournament already has a pending job the new trigger is folded into
+    it, so a round in which many matches finish together only runs the engine
+    once.  The one_pending_automation_job constraint settles concurrent
+    enqueues: the loser folds its trigger into the winner's job.  Returns the
+    pending AutomationJob.
+    """
+    match_ids = [match_id] if match_id else []
+    for _ in range(3):
+        job = _fold_into_pending(tournament_id, match_ids, event_type)
+        if job is not None:
+            return job
+        try:
+            with transaction.atomic():
+                job = AutomationJob.objects.create(
+                    tournament_id=tournament_id,
+                    event_type=event_type,
+                    payload={'match_ids': match_ids},
+                )
+        except IntegrityError:
+            # A concurrent enqueue created the pending job first: coalesce into it
+            continue
+        logger.info(f"Queued {event_type} automation job {job.id} for tournament {tournament_id}")
+        return job
+    raise RuntimeError(f"Could not enqueue automation for tournament {tournament_id}")
+
+
+def requeue_job(job, **fields):
+    """
+    Put ``job`` back in the queue, or fold it into the tournament's pending job.
+
+    A new trigger may have queued a pending job while this one was running;
+    that job redoes the work, so this one is closed as coalesced.  Returns the
+    new status of ``job``.
+    """
+    try:
+        with transaction.atomic():
+            AutomationJob.objects.filter(pk=job.pk).update(
+                status=AutomationJob.STATUS_PENDING, worker_id='', **fields
+            )
+        return AutomationJob.STATUS_PENDING
+    except IntegrityError:
+        pending = _fold_into_pending(job.tournament_id, job.payload.get('match_ids', []), job.event_type)
+        note = f"Coalesced into job {pending.pk}" if pending else "Coalesced into a newer job"
+        error = fields.get('last_error')
+        AutomationJob.objects.filter(pk=job.pk).update(
+            status=AutomationJob.STATUS_DONE,
+            finished_at=timezone.now(),
+            last_error=f"{error}\n{note}" if error else note,
+        )
+        return AutomationJob.STATUS_DONE
+
+
+def enqueue_automation_on_commit(tournament_id, event_type=AutomationJob.EVENT_ROUND_COMPLETED, match_id=None):
+    """
+    Enqueue once the surrounding transaction commits.
+
+    With ``TOURNAMENT_AUTOMATION_RUN_INLINE`` enabled (local development
+    without a worker) the job is also run straight away, reproducing the old
+    synchronous behaviour.
+    """
+    def _enqueue():
+        job = enqueue_automation(tournament_id, event_type=event_type, match_id=match_id)
+        if getattr(settings, 'TOURNAMENT_AUTOMATION_RUN_INLINE', False):
+            run_pending_for_tournament(tournament_id)
+        return job
+
+    transaction.on_commit(_enqueue)
+
+
+def requeue_stale_jobs(stale_after=DEFAULT_STALE_AFTER):
+    """Return jobs stuck in 'running' (crashed worker) to the pending state."""
+    cutoff = timezone.now() - stale_after
+    stale = AutomationJob.objects.filter(
+        status=AutomationJob.STATUS_RUNNING,
+        started_at__lt=cutoff,
+    )
+    count = 0
+    for job in stale:
+        requeue_job(job, next_attempt_at=timezone.now())
+        count += 1
+    if count:
+        logger.warning(f"Requeued {count} stale automation job(s) started before {cutoff}")
+    return count
+
+
+def claim_next_job(worker_id=None, tournament_id=None):
+    """
+    Atomically claim the oldest due pending job whose tournament is not busy.
+
+    The busy-tournament filter only saves wasted claims; exclusivity comes
+    from the one_running_automation_job constraint, which makes the claim of
+    a second job for a running tournament fail.  Returns the claimed
+    AutomationJob, or None when there is nothing to do.
+    """
+    worker_id = worker_id or default_worker_id()
+    now = timezone.now()
+    busy = AutomationJob.objects.filter(
+        status=AutomationJob.STATUS_RUNNING,
+    ).values('tournament_id')
+    candidates = (
+        AutomationJob.objects
+        .filter(status=AutomationJob.STATUS_PENDING, next_attempt_at__lte=now)
+        .exclude(tournament_id__in=busy)
+        .order_by('created_at', 'id')
+    )
+    if tournament_id is not None:
+        candidates = candidates.filter(tournament_id=tournament_id)
+
+    for job_id in candidates.values_list('id', flat=True)[:20]:
+        try:
+            with transaction.atomic():
+                claimed = AutomationJob.objects.filter(
+                    pk=job_id,
+                    status=AutomationJob.STATUS_PENDING,
+                ).update(
+                    status=AutomationJob.STATUS_RUNNING,
+                    started_at=timezone.now(),
+                    attempts=F('attempts') + 1,
+                    worker_id=worker_id[:100],
+                )
+        except IntegrityError:
+            # Another worker started a job for this tournament meanwhile
+            continue
+        if claimed:
+            return AutomationJob.objects.select_related('tournament').get(pk=job_id)
+    return None
+
+
+def _run_engine(job):
+    """Run TournamentEngine for ``job``; returns (success, error message)."""
+    from .automation_engine import TournamentEngine
+    from .automation_logger import AutomationLogger
+
+    success = False
+    error = ''
+    # One buffered AutomationLog write per run, flushed when the block exits
+    with AutomationLogger(job.tournament_id) as automation_log:
+        automation_log.log_automation_start(job.event_type, {
+            'job_id': job.id, 'attempt': job.attempts, 'payload': job.payload,
+        })
+        try:
+            engine = TournamentEngine(job.tournament)
+            success = bool(engine.process_automation())
+            if success:
+                automation_log.log_success(f"Automation job {job.id}", {'job_id': job.id})
+            else:
+                error = "TournamentEngine.process_automation returned False"
+                automation_log.log_decision_point("Automation pass failed", error, {'job_id': job.id})
+        except Exception as e:
+            logger.exception(f"Automation job {job.id} for tournament {job.tournament_id} crashed: {e}")
+            error = str(e)
+            automation_log.log_error(e, f"Automation job {job.id}")
+    return success, error
+
+
+def _refresh_leaderboard(job):
+    """Recompute the tournament's materialized leaderboard; returns (success, error message)."""
+    from leaderboards.materialize import refresh_tournament_leaderboard
+
+    try:
+        refresh_tournament_leaderboard(job.tournament)
+    except Exception as e:
+        logger.warning(f"Leaderboard refresh for job {job.id} failed: {e}")
+        return False, str(e)
+    return True, ''
+
+
+def run_job(job):
+    """
+    Run a claimed job and record the outcome.
+
+    Engine jobs run TournamentEngine and then refresh the leaderboard;
+    leaderboard jobs only refresh it.  Returns True when the job succeeded.
+    """
+    if job.event_type == AutomationJob.EVENT_LEADERBOARD:
+        success, error = _refresh_leaderboard(job)
+    else:
+        success, error = _run_engine(job)
+        # Byes, stage advancement and any results folded into this job change
+        # standings, whether or not the engine pass succeeded.
+        _refresh_leaderboard(job)
+
+    now = timezone.now()
+    if success:
+        new_status = AutomationJob.STATUS_DONE
+    elif job.attempts < MAX_ATTEMPTS:
+        new_status = AutomationJob.STATUS_PENDING
+    else:
+        new_status = AutomationJob.STATUS_FAILED
+
+    if new_status == AutomationJob.STATUS_PENDING:
+        # Retry later, backing off further after each failure
+        new_status = requeue_job(
+            job, next_attempt_at=now + retry_delay(job.attempts), finished_at=None, last_error=error,
+        )
+    else:
+        AutomationJob.objects.filter(pk=job.pk).update(
+            status=new_status,
+            finished_at=now,
+            last_error=error,
+        )
+    job.status = new_status
+    job.finished_at = now
+    job.last_error = error
+    logger.info(
+        f"Automation job {job.id} for tournament {job.tournament_id} -> {new_status} "
+        f"(queued {job.queue_latency_seconds:.2f}s, ran {(now - job.started_at).total_seconds():.2f}s)"
+    )
+    return success
+
+
+def run_pending_for_tournament(tournament_id, worker_id=None):
+    """Drain the queue for a single tournament in the current process."""
+    processed = 0
+    while True:
+        job = claim_next_job(worker_id=worker_id, tournament_id=tournament_id)
+        if job is None:
+            return processed
+        run_job(job)
+        processed += 1
+
+
+def queue_stats(window=timedelta(hours=1)):
+    """
+    Queue depth and latency figures for monitoring.
+
+    ``avg_queue_latency_seconds`` is enqueue → claim; ``avg_run_seconds`` is
+    claim → finish; both over jobs finished inside ``window``.
+    """
+    now = timezone.now()
+    pending = AutomationJob.objects.filter(status=AutomationJob.STATUS_PENDING)
+    oldest_pending = pending.aggregate(oldest=Min('created_at'))['oldest']
+
+    recent = AutomationJob.objects.filter(
+        finished_at__gte=now - window,
+        started_at__isnull=False,
+    ).annotate(
+        queue_latency=ExpressionWrapper(F('started_at') - F('created_at'), output_field=DurationField()),
+        run_time=ExpressionWrapper(F('finished_at') - F('started_at'), output_field=DurationField()),
+    )
+    averages = recent.aggregate(
+        avg_queue_latency=Avg('queue_latency'),
+        avg_run_time=Avg('run_time'),
+    )
+
+    def _seconds(value):
+        return round(value.total_seconds(), 3) if value is not None else None
+
+    return {
+        'pending': pending.count(),
+        'running': AutomationJob.objects.filter(status=AutomationJob.STATUS_RUNNING).count(),
+        'failed': AutomationJob.objects.filter(status=AutomationJob.STATUS_FAILED).count(),
+        'oldest_pending_age_seconds': _seconds(now - oldest_pending) if oldest_pending else None,
+        'finished_in_window': recent.count(),
+        'avg_queue_latency_seconds': _seconds(averages['avg_queue_latency']),
+        'avg_run_seconds': _seconds(averages['avg_run_time']),
+    }
@@ -1,13 +1,23 @@
 """
 Django management command for monitoring tournament automation
-Usage: python manage.py automation_monitor [tournament_id]
+Usage: python manage.py automation_monitor [tournament_id] [--follow [--interval 30]]
+
+--follow waits on the automation log channel-layer group, which every
+AutomationLogger flush announces, and reads new rows only when told to.
+It also catches up every --interval seconds, which is how rows written by
+other processes show up when the channel layer is in-memory (no REDIS_URL).
 """
 
-import time
-import json
+import asyncio
+from asgiref.sync import sync_to_async
+from channels.layers import InMemoryChannelLayer, get_channel_layer
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from tournaments.automation_logger import AutomationMonitor, AutomationLog
+from tournaments.automation_logger import (
+    AUTOMATION_LOG_GROUP,
+    AutomationLog,
+    AutomationMonitor,
+    iter_log_pages,
+)
 
 
 class Command(BaseCommand):
@@ -36,6 +46,12 @@ class Command(BaseCommand):
             default=20,
             help='Number of recent logs to show (default: 20)'
         )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30.0,
+            help='With --follow, seconds between catch-up reads when no flush is announced (default: 30)'
+        )
     
     def handle(self, *args, **options):
         tournament_id = options.get('tournament_id')
@@ -44,7 +60,7 @@ class Command(BaseCommand):
         last_count = options.get('last')
         
         if follow:
-            self.follow_logs(tournament_id, errors_only)
+            self.follow_logs(tournament_id, errors_only, last_count, options['interval'])
         else:
             self.show_status(tournament_id, errors_only, last_count)
     
@@ -58,36 +74,64 @@ class Command(BaseCommand):
             statuses = AutomationMonitor.get_all_tournaments_status()
             self.display_all_tournaments_status(statuses)
     
-    def follow_logs(self, tournament_id, errors_only):
+    def follow_logs(self, tournament_id, errors_only, last_count, interval):
         """Follow logs in real-time"""
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            self.stdout.write(self.style.ERROR("No channel layer configured: cannot follow logs."))
+            return
         self.stdout.write(
             self.style.SUCCESS(f"Following automation logs for tournament {tournament_id or 'ALL'}...")
         )
+        if isinstance(channel_layer, InMemoryChannelLayer):
+            self.stdout.write(self.style.WARNING(
+                f"In-memory channel layer: other processes' flushes are picked up every {interval:g}s."
+            ))
         self.stdout.write("Press Ctrl+C to stop\n")
         
-        last_log_id = 0
+        query = AutomationLog.objects.all()
+        if tournament_id:
+            query = query.filter(tournament_id=tournament_id)
+        if errors_only:
+            query = query.filter(event_type='error')
+        
+        # Start with the last `last_count` entries, like tail -f
+        recent_ids = list(query.order_by('-id').values_list('id', flat=True)[:last_count])
+        last_log_id = recent_ids[-1] - 1 if recent_ids else 0
         
         try:
-            while True:
-                # Get new logs since last check
-                query = AutomationLog.objects.filter(id__gt=last_log_id)
-                
-                if tournament_id:
-                    query = query.filter(tournament_id=tournament_id)
-                
-                if errors_only:
-                    query = query.filter(event_type='error')
-                
-                new_logs = query.order_by('id')
-                
-                for log in new_logs:
-                    self.display_log(log)
-                    last_log_id = log.id
-                
-                time.sleep(1)  # Check every second
-                
+            asyncio.run(self._follow(channel_layer, query, last_log_id, tournament_id, errors_only, interval))
         except KeyboardInterrupt:
             self.stdout.write("\nStopped monitoring.")
+
+    async def _follow(self, channel_layer, query, last_log_id, tournament_id, errors_only, interval):
+        """Print new logs whenever a matching flush is announced (or every ``interval`` seconds)"""
+        show_new_logs = sync_to_async(self.show_new_logs)
+        channel = await channel_layer.new_channel()
+        await channel_layer.group_add(AUTOMATION_LOG_GROUP, channel)
+        try:
+            while True:
+                last_log_id = await show_new_logs(query, last_log_id)
+                while True:
+                    try:
+                        event = await asyncio.wait_for(channel_layer.receive(channel), timeout=interval)
+                    except asyncio.TimeoutError:
+                        break
+                    if tournament_id and event.get('tournament_id') != tournament_id:
+                        continue
+                    if errors_only and not event.get('has_error'):
+                        continue
+                    break
+        finally:
+            await channel_layer.group_discard(AUTOMATION_LOG_GROUP, channel)
+
+    def show_new_logs(self, query, last_log_id):
+        """Display logs with an id above ``last_log_id``; returns the last id shown"""
+        for page in iter_log_pages(query, after_id=last_log_id):
+            for log in page:
+                self.display_log(log)
+            last_log_id = page[-1].id
+        return last_log_id
     
     def display_tournament_status(self, status):
         """Display tournament status"""
@@ -0,0 +1,79 @@
+"""
+Django management command that drains the tournament automation job queue
+Usage: python manage.py automation_worker [--once] [--sleep 1.0] [--stats]
+"""
+
+import time
+import json
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from tournaments.job_queue import (
+    claim_next_job,
+    default_worker_id,
+    queue_stats,
+    requeue_stale_jobs,
+    run_job,
+)
+
+
+class Command(BaseCommand):
+    help = 'Run queued tournament automation jobs (round completion, next-round pairing)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue once and exit instead of polling forever'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty (default: 1.0)'
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=10,
+            help='Requeue jobs left running longer than this many minutes (default: 10)'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print queue depth and latency as JSON and exit'
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(queue_stats(), indent=2))
+            return
+
+        worker_id = default_worker_id()
+        stale_after = timedelta(minutes=options['stale_minutes'])
+        self.stdout.write(self.style.SUCCESS(f"Automation worker {worker_id} started"))
+
+        processed = 0
+        try:
+            while True:
+                close_old_connections()
+                requeue_stale_jobs(stale_after)
+                job = claim_next_job(worker_id=worker_id)
+
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                ok = run_job(job)
+                processed += 1
+                style = self.style.SUCCESS if ok else self.style.WARNING
+                self.stdout.write(style(
+                    f"Job {job.id} (tournament {job.tournament_id}): {job.status} "
+                    f"after {job.queue_latency_seconds:.2f}s in queue"
+                ))
+        except KeyboardInterrupt:
+            self.stdout.write("\nStopped worker.")
+
+        self.stdout.write(f"Processed {processed} job(s)")
@@ -0,0 +1,99 @@
+"""
+Django management command that benchmarks Swiss round generation in memory
+Usage: python manage.py benchmark_swiss_pairing [--sizes 32 64 128 256] [--rounds 7]
+
+Simulates whole Swiss tournaments with unsaved Team/TournamentTeam objects and
+times plan_swiss_pairings (minimum-cost matching) for every round.  No
+database rows are created, so the numbers isolate the pairing work itself.
+Odd sizes exercise bye selection.
+"""
+
+import logging
+import random
+import time
+from django.core.management.base import BaseCommand
+from teams.models import Team
+from tournaments.models import TournamentTeam
+from tournaments.swiss_algorithms import PairingContext, plan_swiss_pairings
+
+
+class Command(BaseCommand):
+    help = 'Benchmark in-memory Swiss round generation for several tournament sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[32, 64, 128, 256],
+            help='Team counts to simulate (default: 32 64 128 256)'
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=7,
+            help='Rounds to generate per simulated tournament (default: 7)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for match results (default: 42)'
+        )
+        parser.add_argument(
+            '--verbose-pairing',
+            action='store_true',
+            help='Keep the pairing logger output (silenced by default)'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rounds = options['rounds']
+        if not options['verbose_pairing']:
+            logging.getLogger("tournaments.swiss").setLevel(logging.CRITICAL)
+
+        self.stdout.write(
+            f"{'teams':>6} | {'rounds':>6} | {'avg ms':>9} | {'max ms':>9} | {'rematches':>9} | {'unpaired':>8}"
+        )
+        self.stdout.write("-" * 63)
+        for size in options['sizes']:
+            timings, rematches, unpaired = self.simulate(size, rounds, rng)
+            self.stdout.write(
+                f"{size:>6} | {len(timings):>6} | "
+                f"{1000 * sum(timings) / len(timings):>9.2f} | {1000 * max(timings):>9.2f} | "
+                f"{rematches:>9} | {unpaired:>8}"
+            )
+
+    def simulate(self, size, rounds, rng):
+        teams = [
+            TournamentTeam(team=Team(id=i, name=f"Team {i}"), swiss_points=0)
+            for i in range(1, size + 1)
+        ]
+        played = set()
+        timings = []
+        rematches = 0
+        unpaired = 0
+
+        for round_num in range(1, rounds + 1):
+            teams.sort(key=lambda tt: (-tt.swiss_points, tt.team_id))
+            context = PairingContext(played_pairs=played)
+
+            started = time.perf_counter()
+            plan = plan_swiss_pairings(teams, context)
+            timings.append(time.perf_counter() - started)
+            unpaired += size - 2 * len(plan.pairs) - (1 if plan.bye is not None else 0)
+
+            if plan.bye is not None:
+                if plan.bye.received_bye_in_round is None:
+                    plan.bye.received_bye_in_round = round_num
+                plan.bye.swiss_points += 3
+
+            for t1, t2 in plan.pairs:
+                key = PairingContext._key(t1.team_id, t2.team_id)
+                if key in played:
+                    rematches += 1
+                played.add(key)
+                winner = t1 if rng.random() < 0.5 else t2
+                winner.swiss_points += 3
+
+        return timings, rematches, unpaired
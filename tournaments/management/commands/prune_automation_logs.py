@@ -0,0 +1,51 @@
+"""
+Django management command that deletes expired tournament automation logs
+Usage: python manage.py prune_automation_logs [--days 30] [--batch-size 5000] [--dry-run]
+
+Run it daily (cron / scheduled job).  --days defaults to
+settings.AUTOMATION_LOG_RETENTION_DAYS.
+"""
+
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tournaments.automation_logger import prune_automation_logs
+
+
+class Command(BaseCommand):
+    help = 'Delete automation logs older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Keep this many days of logs (default: AUTOMATION_LOG_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per DELETE statement (default: 5000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the rows that would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days is None:
+            days = getattr(settings, 'AUTOMATION_LOG_RETENTION_DAYS', 30)
+        cutoff = timezone.now() - timedelta(days=days)
+        count = prune_automation_logs(
+            older_than=cutoff,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {count} automation log(s) older than {cutoff:%Y-%m-%d %H:%M} ({days} days)"
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-17 06:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0026_tournament_max_teams_tournament_registration_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutomationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('round_completed', 'Round Completed'), ('manual', 'Manual Trigger')], default='round_completed', max_length=30)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Trigger details, e.g. the ids of the matches that completed')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('worker_id', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='automation_jobs', to='tournaments.tournament')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='tournaments_status_a7e4fc_idx'), models.Index(fields=['tournament', 'status'], name='tournaments_tournam_32b373_idx')],
+            },
+        ),
+    ]
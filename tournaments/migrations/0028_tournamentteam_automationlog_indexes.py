@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0012_playerstatssnapshot'),
+        ('tournaments', '0027_automationjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='automationlog',
+            index=models.Index(fields=['tournament_id', 'event_type', '-timestamp'], name='tournaments_tournam_07c186_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tournamentteam',
+            index=models.Index(fields=['tournament', 'is_active', 'current_stage_number'], name='tournaments_tournam_bf6f06_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-17 07:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0028_tournamentteam_automationlog_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='automationlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
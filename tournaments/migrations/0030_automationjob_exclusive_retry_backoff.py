@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-17 08:28
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def coalesce_duplicate_jobs(apps, schema_editor):
+    """Leave at most one pending and one running job per tournament (the oldest)."""
+    AutomationJob = apps.get_model('tournaments', 'AutomationJob')
+    for status in ('pending', 'running'):
+        kept = {}
+        for job in AutomationJob.objects.filter(status=status).order_by('created_at', 'id'):
+            first = kept.setdefault(job.tournament_id, job)
+            if first.pk == job.pk:
+                continue
+            match_ids = first.payload.setdefault('match_ids', [])
+            match_ids.extend(m for m in job.payload.get('match_ids', []) if m not in match_ids)
+            AutomationJob.objects.filter(pk=first.pk).update(payload=first.payload)
+            AutomationJob.objects.filter(pk=job.pk).update(
+                status='done',
+                finished_at=django.utils.timezone.now(),
+                last_error=f"Coalesced into job {first.pk}",
+            )
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0029_automationlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationjob',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='The worker leaves the job alone until then (retry backoff)'),
+        ),
+        migrations.RunPython(coalesce_duplicate_jobs, noop_reverse),
+        migrations.AddConstraint(
+            model_name='automationjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('tournament',), name='one_pending_automation_job'),
+        ),
+        migrations.AddConstraint(
+            model_name='automationjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'running')), fields=('tournament',), name='one_running_automation_job'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0030_automationjob_exclusive_retry_backoff'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='automationjob',
+            name='event_type',
+            field=models.CharField(choices=[('round_completed', 'Round Completed'), ('manual', 'Manual Trigger'), ('leaderboard', 'Leaderboard Refresh')], default='round_completed', max_length=30),
+        ),
+    ]
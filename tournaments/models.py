@@ -361,6 +361,7 @@ class Tournament(models.Model):
                 - 'random': Random assignment (default)
                 - 'balanced': Balance teams by skill level
                 - 'snake_draft': Snake draft style assignment
+                - 'partnership_aware': Avoid repeat partners while balancing ratings
         """
         if not self.is_melee:
             raise ValueError("Tournament is not configured for Mêlée mode")
@@ -374,7 +375,7 @@ class Tournament(models.Model):
         self._clear_existing_melee_teams()
         
         # Get all registered MeleePlayer objects for this tournament
-        melee_players = list(self.melee_players.all())
+        melee_players = list(self.melee_players.select_related('player__team', 'original_team'))
         
         if not melee_players:
             logger.warning(f"No players registered for Mêlée tournament {self.name}")
@@ -400,6 +401,8 @@ class Tournament(models.Model):
             teams_created = self._generate_balanced_teams(melee_players, team_size)
         elif algorithm == 'snake_draft':
             teams_created = self._generate_snake_draft_teams(melee_players, team_size)
+        elif algorithm == 'partnership_aware':
+            teams_created = self._generate_partnership_aware_teams(melee_players, team_size)
         else:  # default to random
             teams_created = self._generate_random_teams(melee_players, team_size)
         
@@ -606,7 +609,58 @@ class Tournament(models.Model):
         
         return teams_created
     
-    def _create_team_from_players(self, melee_players, team_name):
+    def _generate_partnership_aware_teams(self, melee_players, team_size):
+        """
+        Generate teams that avoid previous partners and balance team ratings.
+
+        Partnership history of these players across all mêlées is loaded into
+        one co-occurrence matrix; tournaments.melee_formation searches for the
+        split within MELEE_FORMATION_TIME_BUDGET seconds.
+        """
+        from django.conf import settings
+        from pfc_core.session_refresh import refresh_multiple_players_team_sessions
+        from teams.models import PlayerProfile
+        from tournaments.melee_formation import form_teams
+
+        by_player_id = {mp.player_id: mp for mp in melee_players}
+        ratings = dict(
+            PlayerProfile.objects.filter(player_id__in=by_player_id).values_list('player_id', 'value')
+        )
+        for player_id in by_player_id:
+            if ratings.get(player_id) is None:
+                ratings[player_id] = 100.0
+
+        # Lowest-rated players sit out, as with the balanced algorithm
+        ranked = sorted(by_player_id, key=lambda player_id: -ratings[player_id])
+        num_teams = len(ranked) // team_size
+        playing = ranked[:num_teams * team_size]
+
+        result = form_teams(
+            playing,
+            [team_size] * num_teams,
+            ratings,
+            MeleePartnership.get_partnership_matrix(playing),
+            time_budget=getattr(settings, 'MELEE_FORMATION_TIME_BUDGET', 1.0),
+        )
+
+        moved_players = []
+        for i, team_player_ids in enumerate(result.teams):
+            team_players = [by_player_id[player_id] for player_id in team_player_ids]
+            team = self._create_team_from_players(team_players, f"Mêlée Team {i + 1}", refresh_sessions=False)
+            moved_players.extend(mp.player for mp in team_players)
+            avg_rating = sum(ratings[player_id] for player_id in team_player_ids) / team_size
+            logger.info(f"Created partnership-aware Mêlée team: {team.name} (avg rating: {avg_rating:.1f})")
+
+        # One pass over the active sessions for every moved player
+        refresh_multiple_players_team_sessions(moved_players, in_melee_assignment=True)
+
+        remaining = len(melee_players) - len(playing)
+        if remaining > 0:
+            logger.warning(f"{remaining} players left over and not assigned to teams")
+
+        return len(result.teams)
+
+    def _create_team_from_players(self, melee_players, team_name, refresh_sessions=True):
         """Helper method to create a team from a list of MeleePlayer objects"""
         from teams.models import Team, Player
         
@@ -637,8 +691,9 @@ class Tournament(models.Model):
             
             # Refresh the player's session so they don't need to logout/login
             # in_melee_assignment=True → client activates fast 10-second polling
-            from pfc_core.session_refresh import refresh_player_team_session
-            refresh_player_team_session(original_player, in_melee_assignment=True)
+            if refresh_sessions:
+                from pfc_core.session_refresh import refresh_player_team_session
+                refresh_player_team_session(original_player, in_melee_assignment=True)
         
         # Add team to tournament
         TournamentTeam.objects.create(tournament=self, team=team)
@@ -1257,6 +1312,10 @@ class TournamentTeam(models.Model):
     class Meta:
         unique_together = ("tournament", "team")
         ordering = ["-swiss_points", "-buchholz_score", "seeding_position", "id"] # Default ordering for Swiss
+        indexes = [
+            # Active teams of a tournament / of one of its stages
+            models.Index(fields=["tournament", "is_active", "current_stage_number"]),
+        ]
 
     def save(self, *args, **kwargs):
         # Final safeguard for every path that attempts to persist a tournament team,
@@ -1954,6 +2013,9 @@ from .partnership_models import MeleePartnership, MeleeShuffleHistory, MeleePlay
 # Import poule/group models
 from .poule_models import Poule, PouleTeam
 
+# Import automation job queue model
+from .job_models import AutomationJob
+
 
 # ---------------------------------------------------------------------------
 # VS Mode models
@@ -0,0 +1,669 @@
+"""
+tournaments/pairing_engine.py
+=============================
+Minimum-cost perfect matching engine shared by every pairing format.
+
+Swiss, Smart Swiss and WTF rounds used to be paired by depth-first
+backtracking (exponential in the worst case) or greedy loops (which paint
+themselves into a corner when late-round rematch constraints get tight).
+They now all build a PairingEngine with a list of cost functions and let it
+solve the round as a weighted perfect matching on the complete graph of
+teams, using Edmonds' blossom algorithm (O(n³), polynomial).
+
+Cost functions are grouped in priority levels.  A single violation at a
+higher level always outweighs any combination of lower-level costs, so:
+
+  - if a pairing without rematches exists, the engine returns one;
+  - among those, it avoids parent/child pairings whenever possible;
+  - among those, it minimises score / πετΑ-index distance.
+
+Odd fields get a virtual BYE participant; bye cost functions decide who
+receives it (normally the lowest-ranked team without a previous bye).
+
+Design principles:
+  - Pure: no database access — callers pass in-memory objects and a
+    PairingContext (see swiss_algorithms) holding played pairs.
+  - Pluggable: formats differ only in the cost functions they pass.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("tournaments.pairing")
+
+# Priority levels for cost functions (higher level dominates lower levels).
+# LEVEL_TIE_BREAK is internal: ranking-order distance, used only between
+# otherwise equal pairings.
+LEVEL_TIE_BREAK = -1
+LEVEL_PREFERENCE = 0
+LEVEL_PARENT_CHILD = 1
+LEVEL_REMATCH = 2
+
+# Soft costs are floats; they are scaled to integers so the blossom algorithm
+# works in exact integer arithmetic.
+COST_SCALE = 1000
+
+# Fields larger than this are first solved on a sparse graph keeping each
+# participant's SPARSE_NEIGHBOURS cheapest partners.
+SPARSE_THRESHOLD = 48
+SPARSE_NEIGHBOURS = 16
+
+
+# ---------------------------------------------------------------------------
+# Cost functions
+# ---------------------------------------------------------------------------
+
+class PairingCost:
+    """
+    Base class for pluggable pairing costs.
+
+    ``cost(a, b)`` is the price of pairing a with b; ``bye_cost(a)`` is the
+    price of giving a the bye.  Both default to zero.
+    """
+    level = LEVEL_PREFERENCE
+
+    def cost(self, a, b) -> float:
+        return 0.0
+
+    def bye_cost(self, a) -> float:
+        return 0.0
+
+
+class ScoreDistanceCost(PairingCost):
+    """Prefer opponents on the same score; squared so one big float is worse than two small ones."""
+
+    def __init__(self, key: Callable[[Any], float] = lambda tt: tt.swiss_points,
+                 unit: float = 3.0, weight: float = 1.0):
+        self.key = key
+        self.unit = unit
+        self.weight = weight
+
+    def cost(self, a, b) -> float:
+        distance = abs(self.key(a) - self.key(b)) / self.unit
+        return self.weight * distance * distance
+
+
+class PetaIndexDistanceCost(PairingCost):
+    """Prefer opponents with the nearest πετΑ Index (WTF format)."""
+
+    def __init__(self, peta_indices: Dict[int, Dict], weight: float = 1.0):
+        self.peta_indices = peta_indices
+        self.weight = weight
+
+    def _pi(self, tt) -> float:
+        return self.peta_indices.get(tt.team_id, {}).get('PI', 0.0)
+
+    def cost(self, a, b) -> float:
+        return self.weight * abs(self._pi(a) - self._pi(b))
+
+
+class RematchPenalty(PairingCost):
+    """Teams that already met should not meet again."""
+    level = LEVEL_REMATCH
+
+    def __init__(self, context):
+        self.context = context
+
+    def cost(self, a, b) -> float:
+        return 1.0 if self.context.have_played(a, b) else 0.0
+
+
+class ParentChildPenalty(PairingCost):
+    """A team should not play its own parent team / subteam."""
+    level = LEVEL_PARENT_CHILD
+
+    def __init__(self, context):
+        self.context = context
+
+    def cost(self, a, b) -> float:
+        return 1.0 if self.context.is_parent_child(a, b) else 0.0
+
+
+class ByeCost(PairingCost):
+    """The bye goes to the lowest-ranked team (ties: lowest in the ranking order)."""
+
+    def __init__(self, rank_key: Callable[[Any], float] = lambda tt: tt.swiss_points,
+                 unit: float = 3.0):
+        self.rank_key = rank_key
+        self.unit = unit
+
+    def bye_cost(self, a) -> float:
+        return self.rank_key(a) / self.unit
+
+
+class RepeatByePenalty(PairingCost):
+    """Nobody receives a second bye while another team has not had one."""
+    level = LEVEL_REMATCH
+
+    def bye_cost(self, a) -> float:
+        return 1.0 if getattr(a, 'received_bye_in_round', None) is not None else 0.0
+
+
+def default_bye_costs() -> List[PairingCost]:
+    return [ByeCost(), RepeatByePenalty()]
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PairingResult:
+    pairs: List[Tuple[Any, Any]] = field(default_factory=list)
+    bye: Optional[Any] = None
+    # Number of chosen pairs that violate each priority level (e.g. rematches).
+    violations: Dict[int, int] = field(default_factory=dict)
+    total_cost: float = 0.0
+
+
+class PairingEngine:
+    """
+    Pair participants by minimum-cost perfect matching.
+
+    Participants are passed in ranking order; that order is used as the
+    final tie-break so results are deterministic and "top vs top" on equal
+    cost.
+    """
+
+    def __init__(self, costs: Sequence[PairingCost], bye_costs: Optional[Sequence[PairingCost]] = None):
+        self.costs = list(costs)
+        self.bye_costs = list(bye_costs) if bye_costs is not None else default_bye_costs()
+
+    def _levels(self) -> List[int]:
+        return sorted({c.level for c in self.costs + self.bye_costs} | {LEVEL_TIE_BREAK, LEVEL_PREFERENCE})
+
+    def pair(self, participants: Sequence[Any]) -> PairingResult:
+        participants = list(participants)
+        n = len(participants)
+        if n < 2:
+            return PairingResult(bye=participants[0] if participants else None)
+
+        has_bye = n % 2 == 1
+        bye_index = n if has_bye else None
+        size = n + 1 if has_bye else n
+        levels = self._levels()
+
+        # Per-pair, per-level integer costs.
+        level_costs: Dict[Tuple[int, int], Dict[int, int]] = {}
+        for i in range(size):
+            for j in range(i + 1, size):
+                per_level = {level: 0 for level in levels}
+                if j == bye_index:
+                    for c in self.bye_costs:
+                        per_level[c.level] += round(c.bye_cost(participants[i]) * COST_SCALE)
+                else:
+                    a, b = participants[i], participants[j]
+                    for c in self.costs:
+                        per_level[c.level] += round(c.cost(a, b) * COST_SCALE)
+                # Ranking-order tie-break: adjacent teams meet, the bye goes
+                # to the lowest-ranked team.
+                per_level[LEVEL_TIE_BREAK] = j - i if j != bye_index else n - 1 - i
+                level_costs[(i, j)] = per_level
+
+        # Collapse the levels into one integer so that any single
+        # higher-level unit outweighs every lower-level cost combined.
+        pairs_in_matching = size // 2
+        combined: Dict[Tuple[int, int], int] = {key: 0 for key in level_costs}
+        unit = 1
+        for level in levels:
+            for key, per_level in level_costs.items():
+                combined[key] += max(per_level[level], 0) * unit
+            level_max = max(max(per_level[level], 0) for per_level in level_costs.values())
+            unit = unit * (level_max * pairs_in_matching + 1)
+
+        # Solve on a sparse candidate graph first (each participant's cheapest
+        # partners) — an order of magnitude faster for large fields.  If that
+        # graph has no perfect matching, or its best one breaks a hard
+        # constraint, solve again on the complete graph, which is exact.
+        mate = None
+        if size > SPARSE_THRESHOLD:
+            candidates = self._candidate_edges(combined, size, SPARSE_NEIGHBOURS)
+            mate = self._solve(combined, candidates, size)
+            if mate is not None and any(
+                level_costs[self._key(i, mate[i])][level] > 0
+                for i in range(size) for level in levels if level > LEVEL_PREFERENCE
+            ):
+                mate = None
+        if mate is None:
+            mate = self._solve(combined, list(combined), size)
+
+        result = PairingResult(violations={level: 0 for level in levels if level > LEVEL_PREFERENCE})
+        for i in range(n):
+            j = mate[i]
+            if j == -1:
+                # Cannot happen on a complete graph; keep the team visible.
+                logger.error("Pairing engine left participant %s unmatched", i)
+                continue
+            if j == bye_index:
+                result.bye = participants[i]
+            elif i < j:
+                result.pairs.append((participants[i], participants[j]))
+            else:
+                continue
+            key = self._key(i, j)
+            for level in result.violations:
+                if level_costs[key][level] > 0:
+                    result.violations[level] += 1
+            result.total_cost += level_costs[key][LEVEL_PREFERENCE] / COST_SCALE
+
+        order = {id(p): index for index, p in enumerate(participants)}
+        result.pairs.sort(key=lambda pair: order[id(pair[0])])
+        return result
+
+    @staticmethod
+    def _key(i: int, j: int) -> Tuple[int, int]:
+        return (i, j) if i < j else (j, i)
+
+    @staticmethod
+    def _candidate_edges(combined: Dict[Tuple[int, int], int], size: int, k: int) -> List[Tuple[int, int]]:
+        """Edges to each vertex's k cheapest partners and its k ranking-order neighbours."""
+        rows: List[List[Tuple[int, Tuple[int, int]]]] = [[] for _ in range(size)]
+        chosen = set()
+        for key, cost in combined.items():
+            rows[key[0]].append((cost, key))
+            rows[key[1]].append((cost, key))
+            if key[1] - key[0] <= k:
+                # Neighbours across score-group boundaries, so odd groups can float.
+                chosen.add(key)
+        for row in rows:
+            row.sort()
+            chosen.update(key for _cost, key in row[:k])
+        return list(chosen)
+
+    @staticmethod
+    def _solve(combined: Dict[Tuple[int, int], int], keys: List[Tuple[int, int]], size: int) -> Optional[List[int]]:
+        """Minimum-cost perfect matching over ``keys``; None if none exists."""
+        top = max(combined[key] for key in keys) + 1
+        edges = [(i, j, top - combined[(i, j)]) for (i, j) in keys]
+        mate = max_weight_matching(edges, maxcardinality=True)
+        mate = mate + [-1] * (size - len(mate))
+        if any(m == -1 for m in mate):
+            return None
+        return mate
+
+
+# ---------------------------------------------------------------------------
+# Edmonds' maximum-weight matching (blossom algorithm)
+# ---------------------------------------------------------------------------
+
+def max_weight_matching(edges: List[Tuple[int, int, int]], maxcardinality: bool = False) -> List[int]:
+    """
+    Compute a maximum-weighted matching in a general undirected graph.
+
+    ``edges`` is a list of (i, j, weight) with vertices numbered 0..n-1 and
+    integer weights.  With ``maxcardinality`` the matching is maximum-weight
+    among maximum-cardinality matchings.  Returns ``mate`` where mate[v] is
+    the vertex matched to v, or -1.
+
+    Primal-dual implementation of Edmonds' blossom algorithm following
+    Galil, "Efficient algorithms for finding maximum matching in graphs"
+    (ACM Computing Surveys, 1986); O(n³) time.
+    """
+    if not edges:
+        return []
+
+    nedge = len(edges)
+    nvertex = 0
+    for (i, j, _w) in edges:
+        nvertex = max(nvertex, i + 1, j + 1)
+
+    maxweight = max(0, max(w for (_i, _j, w) in edges))
+
+    # endpoint[p] is the vertex at endpoint p; edge k has endpoints 2k and 2k+1.
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * nedge)]
+    # neighbend[v] lists the remote endpoints of edges incident to v.
+    neighbend: List[List[int]] = [[] for _ in range(nvertex)]
+    for k, (i, j, _w) in enumerate(edges):
+        neighbend[i].append(2 * k + 1)
+        neighbend[j].append(2 * k)
+
+    mate = nvertex * [-1]
+    # label: 0 = free, 1 = S, 2 = T (for top-level blossoms and vertices).
+    label = (2 * nvertex) * [0]
+    labelend = (2 * nvertex) * [-1]
+    inblossom = list(range(nvertex))
+    blossomparent = (2 * nvertex) * [-1]
+    blossomchilds: List[Optional[List[int]]] = (2 * nvertex) * [None]
+    blossombase = list(range(nvertex)) + nvertex * [-1]
+    blossomendps: List[Optional[List[int]]] = (2 * nvertex) * [None]
+    bestedge = (2 * nvertex) * [-1]
+    blossombestedges: List[Optional[List[int]]] = (2 * nvertex) * [None]
+    unusedblossoms = list(range(nvertex, 2 * nvertex))
+    dualvar = nvertex * [maxweight] + nvertex * [0]
+    allowedge = nedge * [False]
+    queue: List[int] = []
+
+    def slack(k):
+        (i, j, wt) = edges[k]
+        return dualvar[i] + dualvar[j] - 2 * wt
+
+    def blossom_leaves(b):
+        if b < nvertex:
+            yield b
+        else:
+            for t in blossomchilds[b]:
+                if t < nvertex:
+                    yield t
+                else:
+                    yield from blossom_leaves(t)
+
+    def assign_label(w, t, p):
+        b = inblossom[w]
+        label[w] = label[b] = t
+        labelend[w] = labelend[b] = p
+        bestedge[w] = bestedge[b] = -1
+        if t == 1:
+            queue.extend(blossom_leaves(b))
+        elif t == 2:
+            base = blossombase[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        # Trace back from v and w to find a new blossom base or an augmenting path.
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        (v, w, _wt) = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        blossomchilds[b] = path = []
+        blossomendps[b] = endps = []
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0
+        for v in blossom_leaves(b):
+            if label[inblossom[v]] == 2:
+                queue.append(v)
+            inblossom[v] = b
+        # Compute the least-slack edges from the new blossom to other S-blossoms.
+        bestedgeto = (2 * nvertex) * [-1]
+        for bv in path:
+            if blossombestedges[bv] is None:
+                nblists = [[p // 2 for p in neighbend[v]] for v in blossom_leaves(bv)]
+            else:
+                nblists = [blossombestedges[bv]]
+            for nblist in nblists:
+                for k in nblist:
+                    (i, j, _wt) = edges[k]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if (bj != b and label[bj] == 1 and
+                            (bestedgeto[bj] == -1 or slack(k) < slack(bestedgeto[bj]))):
+                        bestedgeto[bj] = k
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = [k for k in bestedgeto if k != -1]
+        bestedge[b] = -1
+        for k in blossombestedges[b]:
+            if bestedge[b] == -1 or slack(k) < slack(bestedge[b]):
+                bestedge[b] = k
+
+    def expand_blossom(b, endstage):
+        for s in blossomchilds[b]:
+            blossomparent[s] = -1
+            if s < nvertex:
+                inblossom[s] = s
+            elif endstage and dualvar[s] == 0:
+                expand_blossom(s, endstage)
+            else:
+                for v in blossom_leaves(s):
+                    inblossom[v] = s
+        if (not endstage) and label[b] == 2:
+            # Relabel the sub-blossoms on the even-length path through b.
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = blossomchilds[b].index(entrychild)
+            if j & 1:
+                j -= len(blossomchilds[b])
+                jstep = 1
+                endptrick = 0
+            else:
+                jstep = -1
+                endptrick = 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossomendps[b][j - endptrick] ^ endptrick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowedge[blossomendps[b][j - endptrick] // 2] = True
+                j += jstep
+                p = blossomendps[b][j - endptrick] ^ endptrick
+                allowedge[p // 2] = True
+                j += jstep
+            bv = blossomchilds[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            j += jstep
+            while blossomchilds[b][j] != entrychild:
+                bv = blossomchilds[b][j]
+                if label[bv] == 1:
+                    j += jstep
+                    continue
+                v = -1
+                for v in blossom_leaves(bv):
+                    if label[v] != 0:
+                        break
+                if label[v] != 0:
+                    label[v] = 0
+                    label[endpoint[mate[blossombase[bv]]]] = 0
+                    assign_label(v, 2, labelend[v])
+                j += jstep
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+
+    def augment_blossom(b, v):
+        # Swap matched/unmatched edges on the path through b from v to the base.
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= nvertex:
+            augment_blossom(t, v)
+        i = j = blossomchilds[b].index(t)
+        if i & 1:
+            j -= len(blossomchilds[b])
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+        while j != 0:
+            j += jstep
+            t = blossomchilds[b][j]
+            p = blossomendps[b][j - endptrick] ^ endptrick
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p])
+            j += jstep
+            t = blossomchilds[b][j]
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossomchilds[b] = blossomchilds[b][i:] + blossomchilds[b][:i]
+        blossomendps[b] = blossomendps[b][i:] + blossomendps[b][:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]
+
+    def augment_matching(k):
+        (v, w, _wt) = edges[k]
+        for (s, p) in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= nvertex:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= nvertex:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    # Main loop: one stage per augmentation.
+    for _stage in range(nvertex):
+        label[:] = (2 * nvertex) * [0]
+        bestedge[:] = (2 * nvertex) * [-1]
+        blossombestedges[nvertex:] = nvertex * [None]
+        allowedge[:] = nedge * [False]
+        queue[:] = []
+
+        for v in range(nvertex):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    if not allowedge[k]:
+                        kslack = slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+
+            if augmented:
+                break
+
+            # No augmenting path yet: compute the dual adjustment delta.
+            deltatype = -1
+            delta = deltaedge = deltablossom = None
+            if not maxcardinality:
+                deltatype = 1
+                delta = min(dualvar[:nvertex])
+            for v in range(nvertex):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 2
+                        deltaedge = bestedge[v]
+            for b in range(2 * nvertex):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b]) // 2
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 3
+                        deltaedge = bestedge[b]
+            for b in range(nvertex, 2 * nvertex):
+                if (blossombase[b] >= 0 and blossomparent[b] == -1 and label[b] == 2 and
+                        (deltatype == -1 or dualvar[b] < delta)):
+                    delta = dualvar[b]
+                    deltatype = 4
+                    deltablossom = b
+            if deltatype == -1:
+                # Max-cardinality mode and no further improvement possible.
+                deltatype = 1
+                delta = max(0, min(dualvar[:nvertex]))
+
+            for v in range(nvertex):
+                if label[inblossom[v]] == 1:
+                    dualvar[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dualvar[v] += delta
+            for b in range(nvertex, 2 * nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+
+            if deltatype == 1:
+                break
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                (i, j, _wt) = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                (i, j, _wt) = edges[deltaedge]
+                queue.append(i)
+            elif deltatype == 4:
+                expand_blossom(deltablossom, False)
+
+        if not augmented:
+            break
+
+        # Expand S-blossoms whose dual reached zero at the end of the stage.
+        for b in range(nvertex, 2 * nvertex):
+            if (blossomparent[b] == -1 and blossombase[b] >= 0 and
+                    label[b] == 1 and dualvar[b] == 0):
+                expand_blossom(b, True)
+
+    for v in range(nvertex):
+        if mate[v] >= 0:
+            mate[v] = endpoint[mate[v]]
+    return mate
@@ -62,46 +62,64 @@ class MeleePartnership(models.Model):
         Args:
             tournament: Tournament object
             round_number: The round number to record partnerships for
+
+        Returns:
+            int: Number of partnerships created
         """
-        from tournaments.models import MeleePlayer
         from collections import defaultdict
-        
+        from itertools import combinations
+
         # Group players by their assigned team
         teams_players = defaultdict(list)
-        
-        for melee_player in tournament.melee_players.all():
-            if melee_player.assigned_team:
-                teams_players[melee_player.assigned_team].append(melee_player.player)
-        
-        partnerships_created = 0
-        
-        # Record partnerships for each team
-        for team, players in teams_players.items():
-            # Record partnerships for all pairs in this team
-            for i in range(len(players)):
-                for j in range(i + 1, len(players)):
-                    player1 = players[i]
-                    player2 = players[j]
-                    
-                    # Always store in consistent order (lower ID first)
-                    if player1.id > player2.id:
-                        player1, player2 = player2, player1
-                    
-                    # Create partnership record (or skip if already exists)
-                    partnership, created = cls.objects.get_or_create(
-                        tournament=tournament,
-                        round_number=round_number,
-                        player1=player1,
-                        player2=player2,
-                        defaults={
-                            'team_name': team.name
-                        }
-                    )
-                    
-                    if created:
-                        partnerships_created += 1
-        
-        return partnerships_created
+        team_names = {}
+        assignments = tournament.melee_players.filter(
+            assigned_team__isnull=False
+        ).values_list('player_id', 'assigned_team_id', 'assigned_team__name')
+        for player_id, team_id, team_name in assignments:
+            teams_players[team_id].append(player_id)
+            team_names[team_id] = team_name
+
+        existing = set(
+            cls.objects.filter(tournament=tournament, round_number=round_number)
+            .values_list('player1_id', 'player2_id')
+        )
+
+        # One row per pair, always stored in consistent order (lower ID first)
+        new_partnerships = [
+            cls(
+                tournament=tournament,
+                round_number=round_number,
+                player1_id=player1_id,
+                player2_id=player2_id,
+                team_name=team_names[team_id],
+            )
+            for team_id, player_ids in teams_players.items()
+            for player1_id, player2_id in combinations(sorted(player_ids), 2)
+            if (player1_id, player2_id) not in existing
+        ]
+        # ignore_conflicts covers a concurrent recorder for the same round
+        cls.objects.bulk_create(new_partnerships, ignore_conflicts=True)
+
+        return len(new_partnerships)
+
+    @classmethod
+    def get_partnership_matrix(cls, player_ids, tournament=None):
+        """
+        Co-occurrence matrix of past partnerships among ``player_ids``.
+
+        Args:
+            player_ids: IDs of the players to consider
+            tournament: Only count partnerships from this tournament (default: all)
+
+        Returns:
+            Counter: {(lower_id, higher_id): number of rounds they were teammates}
+        """
+        from collections import Counter
+
+        partnerships = cls.objects.filter(player1_id__in=player_ids, player2_id__in=player_ids)
+        if tournament is not None:
+            partnerships = partnerships.filter(tournament=tournament)
+        return Counter(partnerships.values_list('player1_id', 'player2_id'))
     
     @classmethod
     def get_partnership_count(cls, tournament, player1, player2):
@@ -1,8 +1,7 @@
 """
 Utility functions for retrieving historical player ratings
 """
-from datetime import datetime
-from teams.models import PlayerProfile
+from teams.models import PlayerProfile, RatingEvent
 
 
 def get_player_rating_at_time(player, target_datetime):
@@ -21,38 +20,18 @@ def get_player_rating_at_time(player, target_datetime):
     except PlayerProfile.DoesNotExist:
         return 1000.0  # Default rating
     
-    # If no rating history, return current value
-    if not profile.rating_history:
-        return profile.value
-    
     # Convert target_datetime to timezone-aware if needed
     if target_datetime.tzinfo is None:
         from django.utils import timezone
         target_datetime = timezone.make_aware(target_datetime)
     
-    # Find the rating at the target time
-    # Rating history is ordered chronologically
-    last_rating_before_target = None
-    
-    for entry in profile.rating_history:
-        entry_time = datetime.fromisoformat(entry['timestamp'])
-        
-        # If this entry is after our target time, we've gone too far
-        if entry_time > target_datetime:
-            break
-        
-        # This entry is before or at our target time
-        last_rating_before_target = entry['new_value']
-    
-    # If we found a rating before the target time, use it
-    if last_rating_before_target is not None:
-        return last_rating_before_target
-    
-    # If target time is before all history entries, use the first old_value
-    if profile.rating_history:
-        return profile.rating_history[0]['old_value']
+    # Last logged rating at or before the target time, else the rating
+    # before the first change after it (indexed on player, timestamp)
+    rating = RatingEvent.rating_at(player, target_datetime)
+    if rating is not None:
+        return rating
     
-    # Fallback to current value
+    # No rating history: fall back to current value
     return profile.value
 
 
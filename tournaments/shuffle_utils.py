@@ -6,7 +6,7 @@ import random
 import logging
 from django.db import transaction
 from teams.models import Player
-from pfc_core.session_refresh import refresh_player_team_session
+from pfc_core.session_refresh import refresh_multiple_players_team_sessions
 
 logger = logging.getLogger('tournaments')
 
@@ -16,7 +16,9 @@ def shuffle_melee_players(tournament, shuffle_type='manual', shuffled_by=None, r
     Shuffle players between existing mêlée teams in a tournament.
     
     This creates a more dynamic and social experience by mixing up teammates
-    after each round, while keeping the same team structure.
+    after each round, while keeping the same team structure.  The new teams
+    avoid partnerships already played in this tournament and keep team
+    ratings balanced (tournaments.melee_formation).
     
     Args:
         tournament: Tournament object
@@ -93,68 +95,67 @@ def shuffle_melee_players(tournament, shuffle_type='manual', shuffled_by=None, r
             # or from the previous shuffle. We don't need to record them again here.
             logger.info(f"Shuffling players after round {completed_round} completion, preparing for round {next_round}")
             
-            # Shuffle players randomly
-            random.shuffle(all_players)
-            
-            # Determine team size
-            team_size = len(all_players) // len(teams)
-            
-            # Redistribute players to teams
-            player_index = 0
-            teams_affected = 0
-            
+            # Form the next round's teams: avoid partners already seen in this
+            # tournament while keeping team ratings balanced
+            from django.conf import settings
+            from teams.models import PlayerProfile
+            from tournaments.melee_formation import form_teams
+
+            # Same team structure: equal sizes, the first teams take any remainder
+            team_size, remainder = divmod(len(all_players), len(teams))
+            team_sizes = [team_size + (1 if i < remainder else 0) for i in range(len(teams))]
+
+            players_by_id = {player.id: player for player in all_players}
+            ratings = dict(
+                PlayerProfile.objects.filter(player_id__in=players_by_id).values_list('player_id', 'value')
+            )
+            for player_id in players_by_id:
+                if ratings.get(player_id) is None:
+                    ratings[player_id] = 100.0
+            player_ids = list(players_by_id)
+            random.shuffle(player_ids)
+
+            formation = form_teams(
+                player_ids,
+                team_sizes,
+                ratings,
+                MeleePartnership.get_partnership_matrix(player_ids, tournament=tournament),
+                time_budget=getattr(settings, 'MELEE_FORMATION_TIME_BUDGET', 1.0),
+            )
+
             # Import MeleePlayer to update assigned_team
             from tournaments.models import MeleePlayer
-            
-            for team in teams:
-                # Assign new players to team
+            melee_players = {
+                mp.player_id: mp
+                for mp in MeleePlayer.objects.filter(tournament=tournament, player_id__in=players_by_id)
+            }
+
+            teams_affected = 0
+            for team, team_player_ids in zip(teams, formation.teams):
                 team_players = []
-                for _ in range(team_size):
-                    if player_index < len(all_players):
-                        player = all_players[player_index]
-                        
-                        # Update Player.team
-                        player.team = team
-                        player.save()
-                        
-                        # Also update MeleePlayer.assigned_team so partnerships are recorded correctly
-                        try:
-                            melee_player = MeleePlayer.objects.get(tournament=tournament, player=player)
-                            melee_player.assigned_team = team
-                            melee_player.save()
-                        except MeleePlayer.DoesNotExist:
-                            logger.warning(f"MeleePlayer not found for {player.name} in tournament {tournament.name}")
-                        
-                        team_players.append(player.name)
-                        
-                        # Refresh player's session (shuffle = still in Mêlée assignment)
-                        refresh_player_team_session(player, in_melee_assignment=True)
-                        
-                        player_index += 1
-                
+                for player_id in team_player_ids:
+                    player = players_by_id[player_id]
+
+                    # Update Player.team
+                    player.team = team
+                    player.save()
+
+                    # Also update MeleePlayer.assigned_team so partnerships are recorded correctly
+                    melee_player = melee_players.get(player_id)
+                    if melee_player is not None:
+                        melee_player.assigned_team = team
+                        melee_player.save(update_fields=['assigned_team'])
+                    else:
+                        logger.warning(f"MeleePlayer not found for {player.name} in tournament {tournament.name}")
+
+                    team_players.append(player.name)
+
                 teams_affected += 1
                 logger.info(f"Shuffled players into {team.name}: {team_players}")
-            
-            # Handle any remaining players (edge case)
-            while player_index < len(all_players):
-                # Distribute remaining players to teams
-                for team in teams:
-                    if player_index < len(all_players):
-                        player = all_players[player_index]
-                        player.team = team
-                        player.save()
-                        
-                        # Also update MeleePlayer.assigned_team
-                        try:
-                            melee_player = MeleePlayer.objects.get(tournament=tournament, player=player)
-                            melee_player.assigned_team = team
-                            melee_player.save()
-                        except MeleePlayer.DoesNotExist:
-                            pass
-                        
-                        refresh_player_team_session(player, in_melee_assignment=True)
-                        player_index += 1
-            
+
+            # Refresh sessions (shuffle = still in Mêlée assignment) in one pass
+            refresh_multiple_players_team_sessions(all_players, in_melee_assignment=True)
+
             # Record NEW partnerships for the NEXT round (after shuffle)
             # This is the source of truth for who is on which team for the next round
             partnerships_created = MeleePartnership.record_partnerships_for_round(tournament, next_round)
@@ -5,7 +5,7 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from matches.models import Match
 from .models import Tournament
-from .automation_engine import TournamentEngine
+from .job_queue import enqueue_automation_on_commit
 
 logger = logging.getLogger("tournaments")
 
@@ -17,7 +17,7 @@ def handle_match_completion(sender, instance, created, update_fields=None, **kwa
     if instance.status == "completed" and instance.tournament:
         tournament = instance.tournament
         
-        logger.info(f"Match {instance.id} completed for tournament {tournament.id}. Updating team stats and triggering automation.")
+        logger.info(f"Match {instance.id} completed for tournament {tournament.id}. Updating team stats and queueing automation.")
         
         # Update swiss_points for tournament teams
         try:
@@ -55,24 +55,13 @@ def handle_match_completion(sender, instance, created, update_fields=None, **kwa
         except Exception as e:
             logger.exception(f"Error updating swiss_points for tournament {tournament.id}: {e}")
         
-        # Only trigger automation if tournament is idle
-        current_status = getattr(tournament, 'automation_status', 'idle')
-        
-        if current_status != 'idle':
-            logger.info(f"Tournament {tournament.id} automation is not idle (status: {current_status}). Skipping automation.")
+        if getattr(tournament, 'automation_status', 'idle') == 'completed':
             return
-        
+
+        # Hand the expensive part (pairing the next round, creating matches,
+        # badges) to the automation worker so this request returns straight
+        # away.  Jobs are coalesced per tournament and run one at a time.
         try:
-            # Use the fixed automation engine
-            engine = TournamentEngine(tournament)
-            result = engine.process_automation()
-            
-            if result:
-                logger.info(f"✅ Automation successful for tournament {tournament.id}")
-            else:
-                logger.warning(f"⚠️ Automation returned False for tournament {tournament.id}")
-                
+            enqueue_automation_on_commit(tournament.id, match_id=instance.id)
         except Exception as e:
-            logger.exception(f"❌ Error in automation for tournament {tournament.id}: {e}")
-            # Don't set error status - let the engine handle it
-
+            logger.exception(f"❌ Could not queue automation for tournament {tournament.id}: {e}")
@@ -29,15 +29,30 @@ BUGS FIXED (2026-04-14):
 5. Debug logging was sparse — no per-decision trace of floater movement or
    score-group contents.
    FIX: Comprehensive DEBUG logging added throughout.
+
+6. Backtracking (Smart Swiss) was exponential on large fields and score-group
+   pairing (Standard Swiss) was greedy, so it could strand floaters or accept
+   rematches that a different arrangement would have avoided.
+   FIX: Both formats now pair the whole field in one minimum-cost perfect
+   matching (see pairing_engine.py); the odd-team bye is part of the matching.
 """
 
 import logging
 import random
-from typing import List, Tuple, Optional, Set, Dict
+from typing import List, Tuple, Optional, Set
 from django.db import transaction
 from .models import Tournament, TournamentTeam, Round, Stage
 from matches.models import Match
 from teams.models import Team
+from .pairing_engine import (
+    LEVEL_PARENT_CHILD,
+    LEVEL_REMATCH,
+    PairingEngine,
+    PairingResult,
+    ParentChildPenalty,
+    RematchPenalty,
+    ScoreDistanceCost,
+)
 
 logger = logging.getLogger("tournaments.swiss")
 
@@ -62,10 +77,72 @@ def has_parent_child_relationship(team1: Team, team2: Team) -> bool:
     return False
 
 
+class PairingContext:
+    """
+    In-memory pairing constraints for one round.
+
+    Built once per round from two bulk queries (opponents already played,
+    parent-team links) so that the pairing engine's cost functions never touch
+    the database.  Pairs are stored as (low_team_id, high_team_id) tuples.
+    """
+
+    def __init__(self, played_pairs=None, parent_of=None):
+        self.played_pairs: Set[Tuple[int, int]] = set()
+        for a, b in played_pairs or ():
+            self.played_pairs.add(self._key(a, b))
+        self.parent_child_pairs: Set[Tuple[int, int]] = set()
+        for child_id, parent_id in (parent_of or {}).items():
+            if parent_id:
+                self.parent_child_pairs.add(self._key(child_id, parent_id))
+
+    @staticmethod
+    def _key(a: int, b: int) -> Tuple[int, int]:
+        return (a, b) if a < b else (b, a)
+
+    @classmethod
+    def load(cls, tournament, teams: List[TournamentTeam]) -> "PairingContext":
+        """Load played pairs and parent links for ``teams`` in two queries."""
+        tournament_id = getattr(tournament, "pk", tournament)
+        through = TournamentTeam.opponents_played.through
+        played = through.objects.filter(
+            tournamentteam__tournament_id=tournament_id,
+        ).values_list("tournamentteam__team_id", "team_id")
+
+        team_ids = [tt.team_id for tt in teams]
+        parent_of = dict(
+            Team.objects.filter(id__in=team_ids, parent_team__isnull=False)
+            .values_list("id", "parent_team_id")
+        )
+        return cls(played_pairs=played, parent_of=parent_of)
+
+    def have_played(self, team1_tt: TournamentTeam, team2_tt: TournamentTeam) -> bool:
+        return self._key(team1_tt.team_id, team2_tt.team_id) in self.played_pairs
+
+    def is_parent_child(self, team1_tt: TournamentTeam, team2_tt: TournamentTeam) -> bool:
+        return self._key(team1_tt.team_id, team2_tt.team_id) in self.parent_child_pairs
+
+    def can_play(self, team1_tt: TournamentTeam, team2_tt: TournamentTeam,
+                 allow_rematches: bool = False, avoid_parent_child: bool = False) -> bool:
+        if not allow_rematches and self.have_played(team1_tt, team2_tt):
+            return False
+        if avoid_parent_child and self.is_parent_child(team1_tt, team2_tt):
+            return False
+        return True
+
+    def record_pairing(self, team1_tt: TournamentTeam, team2_tt: TournamentTeam) -> None:
+        self.played_pairs.add(self._key(team1_tt.team_id, team2_tt.team_id))
+
+
 def can_teams_play(team1_tt: TournamentTeam, team2_tt: TournamentTeam,
                    allow_rematches: bool = False,
-                   avoid_parent_child: bool = False) -> bool:
+                   avoid_parent_child: bool = False,
+                   context: Optional[PairingContext] = None) -> bool:
     """Return True if the two teams are allowed to play each other."""
+    if context is not None:
+        allowed = context.can_play(team1_tt, team2_tt, allow_rematches, avoid_parent_child)
+        if not allowed:
+            logger.debug("  BLOCKED: %s vs %s", team1_tt.team_id, team2_tt.team_id)
+        return allowed
     if not allow_rematches and team2_tt.team in team1_tt.opponents_played.all():
         logger.debug(f"  BLOCKED (rematch): {team1_tt.team.name} vs {team2_tt.team.name}")
         return False
@@ -75,78 +152,25 @@ def can_teams_play(team1_tt: TournamentTeam, team2_tt: TournamentTeam,
     return True
 
 
-def find_best_pairing(unpaired_teams: List[TournamentTeam],
-                      avoid_parent_child: bool = False) -> Optional[List[Tuple[int, int]]]:
+def _give_bye(bye_team: TournamentTeam, next_round_num: int) -> TournamentTeam:
     """
-    Find the best possible pairing for all unpaired teams using backtracking.
-
-    Teams should be pre-sorted by swiss_points (desc) so that the backtracking
-    naturally tries score-adjacent pairings first.
-
-    Returns a list of (i, j) index pairs, or None if no valid full pairing exists.
-    """
-    n = len(unpaired_teams)
-    if n < 2:
-        return []
-
-    if n % 2 != 0:
-        logger.warning(f"find_best_pairing called with odd count ({n}) — last team excluded")
-        n -= 1  # exclude last team; caller should handle bye first
-
-    def backtrack(paired: Set[int], pairings: List[Tuple[int, int]]) -> Optional[List[Tuple[int, int]]]:
-        if len(paired) == n:
-            return list(pairings)
-
-        # Find first unpaired index
-        first = next((i for i in range(n) if i not in paired), None)
-        if first is None:
-            return list(pairings)
-
-        # Try pairing with all subsequent unpaired teams (score-adjacent first because list is sorted)
-        for j in range(first + 1, n):
-            if j in paired:
-                continue
-            t1 = unpaired_teams[first]
-            t2 = unpaired_teams[j]
-            logger.debug(f"  backtrack: trying {t1.team.name}({t1.swiss_points}pts) vs {t2.team.name}({t2.swiss_points}pts)")
-            if can_teams_play(t1, t2, allow_rematches=False, avoid_parent_child=avoid_parent_child):
-                result = backtrack(paired | {first, j}, pairings + [(first, j)])
-                if result is not None:
-                    return result
-
-        logger.debug(f"  backtrack: no valid partner for {unpaired_teams[first].team.name} — backtracking")
-        return None
-
-    return backtrack(set(), [])
-
-
-def _assign_bye(teams_to_pair: List[TournamentTeam], next_round_num: int) -> Optional[TournamentTeam]:
-    """
-    Select and remove the bye team from teams_to_pair (in-place).
-    Prefers the lowest-ranked team that has not yet received a bye.
-    Falls back to the lowest-ranked team if all have had byes.
-    Returns the bye team or None.
+    Award the bye chosen by the pairing engine: 3 points, and the round is
+    recorded on the team's first bye only.
     """
-    # Scan from bottom (lowest ranked) upward
-    for i in range(len(teams_to_pair) - 1, -1, -1):
-        candidate = teams_to_pair[i]
-        if candidate.received_bye_in_round is None:
-            bye_team = teams_to_pair.pop(i)
-            bye_team.received_bye_in_round = next_round_num
-            bye_team.swiss_points += 3
-            bye_team.save()
-            logger.info(f"BYE assigned to {bye_team.team.name} (round {next_round_num}, first bye)")
-            return bye_team
-
-    # All teams have had a bye — give to lowest ranked
-    bye_team = teams_to_pair.pop()
+    first_bye = bye_team.received_bye_in_round is None
+    if first_bye:
+        bye_team.received_bye_in_round = next_round_num
     bye_team.swiss_points += 3
     bye_team.save()
-    logger.info(f"BYE assigned to {bye_team.team.name} (round {next_round_num}, all had byes — repeat)")
+    if first_bye:
+        logger.info(f"BYE assigned to {bye_team.team.name} (round {next_round_num}, first bye)")
+    else:
+        logger.info(f"BYE assigned to {bye_team.team.name} (round {next_round_num}, all had byes — repeat)")
     return bye_team
 
 
-def _create_match(tournament, round_obj, stage, team1_tt, team2_tt) -> Match:
+def _create_match(tournament, round_obj, stage, team1_tt, team2_tt,
+                  context: Optional[PairingContext] = None) -> Match:
     """Create a match and record opponents-played on both sides."""
     logger.info(f"  PAIRING: {team1_tt.team.name} ({team1_tt.swiss_points}pts) vs "
                 f"{team2_tt.team.name} ({team2_tt.swiss_points}pts) "
@@ -162,6 +186,8 @@ def _create_match(tournament, round_obj, stage, team1_tt, team2_tt) -> Match:
     )
     team1_tt.opponents_played.add(team2_tt.team)
     team2_tt.opponents_played.add(team1_tt.team)
+    if context is not None:
+        context.record_pairing(team1_tt, team2_tt)
     return match
 
 
@@ -169,92 +195,35 @@ def _create_match(tournament, round_obj, stage, team1_tt, team2_tt) -> Match:
 # Score-group-based Standard Swiss pairing
 # ---------------------------------------------------------------------------
 
-def _pair_by_score_groups(teams_to_pair: List[TournamentTeam],
-                          tournament, round_obj, stage) -> List[Match]:
+def build_swiss_engine(context: PairingContext, avoid_parent_child: bool = False) -> PairingEngine:
+    """
+    Pairing engine for Standard / Smart Swiss.
+
+    Rematches are the hardest constraint, then (Smart Swiss only) parent-child
+    pairings, then distance between the teams' Swiss points.
     """
-    Proper Swiss pairing algorithm:
+    costs = [ScoreDistanceCost(), RematchPenalty(context)]
+    if avoid_parent_child:
+        costs.append(ParentChildPenalty(context))
+    return PairingEngine(costs)
 
-    1. Group teams by swiss_points (score brackets).
-    2. Within each group, pair top vs bottom (fold pairing).
-    3. If a group has an odd number, the lowest-ranked team in that group
-       becomes a FLOATER and is carried down to the next (lower) score group.
-    4. If no valid pairing can be made within a group (all rematches), try
-       pairing the floater with someone from the next group first.
-    5. Final fallback: allow rematches.
 
-    Returns list of Match objects created.
+def plan_swiss_pairings(teams_to_pair: List[TournamentTeam],
+                        context: PairingContext,
+                        avoid_parent_child: bool = False) -> PairingResult:
     """
-    matches_created: List[Match] = []
-
-    # Build score groups (sorted descending by score)
-    score_groups: Dict[int, List[TournamentTeam]] = {}
-    for tt in teams_to_pair:
-        score_groups.setdefault(tt.swiss_points, []).append(tt)
-
-    sorted_scores = sorted(score_groups.keys(), reverse=True)
-    logger.debug(f"Score groups: { {s: [t.team.name for t in score_groups[s]] for s in sorted_scores} }")
-
-    floater: Optional[TournamentTeam] = None  # team carried down from previous group
-
-    for score in sorted_scores:
-        group = score_groups[score]
-        if floater:
-            logger.debug(f"  Floater {floater.team.name} ({floater.swiss_points}pts) dropped into group {score}")
-            group = [floater] + group
-            floater = None
-
-        logger.debug(f"Processing score group {score}: {[t.team.name for t in group]}")
-
-        # Attempt fold pairing within this group
-        paired_in_group: List[Tuple[TournamentTeam, TournamentTeam]] = []
-        unpaired = list(group)
-
-        # Try backtracking within the group
-        result = find_best_pairing(unpaired, avoid_parent_child=False)
-        if result is not None and len(result) == len(unpaired) // 2:
-            for i, j in result:
-                paired_in_group.append((unpaired[i], unpaired[j]))
-            if len(unpaired) % 2 == 1:
-                # The last team becomes the floater
-                paired_indices = set()
-                for i, j in result:
-                    paired_indices.add(i)
-                    paired_indices.add(j)
-                floater_idx = next(k for k in range(len(unpaired)) if k not in paired_indices)
-                floater = unpaired[floater_idx]
-                logger.debug(f"  Floater from group {score}: {floater.team.name}")
-        else:
-            # Backtracking found no full pairing — carry everyone as floaters to next group
-            logger.warning(f"  No valid pairing in score group {score} — carrying all to next group")
-            if floater is None:
-                floater = group[0] if group else None
-                remaining = group[1:]
-            else:
-                remaining = group
-            # Add remaining back to next group by injecting into score_groups
-            if remaining:
-                next_score_idx = sorted_scores.index(score) + 1
-                if next_score_idx < len(sorted_scores):
-                    next_score = sorted_scores[next_score_idx]
-                    score_groups[next_score] = remaining + score_groups[next_score]
-                    logger.debug(f"  Injected {[t.team.name for t in remaining]} into group {next_score}")
-                else:
-                    # Last group — force pairing with rematches allowed
-                    logger.warning(f"  Last group, forcing rematch pairings for {[t.team.name for t in remaining]}")
-                    for k in range(0, len(remaining) - 1, 2):
-                        m = _create_match(tournament, round_obj, stage, remaining[k], remaining[k+1])
-                        matches_created.append(m)
-            continue
-
-        for t1, t2 in paired_in_group:
-            m = _create_match(tournament, round_obj, stage, t1, t2)
-            matches_created.append(m)
-
-    # Handle any remaining floater after all groups processed
-    if floater:
-        logger.error(f"Unmatched floater after all groups: {floater.team.name} — this should not happen with proper bye handling")
-
-    return matches_created
+    Pair a ranked field (sorted by swiss_points desc) by minimum-cost perfect
+    matching.  Odd fields get a bye.  Runs entirely against ``context`` — no
+    database access — and records the new pairings in it.
+    """
+    plan = build_swiss_engine(context, avoid_parent_child).pair(teams_to_pair)
+    for t1, t2 in plan.pairs:
+        context.record_pairing(t1, t2)
+
+    rematches = plan.violations.get(LEVEL_REMATCH, 0)
+    if rematches:
+        logger.warning(f"  No rematch-free pairing exists: {rematches} rematch(es) this round")
+    return plan
 
 
 # ---------------------------------------------------------------------------
@@ -267,10 +236,12 @@ def generate_standard_swiss_round(tournament: Tournament, stage: Optional[Stage]
 
     Features:
     - Teams ranked by Swiss points, then Buchholz tiebreaker
-    - Score-group-based pairing with floater carry-down
-    - Rematch avoidance with fallback
-    - Proper bye handling for odd number of teams
-    - Full DEBUG logging of every pairing decision
+    - Pairs chosen by minimum-cost perfect matching (plan_swiss_pairings):
+      rematches only when no rematch-free pairing exists, then the smallest
+      total Swiss-point distance
+    - Odd fields: the bye goes to a team without a previous bye, normally
+      the lowest-ranked one
+    - Pairings computed in memory; one query set to load, one write per match
     """
     logger.info(f"=== Standard Swiss: generating round for tournament {tournament.id} ({tournament.name}) ===")
 
@@ -293,12 +264,12 @@ def generate_standard_swiss_round(tournament: Tournament, stage: Optional[Stage]
                     tournament=tournament,
                     is_active=True,
                     current_stage_number=stage.stage_number
-                ).order_by("-swiss_points", "-buchholz_score", "id"))
+                ).select_related("team").order_by("-swiss_points", "-buchholz_score", "id"))
             else:
                 teams_to_pair = list(TournamentTeam.objects.filter(
                     tournament=tournament,
                     is_active=True
-                ).order_by("-swiss_points", "-buchholz_score", "id"))
+                ).select_related("team").order_by("-swiss_points", "-buchholz_score", "id"))
 
             num_teams = len(teams_to_pair)
             logger.info(f"Teams to pair ({num_teams}): "
@@ -310,13 +281,16 @@ def generate_standard_swiss_round(tournament: Tournament, stage: Optional[Stage]
                 tournament.save()
                 return 0
 
+            # Minimum-cost matching against an in-memory constraint snapshot
+            context = PairingContext.load(tournament, teams_to_pair)
+            plan = plan_swiss_pairings(teams_to_pair, context)
+
             # Bye handling
             bye_team_tt = None
-            if num_teams % 2 != 0:
-                bye_team_tt = _assign_bye(teams_to_pair, next_round_num)
+            if plan.bye is not None:
+                bye_team_tt = _give_bye(plan.bye, next_round_num)
 
-            num_teams = len(teams_to_pair)
-            if num_teams < 2:
+            if not plan.pairs:
                 logger.warning("After bye assignment, fewer than 2 teams remain")
                 tournament.current_round_number = next_round_num
                 tournament.automation_status = "idle"
@@ -332,8 +306,10 @@ def generate_standard_swiss_round(tournament: Tournament, stage: Optional[Stage]
             )
             logger.debug(f"Round object {'created' if created else 'retrieved'}: {round_obj}")
 
-            # Score-group pairing
-            matches_created = _pair_by_score_groups(teams_to_pair, tournament, round_obj, stage)
+            matches_created = [
+                _create_match(tournament, round_obj, stage, t1, t2)
+                for t1, t2 in plan.pairs
+            ]
 
             # Finalize
             if matches_created or bye_team_tt:
@@ -366,11 +342,12 @@ def generate_smart_swiss_round(tournament: Tournament, stage: Optional[Stage] =
     Generate next round using Smart Swiss system with parent-child constraint handling.
 
     Features:
-    - Avoids parent-child team pairings when possible (Strategy 1)
-    - Falls back to allowing parent-child matches if necessary (Strategy 2)
-    - Falls back to emergency sequential pairing if all else fails (Strategy 3)
-    - Uses score-sorted backtracking for optimal pairings
-    - Full DEBUG logging of every pairing decision
+    - Same minimum-cost matching as Standard Swiss, with parent-child
+      pairings as an extra cost level below rematches
+    - Parent-child pairings only when every alternative needs more of them
+      (or a rematch); forced ones are logged
+    - Odd fields: the bye goes to a team without a previous bye, normally
+      the lowest-ranked one
     """
     logger.info(f"=== Smart Swiss: generating round for tournament {tournament.id} ({tournament.name}) ===")
 
@@ -393,12 +370,12 @@ def generate_smart_swiss_round(tournament: Tournament, stage: Optional[Stage] =
                     tournament=tournament,
                     is_active=True,
                     current_stage_number=stage.stage_number
-                ).order_by("-swiss_points", "-buchholz_score", "id"))
+                ).select_related("team").order_by("-swiss_points", "-buchholz_score", "id"))
             else:
                 teams_to_pair = list(TournamentTeam.objects.filter(
                     tournament=tournament,
                     is_active=True
-                ).order_by("-swiss_points", "-buchholz_score", "id"))
+                ).select_related("team").order_by("-swiss_points", "-buchholz_score", "id"))
 
             num_teams = len(teams_to_pair)
             logger.info(f"Teams to pair ({num_teams}): "
@@ -410,13 +387,17 @@ def generate_smart_swiss_round(tournament: Tournament, stage: Optional[Stage] =
                 tournament.save()
                 return 0
 
+            # Minimum-cost matching: rematches are avoided first, then
+            # parent-child pairings, then score distance.
+            context = PairingContext.load(tournament, teams_to_pair)
+            plan = plan_swiss_pairings(teams_to_pair, context, avoid_parent_child=True)
+
             # Bye handling
             bye_team_tt = None
-            if num_teams % 2 != 0:
-                bye_team_tt = _assign_bye(teams_to_pair, next_round_num)
+            if plan.bye is not None:
+                bye_team_tt = _give_bye(plan.bye, next_round_num)
 
-            num_teams = len(teams_to_pair)
-            if num_teams < 2:
+            if not plan.pairs:
                 logger.warning("After bye assignment, fewer than 2 teams remain")
                 tournament.current_round_number = next_round_num
                 tournament.automation_status = "idle"
@@ -431,42 +412,16 @@ def generate_smart_swiss_round(tournament: Tournament, stage: Optional[Stage] =
                 defaults={'is_complete': False}
             )
 
-            matches_created: List[Match] = []
-
-            # Strategy 1: Avoid parent-child relationships
-            logger.info("Strategy 1: backtracking with parent-child avoidance")
-            optimal_pairings = find_best_pairing(teams_to_pair, avoid_parent_child=True)
+            forced_parent_child = plan.violations.get(LEVEL_PARENT_CHILD, 0)
+            logger.info(f"Matching found {len(plan.pairs)} pairings "
+                        f"({forced_parent_child} forced parent-child, "
+                        f"{plan.violations.get(LEVEL_REMATCH, 0)} rematches)")
 
-            if optimal_pairings is not None and len(optimal_pairings) == num_teams // 2:
-                logger.info(f"Strategy 1 SUCCESS: {len(optimal_pairings)} pairings found")
-                for i, j in optimal_pairings:
-                    m = _create_match(tournament, round_obj, stage, teams_to_pair[i], teams_to_pair[j])
-                    matches_created.append(m)
-
-            else:
-                # Strategy 2: Allow parent-child
-                logger.warning("Strategy 1 FAILED. Strategy 2: allowing parent-child pairings")
-                fallback_pairings = find_best_pairing(teams_to_pair, avoid_parent_child=False)
-
-                if fallback_pairings is not None and len(fallback_pairings) > 0:
-                    logger.info(f"Strategy 2 SUCCESS: {len(fallback_pairings)} pairings found")
-                    for i, j in fallback_pairings:
-                        t1 = teams_to_pair[i]
-                        t2 = teams_to_pair[j]
-                        if has_parent_child_relationship(t1.team, t2.team):
-                            logger.warning(f"  PARENT-CHILD pairing (forced): {t1.team.name} vs {t2.team.name}")
-                        m = _create_match(tournament, round_obj, stage, t1, t2)
-                        matches_created.append(m)
-
-                else:
-                    # Strategy 3: Emergency sequential pairing (allow rematches)
-                    logger.error("Strategy 2 FAILED. Strategy 3: emergency sequential pairing (rematches allowed)")
-                    for k in range(0, num_teams - 1, 2):
-                        t1 = teams_to_pair[k]
-                        t2 = teams_to_pair[k + 1]
-                        logger.warning(f"  Emergency pairing: {t1.team.name} vs {t2.team.name}")
-                        m = _create_match(tournament, round_obj, stage, t1, t2)
-                        matches_created.append(m)
+            matches_created: List[Match] = []
+            for t1, t2 in plan.pairs:
+                if forced_parent_child and context.is_parent_child(t1, t2):
+                    logger.warning(f"  PARENT-CHILD pairing (forced): {t1.team.name} vs {t2.team.name}")
+                matches_created.append(_create_match(tournament, round_obj, stage, t1, t2))
 
             # Finalize
             if matches_created or bye_team_tt:
@@ -51,7 +51,7 @@ def sync_team_assignments_with_partnerships(tournament, round_number):
             partnerships = MeleePartnership.objects.filter(
                 tournament=tournament,
                 round_number=round_number
-            )
+            ).select_related('player1__team', 'player2__team')
             
             if not partnerships.exists():
                 return {
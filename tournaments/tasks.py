@@ -310,100 +310,18 @@ def generate_next_combo_round(tournament):
 
 
 def check_round_completion(tournament_id):
-    """Checks if all matches in the current round are completed and triggers next round generation."""
-    logger.info(f"🔍 DEBUG: check_round_completion called for tournament {tournament_id}")
-    try:
-        with transaction.atomic():
-            tournament = Tournament.objects.select_for_update().get(id=tournament_id)
-            logger.info(f"🔍 DEBUG: Tournament {tournament.id} found - Format: {tournament.format}, Status: {tournament.automation_status}")
-
-            if tournament.format == "independent_games":
-                logger.info(
-                    "Skipping round-completion automation for Independent Games tournament %s",
-                    tournament.id,
-                )
-                return
-
-            # Avoid race conditions or redundant checks
-            if tournament.automation_status != "idle":
-                logger.warning(f"Automation for tournament {tournament.id} is already running or completed. Skipping check.")
-                return
-
-            current_round = tournament.current_round_number
-            logger.info(f"🔍 DEBUG: Current round number: {current_round}")
-            if current_round is None:
-                logger.info(f"Tournament {tournament.id} has not started or round number is not set. Skipping completion check.")
-                return
-
-            # Find matches for the current round - FIXED: Use round__number since Match has Round ForeignKey
-            round_matches = Match.objects.filter(tournament=tournament, round__number=current_round)
-            logger.info(f"🔍 DEBUG: Found {round_matches.count()} matches for round {current_round}")
-            
-            # Debug: List all matches and their status
-            for match in round_matches:
-                logger.info(f"🔍 DEBUG: Match {match.id} - Status: {match.status}, Round: {match.round.number if match.round else 'None'}")
-
-            if not round_matches.exists():
-                logger.warning(f"No matches found for round {current_round} in tournament {tournament.id}. Cannot check completion.")
-                # Potentially mark tournament as errored or needing admin intervention?
-                return
-
-            # Check if all matches in the round are completed
-            all_completed = all(match.status == "completed" for match in round_matches)
-            logger.info(f"🔍 DEBUG: All matches completed: {all_completed}")
-
-            if all_completed:
-                logger.info(f"All matches for round {current_round} in tournament {tournament.id} are completed.")
-                tournament.automation_status = "processing"
-                tournament.save()
-                logger.info(f"🔍 DEBUG: Tournament status set to 'processing', calling generation function for format: {tournament.format}")
-
-                # Trigger next round generation based on format
-                if tournament.format == "round_robin":
-                    generate_next_round_robin_round(tournament)
-                elif tournament.format == "swiss" or tournament.format == "smart_swiss":
-                    generate_next_swiss_round(tournament)
-                elif tournament.format == "knockout":
-                    generate_next_knockout_round(tournament)
-                elif tournament.format == "multi_stage":
-                    generate_next_combo_round(tournament)
-                else:
-                    logger.error(f"Unknown tournament format 	{tournament.format}	 for tournament {tournament.id}. Cannot generate next round.")
-                    tournament.automation_status = "error"
-                    tournament.save()
-                    # TODO: Add admin notification here
-                    return
-
-                # If generation was successful (or placeholder ran), update status
-                # The generation functions themselves should update round number and status on success/failure
-                # For now, assume placeholder means success and reset status
-                # In real implementation, generation functions would handle this.
-                if tournament.automation_status == "processing": # Check if generation function changed it
-                     tournament.automation_status = "idle" # Reset for next check
-                     tournament.save()
+    """
+    Queue a round-completion check for the automation worker.
 
-            else:
-                logger.info(f"Round {current_round} in tournament {tournament.id} is not yet complete. Waiting for remaining matches.")
-            
-            # Check if tournament is completed and assign badges if needed
-            # This runs after all match generation logic to avoid interference
-            try:
-                from .completion import check_and_complete_tournament
-                check_and_complete_tournament(tournament)
-            except Exception as e:
-                logger.exception(f"Error checking tournament completion for {tournament.id}: {e}")
-                # Don't fail the entire automation if badge assignment fails
+    This used to run the whole check (and next-round generation) inline while
+    holding a row lock on the tournament and flipping ``automation_status``
+    between idle/processing as a request-time mutex.  Those states now live on
+    AutomationJob (pending/running/done/failed): the worker claims one job per
+    tournament at a time and runs TournamentEngine for it.
 
-    except Tournament.DoesNotExist:
-        logger.error(f"Tournament with ID {tournament_id} not found during completion check.")
-    except Exception as e:
-        logger.exception(f"Error checking round completion for tournament {tournament_id}: {e}")
-        # Attempt to mark tournament as errored if possible
-        try:
-            tournament = Tournament.objects.get(id=tournament_id)
-            tournament.automation_status = "error"
-            tournament.save()
-        except Tournament.DoesNotExist:
-            pass # Tournament doesn't exist, nothing to mark
-        # TODO: Add admin notification here
+    Returns the pending AutomationJob.
+    """
+    from .job_queue import enqueue_automation
 
+    logger.info(f"Queueing round completion check for tournament {tournament_id}")
+    return enqueue_automation(tournament_id)
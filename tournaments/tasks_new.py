@@ -11,38 +11,16 @@ def check_round_completion(tournament_id):
     """
     Main entry point for tournament automation.
     Called when matches are completed to check if round/stage/tournament is complete.
+
+    The pass runs on the automation job queue (one running job per
+    tournament), not inline; this only records the trigger.
     """
-    logger.info(f"🔍 DEBUG: check_round_completion called for tournament {tournament_id}")
-    
+    from .job_models import AutomationJob
+    from .job_queue import enqueue_automation
+
     try:
-        tournament = Tournament.objects.get(id=tournament_id)
-        logger.info(f"🔍 DEBUG: Tournament {tournament_id} found - Format: {tournament.format}, Status: {tournament.automation_status}")
-        
-        # Check if automation should run
-        if tournament.automation_status not in ["idle", "needs_attention"]:
-            logger.info(f"Automation for tournament {tournament_id} is not idle (status: {tournament.automation_status})")
-            return
-        
-        # Set status to processing to prevent concurrent runs
-        tournament.automation_status = "processing"
-        tournament.save()
-        
-        try:
-            # Use the new automation engine
-            engine = TournamentEngine(tournament)
-            success = engine.process_automation()
-            
-            if success:
-                logger.info(f"✅ Automation completed successfully for tournament {tournament_id}")
-            else:
-                logger.warning(f"⚠️ Automation completed with issues for tournament {tournament_id}")
-                
-        except Exception as e:
-            logger.exception(f"Error in automation engine for tournament {tournament_id}: {e}")
-            # Engine handles its own error states
-            
-    except Tournament.DoesNotExist:
-        logger.error(f"Tournament {tournament_id} not found")
+        job = enqueue_automation(tournament_id, event_type=AutomationJob.EVENT_MANUAL)
+        logger.info(f"Queued automation job {job.id} for tournament {tournament_id}")
     except Exception as e:
         logger.exception(f"Error in check_round_completion for tournament {tournament_id}: {e}")
 
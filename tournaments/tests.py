@@ -1,3 +1,255 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from itertools import combinations
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from teams.models import Player, Team
+
+from . import job_queue, tasks_new, views_monitoring
+from .automation_logger import AUTOMATION_LOG_GROUP, AutomationLog, AutomationLogger, prune_automation_logs
+from .job_models import AutomationJob
+from .melee_formation import form_teams, pair_key
+from .models import MeleePlayer, Tournament, TournamentTeam
+from .pairing_engine import LEVEL_PARENT_CHILD, LEVEL_REMATCH
+from .partnership_models import MeleePartnership
+from .shuffle_utils import shuffle_melee_players
+from .swiss_algorithms import PairingContext, plan_swiss_pairings
+
+
+class MeleeFormationTests(TestCase):
+    def test_form_teams_avoids_repeat_partners(self):
+        players = list(range(1, 13))
+        ratings = {p: 100 + p for p in players}
+        # Everyone already partnered their snake-draft teammates
+        first = form_teams(players, [3] * 4, ratings, time_budget=0)
+        history = {pair_key(a, b): 1 for team in first.teams for a, b in combinations(team, 2)}
+
+        result = form_teams(players, [3] * 4, ratings, history, time_budget=0.2, seed=1)
+
+        self.assertEqual(result.initial_repeat_pairs, 12)
+        self.assertEqual(result.repeat_pairs, 0)
+        self.assertEqual(sorted(p for team in result.teams for p in team), players)
+        self.assertTrue(all(len(team) == 3 for team in result.teams))
+
+
+@override_settings(MELEE_FORMATION_TIME_BUDGET=0.1)
+class MeleePartnershipTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.tournament = Tournament.objects.create(
+            name="Mêlée", format="round_robin", play_format="doublet",
+            start_date=now, end_date=now + timedelta(days=1),
+            is_melee=True, melee_format="doublets",
+        )
+        home = Team.objects.create(name="Home", pin="MELEE0")
+        for i in range(8):
+            player = Player.objects.create(name=f"P{i}", team=home)
+            MeleePlayer.objects.create(tournament=self.tournament, player=player)
+
+    def test_generation_records_partnerships_in_bulk(self):
+        self.assertEqual(self.tournament.generate_melee_teams('partnership_aware'), 4)
+        self.assertEqual(MeleePartnership.objects.filter(round_number=1).count(), 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            created = MeleePartnership.record_partnerships_for_round(self.tournament, 2)
+        self.assertEqual(created, 4)
+        self.assertEqual(len(queries.captured_queries), 3)
+        # Re-recording a round is a no-op
+        self.assertEqual(MeleePartnership.record_partnerships_for_round(self.tournament, 2), 0)
+
+    def test_shuffle_avoids_previous_partners(self):
+        self.tournament.generate_melee_teams('partnership_aware')
+
+        result = shuffle_melee_players(self.tournament, round_number=1)
+
+        self.assertTrue(result['success'], result['message'])
+        matrix = MeleePartnership.get_partnership_matrix(
+            list(self.tournament.melee_players.values_list('player_id', flat=True)),
+            tournament=self.tournament,
+        )
+        self.assertEqual(sum(matrix.values()), 8)
+        self.assertEqual(max(matrix.values()), 1)
+
+
+class AutomationLogBufferTests(TestCase):
+    def test_entries_are_written_in_bulk_and_announced(self):
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(AUTOMATION_LOG_GROUP, channel)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with AutomationLogger(7, buffer_size=3, flush_seconds=60) as automation_log:
+                with CaptureQueriesContext(connection) as queries:
+                    automation_log.log_action("Pair round", "two entries stay buffered")
+                    automation_log.log_decision_point("Wait", "round incomplete")
+                self.assertEqual(len(queries.captured_queries), 0)
+
+                automation_log.log_action("Pair round", "third entry fills the buffer")
+                self.assertEqual(AutomationLog.objects.filter(tournament_id=7).count(), 3)
+                automation_log.log_status_change("processing", "idle", "run finished")
+        self.assertEqual(AutomationLog.objects.filter(tournament_id=7).count(), 4)
+
+        event = async_to_sync(channel_layer.receive)(channel)
+        self.assertEqual((event['tournament_id'], event['count'], event['has_error']), (7, 3, False))
+
+    def test_prune_removes_only_expired_rows(self):
+        now = timezone.now()
+        AutomationLog.objects.bulk_create([
+            AutomationLog(tournament_id=1, event_type='action', message=f"m{days}",
+                          timestamp=now - timedelta(days=days))
+            for days in (1, 10, 40, 50, 60)
+        ])
+
+        self.assertEqual(prune_automation_logs(now - timedelta(days=30), dry_run=True), 3)
+        self.assertEqual(prune_automation_logs(now - timedelta(days=30), batch_size=2), 3)
+        self.assertEqual(
+            sorted(AutomationLog.objects.values_list('message', flat=True)), ["m1", "m10"]
+        )
+
+
+@mock.patch.object(views_monitoring, 'EXPORT_PAGE_SIZE', 2)
+class AutomationLogExportTests(TestCase):
+    def setUp(self):
+        AutomationLog.objects.bulk_create([
+            AutomationLog(tournament_id=3, event_type='action', message=f"m{i}") for i in range(5)
+        ])
+        self.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        self.url = reverse('export_tournament_logs', args=[3])
+
+    def test_wsgi_export_streams_every_page(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url)
+        self.assertFalse(response.is_async)
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([log['message'] for log in body['logs']], [f"m{i}" for i in range(5)])
+
+    async def test_asgi_export_is_produced_page_by_page(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(self.url, {'format': 'csv'})
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        # Header, one chunk per keyset page of two rows
+        self.assertEqual(len(chunks), 4)
+        rows = b''.join(chunks).decode().splitlines()
+        self.assertEqual([row.split(',')[3] for row in rows[1:]], [f"m{i}" for i in range(5)])
+
+
+class AutomationJobQueueTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.tournament = Tournament.objects.create(
+            name="Queued", format="swiss", start_date=now, end_date=now + timedelta(days=1),
+        )
+
+    def test_triggers_coalesce_into_one_pending_job(self):
+        first = job_queue.enqueue_automation(self.tournament.id, match_id=1)
+        second = job_queue.enqueue_automation(self.tournament.id, match_id=2)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(AutomationJob.objects.get(pk=first.pk).payload['match_ids'], [1, 2])
+
+        # The constraint, not the lookup, is what rules out a second pending job
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AutomationJob.objects.create(tournament=self.tournament)
+
+    def test_one_running_job_per_tournament(self):
+        self.assertIsNone(job_queue.claim_next_job(worker_id="w1"))
+        job_queue.enqueue_automation(self.tournament.id)
+        running = job_queue.claim_next_job(worker_id="w1")
+        self.assertEqual(running.status, AutomationJob.STATUS_RUNNING)
+
+        # A trigger arriving mid-run queues the next pass, which waits for the first
+        queued = job_queue.enqueue_automation(self.tournament.id)
+        self.assertNotEqual(queued.pk, running.pk)
+        self.assertIsNone(job_queue.claim_next_job(worker_id="w2"))
+        # Even a claim that skips the busy check cannot start a second run
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AutomationJob.objects.filter(pk=queued.pk).update(status=AutomationJob.STATUS_RUNNING)
+
+        with mock.patch('tournaments.automation_engine.TournamentEngine.process_automation', return_value=True):
+            self.assertTrue(job_queue.run_job(running))
+        self.assertEqual(job_queue.claim_next_job(worker_id="w2").pk, queued.pk)
+
+    def test_stale_automation_status_does_not_skip_the_pass(self):
+        # Left behind by a crashed run; the queue, not the status, serialises passes
+        Tournament.objects.filter(pk=self.tournament.pk).update(automation_status="processing")
+        tasks_new.check_round_completion(self.tournament.id)
+        job = job_queue.claim_next_job(worker_id="w1")
+        self.assertEqual(job.event_type, AutomationJob.EVENT_MANUAL)
+
+        engine = 'tournaments.automation_engine.TournamentEngine'
+        with mock.patch(f'{engine}.is_tournament_complete', return_value=False), \
+                mock.patch(f'{engine}.is_current_stage_complete', return_value=False), \
+                mock.patch(f'{engine}.should_generate_next_round', return_value=True), \
+                mock.patch(f'{engine}.generate_next_round', return_value=True) as generate:
+            self.assertTrue(job_queue.run_job(job))
+        generate.assert_called_once()
+        self.assertEqual(Tournament.objects.get(pk=self.tournament.pk).automation_status, "idle")
+
+    def test_failures_back_off_then_fail(self):
+        job_queue.enqueue_automation(self.tournament.id)
+        with mock.patch('tournaments.automation_engine.TournamentEngine.process_automation', return_value=False):
+            for attempt in range(1, job_queue.MAX_ATTEMPTS + 1):
+                job = job_queue.claim_next_job(worker_id="w1")
+                self.assertEqual(job.attempts, attempt)
+                self.assertFalse(job_queue.run_job(job))
+                job.refresh_from_db()
+                if attempt < job_queue.MAX_ATTEMPTS:
+                    self.assertEqual(job.status, AutomationJob.STATUS_PENDING)
+                    self.assertGreater(job.next_attempt_at, timezone.now() + job_queue.retry_delay(attempt) / 2)
+                    # Not due yet: the worker leaves it alone until the backoff expires
+                    self.assertIsNone(job_queue.claim_next_job(worker_id="w1"))
+                    AutomationJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(job.status, AutomationJob.STATUS_FAILED)
+        self.assertEqual(job_queue.retry_delay(2), 2 * job_queue.retry_delay(1))
+
+
+class SwissPairingTests(TestCase):
+    """The matching engine runs against an in-memory context, so unsaved teams do."""
+
+    def _field(self, *swiss_points, byes=()):
+        return [
+            TournamentTeam(team_id=i + 1, swiss_points=points,
+                           received_bye_in_round=1 if i + 1 in byes else None)
+            for i, points in enumerate(swiss_points)
+        ]
+
+    @staticmethod
+    def _pairs(plan):
+        return {frozenset((t1.team_id, t2.team_id)) for t1, t2 in plan.pairs}
+
+    def test_rematch_avoided_when_possible(self):
+        teams = self._field(6, 6, 3, 3)
+        # The leaders already met; pairing by score alone would repeat it
+        plan = plan_swiss_pairings(teams, PairingContext(played_pairs=[(1, 2)]))
+
+        self.assertNotIn(frozenset((1, 2)), self._pairs(plan))
+        self.assertEqual(plan.violations.get(LEVEL_REMATCH, 0), 0)
+        self.assertEqual(len(plan.pairs), 2)
+
+    def test_bye_goes_to_lowest_ranked_team_without_one(self):
+        plan = plan_swiss_pairings(self._field(9, 6, 6, 3, 0), PairingContext())
+        self.assertEqual(plan.bye.team_id, 5)
+
+        plan = plan_swiss_pairings(self._field(6, 6, 3, 3, 0, byes=(5,)), PairingContext())
+        self.assertEqual(plan.bye.team_id, 4)
+        self.assertIn(5, {tt.team_id for pair in plan.pairs for tt in pair})
+
+    def test_smart_swiss_avoids_parent_child_pairing(self):
+        # Team 2 is a subteam of team 1 and both lead on points
+        context = PairingContext(parent_of={2: 1})
+        plan = plan_swiss_pairings(self._field(6, 6, 0, 0), context, avoid_parent_child=True)
+        self.assertNotIn(frozenset((1, 2)), self._pairs(plan))
+        self.assertEqual(plan.violations.get(LEVEL_PARENT_CHILD, 0), 0)
+
+        # Standard Swiss has no such constraint and pairs them by score
+        plan = plan_swiss_pairings(self._field(6, 6, 0, 0), PairingContext(parent_of={2: 1}))
+        self.assertIn(frozenset((1, 2)), self._pairs(plan))
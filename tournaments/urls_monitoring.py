@@ -23,6 +23,7 @@ urlpatterns = [
     
     # Health and export
     path('monitoring/health/', views_monitoring.automation_health_check, name='automation_health'),
+    path('monitoring/api/queue/', views_monitoring.automation_queue_api, name='automation_queue_api'),
     path('monitoring/export/', views_monitoring.export_automation_logs, name='export_logs'),
     path('monitoring/export/<int:tournament_id>/', views_monitoring.export_automation_logs, name='export_tournament_logs'),
 ]
@@ -827,7 +827,8 @@ def tournament_generate_melee_teams(request, tournament_id):
                 algorithm_names = {
                     'random': 'Random Assignment',
                     'balanced': 'Balanced by Skill',
-                    'snake_draft': 'Snake Draft'
+                    'snake_draft': 'Snake Draft',
+                    'partnership_aware': 'Fresh Partners',
                 }
                 algorithm_name = algorithm_names.get(algorithm, algorithm)
                 
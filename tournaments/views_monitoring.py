@@ -3,9 +3,12 @@ Web-based monitoring dashboard for tournament automation
 Provides real-time monitoring interface for debugging
 """
 
+import csv
 import json
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
@@ -15,7 +18,8 @@ from django.db.models import Count, Q
 from datetime import timedelta
 
 from .models import Tournament
-from .automation_logger import AutomationLog, AutomationMonitor, AutomationLogger
+from .automation_logger import AutomationLog, AutomationMonitor, AutomationLogger, iter_log_pages
+from .job_queue import queue_stats
 
 
 @staff_member_required
@@ -124,17 +128,7 @@ def automation_logs_api(request, tournament_id=None):
     # Format logs for JSON response
     log_data = []
     for log in logs:
-        log_data.append({
-            'id': log.id,
-            'tournament_id': log.tournament_id,
-            'event_type': log.event_type,
-            'message': log.message,
-            'details': log.details,
-            'reasoning': log.reasoning,
-            'context': log.context,
-            'timestamp': log.timestamp.isoformat(),
-            'data': log.data,
-        })
+        log_data.append(log.as_dict())
     
     return JsonResponse({
         'logs': log_data,
@@ -176,6 +170,7 @@ class AutomationControlView(View):
                     old_status, 'idle', 
                     'Manual reset via monitoring dashboard'
                 )
+                logger.flush()
                 
                 return JsonResponse({
                     'success': True,
@@ -183,16 +178,16 @@ class AutomationControlView(View):
                 })
             
             elif action == 'trigger_automation':
-                # Manually trigger automation
-                from .automation_engine import TournamentAutomationEngine
+                # Manually trigger automation via the worker queue
+                from .job_models import AutomationJob
+                from .job_queue import enqueue_automation
                 
-                engine = TournamentAutomationEngine(tournament)
-                result = engine.process_tournament()
+                job = enqueue_automation(tournament_id, event_type=AutomationJob.EVENT_MANUAL)
                 
                 return JsonResponse({
                     'success': True,
-                    'message': f'Automation triggered for tournament {tournament_id}',
-                    'result': result
+                    'message': f'Automation queued for tournament {tournament_id}',
+                    'job_id': job.id
                 })
             
             elif action == 'generate_round':
@@ -259,8 +254,11 @@ def automation_health_check(request):
         updated_at__lt=ten_minutes_ago
     ).count()
     
+    # Automation job queue depth and latency
+    job_queue = queue_stats()
+    
     # Determine overall health
-    if recent_errors > 5 or stuck_tournaments > 0:
+    if recent_errors > 5 or stuck_tournaments > 0 or job_queue['failed'] > 0:
         health_status = 'critical'
     elif recent_errors > 0:
         health_status = 'warning'
@@ -274,15 +272,86 @@ def automation_health_check(request):
         'stuck_tournaments': stuck_tournaments,
         'recent_events': {event['event_type']: event['count'] for event in recent_events},
         'active_tournaments': Tournament.objects.filter(is_active=True).count(),
+        'job_queue': job_queue,
     }
     
     return JsonResponse(health_data)
 
 
+@staff_member_required
+def automation_queue_api(request):
+    """API endpoint for automation job queue depth and latency"""
+    return JsonResponse(queue_stats())
+
+
+class _Echo:
+    """Write target that hands back what it is given, so csv.writer output can be streamed"""
+
+    def write(self, value):
+        return value
+
+
+EXPORT_PAGE_SIZE = 500
+CSV_EXPORT_HEADER = [
+    'ID', 'Tournament ID', 'Event Type', 'Message', 'Details',
+    'Reasoning', 'Context', 'Timestamp'
+]
+
+
+def _stream_logs_json(query):
+    yield '{"logs": ['
+    separator = '\n'
+    for page in iter_log_pages(query, EXPORT_PAGE_SIZE):
+        chunk = []
+        for log in page:
+            chunk.append(separator + json.dumps(log.as_dict(), default=str))
+            separator = ',\n'
+        yield ''.join(chunk)
+    yield '\n]}\n'
+
+
+def _stream_logs_csv(query):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_EXPORT_HEADER)
+    for page in iter_log_pages(query.defer('data'), EXPORT_PAGE_SIZE):
+        yield ''.join(
+            writer.writerow([
+                log.id, log.tournament_id, log.event_type, log.message,
+                log.details, log.reasoning, log.context, log.timestamp
+            ])
+            for log in page
+        )
+
+
+async def _stream_async(chunks):
+    """
+    Drive a sync chunk generator from an async one, one page per step.
+
+    Under ASGI Django buffers a sync streaming iterator in full before
+    sending anything; stepping it with sync_to_async (one keyset query per
+    step, on the thread-sensitive executor) keeps the stream incremental.
+    """
+    next_chunk = sync_to_async(next)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
 @staff_member_required
 def export_automation_logs(request, tournament_id=None):
-    """Export automation logs as CSV or JSON"""
+    """
+    Export automation logs as CSV or JSON, oldest first.
+
+    The response is streamed: rows are read in keyset pages of
+    EXPORT_PAGE_SIZE and written out page by page, so only one page is held
+    in memory.  Under ASGI (Daphne) the pages are produced by an async
+    generator, since a sync one would be read in full before the first byte.
+    """
     format_type = request.GET.get('format', 'json')
+    if format_type not in ('json', 'csv'):
+        return JsonResponse({'error': 'Invalid format. Use json or csv.'}, status=400)
     
     # Build query
     query = AutomationLog.objects.all()
@@ -298,51 +367,14 @@ def export_automation_logs(request, tournament_id=None):
     if end_date:
         query = query.filter(timestamp__lte=end_date)
     
-    logs = query.order_by('-timestamp')[:1000]  # Limit to 1000 records
-    
     if format_type == 'json':
-        log_data = []
-        for log in logs:
-            log_data.append({
-                'id': log.id,
-                'tournament_id': log.tournament_id,
-                'event_type': log.event_type,
-                'message': log.message,
-                'details': log.details,
-                'reasoning': log.reasoning,
-                'context': log.context,
-                'timestamp': log.timestamp.isoformat(),
-                'data': log.data,
-            })
-        
-        response = JsonResponse({'logs': log_data}, json_dumps_params={'indent': 2})
-        response['Content-Disposition'] = f'attachment; filename="automation_logs_{tournament_id or "all"}.json"'
-        return response
-    
-    elif format_type == 'csv':
-        import csv
-        from io import StringIO
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            'ID', 'Tournament ID', 'Event Type', 'Message', 'Details', 
-            'Reasoning', 'Context', 'Timestamp'
-        ])
-        
-        # Write data
-        for log in logs:
-            writer.writerow([
-                log.id, log.tournament_id, log.event_type, log.message,
-                log.details, log.reasoning, log.context, log.timestamp
-            ])
-        
-        response = HttpResponse(output.getvalue(), content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="automation_logs_{tournament_id or "all"}.csv"'
-        return response
-    
+        chunks, content_type = _stream_logs_json(query), 'application/json'
     else:
-        return JsonResponse({'error': 'Invalid format. Use json or csv.'}, status=400)
-
+        chunks, content_type = _stream_logs_csv(query), 'text/csv'
+    if isinstance(request, ASGIRequest):
+        chunks = _stream_async(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="automation_logs_{tournament_id or "all"}.{format_type}"'
+    )
+    return response
@@ -7,6 +7,10 @@ This module handles the unique pairing strategy for WTF tournaments:
 2. Identify Cool-Down teams (high Swiss, low PI)  
 3. Pair Push-Up vs Cool-Down when possible
 4. Fall back to nearest-PI pairing
+
+Steps 3 and 4 are solved together as one minimum-cost matching
+(see pairing_engine.py), so rematches are only accepted when no
+rematch-free pairing of the whole field exists.
 """
 
 import logging
@@ -16,10 +20,37 @@ from tournaments.models import Tournament, TournamentTeam, Stage, Round
 from matches.models import Match
 from teams.models import Team
 from tournaments.wtf_algorithm import WTFAlgorithm
+from tournaments.pairing_engine import (
+    ByeCost,
+    LEVEL_REMATCH,
+    PairingCost,
+    PairingEngine,
+    PetaIndexDistanceCost,
+    RematchPenalty,
+    RepeatByePenalty,
+)
+from tournaments.swiss_algorithms import PairingContext
 
 logger = logging.getLogger(__name__)
 
 
+class PushupCooldownPreference(PairingCost):
+    """
+    Prefer Push-Up vs Cool-Down pairings: every other pairing costs ``weight``.
+
+    With the default weight (the largest possible PI distance) the matching
+    maximises the number of Push-Up/Cool-Down pairs before nearest-PI.
+    """
+
+    def __init__(self, classifications: Dict[int, str], weight: float = 1.0):
+        self.classifications = classifications
+        self.weight = weight
+
+    def cost(self, a, b) -> float:
+        kinds = {self.classifications.get(a.team_id), self.classifications.get(b.team_id)}
+        return 0.0 if kinds == {"pushup", "cooldown"} else self.weight
+
+
 class WTFPairingEngine:
     """
     WTF Pairing Engine implementing push-up/cool-down strategy.
@@ -132,119 +163,46 @@ class WTFPairingEngine:
         """
         Generate pairings using WTF strategy.
         
-        Strategy:
-        1. Pair Push-Up vs Cool-Down teams (avoiding repeats)
-        2. Pair remaining teams by nearest πετΑ Index
+        Strategy (one minimum-cost matching, in priority order):
+        1. Avoid repeats
+        2. Pair Push-Up vs Cool-Down teams
+        3. Pair remaining teams by nearest πετΑ Index
         """
-        pairings = []
-        unpaired_teams = tournament_teams.copy()
-        
-        # Get teams by classification
-        pushup_teams = [tt for tt in tournament_teams if classifications.get(tt.team.id) == "pushup"]
-        cooldown_teams = [tt for tt in tournament_teams if classifications.get(tt.team.id) == "cooldown"]
-        normal_teams = [tt for tt in tournament_teams if classifications.get(tt.team.id) == "normal"]
-        
-        logger.info(f"Push-Up teams: {len(pushup_teams)}, Cool-Down teams: {len(cooldown_teams)}, Normal teams: {len(normal_teams)}")
-        
-        # Phase 1: Pair Push-Up vs Cool-Down
-        pushup_cooldown_pairs = self._pair_pushup_cooldown(pushup_teams, cooldown_teams)
-        for pair in pushup_cooldown_pairs:
-            pairings.append(pair)
-            unpaired_teams.remove(pair[0])
-            unpaired_teams.remove(pair[1])
-        
-        # Phase 2: Pair remaining teams by nearest πετΑ Index
-        nearest_pi_pairs = self._pair_by_nearest_pi(unpaired_teams, peta_indices)
-        pairings.extend(nearest_pi_pairs)
-        
-        return pairings
-    
-    def _pair_pushup_cooldown(self, pushup_teams: List[TournamentTeam], 
-                             cooldown_teams: List[TournamentTeam]) -> List[Tuple[TournamentTeam, TournamentTeam]]:
-        """
-        Pair Push-Up teams with Cool-Down teams, avoiding repeats.
-        """
-        pairings = []
-        used_pushup = set()
-        used_cooldown = set()
-        
-        for pushup_team in pushup_teams:
-            if pushup_team.team.id in used_pushup:
-                continue
-            
-            # Find best Cool-Down opponent (avoiding repeats)
-            best_cooldown = None
-            for cooldown_team in cooldown_teams:
-                if (cooldown_team.team.id in used_cooldown or 
-                    self._have_teams_played(pushup_team.team.id, cooldown_team.team.id)):
-                    continue
-                
-                best_cooldown = cooldown_team
-                break
-            
-            if best_cooldown:
-                pairings.append((pushup_team, best_cooldown))
-                used_pushup.add(pushup_team.team.id)
-                used_cooldown.add(best_cooldown.team.id)
-                logger.info(f"Push-Up/Cool-Down pair: {pushup_team.team.name} vs {best_cooldown.team.name}")
-        
-        return pairings
-    
-    def _pair_by_nearest_pi(self, teams: List[TournamentTeam], 
-                           peta_indices: Dict[int, Dict]) -> List[Tuple[TournamentTeam, TournamentTeam]]:
-        """
-        Pair remaining teams by nearest πετΑ Index values.
-        """
-        pairings = []
-        unpaired = teams.copy()
+        counts = {kind: 0 for kind in ("pushup", "cooldown", "normal")}
+        for tt in tournament_teams:
+            counts[classifications.get(tt.team_id, "normal")] += 1
+        logger.info(f"Push-Up teams: {counts['pushup']}, Cool-Down teams: {counts['cooldown']}, Normal teams: {counts['normal']}")
+        
+        # Nearest-PI order makes the engine's ranking tie-break pair PI neighbours.
+        ordered = sorted(tournament_teams, key=lambda tt: peta_indices.get(tt.team_id, {}).get('PI', 0.0), reverse=True)
+        
+        costs = [
+            PushupCooldownPreference(classifications),
+            PetaIndexDistanceCost(peta_indices),
+        ]
+        if self.config.get("avoid_repeats", True):
+            costs.append(RematchPenalty(self._load_played_pairs()))
+        engine = PairingEngine(costs, bye_costs=[ByeCost(), RepeatByePenalty()])
+        plan = engine.pair(ordered)
+        
+        for team1, team2 in plan.pairs:
+            kinds = {classifications.get(team1.team_id), classifications.get(team2.team_id)}
+            if kinds == {"pushup", "cooldown"}:
+                logger.info(f"Push-Up/Cool-Down pair: {team1.team.name} vs {team2.team.name}")
+            else:
+                pi_diff = abs(peta_indices.get(team1.team_id, {}).get('PI', 0.0) -
+                              peta_indices.get(team2.team_id, {}).get('PI', 0.0))
+                logger.info(f"Nearest-PI pair: {team1.team.name} vs {team2.team.name} (PI diff: {pi_diff:.3f})")
         
-        # Sort teams by πετΑ Index for efficient pairing
-        unpaired.sort(key=lambda tt: peta_indices.get(tt.team.id, {}).get('PI', 0.0), reverse=True)
+        if plan.violations.get(LEVEL_REMATCH, 0):
+            logger.warning(f"Forced {plan.violations[LEVEL_REMATCH]} repeat pair(s): no repeat-free pairing exists")
+        if plan.bye is not None:
+            logger.info(f"Bye: {plan.bye.team.name}")
         
-        while len(unpaired) >= 2:
-            team1 = unpaired[0]
-            team1_pi = peta_indices.get(team1.team.id, {}).get('PI', 0.0)
-            
-            # Find nearest PI opponent (avoiding repeats)
-            best_opponent = None
-            best_pi_diff = float('inf')
-            
-            for i, team2 in enumerate(unpaired[1:], 1):
-                if self._have_teams_played(team1.team.id, team2.team.id):
-                    continue
-                
-                team2_pi = peta_indices.get(team2.team.id, {}).get('PI', 0.0)
-                pi_diff = abs(team1_pi - team2_pi)
-                
-                if pi_diff < best_pi_diff:
-                    best_pi_diff = pi_diff
-                    best_opponent = team2
-            
-            if best_opponent:
-                pairings.append((team1, best_opponent))
-                unpaired.remove(team1)
-                unpaired.remove(best_opponent)
-                logger.info(f"Nearest-PI pair: {team1.team.name} vs {best_opponent.team.name} (PI diff: {best_pi_diff:.3f})")
-            else:
-                # No valid opponent found, pair with next available (allowing repeat)
-                if len(unpaired) >= 2:
-                    team2 = unpaired[1]
-                    pairings.append((team1, team2))
-                    unpaired.remove(team1)
-                    unpaired.remove(team2)
-                    logger.warning(f"Forced pair (repeat): {team1.team.name} vs {team2.team.name}")
-                else:
-                    # Odd number of teams, team1 gets a bye
-                    logger.info(f"Bye: {team1.team.name}")
-                    break
-        
-        return pairings
+        return plan.pairs
     
-    def _have_teams_played(self, team1_id: int, team2_id: int) -> bool:
-        """Check if two teams have already played against each other."""
-        if not self.config.get("avoid_repeats", True):
-            return False
-        
+    def _load_played_pairs(self) -> PairingContext:
+        """Load every pairing already played in this stage/tournament in one query."""
         base_filter = Q(status__in=['completed', 'active', 'pending'])
         
         if self.stage:
@@ -252,28 +210,23 @@ class WTFPairingEngine:
         else:
             base_filter &= Q(tournament=self.tournament)
         
-        # Check if teams have played
-        match_exists = Match.objects.filter(
-            base_filter &
-            ((Q(team1_id=team1_id) & Q(team2_id=team2_id)) |
-             (Q(team1_id=team2_id) & Q(team2_id=team1_id)))
-        ).exists()
-        
-        return match_exists
+        played = Match.objects.filter(base_filter).values_list('team1_id', 'team2_id')
+        return PairingContext(played_pairs=played)
     
     def _create_matches(self, pairings: List[Tuple[TournamentTeam, TournamentTeam]], 
                        round_number: int) -> List[Match]:
         """Create Match objects from pairings."""
         matches = []
+        if not pairings:
+            return matches
+        
+        round_obj = Round.objects.get(
+            tournament=self.tournament,
+            stage=self.stage,
+            number_in_stage=round_number
+        )
         
         for team1_tt, team2_tt in pairings:
-            # Get the round object
-            round_obj = Round.objects.get(
-                tournament=self.tournament,
-                stage=self.stage,
-                number_in_stage=round_number
-            )
-            
             match_data = {
                 'tournament': self.tournament,
                 'team1': team1_tt.team,